@@ -6,8 +6,13 @@ from django.contrib.auth import get_user_model
 from django.utils.html import format_html
 from django.urls import reverse, NoReverseMatch
 from django.contrib.contenttypes.models import ContentType
-from django.utils import timezone
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.db.models import Q
 from django.shortcuts import redirect
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.template.response import TemplateResponse
+from django.urls import path
 
 # Import from allauth to customize its admin
 from allauth.account.models import EmailAddress
@@ -23,11 +28,36 @@ from .models import (
     Like,
     Notification,
     Report,
+    PurgeJob,
+    GroupJoinRequest,
 )
+from .admin_tools import AutocompleteFilter, LargeTableAdmin
+from .moderation import load_targets, moderation_queue, reasons_for, resolve
+from .purge import schedule_purge
 
 User = get_user_model()
 
 
+# --- Generic objects on a changelist page ---
+# Notifications, reports, comments and likes print and link the objects they
+# point at. Prefetched, these are one query per type for the page, with what
+# each __str__ reads joined in, rather than several queries per row.
+def generic_display_querysets():
+    posts = StatusPost.objects.select_related("author")
+    comments = Comment.objects.select_related("author").prefetch_related(
+        GenericPrefetch("content_object", [posts])
+    )
+    return [
+        posts,
+        comments,
+        Like.objects.select_related("user").prefetch_related(
+            GenericPrefetch("content_object", [posts, comments])
+        ),
+        Follow.objects.select_related("follower", "following"),
+        GroupJoinRequest.objects.select_related("user", "group"),
+    ]
+
+
 # --- Define the Inline Admin for UserProfile ---
 class UserProfileInline(admin.StackedInline):
     model = UserProfile
@@ -48,6 +78,23 @@ class CustomUserAdmin(BaseUserAdmin):
     search_fields = ("username", "email", "first_name", "last_name")
     # --- END OF NEW ADDITION ---
 
+    actions = ["schedule_purge"]
+
+    @admin.action(description="Schedule a batched purge of the selected users")
+    def schedule_purge(self, request, queryset):
+        # Deleting a heavy user through the ORM holds every related row in
+        # memory and locks for the whole cascade; `run_purge_jobs` does it
+        # in small batches instead.
+        job = schedule_purge(
+            queryset.exclude(is_superuser=True),
+            label=f"Admin purge by {request.user.username}",
+        )
+        self.message_user(
+            request,
+            f"{job} scheduled for {len(job.object_ids)} user(s); "
+            f"run `manage.py run_purge_jobs` to carry it out.",
+        )
+
     def get_inline_instances(self, request, obj=None):
         if not obj:
             return list()
@@ -113,17 +160,56 @@ class UserProfileAdmin(admin.ModelAdmin):
     picture_tag.short_description = "Picture"
 
 
-admin.site.register(Follow)
+@admin.register(Follow)
+class FollowAdmin(LargeTableAdmin):
+    list_select_related = ("follower", "following")
+    list_filter = (("follower", AutocompleteFilter), ("following", AutocompleteFilter))
+    autocomplete_fields = ("follower", "following")
+
+
 admin.site.register(Group)
-admin.site.register(Comment)
-admin.site.register(Like)
+
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_filter = ("created_at", ("author", AutocompleteFilter))
+    search_fields = ("content", "author__username")
+    autocomplete_fields = ("author", "parent")
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("author")
+            .prefetch_related(
+                GenericPrefetch("content_object", generic_display_querysets())
+            )
+        )
+
+
+@admin.register(Like)
+class LikeAdmin(LargeTableAdmin):
+    list_filter = ("reaction_type", ("user", AutocompleteFilter))
+    autocomplete_fields = ("user",)
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("user")
+            .prefetch_related(
+                GenericPrefetch("content_object", generic_display_querysets())
+            )
+        )
 
 
 @admin.register(StatusPost)
-class StatusPostAdmin(admin.ModelAdmin):
+class StatusPostAdmin(LargeTableAdmin):
     list_display = ("id", "author", "content_preview", "created_at")
-    list_filter = ("created_at", "author")
+    list_filter = ("created_at", ("author", AutocompleteFilter))
+    list_select_related = ("author",)
     search_fields = ("content", "author__username")
+    autocomplete_fields = ("author", "parent_post", "shared_via")
     readonly_fields = ("image_tag_detail", "video_player_detail")
 
     def content_preview(self, obj):
@@ -148,7 +234,7 @@ class StatusPostAdmin(admin.ModelAdmin):
 
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(LargeTableAdmin):
     list_display = (
         "id",
         "recipient_username_link",
@@ -164,8 +250,8 @@ class NotificationAdmin(admin.ModelAdmin):
         "is_read",
         "notification_type",
         "timestamp",
-        "recipient__username",
-        "actor__username",
+        ("recipient", AutocompleteFilter),
+        ("actor", AutocompleteFilter),
     )
     search_fields = ("recipient__username", "actor__username", "verb")
     list_select_related = (
@@ -174,6 +260,7 @@ class NotificationAdmin(admin.ModelAdmin):
         "target_content_type",
         "action_object_content_type",
     )
+    autocomplete_fields = ("recipient", "actor")
     date_hierarchy = "timestamp"
 
     readonly_fields = (
@@ -186,6 +273,16 @@ class NotificationAdmin(admin.ModelAdmin):
         "timestamp",
     )
 
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(
+                GenericPrefetch("target", generic_display_querysets()),
+                GenericPrefetch("action_object", generic_display_querysets()),
+            )
+        )
+
     def _get_admin_obj_url(self, obj_instance):
         if not obj_instance:
             return None
@@ -253,8 +350,47 @@ class NotificationAdmin(admin.ModelAdmin):
     target_link.short_description = "Target Object"
 
 
+class ContentAuthorFilter(admin.SimpleListFilter):
+    """
+    Reports on the posts and comments of one user, as linked from the
+    "Content Author" column. Only listed while applied, so the sidebar never
+    lists every user.
+    """
+
+    title = "content author"
+    parameter_name = "content_author"
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        if not value or not value.isdigit():
+            return []
+        return [
+            (str(pk), username)
+            for pk, username in User.objects.filter(pk=value).values_list(
+                "pk", "username"
+            )
+        ]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value is None:
+            return queryset
+        if not value.isdigit():
+            return queryset.none()
+        return queryset.filter(
+            Q(
+                content_type=ContentType.objects.get_for_model(StatusPost),
+                object_id__in=StatusPost.objects.filter(author_id=value).values("id"),
+            )
+            | Q(
+                content_type=ContentType.objects.get_for_model(Comment),
+                object_id__in=Comment.objects.filter(author_id=value).values("id"),
+            )
+        )
+
+
 @admin.register(Report)
-class ReportAdmin(admin.ModelAdmin):
+class ReportAdmin(LargeTableAdmin):
     list_display = (
         "id",
         "reporter_link",
@@ -265,8 +401,16 @@ class ReportAdmin(admin.ModelAdmin):
         "created_at",
         "moderator",
     )
-    list_filter = ("status", "reason", "created_at", "content_type")
+    list_filter = (
+        "status",
+        "reason",
+        "created_at",
+        "content_type",
+        ("reporter", AutocompleteFilter),
+        ContentAuthorFilter,
+    )
     search_fields = ("reporter__username", "details", "moderator__username")
+    list_select_related = ("reporter", "moderator", "content_type")
     list_editable = ("status",)
 
     actions = ["delete_reported_content", "dismiss_reports"]
@@ -297,33 +441,149 @@ class ReportAdmin(admin.ModelAdmin):
         ),
     )
 
+    # Decisions apply to the reported content, so to every open report on it
+    # (see community.moderation), not only to the selected rows.
     @admin.action(description='Delete reported content and mark as "Action Taken"')
     def delete_reported_content(self, request, queryset):
-        items_deleted = 0
-        for report in queryset:
-            if report.content_object:
-                report.content_object.delete()
-                items_deleted += 1
-        queryset.update(
-            status="ACTION_TAKEN",
-            moderator=request.user,
-            moderated_at=timezone.now(),
-            moderator_notes=f"Content deleted by {request.user.username} via admin action.",
+        closed, deleted = resolve(
+            self._targets(queryset),
+            request.user,
+            delete_content=True,
+            notes=f"Content deleted by {request.user.username} via admin action.",
         )
         self.message_user(
-            request, f"{items_deleted} piece(s) of content were successfully deleted."
+            request,
+            f"{deleted} piece(s) of content were successfully deleted and "
+            f"{closed} report(s) marked as action taken.",
         )
 
     @admin.action(description='Mark selected reports as "Dismissed"')
     def dismiss_reports(self, request, queryset):
-        updated_count = queryset.update(
-            status="DISMISSED",
-            moderator=request.user,
-            moderated_at=timezone.now(),
-            moderator_notes=f"Report dismissed by {request.user.username} via admin action.",
+        closed, _ = resolve(
+            self._targets(queryset),
+            request.user,
+            delete_content=False,
+            notes=f"Report dismissed by {request.user.username} via admin action.",
         )
         self.message_user(
-            request, f"{updated_count} report(s) were successfully marked as dismissed."
+            request, f"{closed} report(s) were successfully marked as dismissed."
+        )
+
+    @staticmethod
+    def _targets(queryset):
+        return set(queryset.values_list("content_type_id", "object_id"))
+
+    # --- Moderation queue: open reports grouped by what they report ---
+    def get_urls(self):
+        return [
+            path(
+                "queue/",
+                self.admin_site.admin_view(self.moderation_queue_view),
+                name="community_report_queue",
+            ),
+        ] + super().get_urls()
+
+    def moderation_queue_view(self, request):
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        if request.method == "POST":
+            return self._resolve_from_queue(request)
+
+        page = Paginator(moderation_queue(), 50).get_page(request.GET.get("p"))
+        rows = list(page.object_list)
+        targets = [(row["content_type"], row["object_id"]) for row in rows]
+        objects = load_targets(targets)
+        reasons = reasons_for(targets)
+        reason_labels = dict(Report.REASON_CHOICES)
+        changelist_url = reverse("admin:community_report_changelist")
+        entries = []
+        for row, target in zip(rows, targets):
+            content_type = ContentType.objects.get_for_id(target[0])
+            obj = objects.get(target)
+            try:
+                url = reverse(
+                    f"admin:{content_type.app_label}_{content_type.model}_change",
+                    args=[target[1]],
+                )
+            except NoReverseMatch:
+                url = None
+            preview = str(obj) if obj is not None else None
+            entries.append(
+                {
+                    **row,
+                    "key": f"{target[0]}:{target[1]}",
+                    "model": content_type.model,
+                    "preview": (
+                        preview[:75] + "..."
+                        if preview and len(preview) > 75
+                        else preview
+                    ),
+                    "url": url if obj is not None else None,
+                    "reasons": sorted(
+                        (
+                            (reason_labels.get(reason, reason), count)
+                            for reason, count in reasons[target].items()
+                        ),
+                        key=lambda item: -item[1],
+                    ),
+                    "reports_url": f"{changelist_url}?content_type__id__exact={target[0]}"
+                    f"&object_id={target[1]}",
+                }
+            )
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Moderation queue",
+            "entries": entries,
+            "page": page,
+        }
+        return TemplateResponse(
+            request, "admin/community/report/moderation_queue.html", context
+        )
+
+    def _resolve_from_queue(self, request):
+        decision = request.POST.get("decision")
+        targets = []
+        for key in request.POST.getlist("target"):
+            content_type_id, _, object_id = key.partition(":")
+            if content_type_id.isdigit() and object_id.isdigit():
+                targets.append((int(content_type_id), int(object_id)))
+        if decision not in ("delete", "dismiss") or not targets:
+            self.message_user(
+                request, "Select some content and a decision.", level="warning"
+            )
+            return redirect("admin:community_report_queue")
+        notes = request.POST.get("notes", "").strip()
+        if decision == "delete":
+            closed, deleted = resolve(
+                targets,
+                request.user,
+                delete_content=True,
+                notes=notes
+                or f"Content deleted by {request.user.username} from the moderation queue.",
+            )
+            self.message_user(
+                request,
+                f"{deleted} piece(s) of content deleted; {closed} report(s) marked as action taken.",
+            )
+        else:
+            closed, _ = resolve(
+                targets,
+                request.user,
+                delete_content=False,
+                notes=notes
+                or f"Reports dismissed by {request.user.username} from the moderation queue.",
+            )
+            self.message_user(request, f"{closed} report(s) dismissed.")
+        return redirect("admin:community_report_queue")
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(
+                GenericPrefetch("content_object", generic_display_querysets())
+            )
         )
 
     def reporter_link(self, obj):
@@ -342,7 +602,7 @@ class ReportAdmin(admin.ModelAdmin):
             author = obj.content_object.author
             url = (
                 reverse("admin:community_report_changelist")
-                + f'?object_id__in={author.status_posts.values_list("id", flat=True)}'
+                + f"?content_author={author.pk}"
             )
             return format_html(
                 '<a href="{}">{} (See reports for user)</a>', url, author.username
@@ -370,16 +630,16 @@ class ReportAdmin(admin.ModelAdmin):
 
     def response_change(self, request, obj):
         if "_delete_content_and_resolve" in request.POST:
-            if obj.content_object:
-                obj.content_object.delete()
-                obj.status = "ACTION_TAKEN"
-                obj.moderator = request.user
-                obj.moderated_at = timezone.now()
-                obj.moderator_notes = f"Content deleted by {request.user.username} from report detail view."
-                obj.save()
+            _, deleted = resolve(
+                [(obj.content_type_id, obj.object_id)],
+                request.user,
+                delete_content=True,
+                notes=f"Content deleted by {request.user.username} from report detail view.",
+            )
+            if deleted:
                 self.message_user(
                     request,
-                    "The reported content has been deleted and the report marked as resolved.",
+                    "The reported content has been deleted and its reports marked as resolved.",
                 )
             else:
                 self.message_user(
@@ -390,14 +650,15 @@ class ReportAdmin(admin.ModelAdmin):
             return redirect("admin:community_report_changelist")
 
         if "_dismiss_report" in request.POST:
-            obj.status = "DISMISSED"
-            obj.moderator = request.user
-            obj.moderated_at = timezone.now()
-            obj.moderator_notes = (
-                f"Report dismissed by {request.user.username} from report detail view."
+            closed, _ = resolve(
+                [(obj.content_type_id, obj.object_id)],
+                request.user,
+                delete_content=False,
+                notes=f"Report dismissed by {request.user.username} from report detail view.",
+            )
+            self.message_user(
+                request, f"{closed} report(s) on this content have been dismissed."
             )
-            obj.save()
-            self.message_user(request, "The report has been dismissed.")
             return redirect("admin:community_report_changelist")
 
         return super().response_change(request, obj)
@@ -408,3 +669,23 @@ class ReportAdmin(admin.ModelAdmin):
         return super().change_view(
             request, object_id, form_url, extra_context=extra_context
         )
+
+
+@admin.register(PurgeJob)
+class PurgeJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "label", "model", "status", "created_at", "finished_at")
+    list_filter = ("status", "model")
+    readonly_fields = (
+        "label",
+        "model",
+        "object_ids",
+        "status",
+        "deleted",
+        "error",
+        "created_at",
+        "started_at",
+        "finished_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
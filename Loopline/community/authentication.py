@@ -0,0 +1,161 @@
+# community/authentication.py
+"""
+Token authentication with the token -> user lookup cached.
+
+DRF's TokenAuthentication joins authtoken_token to auth_user on every
+request, and every WebSocket connect did the same. Here a token resolves to
+a snapshot of the user's identity fields, found in two tiers before the
+database is asked:
+
+    1. an in-process LRU, for AUTH_TOKEN_LOCAL_TTL seconds
+    2. the shared cache (Redis), for AUTH_TOKEN_CACHE_TTL seconds, under
+       auth:token:<sha256 of the token>
+
+The user is rebuilt from the snapshot as a model instance whose other fields
+(the password hash, last_login, ...) are deferred: they load on first access,
+related lookups work as usual, and save() only writes the fields it has.
+
+Entries are dropped when a token is deleted (logout) and when a user's
+password, active flag or snapshot fields change (see the signals). Another
+process's local tier can lag by up to AUTH_TOKEN_LOCAL_TTL seconds, which is
+why it is kept short.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .db_routing import primary_reads
+
+User = get_user_model()
+
+SNAPSHOT_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+# Saving any of these drops the user's cached tokens.
+INVALIDATING_FIELDS = frozenset(SNAPSHOT_FIELDS) | {"password"}
+LOCAL_CACHE_SIZE = 10000
+
+
+class _LocalTokenCache:
+    """A small thread-safe LRU of token -> (expiry, snapshot)."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, snapshot = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return snapshot
+
+    def set(self, key, snapshot, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local = _LocalTokenCache(LOCAL_CACHE_SIZE)
+
+
+def _cache_key(token_key):
+    return f"auth:token:{hashlib.sha256(token_key.encode()).hexdigest()}"
+
+
+def _user_from_snapshot(snapshot):
+    # from_db() wants the loaded values in the model's field order.
+    fields = [
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname in snapshot
+    ]
+    return User.from_db(DEFAULT_DB_ALIAS, fields, [snapshot[field] for field in fields])
+
+
+def cached_token_user(token_key):
+    """The user the token belongs to (active or not), or None if unknown."""
+    snapshot = _local.get(token_key)
+    if snapshot is None:
+        snapshot = cache.get(_cache_key(token_key))
+        if snapshot is None:
+            # From the primary: a token a replica hasn't seen yet would be
+            # rejected, and the snapshot is cached.
+            with primary_reads():
+                snapshot = (
+                    Token.objects.filter(key=token_key)
+                    .values(*(f"user__{field}" for field in SNAPSHOT_FIELDS))
+                    .first()
+                )
+            if snapshot is None:
+                return None
+            snapshot = {field: snapshot[f"user__{field}"] for field in SNAPSHOT_FIELDS}
+            cache.set(_cache_key(token_key), snapshot, settings.AUTH_TOKEN_CACHE_TTL)
+        _local.set(token_key, snapshot, settings.AUTH_TOKEN_LOCAL_TTL)
+    return _user_from_snapshot(snapshot)
+
+
+def _forget(token_keys):
+    for token_key in token_keys:
+        _local.delete(token_key)
+    cache.delete_many([_cache_key(token_key) for token_key in token_keys])
+
+
+def forget_tokens(token_keys):
+    """
+    Drops cached lookups of the tokens, now and again once the transaction
+    commits, so a request racing the change can't re-cache the old state.
+    """
+    token_keys = list(token_keys)
+    if token_keys:
+        _forget(token_keys)
+        transaction.on_commit(lambda: _forget(token_keys))
+
+
+def forget_user_tokens(user_id):
+    forget_tokens(Token.objects.filter(user_id=user_id).values_list("key", flat=True))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication, resolving tokens through cached_token_user."""
+
+    def authenticate_credentials(self, key):
+        user = cached_token_user(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return (user, Token(key=key, user=user))
@@ -1,46 +1,44 @@
 # C:\Users\Vinay\Project\Loopline\community\consumers.py
 # --- FINAL FIX for Global and Private Channels ---
 
-import json
-from urllib.parse import parse_qs
+import orjson
 from asgiref.sync import async_to_sync
 from channels.generic.websocket import WebsocketConsumer
-from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model
+from .live_polls import poll_group_name
+from .models import Poll
+from .renderers import frame
 
 User = get_user_model()
 
-def get_user_from_token(token_key):
-    try:
-        token = Token.objects.get(key=token_key)
-        return token.user
-    except Token.DoesNotExist:
-        return None
+def can_view_poll(user, poll_id):
+    """Polls in private groups are only streamed to members of the group."""
+    poll = Poll.objects.select_related('post__group').filter(pk=poll_id).first()
+    if poll is None:
+        return False
+    group = poll.post.group
+    if group is None or group.privacy_level == 'public':
+        return True
+    return group.members.filter(pk=user.pk).exists()
 
 class UserActivityConsumer(WebsocketConsumer):
     
     # [FIX] Define group names as class attributes for clarity and reuse
     GLOBAL_GROUP_NAME = "global_notifications"
+    # A feed page only shows a handful of polls; this just bounds abuse.
+    MAX_POLL_SUBSCRIPTIONS = 50
 
     def connect(self):
-        query_string = self.scope['query_string'].decode('utf-8')
-        query_params = parse_qs(query_string)
-        token_key = query_params.get('token', [None])[0]
-        
-        if token_key is None:
-            self.close()
-            return
-            
-        user = get_user_from_token(token_key)
-        
-        if user is None:
+        # TokenAuthMiddleware has already resolved ?token= to the user.
+        user = self.scope.get('user')
+
+        if user is None or not user.is_authenticated:
             self.close()
             return
 
-        self.scope['user'] = user
-        
         # [FIX] Keep track of the user-specific group name
         self.user_group_name = f'user_{user.id}'
+        self.poll_ids = set()
         
         # [FIX] Subscribe the user to THEIR PRIVATE group
         async_to_sync(self.channel_layer.group_add)(
@@ -70,21 +68,31 @@ class UserActivityConsumer(WebsocketConsumer):
             self.GLOBAL_GROUP_NAME,
             self.channel_name
         )
+
+        for poll_id in getattr(self, 'poll_ids', ()):
+            async_to_sync(self.channel_layer.group_discard)(
+                poll_group_name(poll_id),
+                self.channel_name
+            )
         print(f"CONSUMER-DEBUG: User '{self.scope['user'].username}' DISCONNECTED.")
 
 
+    def send_frame(self, event, key):
+        # Signals encode a push once for all its recipients and send it as
+        # 'text'; anything else carries the message to encode here.
+        text = event.get('text')
+        self.send(text_data=text if text is not None else frame(event[key]))
+
     # --- EXISTING METHOD: Handles receiving notification events from signals ---
     def send_notification(self, event):
-        message_data = event['message']
         # The frontend now expects a flat structure, so we send the inner message directly
-        self.send(text_data=json.dumps(message_data))
+        self.send_frame(event, 'message')
         print(f"!!! CONSUMER-DEBUG: Sent 'new_notification' to browser for group '{self.user_group_name}'")
 
     # --- EXISTING METHOD: Handles receiving new post events from signals ---
     def send_live_post(self, event):
-        message_data = event['message']
         # The frontend now expects a flat structure, so we send the inner message directly
-        self.send(text_data=json.dumps(message_data))
+        self.send_frame(event, 'message')
         print(f"!!! CONSUMER-DEBUG: Sent 'new_post' to browser for group '{self.user_group_name}'")
 
     # --- [FIX] NEW GENERIC METHOD: Handles global broadcast events ---
@@ -94,6 +102,39 @@ class UserActivityConsumer(WebsocketConsumer):
         It forwards the 'payload' of the message directly to the client.
         This is what our post_delete signal uses.
         """
-        payload = event['payload']
-        self.send(text_data=json.dumps(payload))
-        print(f"!!! CONSUMER-DEBUG: BROADCASTED event of type '{payload.get('type')}' to ALL connected clients.")
\ No newline at end of file
+        self.send_frame(event, 'payload')
+        print(f"!!! CONSUMER-DEBUG: BROADCASTED event of type '{event.get('payload', {}).get('type')}' to ALL connected clients.")
+
+    # --- LIVE POLL TALLIES ---
+    def receive(self, text_data=None, bytes_data=None):
+        """
+        Clients subscribe to the polls currently on screen:
+            {"type": "subscribe_poll", "poll_id": 12}
+            {"type": "unsubscribe_poll", "poll_id": 12}
+        """
+        try:
+            message = orjson.loads(text_data or '')
+            poll_id = int(message.get('poll_id'))
+        except (ValueError, TypeError, AttributeError):
+            return
+
+        if message.get('type') == 'subscribe_poll':
+            if poll_id in self.poll_ids or len(self.poll_ids) >= self.MAX_POLL_SUBSCRIPTIONS:
+                return
+            if not can_view_poll(self.scope['user'], poll_id):
+                return
+            self.poll_ids.add(poll_id)
+            async_to_sync(self.channel_layer.group_add)(
+                poll_group_name(poll_id),
+                self.channel_name
+            )
+        elif message.get('type') == 'unsubscribe_poll' and poll_id in self.poll_ids:
+            self.poll_ids.discard(poll_id)
+            async_to_sync(self.channel_layer.group_discard)(
+                poll_group_name(poll_id),
+                self.channel_name
+            )
+
+    def poll_tallies(self, event):
+        # The frame is built once by live_polls for all subscribers.
+        self.send_frame(event, 'payload')
@@ -0,0 +1,53 @@
+# community/db_health.py
+"""
+Database health and connection metrics, for the health check endpoint and
+`manage.py benchmark_connections`.
+
+Pool statistics come from psycopg_pool (see its docs for the fields, e.g.
+pool_size, pool_available, requests_waiting, requests_wait_ms) and are only
+there with DATABASE_POOL_MODE = "pool". They describe this worker process's
+pool; the server's view across every worker is server_connections().
+"""
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .db_routing import replica_lag
+
+
+def pool_stats(alias):
+    pool = getattr(connections[alias], "pool", None)
+    return pool.get_stats() if pool is not None else None
+
+
+def server_connections(alias="default"):
+    """This database's connections on the server, by state (active, idle, ...)."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT COALESCE(state, 'unknown'), count(*) FROM pg_stat_activity
+            WHERE datname = current_database() AND pid <> pg_backend_pid()
+            GROUP BY 1
+            """
+        )
+        return dict(cursor.fetchall())
+
+
+def database_status(alias, detailed=False):
+    started = time.perf_counter()
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except DatabaseError:
+        return {"ok": False}
+    status = {
+        "ok": True,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    if alias in settings.DATABASE_REPLICAS:
+        status["lag_seconds"] = replica_lag(alias)
+    if detailed:
+        status["pool"] = pool_stats(alias)
+        status["server_connections"] = server_connections(alias)
+    return status
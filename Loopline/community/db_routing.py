@@ -0,0 +1,201 @@
+# community/db_routing.py
+"""
+Read replicas for the API's safe requests, with read-your-writes stickiness.
+
+Replicas are the aliases in settings.DATABASE_REPLICAS (built from
+DATABASE_REPLICA_URLS). With none configured, nothing here changes where a
+query goes.
+
+Routing is opt-in per request: ReplicaRoutingMiddleware marks GET/HEAD/OPTIONS
+requests under /api/ (except /api/auth/, where tokens are created and
+checked) as replica-readable, and only then does PrimaryReplicaRouter send
+reads to a replica. Everything else - writes, other requests, management
+commands, Channels consumers, Celery-style background work - stays on the
+primary. Within a replica-readable request, reads still go to the primary
+once the request has written, while a transaction is open on it, and inside
+primary_reads(), which is for reads whose result gets cached.
+
+After a client's successful unsafe request, its reads are pinned to the
+primary for REPLICA_STICKY_SECONDS so it sees its own write. The pin lives in
+the shared cache, keyed by the client's Authorization header (or session
+cookie, or address), so it holds across workers:
+
+    db_pin:<sha256 of the credential>
+
+Logging in and registering pin the token they hand out, since that, not the
+credential the request came with, is what the client's next requests carry.
+
+A replica is skipped while it is more than REPLICA_MAX_LAG_SECONDS behind or
+unreachable; each worker re-checks a replica's lag at most once every
+REPLICA_LAG_CHECK_INTERVAL seconds.
+"""
+import contextlib
+import contextvars
+import hashlib
+import random
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+PRIMARY = "default"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+@dataclass
+class _RequestRouting:
+    replica: str = None
+    wrote: bool = False
+
+
+_routing = contextvars.ContextVar("db_routing", default=None)
+# alias -> (monotonic time of the check, lag in seconds or None if unknown)
+_lag_checks = {}
+
+
+def replica_lag(alias):
+    """
+    Seconds `alias` is behind the primary, or None if it can't be told.
+
+    A replica that has replayed everything it has received counts as 0 even if
+    its last replayed transaction is old, so a quiet primary doesn't make its
+    replicas look stale.
+    """
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(_LAG_SQL)
+            (lag,) = cursor.fetchone()
+    except DatabaseError:
+        return None
+    return None if lag is None else float(lag)
+
+
+def healthy_replicas():
+    now = time.monotonic()
+    healthy = []
+    for alias in settings.DATABASE_REPLICAS:
+        checked_at, lag = _lag_checks.get(alias, (None, None))
+        if (
+            checked_at is None
+            or now - checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL
+        ):
+            lag = replica_lag(alias)
+            _lag_checks[alias] = (now, lag)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS:
+            healthy.append(alias)
+    return healthy
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """Sends the reads inside the block to the primary."""
+    token = _routing.set(None)
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+def _credential_pin_key(credential):
+    return "db_pin:" + hashlib.sha256(credential.encode()).hexdigest()
+
+
+def _pin_key(request):
+    credential = (
+        request.META.get("HTTP_AUTHORIZATION")
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get("REMOTE_ADDR")
+    )
+    if not credential:
+        return None
+    return _credential_pin_key(credential)
+
+
+def _pin(pin_key):
+    if settings.REPLICA_STICKY_SECONDS > 0:
+        cache.set(pin_key, 1, settings.REPLICA_STICKY_SECONDS)
+
+
+def _pin_issued_token(request, response):
+    """Pins the token a successful login or registration returned."""
+    data = getattr(response, "data", None)
+    if (
+        request.method not in SAFE_METHODS
+        and response.status_code < 400
+        and isinstance(data, dict)
+        and data.get("key")
+    ):
+        _pin(_credential_pin_key(f"Token {data['key']}"))
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS or not request.path.startswith("/api/"):
+            return self.get_response(request)
+        if request.path.startswith("/api/auth/"):
+            response = self.get_response(request)
+            _pin_issued_token(request, response)
+            return response
+
+        pin_key = _pin_key(request)
+        state = None
+        if request.method in SAFE_METHODS and not (pin_key and cache.get(pin_key)):
+            state = _RequestRouting()
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and pin_key
+        ):
+            _pin(pin_key)
+        return response
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return None
+        state = _routing.get()
+        if state is None or state.wrote or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        if state.replica is None:
+            # Chosen once, so a request reads one consistent replica.
+            state.replica = random.choice(healthy_replicas() or [PRIMARY])
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return None
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        # Explicit, or Django would write an instance back to the alias it
+        # was read from.
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,155 @@
+# community/feed_ranking.py
+"""
+The ranked ("top") home feed.
+
+Candidates are the viewer's chronological feed - their own posts and those of
+the people they follow, filtered by group visibility - limited to the newest
+FEED_RANK_CANDIDATES posts of the last FEED_RANK_WINDOW_DAYS. Each is scored
+in one SQL statement over the whole candidate set:
+
+    score = recency * (1 + engagement) * (1 + affinity) * (1 + group)
+
+    recency      0.5 ** (age in hours / FEED_RANK_HALF_LIFE_HOURS)
+    engagement   ENGAGEMENT_WEIGHT * ln(1 + velocity), where velocity is
+                 likes + 2 * comments + 3 * reposts per hour of age
+    affinity     AFFINITY_WEIGHT * ln(1 + the viewer's reactions and comments
+                 on the author's posts over AFFINITY_DAYS), plus
+                 MUTUAL_WEIGHT if the author follows the viewer back
+    group        GROUP_WEIGHT if the post is in a group the viewer belongs to
+
+The ranked IDs are stored as a snapshot in the cache, so paging through them
+stays stable while scores move (see RankedFeedPagination in views).
+"""
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from .models import Comment, Follow, Like, PostReaction, StatusPost
+from .visibility import member_group_ids, visible_group_ids
+
+ENGAGEMENT_WEIGHT = 1.0
+AFFINITY_WEIGHT = 0.5
+MUTUAL_WEIGHT = 0.5
+GROUP_WEIGHT = 0.3
+AFFINITY_DAYS = 30
+# Comments say more about affinity than a reaction does.
+COMMENT_AFFINITY = 2.0
+
+_RANK_SQL = """
+    WITH candidates AS (
+        SELECT p.id, p.author_id, p.group_id, p.like_count, p.comment_count,
+               p.repost_count,
+               GREATEST(EXTRACT(EPOCH FROM (now() - p.created_at))::float8, 0)
+                   / 3600 AS age_hours
+        FROM {post} p
+        WHERE p.author_id = ANY(%(authors)s::bigint[])
+          AND (p.group_id IS NULL OR p.group_id = ANY(%(groups)s::bigint[]))
+          AND p.created_at >= %(since)s
+        ORDER BY p.created_at DESC, p.id DESC
+        LIMIT %(limit)s
+    ),
+    affinity AS (
+        SELECT author_id, sum(weight) AS weight FROM ({interactions}) interactions
+        GROUP BY author_id
+    )
+    SELECT c.id
+    FROM candidates c
+    LEFT JOIN affinity a ON a.author_id = c.author_id
+    LEFT JOIN {follow} f
+        ON f.follower_id = c.author_id AND f.following_id = %(viewer)s
+    ORDER BY
+        power(0.5, c.age_hours / %(half_life)s)
+        * (1 + %(engagement_weight)s * ln(1 + (
+            c.like_count + 2 * c.comment_count + 3 * c.repost_count
+        ) / (c.age_hours + 1)))
+        * (1 + %(affinity_weight)s * ln(1 + COALESCE(a.weight, 0))
+             + CASE WHEN f.id IS NULL THEN 0 ELSE %(mutual_weight)s END)
+        * (1 + CASE WHEN c.group_id = ANY(%(member_groups)s::bigint[])
+                    THEN %(group_weight)s ELSE 0 END)
+        DESC,
+        c.id DESC
+"""
+
+# The viewer's reactions and comments on posts, read from the typed tables
+# or, until ENGAGEMENT_TYPED_READS is on, through the generic relations.
+_TYPED_INTERACTIONS_SQL = """
+    SELECT p.author_id, 1.0::float8 AS weight
+    FROM {post_reaction} r JOIN {post} p ON p.id = r.post_id
+    WHERE r.user_id = %(viewer)s AND r.created_at >= %(affinity_since)s
+    UNION ALL
+    SELECT p.author_id, %(comment_affinity)s
+    FROM {comment} c JOIN {post} p ON p.id = c.post_id
+    WHERE c.author_id = %(viewer)s AND c.created_at >= %(affinity_since)s
+"""
+
+_GENERIC_INTERACTIONS_SQL = """
+    SELECT p.author_id, 1.0::float8 AS weight
+    FROM {like} l JOIN {post} p ON p.id = l.object_id
+    WHERE l.user_id = %(viewer)s AND l.content_type_id = %(post_type)s
+      AND l.created_at >= %(affinity_since)s
+    UNION ALL
+    SELECT p.author_id, %(comment_affinity)s
+    FROM {comment} c JOIN {post} p ON p.id = c.object_id
+    WHERE c.author_id = %(viewer)s AND c.content_type_id = %(post_type)s
+      AND c.created_at >= %(affinity_since)s
+"""
+
+
+def ranked_post_ids(user):
+    """The IDs of the viewer's candidate posts, best first."""
+    quote = connection.ops.quote_name
+    tables = {
+        "post": quote(StatusPost._meta.db_table),
+        "post_reaction": quote(PostReaction._meta.db_table),
+        "like": quote(Like._meta.db_table),
+        "comment": quote(Comment._meta.db_table),
+        "follow": quote(Follow._meta.db_table),
+    }
+    if settings.ENGAGEMENT_TYPED_READS:
+        interactions = _TYPED_INTERACTIONS_SQL.format(**tables)
+    else:
+        interactions = _GENERIC_INTERACTIONS_SQL.format(**tables)
+    sql = _RANK_SQL.format(interactions=interactions, **tables)
+    now = timezone.now()
+    authors = list(user.following.values_list("following_id", flat=True))
+    authors.append(user.pk)
+    params = {
+        "viewer": user.pk,
+        "post_type": ContentType.objects.get_for_model(StatusPost).pk,
+        "authors": authors,
+        "groups": sorted(visible_group_ids(user)),
+        "member_groups": sorted(member_group_ids(user.pk)),
+        "since": now - timedelta(days=settings.FEED_RANK_WINDOW_DAYS),
+        "affinity_since": now - timedelta(days=AFFINITY_DAYS),
+        "limit": settings.FEED_RANK_CANDIDATES,
+        "half_life": settings.FEED_RANK_HALF_LIFE_HOURS,
+        "engagement_weight": ENGAGEMENT_WEIGHT,
+        "affinity_weight": AFFINITY_WEIGHT,
+        "mutual_weight": MUTUAL_WEIGHT,
+        "group_weight": GROUP_WEIGHT,
+        "comment_affinity": COMMENT_AFFINITY,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [post_id for (post_id,) in cursor.fetchall()]
+
+
+def _snapshot_key(user_id, token):
+    return f"feed:top:{user_id}:{token}"
+
+
+def save_snapshot(user, post_ids):
+    """Stores a ranking for paging through; returns its token."""
+    token = secrets.token_urlsafe(8)
+    cache.set(_snapshot_key(user.pk, token), post_ids, settings.FEED_RANK_SNAPSHOT_TTL)
+    return token
+
+
+def load_snapshot(user, token):
+    """The ranking stored under `token`, or None once it has expired."""
+    return cache.get(_snapshot_key(user.pk, token))
@@ -0,0 +1,215 @@
+# community/hashtags.py
+"""
+Hashtags: parsing, the tag index and trending tags.
+
+Tags are parsed out of a post's content whenever it is saved (see the
+StatusPost signals) into Hashtag/PostHashtag, so a tag's timeline is an
+index scan instead of an `icontains` over every post. Posts from before the
+index are tagged by `manage.py backfill_hashtags`.
+
+Trending
+--------
+Each tag use on a committed post is counted in Redis, in time buckets of
+three sizes, one per trending window:
+
+    1h    12 buckets of 5 minutes
+    24h   24 buckets of 1 hour
+    7d    7 buckets of 1 day
+
+A bucket is a count-min sketch (a hash of SKETCH_DEPTH x SKETCH_WIDTH
+counters) plus a sorted set of its TOP_K_CAPACITY heaviest tags, so its
+memory is bounded however many distinct tags are used:
+
+    trending:<bucket seconds>:<bucket>:cms
+    trending:<bucket seconds>:<bucket>:top
+
+A use increments the tag's counters in the sketch, and the tag enters the
+bucket's top set if its estimate beats the lightest tag there. A window's
+trending tags are the sum of its buckets' top sets, kept for
+TRENDING_RESULT_TTL seconds, so the endpoint reads K entries rather than
+grouping over posts. Counts are estimates and never undercount.
+
+Only posts everyone may see are counted - no group, or a public one - so
+trending never names a tag used only inside private groups.
+"""
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from .models import Hashtag, PostHashtag
+from .redis_client import get_redis
+
+# A "#" not inside a word, then a word with at least one letter: "#django",
+# "#web3", but not "#1", "C#" or "&#39;".
+HASHTAG_RE = re.compile(r"(?<![\w#&])#(\w*[^\W\d_]\w*)")
+MAX_HASHTAGS_PER_POST = 30
+MAX_HASHTAG_LENGTH = 100
+
+# Window name -> (bucket length in seconds, buckets in the window).
+TRENDING_WINDOWS = {
+    "1h": (5 * 60, 12),
+    "24h": (60 * 60, 24),
+    "7d": (24 * 60 * 60, 7),
+}
+SKETCH_WIDTH = 1024
+SKETCH_DEPTH = 4
+# Tags tracked per bucket, and the most the trending endpoint returns.
+TOP_K_CAPACITY = 100
+TRENDING_RESULT_TTL = 30
+
+
+def extract_hashtags(text):
+    """The distinct tags in `text`, lower-cased, in order of appearance."""
+    names = []
+    for match in HASHTAG_RE.finditer(text or ""):
+        name = match.group(1).lower()[:MAX_HASHTAG_LENGTH]
+        if name not in names:
+            names.append(name)
+            if len(names) == MAX_HASHTAGS_PER_POST:
+                break
+    return names
+
+
+def _tag_posts(names_by_post):
+    """Adds PostHashtag rows for {post: names}, creating missing tags."""
+    all_names = {name for names in names_by_post.values() for name in names}
+    if not all_names:
+        return
+    Hashtag.objects.bulk_create(
+        [Hashtag(name=name) for name in all_names], ignore_conflicts=True
+    )
+    ids = dict(Hashtag.objects.filter(name__in=all_names).values_list("name", "id"))
+    PostHashtag.objects.bulk_create(
+        [
+            PostHashtag(post=post, hashtag_id=ids[name], created_at=post.created_at)
+            for post, names in names_by_post.items()
+            for name in names
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def sync_post_hashtags(post, created=False):
+    """
+    Makes the post's tags match its content. Returns the names of the tags
+    it gained.
+    """
+    names = set(extract_hashtags(post.content))
+    current = {}
+    if not created:
+        current = dict(
+            PostHashtag.objects.filter(post=post).values_list("hashtag__name", "id")
+        )
+    removed = [current[name] for name in current.keys() - names]
+    if removed:
+        PostHashtag.objects.filter(id__in=removed).delete()
+    added = names - current.keys()
+    _tag_posts({post: added})
+    return added
+
+
+def tag_posts(posts):
+    """Indexes the tags of many posts at once (additions only)."""
+    _tag_posts({post: extract_hashtags(post.content) for post in posts})
+
+
+def _trending_redis():
+    return get_redis(settings.TRENDING_REDIS_URL)
+
+
+def _bucket_key(bucket_seconds, bucket, kind):
+    return f"trending:{bucket_seconds}:{bucket}:{kind}"
+
+
+def _sketch_fields(name):
+    """The tag's counter in each row of a count-min sketch."""
+    digest = hashlib.blake2b(name.encode(), digest_size=4 * SKETCH_DEPTH).digest()
+    return [
+        f"{row}:{int.from_bytes(digest[4 * row : 4 * row + 4], 'big') % SKETCH_WIDTH}"
+        for row in range(SKETCH_DEPTH)
+    ]
+
+
+# KEYS: the bucket's sketch and top set. ARGV: tag, amount, TTL, capacity,
+# then the tag's sketch counters.
+_COUNT_SCRIPT = """
+local estimate
+for i = 5, #ARGV do
+    local count = redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[2])
+    if estimate == nil or count < estimate then
+        estimate = count
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+if redis.call('ZSCORE', KEYS[2], ARGV[1])
+        or redis.call('ZCARD', KEYS[2]) < tonumber(ARGV[4]) then
+    redis.call('ZADD', KEYS[2], estimate, ARGV[1])
+else
+    local lightest = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+    if estimate > tonumber(lightest[2]) then
+        redis.call('ZREM', KEYS[2], lightest[1])
+        redis.call('ZADD', KEYS[2], estimate, ARGV[1])
+    end
+end
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return estimate
+"""
+
+
+def count_hashtag_uses(names, now=None):
+    """Counts one use of each tag towards every trending window."""
+    if not names:
+        return
+    now = time.time() if now is None else now
+    redis = _trending_redis()
+    count = redis.register_script(_COUNT_SCRIPT)
+    pipe = redis.pipeline(transaction=False)
+    for name in names:
+        fields = _sketch_fields(name)
+        for bucket_seconds, buckets in TRENDING_WINDOWS.values():
+            bucket = int(now // bucket_seconds)
+            count(
+                keys=[
+                    _bucket_key(bucket_seconds, bucket, "cms"),
+                    _bucket_key(bucket_seconds, bucket, "top"),
+                ],
+                args=[name, 1, bucket_seconds * (buckets + 1), TOP_K_CAPACITY, *fields],
+                client=pipe,
+            )
+    try:
+        pipe.execute()
+    except RedisError:
+        # Trending is best effort; the post itself is already saved.
+        pass
+
+
+def trending_hashtags(window, limit, now=None):
+    """
+    The window's `limit` most used tags, as [(name, uses), ...]. Empty while
+    Redis is unavailable.
+    """
+    bucket_seconds, buckets = TRENDING_WINDOWS[window]
+    now = time.time() if now is None else now
+    current = int(now // bucket_seconds)
+    redis = _trending_redis()
+    result_key = f"trending:result:{window}:{current}"
+    try:
+        if not redis.exists(result_key):
+            pipe = redis.pipeline()
+            pipe.zunionstore(
+                result_key,
+                [
+                    _bucket_key(bucket_seconds, bucket, "top")
+                    for bucket in range(current - buckets + 1, current + 1)
+                ],
+            )
+            pipe.zremrangebyrank(result_key, 0, -TOP_K_CAPACITY - 1)
+            pipe.expire(result_key, TRENDING_RESULT_TTL)
+            pipe.execute()
+        top = redis.zrevrange(result_key, 0, limit - 1, withscores=True)
+    except RedisError:
+        return []
+    return [(name, int(uses)) for name, uses in top]
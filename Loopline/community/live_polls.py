@@ -0,0 +1,125 @@
+# community/live_polls.py
+"""
+Live poll tallies over the channel layer.
+
+Clients subscribe to a poll (see UserActivityConsumer) and receive
+`poll_tallies` frames carrying only the option counts. Pushes are coalesced
+per poll: the first vote in a quiet period is pushed straight away, votes
+arriving during the next POLL_TALLY_PUSH_WINDOW seconds only mark the poll
+dirty, and a single trailing push at the end of the window sends the latest
+counts. A poll taking hundreds of votes per second therefore produces at
+most one frame per window.
+
+The lock and dirty flag live in the shared cache, so the bound holds across
+all web workers, not just within one process.
+"""
+import threading
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .models import Poll
+from .renderers import frame
+
+
+def poll_group_name(poll_id):
+    return f"poll_{poll_id}"
+
+
+def _lock_key(poll_id):
+    return f"live_polls:lock:{poll_id}"
+
+
+def _dirty_key(poll_id):
+    return f"live_polls:dirty:{poll_id}"
+
+
+def build_tallies_payload(poll):
+    counts = poll.get_vote_counts()
+    return {
+        "poll_id": poll.id,
+        "post_id": poll.post_id,
+        "options": [
+            {"id": option_id, "vote_count": count}
+            for option_id, count in counts.items()
+        ],
+        "total_votes": sum(counts.values()),
+        "is_closed": poll.is_closed,
+    }
+
+
+def send_poll_tallies(poll_id):
+    try:
+        poll = Poll.objects.get(pk=poll_id)
+    except Poll.DoesNotExist:
+        return
+    async_to_sync(get_channel_layer().group_send)(
+        poll_group_name(poll_id),
+        {
+            "type": "poll_tallies",
+            "text": frame(
+                {"type": "poll_tallies", "payload": build_tallies_payload(poll)}
+            ),
+        },
+    )
+
+
+def _lock_timeout(window):
+    # The trailing flush normally releases the lock; the timeout only stops a
+    # crashed worker from silencing a poll forever.
+    return max(int(window * 10), 5)
+
+
+def publish_poll_tallies(poll_id):
+    """
+    Called after a vote commits. Pushes now if no push is in flight for this
+    poll, otherwise leaves the change for the trailing flush.
+    """
+    window = settings.POLL_TALLY_PUSH_WINDOW
+    if window <= 0:
+        send_poll_tallies(poll_id)
+        return
+    if cache.add(_lock_key(poll_id), 1, timeout=_lock_timeout(window)):
+        send_poll_tallies(poll_id)
+        _schedule_flush(poll_id, window)
+    else:
+        cache.set(_dirty_key(poll_id), 1, timeout=_lock_timeout(window))
+
+
+def flush_poll_tallies(poll_id):
+    """
+    Runs at the end of a window. Sends the counts if anything changed during
+    it (and starts another window), otherwise releases the poll's lock.
+    """
+    window = settings.POLL_TALLY_PUSH_WINDOW
+    if cache.delete(_dirty_key(poll_id)):
+        send_poll_tallies(poll_id)
+        cache.set(_lock_key(poll_id), 1, timeout=_lock_timeout(window))
+        _schedule_flush(poll_id, window)
+        return
+    cache.delete(_lock_key(poll_id))
+    # A vote may have marked the poll dirty between the two calls above,
+    # after seeing the lock still held. Pick it up rather than drop it.
+    if cache.get(_dirty_key(poll_id)) and cache.add(
+        _lock_key(poll_id), 1, timeout=_lock_timeout(window)
+    ):
+        cache.delete(_dirty_key(poll_id))
+        send_poll_tallies(poll_id)
+        _schedule_flush(poll_id, window)
+
+
+def _run_flush(poll_id):
+    try:
+        flush_poll_tallies(poll_id)
+    finally:
+        # This runs on a timer thread, which has its own DB connection.
+        connections.close_all()
+
+
+def _schedule_flush(poll_id, delay):
+    timer = threading.Timer(delay, _run_flush, args=[poll_id])
+    timer.daemon = True
+    timer.start()
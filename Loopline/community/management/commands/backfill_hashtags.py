@@ -0,0 +1,50 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\backfill_hashtags.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from community.hashtags import tag_posts
+from community.models import StatusPost
+
+
+class Command(BaseCommand):
+    help = (
+        "Indexes the hashtags of posts written before the hashtag index, in "
+        "small batches. Safe to run while the site is live, and to re-run. "
+        "Old posts don't count towards trending."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Posts per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches, to go easy on the database.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = StatusPost.objects.aggregate(last=Max("id"))["last"] or 0
+        posts = StatusPost.objects.filter(content__contains="#").only(
+            "id", "content", "created_at"
+        )
+        scanned = 0
+        for start in range(1, last_id + 1, batch_size):
+            batch = list(posts.filter(id__gte=start, id__lt=start + batch_size))
+            with transaction.atomic():
+                tag_posts(batch)
+            scanned += len(batch)
+            if options["pause"]:
+                time.sleep(options["pause"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed the hashtags of {scanned} post(s).")
+        )
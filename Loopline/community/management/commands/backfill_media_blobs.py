@@ -0,0 +1,68 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\backfill_media_blobs.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from community.models import MediaBlob, PostMedia, UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves post media and profile pictures stored before content addressing "
+        "into blob storage, so identical files are kept only once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delete-originals",
+            action="store_true",
+            help="Delete each legacy file once no row points at it any more.",
+        )
+
+    def handle(self, *args, **options):
+        media_count = self.backfill(
+            PostMedia.objects.filter(blob__isnull=True).exclude(file=""),
+            "file",
+            "blob",
+            options["delete_originals"],
+        )
+        picture_count = self.backfill(
+            UserProfile.objects.filter(picture_blob__isnull=True)
+            .exclude(picture="")
+            .exclude(picture__isnull=True),
+            "picture",
+            "picture_blob",
+            options["delete_originals"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Moved {media_count} post media file(s) and "
+                f"{picture_count} profile picture(s) into blob storage."
+            )
+        )
+
+    def backfill(self, queryset, file_field, blob_field, delete_originals):
+        model = queryset.model
+        moved = 0
+        for row in queryset.iterator(chunk_size=500):
+            field_file = getattr(row, file_field)
+            legacy_name = field_file.name
+            storage = field_file.storage
+            if not storage.exists(legacy_name):
+                self.stdout.write(self.style.WARNING(f"Missing file: {legacy_name}"))
+                continue
+
+            with storage.open(legacy_name, "rb") as legacy_file:
+                blob_name = storage.save(legacy_name, legacy_file)
+            with transaction.atomic():
+                digest = MediaBlob.objects.acquire(blob_name)
+                # update() so model save() hooks do not take a second reference.
+                model.objects.filter(pk=row.pk).update(
+                    **{file_field: blob_name, f"{blob_field}_id": digest}
+                )
+            moved += 1
+
+            still_used = model.objects.filter(**{file_field: legacy_name}).exists()
+            if delete_originals and not still_used:
+                storage.delete(legacy_name)
+        return moved
@@ -0,0 +1,88 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\backfill_typed_engagement.py
+
+import time
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+
+from community.models import Comment, Like, StatusPost
+from community.reactions import TYPED_REACTION_MODELS
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies likes and comments written before the typed engagement tables "
+        "into PostReaction/CommentReaction and Comment.post, in small batches. "
+        "Safe to run while the site is live, and to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows of the source table per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches, to go easy on the database.",
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.pause = options["pause"]
+        quote = connection.ops.quote_name
+        like_table = quote(Like._meta.db_table)
+
+        for model in TYPED_REACTION_MODELS:
+            typed_model, field_name = TYPED_REACTION_MODELS[model]
+            typed_fk = quote(typed_model._meta.get_field(field_name).column)
+            copied = self.run_batches(
+                Like,
+                f"""
+                INSERT INTO {quote(typed_model._meta.db_table)}
+                    (user_id, {typed_fk}, reaction_type, created_at)
+                SELECT l.user_id, l.object_id, l.reaction_type, l.created_at
+                FROM {like_table} l
+                JOIN {quote(model._meta.db_table)} t ON t.id = l.object_id
+                WHERE l.content_type_id = %s AND l.id >= %s AND l.id < %s
+                ON CONFLICT DO NOTHING
+                """,
+                [ContentType.objects.get_for_model(model).id],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Copied {copied} like(s) into {typed_model.__name__}."
+                )
+            )
+
+        comment_table = quote(Comment._meta.db_table)
+        linked = self.run_batches(
+            Comment,
+            f"""
+            UPDATE {comment_table} c SET post_id = c.object_id
+            FROM {quote(StatusPost._meta.db_table)} p
+            WHERE p.id = c.object_id AND c.post_id IS NULL
+              AND c.content_type_id = %s AND c.id >= %s AND c.id < %s
+            """,
+            [ContentType.objects.get_for_model(StatusPost).id],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Linked {linked} comment(s) to their posts.")
+        )
+
+    def run_batches(self, source_model, sql, params):
+        """Runs `sql` over consecutive ID ranges of the source table."""
+        last_id = source_model.objects.aggregate(last=Max("id"))["last"] or 0
+        total = 0
+        for start in range(1, last_id + 1, self.batch_size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, [*params, start, start + self.batch_size])
+                total += cursor.rowcount
+            if self.pause:
+                time.sleep(self.pause)
+        return total
@@ -0,0 +1,250 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\benchmark_connections.py
+
+import asyncio
+import json
+import threading
+import time
+
+from channels.testing import HttpCommunicator, WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+from django.db.models import Count
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from community.db_health import pool_stats, server_connections
+from community.models import Poll
+
+User = get_user_model()
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 2)
+
+
+def summarize(latencies, errors, seconds):
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": round(max(latencies), 2) if latencies else None,
+    }
+
+
+class ConnectionSampler(threading.Thread):
+    """Counts this database's server connections every `interval` seconds."""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.samples.append(sum(server_connections().values()))
+            except DatabaseError:
+                pass
+            finally:
+                # Hands the connection back, so the sampler doesn't hold one.
+                connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives the ASGI application in-process with concurrent HTTP and "
+        "WebSocket clients, and reports their latency and the server "
+        "connections the database saw meanwhile (from pg_stat_activity). Run "
+        "it under each DATABASE_POOL_MODE to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--http-clients",
+            type=int,
+            default=20,
+            help="Concurrent clients requesting --path back to back.",
+        )
+        parser.add_argument(
+            "--ws-clients",
+            type=int,
+            default=20,
+            help=(
+                "Concurrent clients connecting to the activity socket, "
+                "subscribing to a poll and disconnecting, back to back."
+            ),
+        )
+        parser.add_argument(
+            "--duration", type=float, default=10.0, help="Seconds to run for."
+        )
+        parser.add_argument(
+            "--path", help="API path the HTTP clients request (default: the feed)."
+        )
+        parser.add_argument(
+            "--user",
+            help="Username to authenticate as (default: the most followed user).",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON."
+        )
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        if connections["default"].vendor != "postgresql":
+            raise CommandError("Counting server connections needs PostgreSQL.")
+        # Imported here, as loading it sets the application up.
+        from config.asgi import application
+
+        self.application = application
+        user = self.pick_user(options["user"])
+        self.token = Token.objects.get_or_create(user=user)[0].key
+        self.poll_id = Poll.objects.values_list("id", flat=True).first()
+        self.path = options["path"] or reverse("community:user-feed")
+        connections.close_all()
+
+        sampler = ConnectionSampler(interval=0.1)
+        sampler.start()
+        try:
+            http, ws = asyncio.run(
+                self.run_load(
+                    options["http_clients"], options["ws_clients"], options["duration"]
+                )
+            )
+        finally:
+            sampler.stopped.set()
+            sampler.join()
+
+        samples = sampler.samples
+        report = {
+            "pool_mode": settings.DATABASE_POOL_MODE,
+            "http_clients": options["http_clients"],
+            "ws_clients": options["ws_clients"],
+            "duration": options["duration"],
+            "path": self.path,
+            "http": http,
+            "websocket": ws,
+            "server_connections": {
+                "peak": max(samples, default=None),
+                "mean": round(sum(samples) / len(samples), 1) if samples else None,
+            },
+            "pool": pool_stats("default"),
+        }
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+
+    def pick_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {username!r}.")
+        user = User.objects.annotate(n=Count("followers")).order_by("-n", "id").first()
+        if user is None:
+            raise CommandError("The database has no users; seed it first.")
+        return user
+
+    async def run_load(self, http_clients, ws_clients, duration):
+        deadline = time.monotonic() + duration
+        http_latencies, ws_latencies = [], []
+        errors = {"http": 0, "websocket": 0}
+        started = time.monotonic()
+        await asyncio.gather(
+            *[
+                self.http_client(deadline, http_latencies, errors)
+                for _ in range(http_clients)
+            ],
+            *[
+                self.ws_client(deadline, ws_latencies, errors)
+                for _ in range(ws_clients)
+            ],
+        )
+        seconds = time.monotonic() - started
+        return (
+            summarize(http_latencies, errors["http"], seconds),
+            summarize(ws_latencies, errors["websocket"], seconds),
+        )
+
+    async def http_client(self, deadline, latencies, errors):
+        headers = [
+            (b"host", b"localhost"),
+            (b"authorization", f"Token {self.token}".encode()),
+        ]
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            communicator = HttpCommunicator(
+                self.application, "GET", self.path, headers=headers
+            )
+            try:
+                response = await communicator.get_response(timeout=30)
+                # Let the request finish, as a server would, so Django's
+                # request_finished handling gives the connection back.
+                await communicator.wait(timeout=30)
+            except Exception:
+                errors["http"] += 1
+                continue
+            if response["status"] >= 400:
+                errors["http"] += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async def ws_client(self, deadline, latencies, errors):
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            communicator = WebsocketCommunicator(
+                self.application, f"/ws/activity/?token={self.token}"
+            )
+            try:
+                connected, _ = await communicator.connect(timeout=30)
+                if connected and self.poll_id:
+                    await communicator.send_json_to(
+                        {"type": "subscribe_poll", "poll_id": self.poll_id}
+                    )
+                    # Wait for the subscription to be handled.
+                    await communicator.receive_nothing(timeout=0.05)
+                await communicator.disconnect(timeout=30)
+            except Exception:
+                errors["websocket"] += 1
+                continue
+            if not connected:
+                errors["websocket"] += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"Pool mode {report['pool_mode']!r}: {report['http_clients']} HTTP and "
+            f"{report['ws_clients']} WebSocket clients for {report['duration']}s"
+        )
+        for name, label in (
+            ("http", f"GET {report['path']}"),
+            ("websocket", "WS session"),
+        ):
+            stats = report[name]
+            line = (
+                f"  {label:<28} {stats['count']:>6} ok {stats['errors']:>4} failed "
+                f"{stats['per_second']:>8}/s  p50 {stats['p50_ms']} ms  "
+                f"p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms"
+            )
+            style = self.style.WARNING if stats["errors"] else self.style.SUCCESS
+            self.stdout.write(style(line))
+        connections_seen = report["server_connections"]
+        self.stdout.write(
+            f"  Server connections: peak {connections_seen['peak']}, "
+            f"mean {connections_seen['mean']}"
+        )
+        if report["pool"]:
+            self.stdout.write(f"  Pool: {json.dumps(report['pool'])}")
@@ -0,0 +1,141 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\benchmark_renderers.py
+
+import gzip
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.urls import resolve, reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from community.renderers import MessagePackRenderer, ORJSONRenderer
+
+User = get_user_model()
+
+ENCODERS = {
+    "json": JSONRenderer(),
+    "orjson": ORJSONRenderer(),
+    "msgpack": MessagePackRenderer(),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares encode time and payload size of the stdlib JSON, orjson and "
+        "MessagePack renderers on real feed and notification pages, fetched "
+        "as the best-connected users in the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=10, help="Users whose pages are encoded."
+        )
+        parser.add_argument(
+            "--pages", type=int, default=3, help="Pages per user and endpoint."
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=50, help="Encodes per page and encoder."
+        )
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            dest="endpoints",
+            help="URL name to fetch (repeatable). Default: the feed and notifications.",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON."
+        )
+
+    def handle(self, *args, **options):
+        endpoints = options["endpoints"] or [
+            "community:user-feed",
+            "community:notification-list",
+        ]
+        users = list(
+            User.objects.annotate(follows=Count("following")).order_by(
+                "-follows", "pk"
+            )[: options["users"]]
+        )
+        if not users:
+            raise CommandError("No users to fetch pages for; seed some data first.")
+
+        report = {}
+        for endpoint in endpoints:
+            pages = [
+                page
+                for user in users
+                for page in self.fetch_pages(endpoint, user, options["pages"])
+            ]
+            if not pages:
+                continue
+            report[endpoint] = self.measure(pages, options["repeat"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for endpoint, result in report.items():
+            self.stdout.write(f"{endpoint}: {result['pages']} page(s)")
+            if result["mismatches"]:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"  {result['mismatches']} page(s) decode differently from stdlib JSON!"
+                    )
+                )
+            for name, row in result["encoders"].items():
+                self.stdout.write(
+                    f"  {name:8} {row['median_us']:>9.1f} us/page "
+                    f"({row['speedup']:.1f}x)  {row['mean_bytes']:>8} B  "
+                    f"{row['mean_gzip_bytes']:>7} B gzipped"
+                )
+        self.stdout.write(self.style.SUCCESS("Benchmark complete."))
+
+    def fetch_pages(self, endpoint, user, count):
+        """Up to `count` pages of `endpoint` as `user` sees them, as response data."""
+        factory = APIRequestFactory()
+        path = reverse(endpoint)
+        view = resolve(path).func
+        pages = []
+        while path and len(pages) < count:
+            request = factory.get(path, HTTP_HOST="localhost")
+            force_authenticate(request, user=user)
+            response = view(request)
+            if response.status_code != 200:
+                break
+            pages.append(response.data)
+            path = (
+                response.data.get("next") if isinstance(response.data, dict) else None
+            )
+        return pages
+
+    def measure(self, pages, repeat):
+        mismatches = sum(
+            json.loads(ENCODERS["orjson"].render(page))
+            != json.loads(ENCODERS["json"].render(page))
+            for page in pages
+        )
+        encoders = {}
+        for name, renderer in ENCODERS.items():
+            timings = []
+            for page in pages:
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    renderer.render(page)
+                timings.append((time.perf_counter() - started) / repeat * 1e6)
+            bodies = [renderer.render(page) for page in pages]
+            encoders[name] = {
+                "median_us": round(statistics.median(timings), 1),
+                "mean_bytes": round(statistics.mean(len(body) for body in bodies)),
+                "mean_gzip_bytes": round(
+                    statistics.mean(len(gzip.compress(body)) for body in bodies)
+                ),
+            }
+        baseline = encoders["json"]["median_us"]
+        for row in encoders.values():
+            row["speedup"] = (
+                round(baseline / row["median_us"], 2) if row["median_us"] else None
+            )
+        return {"pages": len(pages), "mismatches": mismatches, "encoders": encoders}
@@ -4,10 +4,11 @@
 import os
 import re
 from django.core.management.base import BaseCommand
-from django.db import transaction
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
+from community.purge import BATCH_SIZE, run_purge_job, schedule_purge
+
 User = get_user_model()
 
 
@@ -22,8 +23,13 @@ class Command(BaseCommand):
             required=True,
             help="The credential file to process for cleanup (e.g., seeded_users.txt).",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows per DELETE statement.",
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
         filename = options["file"]
         file_path = os.path.join(settings.BASE_DIR, filename)
@@ -63,12 +69,26 @@ class Command(BaseCommand):
             f"Found {len(usernames_to_delete)} usernames. Proceeding with DB deletion..."
         )
 
-        # This simple query is all that's needed.
-        # The database's 'on_delete=CASCADE' policy handles deleting all related content.
-        users_to_delete = User.objects.filter(username__in=usernames_to_delete)
-
-        deleted_count, _ = users_to_delete.delete()
+        # The users and everything that depends on them go in small batches
+        # (see community/purge.py). If this stops part way, the job is left
+        # behind and `manage.py run_purge_jobs` finishes it.
+        job = schedule_purge(
+            User.objects.filter(username__in=usernames_to_delete),
+            label=f"clear_seeded_data {filename}",
+        )
+        try:
+            run_purge_job(job, options["batch_size"])
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Error: {job} stopped ({e}). Finish it with "
+                    f"`manage.py run_purge_jobs --job {job.pk}`; the credential "
+                    f"file is kept until then."
+                )
+            )
+            return
 
+        deleted_count = job.deleted.get(User._meta.label, 0)
         self.stdout.write(
             self.style.SUCCESS(
                 f" > Deleted {deleted_count} user accounts and all their associated data."
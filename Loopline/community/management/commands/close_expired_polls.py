@@ -0,0 +1,25 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\close_expired_polls.py
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from community.models import Poll
+
+
+class Command(BaseCommand):
+    help = (
+        "Freezes the results of polls whose deadline has passed. Polls are also "
+        "closed lazily on the next vote attempt; this just does it up front."
+    )
+
+    def handle(self, *args, **options):
+        expired = Poll.objects.filter(
+            closed_at__isnull=True, closes_at__lte=timezone.now()
+        )
+
+        closed_count = 0
+        for poll in expired.iterator():
+            poll.close()
+            closed_count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed_count} expired poll(s)."))
@@ -0,0 +1,262 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\explain_hot_queries.py
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from community.models import Conversation, Group
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests the hot API views (feed, group feed, profile posts, discover, "
+        "notifications, messages) as a real user, runs EXPLAIN (ANALYZE, BUFFERS) "
+        "on every SELECT they issue, and flags sequential scans, sorts and bad "
+        "row estimates. Run it against a seeded database (see seed_data). "
+        "Nothing is written: each view runs in a rolled-back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Username to request the views as (default: the most followed user).",
+        )
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=1000,
+            help="Ignore scans and sorts over fewer rows than this.",
+        )
+        parser.add_argument(
+            "--misestimate",
+            type=float,
+            default=10.0,
+            help="Flag plan nodes whose row estimate is off by this factor or more.",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON."
+        )
+        parser.add_argument("--output", help="Also write the JSON report to this file.")
+        parser.add_argument(
+            "--baseline",
+            help=(
+                "A report written earlier with --output. Fails if any finding is "
+                "not in it, for use as a regression check."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("EXPLAIN (ANALYZE, BUFFERS) needs PostgreSQL.")
+        self.min_rows = options["min_rows"]
+        self.misestimate = options["misestimate"]
+        user = self.pick_user(options["user"])
+
+        report = {"user": user.username, "views": []}
+        for name, path in self.hot_view_paths(user):
+            if path is None:
+                self.stderr.write(self.style.WARNING(f"Skipping {name}: no data."))
+                continue
+            report["views"].append(self.explain_view(name, path, user))
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+
+        if options["baseline"]:
+            self.check_baseline(report, options["baseline"])
+
+    def pick_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {username!r}.")
+        user = User.objects.annotate(n=Count("followers")).order_by("-n", "id").first()
+        if user is None:
+            raise CommandError("The database has no users; seed it first.")
+        return user
+
+    def hot_view_paths(self, user):
+        group = (
+            Group.objects.annotate(n=Count("status_posts")).order_by("-n", "id").first()
+        )
+        conversation = (
+            Conversation.objects.filter(participants=user)
+            .annotate(n=Count("messages"))
+            .order_by("-n", "id")
+            .first()
+        )
+        return [
+            ("feed", reverse("community:user-feed")),
+            (
+                "group_feed",
+                group
+                and reverse(
+                    "community:group-statuspost-list", kwargs={"slug": group.slug}
+                ),
+            ),
+            (
+                "profile_posts",
+                reverse("community:user-post-list", kwargs={"username": user.username}),
+            ),
+            ("discover", reverse("community:network-discover")),
+            ("notifications", reverse("community:notification-list")),
+            (
+                "messages",
+                conversation
+                and reverse(
+                    "community:message-list",
+                    kwargs={"conversation_id": conversation.pk},
+                ),
+            ),
+        ]
+
+    def explain_view(self, name, path, user):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=user)
+        match = resolve(path)
+        queries = []
+        try:
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as captured:
+                    response = match.func(request, *match.args, **match.kwargs)
+                    response.render()
+                for query in captured.captured_queries:
+                    if query["sql"].lstrip().upper().startswith("SELECT"):
+                        queries.append(self.explain_query(query["sql"]))
+                raise _Rollback
+        except _Rollback:
+            pass
+        return {
+            "view": name,
+            "path": path,
+            "status": response.status_code,
+            "queries": queries,
+            "findings": [f for q in queries for f in q["findings"]],
+        }
+
+    def explain_query(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+            (plan_json,) = cursor.fetchone()
+        if isinstance(plan_json, str):
+            plan_json = json.loads(plan_json)
+        result = plan_json[0]
+        plan = result["Plan"]
+        findings = []
+        self.inspect(plan, findings)
+        return {
+            "sql": sql,
+            "execution_ms": result.get("Execution Time"),
+            "planning_ms": result.get("Planning Time"),
+            "shared_hit_blocks": plan.get("Shared Hit Blocks", 0),
+            "shared_read_blocks": plan.get("Shared Read Blocks", 0),
+            "findings": findings,
+        }
+
+    def inspect(self, node, findings):
+        node_type = node["Node Type"]
+        loops = node.get("Actual Loops", 1) or 1
+        actual = node.get("Actual Rows", 0) * loops
+        estimated = node.get("Plan Rows", 0) * loops
+        relation = node.get("Relation Name")
+        scanned = actual + node.get("Rows Removed by Filter", 0) * loops
+
+        if node_type == "Seq Scan" and scanned >= self.min_rows:
+            findings.append(
+                {"kind": "seq_scan", "relation": relation, "rows_scanned": scanned}
+            )
+        if node_type in ("Sort", "Incremental Sort") and (
+            actual >= self.min_rows or node.get("Sort Space Type") == "Disk"
+        ):
+            findings.append(
+                {
+                    "kind": "sort",
+                    "sort_key": node.get("Sort Key"),
+                    "method": node.get("Sort Method"),
+                    "space_type": node.get("Sort Space Type"),
+                    "rows": actual,
+                }
+            )
+        high, low = max(actual, estimated), max(min(actual, estimated), 1)
+        if high >= self.min_rows and high / low >= self.misestimate:
+            findings.append(
+                {
+                    "kind": "misestimate",
+                    "node": node_type,
+                    "relation": relation,
+                    "estimated_rows": estimated,
+                    "actual_rows": actual,
+                }
+            )
+        for child in node.get("Plans", []):
+            self.inspect(child, findings)
+
+    def print_report(self, report):
+        self.stdout.write(f"Hot views as {report['user']}:")
+        for view in report["views"]:
+            total_ms = sum(q["execution_ms"] or 0 for q in view["queries"])
+            line = (
+                f"  {view['view']:<14} {len(view['queries']):>3} queries "
+                f"{total_ms:>9.2f} ms  HTTP {view['status']}"
+            )
+            if view["findings"]:
+                self.stdout.write(self.style.WARNING(line))
+                for finding in view["findings"]:
+                    self.stdout.write(f"      {self.describe(finding)}")
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+    @staticmethod
+    def describe(finding):
+        details = ", ".join(
+            f"{key}={value}" for key, value in finding.items() if key != "kind"
+        )
+        return f"{finding['kind']}: {details}"
+
+    @staticmethod
+    def finding_key(view, finding):
+        # Row counts vary between runs; what matters is where it happens.
+        return (
+            view,
+            finding["kind"],
+            finding.get("relation"),
+            json.dumps(finding.get("sort_key")),
+        )
+
+    def check_baseline(self, report, baseline_path):
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+        known = {
+            self.finding_key(view["view"], finding)
+            for view in baseline["views"]
+            for finding in view["findings"]
+        }
+        new = [
+            (view["view"], finding)
+            for view in report["views"]
+            for finding in view["findings"]
+            if self.finding_key(view["view"], finding) not in known
+        ]
+        if new:
+            for view, finding in new:
+                self.stderr.write(f"New in {view}: {self.describe(finding)}")
+            raise CommandError(f"{len(new)} finding(s) not in the baseline.")
+        self.stdout.write(self.style.SUCCESS("No new findings against the baseline."))
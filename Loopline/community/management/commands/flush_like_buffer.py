@@ -0,0 +1,34 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\flush_like_buffer.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from community.reactions import flush_like_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes reactions buffered in Redis for hot posts and comments to the "
+        "database (see LIKE_WRITE_BEHIND_ENABLED)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Keep running, flushing every this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        while True:
+            flushed = flush_like_buffer()
+            if flushed or interval is None:
+                self.stdout.write(
+                    self.style.SUCCESS(f"Flushed {flushed} buffered reaction(s).")
+                )
+            if interval is None:
+                return
+            time.sleep(interval)
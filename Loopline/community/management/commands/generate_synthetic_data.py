@@ -0,0 +1,754 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\generate_synthetic_data.py
+# Builds a large, realistic dataset for capacity testing: no prompts, no
+# network, and the same world every time for the same --seed.
+#
+# Rows are streamed into PostgreSQL with COPY, so no model save() runs and no
+# signal fires. Everything the signals would normally maintain in the
+# database (like/comment/repost/reply/member/vote counters, the typed
+# reaction tables, comment paths, notifications) is written here directly.
+# The Redis indexes are not; run `rebuild_mention_index` afterwards if the
+# @mention typeahead matters for the test.
+
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from faker import Faker
+from psycopg.types.json import Jsonb
+
+from community.models import (
+    Comment,
+    Follow,
+    Group,
+    Like,
+    Notification,
+    Poll,
+    PollOption,
+    PollVote,
+    PostReaction,
+    StatusPost,
+    UserProfile,
+)
+
+User = get_user_model()
+
+# How often each reaction is picked, roughly as people use them.
+REACTION_WEIGHTS = {
+    "like": 60,
+    "love": 15,
+    "happy": 8,
+    "celebrate": 7,
+    "insightful": 6,
+    "brilliant": 4,
+}
+# Share of comments that reply to an earlier comment on the same post.
+REPLY_RATIO = 0.3
+# Share of posts that repost an earlier post.
+REPOST_RATIO = 0.03
+# Share of notifications already read.
+READ_RATIO = 0.7
+# Distinct strings drawn from Faker once; rows are assembled from them, as
+# calling Faker per row would dominate the run time.
+TEXT_POOL_SIZE = 2000
+
+
+def reserve_ids(model, count):
+    """
+    Takes `count` consecutive primary keys from the model's sequence, so rows
+    can be linked up before they are written. Run against a database nothing
+    else is writing to.
+    """
+    if not count:
+        return range(0)
+    table, column = model._meta.db_table, model._meta.pk.column
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, %s), "
+            "nextval(pg_get_serial_sequence(%s, %s)) + %s - 1)",
+            [table, column, table, column, count],
+        )
+        last = cursor.fetchone()[0]
+    return range(last - count + 1, last + 1)
+
+
+def instance_row(instance, columns):
+    """The values of a model instance's columns, defaults included."""
+    row = []
+    for name in columns:
+        field = instance._meta.get_field(name)
+        value = getattr(instance, field.attname)
+        if value is None and (
+            getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+        ):
+            value = field.pre_save(instance, add=True)
+        row.append(field.get_prep_value(value))
+    return row
+
+
+def copy_rows(model, columns, rows):
+    """Streams `rows` (values for `columns`, by attname) into the model's table."""
+    fields = [model._meta.get_field(name) for name in columns]
+    json_columns = [
+        i for i, field in enumerate(fields) if isinstance(field, models.JSONField)
+    ]
+    quote = connection.ops.quote_name
+    sql = "COPY {} ({}) FROM STDIN".format(
+        quote(model._meta.db_table), ", ".join(quote(field.column) for field in fields)
+    )
+    written = 0
+    with connection.cursor() as cursor, cursor.copy(sql) as copy:
+        for row in rows:
+            if json_columns:
+                row = list(row)
+                for i in json_columns:
+                    row[i] = Jsonb(row[i])
+            copy.write_row(row)
+            written += 1
+    return written
+
+
+def batched(items, size):
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates synthetic users, a power-law follow graph, groups, posts, "
+        "reactions, comments, polls and notifications at a target scale, "
+        "written with COPY and without signals. The same --seed and --end "
+        "give the same users, content and timestamps; row IDs (and the group "
+        "slugs that include them) come from the tables' sequences, so they "
+        "only repeat when run against an empty database. Generated users are "
+        "<prefix><seed>_<n>@<domain>, so they can be removed with "
+        "User.objects.filter(email__endswith='@<domain>').delete()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--avg-follows", type=float, default=50, help="Mean follows per user."
+        )
+        parser.add_argument(
+            "--max-follows",
+            type=int,
+            default=5000,
+            help="Cap on any one user's follows (the tail of the power law).",
+        )
+        parser.add_argument(
+            "--zipf",
+            type=float,
+            default=1.1,
+            help="Exponent of user popularity; higher concentrates followers "
+            "and engagement on fewer users.",
+        )
+        parser.add_argument(
+            "--groups", type=int, default=None, help="Default: one per 500 users."
+        )
+        parser.add_argument(
+            "--avg-group-members", type=float, default=50, help="Mean group size."
+        )
+        parser.add_argument("--posts-per-user", type=float, default=5)
+        parser.add_argument(
+            "--group-post-ratio",
+            type=float,
+            default=0.1,
+            help="Share of posts made in a group.",
+        )
+        parser.add_argument("--avg-likes", type=float, default=10, help="Per post.")
+        parser.add_argument("--avg-comments", type=float, default=2, help="Per post.")
+        parser.add_argument(
+            "--poll-ratio", type=float, default=0.05, help="Share of posts with a poll."
+        )
+        parser.add_argument(
+            "--avg-poll-votes", type=float, default=20, help="Per poll."
+        )
+        parser.add_argument(
+            "--notification-ratio",
+            type=float,
+            default=0.3,
+            help="Share of follows, likes and comments that left a notification.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Spread activity over this many days before --end.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            default=None,
+            help="The day (YYYY-MM-DD) activity stops before. Default: today. "
+            "Fix it to get the same timestamps on another day.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--prefix", default="synthetic", help="Username prefix.")
+        parser.add_argument("--domain", default="synthetic.test")
+        parser.add_argument(
+            "--password", default="password123", help="Every user's password."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10000, help="Rows per transaction."
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("generate_synthetic_data writes with PostgreSQL COPY.")
+        if options["users"] < 2:
+            raise CommandError("--users must be at least 2.")
+        self.options = options
+        self.batch_size = options["batch_size"]
+        self.rng = random.Random(options["seed"])
+        faker = Faker()
+        faker.seed_instance(options["seed"])
+        self.first_names = [faker.first_name() for _ in range(TEXT_POOL_SIZE)]
+        self.last_names = [faker.last_name() for _ in range(TEXT_POOL_SIZE)]
+        self.sentences = [faker.sentence(nb_words=12) for _ in range(TEXT_POOL_SIZE)]
+        self.headlines = [faker.job() for _ in range(TEXT_POOL_SIZE)]
+        self.cities = [faker.city() for _ in range(TEXT_POOL_SIZE)]
+        self.companies = [faker.company() for _ in range(TEXT_POOL_SIZE)]
+        # Timestamps count back from midnight (UTC) of the --end day.
+        end = options["end"] or timezone.now().date()
+        self.end = datetime.combine(end, datetime.min.time(), tzinfo=dt_timezone.utc)
+        self.start = self.end - timedelta(days=options["days"])
+        self.content_types = ContentType.objects.get_for_models(
+            StatusPost, Comment, Like, Follow
+        )
+        self.totals = Counter()
+
+        started = time.monotonic()
+        self.generate_users()
+        self.generate_groups()
+        self.generate_follows()
+        self.generate_posts()
+        self.analyze()
+        summary = ", ".join(f"{count} {name}" for name, count in self.totals.items())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {summary} in {time.monotonic() - started:.1f}s."
+            )
+        )
+
+    # --- Helpers ---
+
+    def log(self, message):
+        self.stdout.write(f"  {message}")
+
+    def write(self, name, model, columns, rows):
+        self.totals[name] += copy_rows(model, columns, rows)
+
+    def moment(self, after=None):
+        """A random time between `after` (or the start) and the end."""
+        start = after or self.start
+        return start + (self.end - start) * self.rng.random()
+
+    def sentence_text(self, low, high):
+        return " ".join(self.rng.choices(self.sentences, k=self.rng.randint(low, high)))
+
+    def heavy_tailed(self, mean, cap):
+        """A count with the given mean and a long tail, at most `cap`."""
+        if mean <= 0:
+            return 0
+        # paretovariate(2) has a mean of 2.
+        return min(cap, int(mean * self.rng.paretovariate(2) / 2))
+
+    def popular_users(self, count, exclude=None):
+        """`count` distinct users, the popular ones more likely."""
+        count = min(count, len(self.user_ids) - (exclude is not None))
+        if count > len(self.user_ids) // 2:
+            # Rejection sampling stalls near the whole population.
+            candidates = [u for u in self.user_ids if u != exclude]
+            return self.rng.sample(candidates, count)
+        chosen = set()
+        while len(chosen) < count:
+            for user_id in self.rng.choices(
+                self.user_ids, cum_weights=self.popularity, k=count - len(chosen)
+            ):
+                if user_id != exclude:
+                    chosen.add(user_id)
+        return list(chosen)
+
+    def notify(self):
+        return self.rng.random() < self.options["notification_ratio"]
+
+    def notification_row(self, recipient, actor, verb, kind, action, target, at):
+        action_type, action_id = action
+        target_type, target_id = target or (None, None)
+        return (
+            recipient,
+            actor,
+            verb,
+            kind,
+            action_type,
+            action_id,
+            target_type,
+            target_id,
+            at,
+            self.rng.random() < READ_RATIO,
+        )
+
+    NOTIFICATION_COLUMNS = [
+        "recipient_id",
+        "actor_id",
+        "verb",
+        "notification_type",
+        "action_object_content_type_id",
+        "action_object_object_id",
+        "target_content_type_id",
+        "target_object_object_id",
+        "timestamp",
+        "is_read",
+    ]
+
+    # --- Stages ---
+
+    def generate_users(self):
+        count = self.options["users"]
+        self.log(f"Users: {count}...")
+        # Names come from the seed, not the IDs, so they are the same on
+        # every run.
+        username_prefix = f"{self.options['prefix']}{self.options['seed']}_"
+        if User.objects.filter(username=f"{username_prefix}1").exists():
+            raise CommandError(
+                f"Users named {username_prefix}<n> already exist; pick another "
+                "--prefix or --seed."
+            )
+        self.user_ids = reserve_ids(User, count)
+        # Zipf popularity over a shuffled ranking, as cumulative weights.
+        ranks = list(range(1, count + 1))
+        self.rng.shuffle(ranks)
+        self.popularity = list(
+            itertools.accumulate(rank ** -self.options["zipf"] for rank in ranks)
+        )
+        password = make_password(self.options["password"])
+        user_columns = [f.attname for f in User._meta.concrete_fields]
+        profile_columns = [f.attname for f in UserProfile._meta.concrete_fields]
+        for batch in batched(self.user_ids, self.batch_size):
+            users, profiles, emails = [], [], []
+            for user_id in batch:
+                username = f"{username_prefix}{user_id - self.user_ids.start + 1}"
+                email = f"{username}@{self.options['domain']}"
+                user = User(
+                    id=user_id,
+                    username=username,
+                    email=email,
+                    password=password,
+                    first_name=self.rng.choice(self.first_names),
+                    last_name=self.rng.choice(self.last_names),
+                    date_joined=self.moment(),
+                )
+                profile = UserProfile(
+                    user_id=user_id,
+                    headline=self.rng.choice(self.headlines),
+                    bio=self.sentence_text(1, 2),
+                    location_city=self.rng.choice(self.cities),
+                    updated_at=user.date_joined,
+                )
+                users.append(instance_row(user, user_columns))
+                profiles.append(instance_row(profile, profile_columns))
+                emails.append((user_id, email, True, True))
+            with transaction.atomic():
+                self.write("users", User, user_columns, users)
+                self.write("profiles", UserProfile, profile_columns, profiles)
+                self.write(
+                    "email addresses",
+                    EmailAddress,
+                    ["user_id", "email", "verified", "primary"],
+                    emails,
+                )
+
+    def generate_groups(self):
+        count = self.options["groups"]
+        if count is None:
+            count = max(1, len(self.user_ids) // 500)
+        self.log(f"Groups: {count}...")
+        self.group_ids = reserve_ids(Group, count)
+        self.group_members = {}
+        groups, memberships = [], []
+        for group_id in self.group_ids:
+            size = max(
+                2,
+                self.heavy_tailed(
+                    self.options["avg_group_members"], len(self.user_ids)
+                ),
+            )
+            members = self.popular_users(size)
+            name = f"{self.rng.choice(self.companies)} {self.rng.choice(['Hub', 'Circle', 'Guild', 'Lab'])}"
+            groups.append(
+                (
+                    group_id,
+                    name,
+                    f"{slugify(name) or 'group'}-{group_id}",
+                    self.sentence_text(1, 3),
+                    members[0],
+                    len(members),
+                    self.moment(),
+                    "public" if self.rng.random() < 0.7 else "private",
+                )
+            )
+            memberships.extend((group_id, user_id) for user_id in members)
+            self.group_members[group_id] = members
+        with transaction.atomic():
+            self.write(
+                "groups",
+                Group,
+                [
+                    "id",
+                    "name",
+                    "slug",
+                    "description",
+                    "creator_id",
+                    "member_count",
+                    "created_at",
+                    "privacy_level",
+                ],
+                groups,
+            )
+            self.write(
+                "group memberships",
+                Group.members.through,
+                ["group_id", "user_id"],
+                memberships,
+            )
+
+    def generate_follows(self):
+        self.log(
+            f"Follows: about {int(len(self.user_ids) * self.options['avg_follows'])}..."
+        )
+        follow_type = self.content_types[Follow].id
+        cap = min(self.options["max_follows"], len(self.user_ids) - 1)
+        follows = []
+
+        def flush():
+            ids = reserve_ids(Follow, len(follows))
+            notifications = [
+                self.notification_row(
+                    following,
+                    follower,
+                    "started following you",
+                    Notification.FOLLOW,
+                    (follow_type, follow_id),
+                    None,
+                    at,
+                )
+                for follow_id, (follower, following, at) in zip(ids, follows)
+                if self.notify()
+            ]
+            with transaction.atomic():
+                self.write(
+                    "follows",
+                    Follow,
+                    ["id", "follower_id", "following_id", "created_at"],
+                    ((follow_id, *follow) for follow_id, follow in zip(ids, follows)),
+                )
+                self.write(
+                    "notifications",
+                    Notification,
+                    self.NOTIFICATION_COLUMNS,
+                    notifications,
+                )
+            follows.clear()
+
+        for follower in self.user_ids:
+            count = self.heavy_tailed(self.options["avg_follows"], cap)
+            for following in self.popular_users(count, exclude=follower):
+                follows.append((follower, following, self.moment()))
+            if len(follows) >= self.batch_size:
+                flush()
+        flush()
+
+    def generate_posts(self):
+        total = int(len(self.user_ids) * self.options["posts_per_user"])
+        self.log(f"Posts: {total}, with reactions, comments and polls...")
+        for offset in range(0, total, self.batch_size):
+            self.generate_post_batch(min(self.batch_size, total - offset))
+
+    def generate_post_batch(self, count):
+        options = self.options
+        post_type = self.content_types[StatusPost].id
+        like_type = self.content_types[Like].id
+        comment_type = self.content_types[Comment].id
+        cap = len(self.user_ids) - 1
+        reaction_types, reaction_weights = zip(*REACTION_WEIGHTS.items())
+
+        # First decide everything, then take IDs for the rows that need them.
+        posts, likes, comments, polls = [], [], [], []
+        for post_id in reserve_ids(StatusPost, count):
+            author = self.popular_users(1)[0]
+            group = None
+            if self.group_ids and self.rng.random() < options["group_post_ratio"]:
+                group = self.rng.choice(self.group_ids)
+                author = self.rng.choice(self.group_members[group])
+            created = self.moment()
+            parent = None
+            if posts and self.rng.random() < REPOST_RATIO:
+                parent = self.rng.choice(posts)
+                parent["repost_count"] += 1
+                created = self.moment(parent["created_at"])
+            post = {
+                "id": post_id,
+                "author_id": author,
+                "content": self.sentence_text(1, 5),
+                "parent_post_id": parent and parent["id"],
+                "group_id": group,
+                "created_at": created,
+                "updated_at": created,
+                "like_count": 0,
+                "reaction_counts": Counter(),
+                "comment_count": 0,
+                "repost_count": 0,
+            }
+            posts.append(post)
+
+            for user_id in self.popular_users(
+                self.heavy_tailed(options["avg_likes"], cap)
+            ):
+                reaction = self.rng.choices(reaction_types, reaction_weights)[0]
+                likes.append((user_id, post, reaction, self.moment(created)))
+                post["like_count"] += 1
+                post["reaction_counts"][reaction] += 1
+
+            thread = []
+            for user_id in self.popular_users(
+                self.heavy_tailed(options["avg_comments"], cap)
+            ):
+                reply_to = (
+                    self.rng.choice(thread)
+                    if thread and self.rng.random() < REPLY_RATIO
+                    else None
+                )
+                comment = {
+                    "author_id": user_id,
+                    "content": self.sentence_text(1, 2),
+                    "created_at": self.moment(
+                        reply_to["created_at"] if reply_to else created
+                    ),
+                    "post": post,
+                    "parent": reply_to,
+                    "reply_count": 0,
+                }
+                if reply_to:
+                    reply_to["reply_count"] += 1
+                thread.append(comment)
+                post["comment_count"] += 1
+            comments.extend(thread)
+
+            if self.rng.random() < options["poll_ratio"]:
+                option_count = self.rng.randint(2, 4)
+                voters = self.popular_users(
+                    self.heavy_tailed(options["avg_poll_votes"], cap)
+                )
+                votes = [
+                    (user_id, self.rng.randrange(option_count), self.moment(created))
+                    for user_id in voters
+                ]
+                polls.append((post, option_count, votes))
+
+        like_ids = reserve_ids(Like, len(likes))
+        comment_ids = reserve_ids(Comment, len(comments))
+        poll_ids = reserve_ids(Poll, len(polls))
+        option_ids = iter(reserve_ids(PollOption, sum(p[1] for p in polls)))
+
+        for comment_id, comment in zip(comment_ids, comments):
+            # Parents precede their replies, so their paths are already set.
+            comment["id"] = comment_id
+            parent_path = comment["parent"]["path"] if comment["parent"] else ""
+            comment["path"] = f"{parent_path}{comment_id:010d}/"
+
+        notifications = []
+        for like_id, (user_id, post, reaction, at) in zip(like_ids, likes):
+            if user_id != post["author_id"] and self.notify():
+                notifications.append(
+                    self.notification_row(
+                        post["author_id"],
+                        user_id,
+                        "liked your post",
+                        Notification.LIKE,
+                        (like_type, like_id),
+                        (post_type, post["id"]),
+                        at,
+                    )
+                )
+        for comment in comments:
+            parent = comment["parent"]
+            recipient = parent["author_id"] if parent else comment["post"]["author_id"]
+            if recipient != comment["author_id"] and self.notify():
+                notifications.append(
+                    self.notification_row(
+                        recipient,
+                        comment["author_id"],
+                        (
+                            "replied to your comment"
+                            if parent
+                            else "commented on your post"
+                        ),
+                        Notification.REPLY if parent else Notification.COMMENT,
+                        (comment_type, comment["id"]),
+                        (comment_type, comment["id"]),
+                        comment["created_at"],
+                    )
+                )
+
+        poll_rows, option_rows, vote_rows = [], [], []
+        for poll_id, (post, option_count, votes) in zip(poll_ids, polls):
+            poll_rows.append(
+                (
+                    poll_id,
+                    post["id"],
+                    self.rng.choice(self.sentences)[:255],
+                    post["created_at"],
+                )
+            )
+            options_of_poll = [next(option_ids) for _ in range(option_count)]
+            tallies = Counter(choice for _, choice, _ in votes)
+            for index, option_id in enumerate(options_of_poll):
+                option_rows.append(
+                    (
+                        option_id,
+                        poll_id,
+                        self.rng.choice(self.headlines)[:100],
+                        tallies[index],
+                        post["created_at"],
+                    )
+                )
+            vote_rows.extend(
+                (user_id, poll_id, options_of_poll[choice], at)
+                for user_id, choice, at in votes
+            )
+
+        post_columns = list(posts[0]) if posts else []
+        with transaction.atomic():
+            self.write(
+                "posts",
+                StatusPost,
+                post_columns,
+                (
+                    [
+                        (
+                            dict(post["reaction_counts"])
+                            if c == "reaction_counts"
+                            else post[c]
+                        )
+                        for c in post_columns
+                    ]
+                    for post in posts
+                ),
+            )
+            self.write(
+                "likes",
+                Like,
+                [
+                    "id",
+                    "user_id",
+                    "content_type_id",
+                    "object_id",
+                    "reaction_type",
+                    "created_at",
+                ],
+                (
+                    (like_id, user_id, post_type, post["id"], reaction, at)
+                    for like_id, (user_id, post, reaction, at) in zip(like_ids, likes)
+                ),
+            )
+            self.write(
+                "post reactions",
+                PostReaction,
+                ["user_id", "post_id", "reaction_type", "created_at"],
+                (
+                    (user_id, post["id"], reaction, at)
+                    for user_id, post, reaction, at in likes
+                ),
+            )
+            self.write(
+                "comments",
+                Comment,
+                [
+                    "id",
+                    "author_id",
+                    "content",
+                    "created_at",
+                    "updated_at",
+                    "content_type_id",
+                    "object_id",
+                    "parent_id",
+                    "post_id",
+                    "like_count",
+                    "reaction_counts",
+                    "reply_count",
+                    "path",
+                ],
+                (
+                    (
+                        c["id"],
+                        c["author_id"],
+                        c["content"],
+                        c["created_at"],
+                        c["created_at"],
+                        post_type,
+                        c["post"]["id"],
+                        c["parent"] and c["parent"]["id"],
+                        c["post"]["id"],
+                        0,
+                        {},
+                        c["reply_count"],
+                        c["path"],
+                    )
+                    for c in comments
+                ),
+            )
+            self.write(
+                "polls", Poll, ["id", "post_id", "question", "created_at"], poll_rows
+            )
+            self.write(
+                "poll options",
+                PollOption,
+                ["id", "poll_id", "text", "vote_count", "created_at"],
+                option_rows,
+            )
+            self.write(
+                "poll votes",
+                PollVote,
+                ["user_id", "poll_id", "option_id", "created_at"],
+                vote_rows,
+            )
+            self.write(
+                "notifications", Notification, self.NOTIFICATION_COLUMNS, notifications
+            )
+
+    def analyze(self):
+        # Fresh statistics, so query plans match the new data from the start.
+        tables = {
+            model._meta.db_table
+            for model in (
+                User,
+                UserProfile,
+                EmailAddress,
+                Group,
+                Group.members.through,
+                Follow,
+                StatusPost,
+                Like,
+                PostReaction,
+                Comment,
+                Poll,
+                PollOption,
+                PollVote,
+                Notification,
+            )
+        }
+        with connection.cursor() as cursor:
+            for table in sorted(tables):
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
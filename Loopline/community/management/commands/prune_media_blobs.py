@@ -0,0 +1,66 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\prune_media_blobs.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from community.models import MediaBlob
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes content-addressed media blobs that no post, profile or upload "
+        "has referenced for the given grace period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-minutes",
+            type=int,
+            default=60,
+            help="Only prune blobs that have been unreferenced for this long.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the blobs that would be deleted without deleting them.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options["grace_minutes"])
+        candidates = MediaBlob.objects.filter(ref_count=0, updated_at__lt=cutoff)
+
+        pruned_count = 0
+        freed_bytes = 0
+        for blob in candidates.iterator():
+            if options["dry_run"]:
+                self.stdout.write(f"Would delete {blob.name} ({blob.size} bytes)")
+                continue
+            with transaction.atomic():
+                # Re-check under the row lock that acquire() and hold() wait
+                # on: the blob may have been reused since the candidates
+                # were read.
+                locked = (
+                    MediaBlob.objects.select_for_update()
+                    .filter(digest=blob.digest, ref_count=0, updated_at__lt=cutoff)
+                    .first()
+                )
+                if locked is not None:
+                    locked.delete()
+            # The file goes once the row's deletion has committed, unless the
+            # content was stored again in the meantime.
+            if locked is not None and MediaBlob.objects.delete_file(
+                blob.digest, blob.name
+            ):
+                pruned_count += 1
+                freed_bytes += blob.size
+
+        if options["dry_run"]:
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Pruned {pruned_count} unreferenced blob(s), freeing {freed_bytes} bytes."
+            )
+        )
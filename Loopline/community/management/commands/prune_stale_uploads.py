@@ -0,0 +1,96 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\prune_stale_uploads.py
+
+import os
+import uuid
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from community.models import MediaUpload
+from community.uploads import discard_upload, get_temp_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes chunked uploads that were never attached to a post and have "
+        "not moved for the given time, with their .part files, and removes "
+        ".part files left behind without an upload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age-hours",
+            type=int,
+            default=24,
+            help="Only delete uploads untouched for this long.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List what would be deleted without deleting it.",
+        )
+
+    def handle(self, *args, **options):
+        max_age = timedelta(hours=options["max_age_hours"])
+        stale = MediaUpload.objects.filter(
+            status__in=[MediaUpload.STATUS_UPLOADING, MediaUpload.STATUS_COMPLETE],
+            updated_at__lt=timezone.now() - max_age,
+        )
+
+        discarded = 0
+        for upload in stale.iterator():
+            if options["dry_run"]:
+                self.stdout.write(f"Would delete {upload}")
+                continue
+            discard_upload(upload)
+            discarded += 1
+
+        orphans = self.orphaned_part_files(max_age)
+        for path in orphans:
+            if options["dry_run"]:
+                self.stdout.write(f"Would delete {path}")
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        if options["dry_run"]:
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {discarded} stale upload(s) and {len(orphans)} "
+                "orphaned .part file(s)."
+            )
+        )
+
+    def orphaned_part_files(self, max_age):
+        """.part files older than `max_age` whose upload no longer exists."""
+        temp_dir = get_temp_dir()
+        if not os.path.isdir(temp_dir):
+            return []
+        cutoff = time.time() - max_age.total_seconds()
+        candidates = {}
+        for entry in os.scandir(temp_dir):
+            upload_id, extension = os.path.splitext(entry.name)
+            if extension == ".part" and entry.stat().st_mtime < cutoff:
+                candidates[upload_id] = entry.path
+        known = {
+            str(pk)
+            for pk in MediaUpload.objects.filter(
+                pk__in=[upload_id for upload_id in candidates if _is_uuid(upload_id)]
+            ).values_list("pk", flat=True)
+        }
+        return [
+            path for upload_id, path in candidates.items() if upload_id not in known
+        ]
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
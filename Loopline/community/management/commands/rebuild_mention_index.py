@@ -0,0 +1,39 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\rebuild_mention_index.py
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from community.mentions import index_users
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Indexes every user for the @mention typeahead. Needed once for users "
+        "from before the index; safe to re-run, as each user's entries are "
+        "replaced rather than added to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Users per Redis pipeline.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        user_ids = User.objects.order_by("pk").values_list("pk", flat=True)
+        indexed = 0
+        batch = []
+        for user_id in user_ids.iterator(chunk_size=batch_size):
+            batch.append(user_id)
+            if len(batch) == batch_size:
+                index_users(batch)
+                indexed += len(batch)
+                batch = []
+        index_users(batch)
+        indexed += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} user(s)."))
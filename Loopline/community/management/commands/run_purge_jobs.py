@@ -0,0 +1,53 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\run_purge_jobs.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from community.models import PurgeJob
+from community.purge import BATCH_SIZE, run_purge_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the pending purge jobs (see community/purge.py), deleting their "
+        "rows and everything depending on them in small batches. Jobs that "
+        "failed or were interrupted carry on from where they stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--job", type=int, help="Run only this job.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows per DELETE statement.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        jobs = PurgeJob.objects.exclude(status=PurgeJob.DONE)
+        if options["job"]:
+            jobs = jobs.filter(pk=options["job"])
+            if not jobs.exists():
+                raise CommandError(f"No unfinished purge job {options['job']}.")
+        finished = 0
+        for job in jobs:
+            self.stdout.write(f"{job}: {len(job.object_ids)} {job.model} row(s)...")
+            try:
+                run_purge_job(job, options["batch_size"], progress=self.report)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f" > {job} failed: {e}"))
+                continue
+            finished += 1
+            self.stdout.write(f" > Deleted {self.describe(job.deleted)}.")
+        self.stdout.write(self.style.SUCCESS(f"Finished {finished} purge job(s)."))
+
+    def report(self, job):
+        if self.verbosity > 1:
+            self.stdout.write(f"   {self.describe(job.deleted)}")
+
+    @staticmethod
+    def describe(deleted):
+        return (
+            ", ".join(f"{count} {label}" for label, count in sorted(deleted.items()))
+            or "nothing"
+        )
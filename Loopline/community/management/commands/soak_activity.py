@@ -0,0 +1,123 @@
+# C:\Users\Vinay\Project\Loopline\community\management\commands\soak_activity.py
+
+import json
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from community.models import Follow, StatusPost
+from community.soak import add_arguments, format_report, run_soak
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Soak-tests the activity WebSocket against a running ASGI server: opens "
+        "one socket per test user, drives posts, likes, comments and follows "
+        "through the API, and reports push latency, dropped and duplicated "
+        "events, server memory per socket and channel layer queue depth. See "
+        "community/soak.py, which also runs standalone from --users-file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sockets", type=int, default=100, help="Test users, one socket each."
+        )
+        parser.add_argument(
+            "--follows-per-user",
+            type=int,
+            default=10,
+            help="Follows among the test users before the run, so posts fan out.",
+        )
+        parser.add_argument("--prefix", default="soak", help="Test usernames' prefix.")
+        parser.add_argument(
+            "--users-file", help="Write the users, tokens and follows here."
+        )
+        parser.add_argument(
+            "--setup-only",
+            action="store_true",
+            help="Prepare the users (and --users-file) without running.",
+        )
+        add_arguments(parser)
+
+    def handle(self, *args, **options):
+        users, follows = self.prepare(options)
+        post_content_type_id = ContentType.objects.get_for_model(StatusPost).id
+        if options["users_file"]:
+            with open(options["users_file"], "w") as users_file:
+                json.dump(
+                    {
+                        "users": users,
+                        "follows": follows,
+                        "post_content_type_id": post_content_type_id,
+                    },
+                    users_file,
+                )
+        if options["setup_only"]:
+            self.stdout.write(self.style.SUCCESS(f"Prepared {len(users)} users."))
+            return
+        if not options["redis_url"]:
+            hosts = settings.CHANNEL_LAYERS["default"].get("CONFIG", {}).get("hosts")
+            if hosts and isinstance(hosts[0], str):
+                options["redis_url"] = hosts[0]
+        report = run_soak(
+            users, follows, post_content_type_id, options, log=self.stdout.write
+        )
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(format_report(report))
+
+    def prepare(self, options):
+        """The test users with their tokens, and the follows among them."""
+        count = options["sockets"]
+        if count < 2:
+            raise CommandError("--sockets must be at least 2.")
+        usernames = [f"{options['prefix']}{i}" for i in range(count)]
+        existing = set(
+            User.objects.filter(username__in=usernames).values_list(
+                "username", flat=True
+            )
+        )
+        for username in usernames:
+            if username not in existing:
+                User.objects.create_user(
+                    username=username, email=f"{username}@soak.test"
+                )
+        users = list(User.objects.filter(username__in=usernames).order_by("id"))
+        tokens = {
+            token.user_id: token.key for token in Token.objects.filter(user__in=users)
+        }
+        for user in users:
+            if user.id not in tokens:
+                tokens[user.id] = Token.objects.create(user=user).key
+
+        # bulk_create skips the signals, so setting up sends no notifications.
+        rng = random.Random(options["seed"])
+        ids = [user.id for user in users]
+        per_user = min(options["follows_per_user"], count - 1)
+        Follow.objects.bulk_create(
+            [
+                Follow(follower_id=follower, following_id=following)
+                for follower in ids
+                for following in rng.sample([i for i in ids if i != follower], per_user)
+            ],
+            ignore_conflicts=True,
+        )
+        follows = list(
+            Follow.objects.filter(follower__in=ids, following__in=ids).values_list(
+                "follower_id", "following_id"
+            )
+        )
+        return (
+            [
+                {"id": user.id, "username": user.username, "token": tokens[user.id]}
+                for user in users
+            ],
+            [list(follow) for follow in follows],
+        )
@@ -0,0 +1,236 @@
+# community/mentions.py
+"""
+The @mention typeahead.
+
+Every active user is indexed in one Redis sorted set under the names they can
+be found by - username, first and last name, display name and each of its
+words - lower-cased. All scores are 0, so the set is ordered by member and a
+prefix is one ZRANGEBYLEX:
+
+    mentions:index          "<term>\\x00<user id>", score 0
+    mentions:user:<id>      the user's current members, to replace on change
+
+The index is kept in sync by the User/UserProfile signals, and filled for
+existing users by `manage.py rebuild_mention_index`.
+
+Suggestions put the viewer's own people first: whom they follow, who follows
+them, and whose posts they have recently reacted to or commented on. That
+"affinity" list and the names it can be matched by are cached per viewer for
+MENTION_AFFINITY_TTL seconds, so a keystroke costs one Redis round trip and
+one primary-key lookup.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from .models import Comment, Follow, Like, PostReaction, StatusPost
+from .redis_client import get_redis
+
+User = get_user_model()
+
+INDEX_KEY = "mentions:index"
+# Index entries read per keystroke, before ranking.
+MENTION_CANDIDATES = 50
+# The most people kept in a viewer's affinity list.
+AFFINITY_SIZE = 200
+AFFINITY_DAYS = 30
+FOLLOWING_WEIGHT = 3
+FOLLOWER_WEIGHT = 2
+MAX_SUGGESTIONS = 10
+
+# Sorts after every other character, so "[<prefix>" to "[<prefix><this>"
+# is the whole prefix range.
+_LEX_END = "\U0010ffff"
+
+
+def normalize(text):
+    return (text or "").strip().lstrip("@").casefold()
+
+
+def _terms(username, first_name, last_name, display_name):
+    """The names a user can be found by."""
+    terms = {normalize(username)}
+    names = [first_name, last_name, f"{first_name or ''} {last_name or ''}"]
+    if display_name:
+        names.append(display_name)
+        names.extend(display_name.split())
+    terms.update(normalize(name) for name in names)
+    terms.discard("")
+    return terms
+
+
+def _user_key(user_id):
+    return f"mentions:user:{user_id}"
+
+
+def _mention_redis():
+    return get_redis(settings.MENTION_REDIS_URL)
+
+
+def index_users(user_ids):
+    """Replaces the index entries of the given users with their current names."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    rows = User.objects.filter(pk__in=user_ids, is_active=True).values_list(
+        "pk", "username", "first_name", "last_name", "profile__display_name"
+    )
+    members = {
+        pk: {f"{term}\x00{pk}" for term in _terms(*names)} for pk, *names in rows
+    }
+    redis = _mention_redis()
+    pipe = redis.pipeline(transaction=False)
+    for user_id in user_ids:
+        pipe.smembers(_user_key(user_id))
+    previous = dict(zip(user_ids, pipe.execute()))
+
+    pipe = redis.pipeline()
+    for user_id in user_ids:
+        current = members.get(user_id, set())
+        stale = previous[user_id] - current
+        if stale:
+            pipe.zrem(INDEX_KEY, *stale)
+            pipe.srem(_user_key(user_id), *stale)
+        if current - previous[user_id]:
+            pipe.zadd(INDEX_KEY, dict.fromkeys(current, 0))
+            pipe.sadd(_user_key(user_id), *current)
+    pipe.execute()
+
+
+def index_user(user_id):
+    """Signal-side indexing: a Redis outage must not break saving a user."""
+    try:
+        index_users([user_id])
+    except RedisError:
+        pass
+
+
+def _index_lookup(prefix):
+    """User IDs with a name starting with `prefix`, in name order."""
+    members = _mention_redis().zrangebylex(
+        INDEX_KEY, f"[{prefix}", f"[{prefix}{_LEX_END}", 0, MENTION_CANDIDATES
+    )
+    return [int(member.rpartition("\x00")[2]) for member in members]
+
+
+def _database_lookup(prefix):
+    """The same lookup against the database, for when Redis is unavailable."""
+    return list(
+        User.objects.filter(
+            Q(username__istartswith=prefix)
+            | Q(first_name__istartswith=prefix)
+            | Q(last_name__istartswith=prefix)
+            | Q(profile__display_name__istartswith=prefix),
+            is_active=True,
+        )
+        .order_by("username")
+        .values_list("pk", flat=True)[:MENTION_CANDIDATES]
+    )
+
+
+def _affinity_key(user_id):
+    return f"mentions:affinity:{user_id}"
+
+
+def _engaged_authors(user, since):
+    """
+    The author of every post `user` reacted to or commented on since
+    `since`, once per interaction. Read from the typed tables or, until
+    ENGAGEMENT_TYPED_READS is on, through the generic relations.
+    """
+    if settings.ENGAGEMENT_TYPED_READS:
+        reactions = PostReaction.objects.filter(
+            user=user, created_at__gte=since
+        ).values_list("post__author_id", flat=True)
+        comments = (
+            Comment.objects.filter(author=user, created_at__gte=since)
+            .exclude(post__isnull=True)
+            .values_list("post__author_id", flat=True)
+        )
+        return [*reactions, *comments]
+
+    post_type = ContentType.objects.get_for_model(StatusPost)
+    author = Subquery(
+        StatusPost.objects.filter(pk=OuterRef("object_id")).values("author_id")[:1]
+    )
+    reactions = (
+        Like.objects.filter(user=user, content_type=post_type, created_at__gte=since)
+        .annotate(post_author=author)
+        .values_list("post_author", flat=True)
+    )
+    comments = (
+        Comment.objects.filter(
+            author=user, content_type=post_type, created_at__gte=since
+        )
+        .annotate(post_author=author)
+        .values_list("post_author", flat=True)
+    )
+    return [*reactions, *comments]
+
+
+def viewer_affinity(user):
+    """{user id: (weight, names)} for the people `user` interacts with most."""
+    key = _affinity_key(user.pk)
+    affinity = cache.get(key)
+    if affinity is not None:
+        return affinity
+
+    weights = Counter()
+    for user_id in Follow.objects.filter(follower=user).values_list(
+        "following_id", flat=True
+    ):
+        weights[user_id] += FOLLOWING_WEIGHT
+    for user_id in Follow.objects.filter(following=user).values_list(
+        "follower_id", flat=True
+    ):
+        weights[user_id] += FOLLOWER_WEIGHT
+    since = timezone.now() - timedelta(days=AFFINITY_DAYS)
+    weights.update(_engaged_authors(user, since))
+    weights.pop(user.pk, None)
+    weights.pop(None, None)
+
+    top = dict(weights.most_common(AFFINITY_SIZE))
+    rows = User.objects.filter(pk__in=top, is_active=True).values_list(
+        "pk", "username", "first_name", "last_name", "profile__display_name"
+    )
+    affinity = {pk: (top[pk], _terms(*names)) for pk, *names in rows}
+    cache.set(key, affinity, settings.MENTION_AFFINITY_TTL)
+    return affinity
+
+
+def suggest_mentions(user, query, limit):
+    """
+    Up to `limit` users whose names start with `query`: the viewer's own
+    people first, by affinity, then everyone else in name order.
+    """
+    prefix = normalize(query)
+    if not prefix:
+        return []
+    try:
+        candidates = _index_lookup(prefix)
+    except RedisError:
+        candidates = _database_lookup(prefix)
+
+    position = {}
+    for user_id in candidates:
+        position.setdefault(user_id, len(position))
+    weights = {user_id: 0 for user_id in position}
+    for user_id, (weight, terms) in viewer_affinity(user).items():
+        if any(term.startswith(prefix) for term in terms):
+            weights[user_id] = weight
+    weights.pop(user.pk, None)
+
+    unlisted = len(position)
+    ranked = sorted(
+        weights,
+        key=lambda user_id: (-weights[user_id], position.get(user_id, unlisted)),
+    )[:limit]
+    users = User.objects.select_related("profile").in_bulk(ranked)
+    return [users[user_id] for user_id in ranked if user_id in users]
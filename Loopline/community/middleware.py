@@ -2,16 +2,17 @@
 
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
-from rest_framework.authtoken.models import Token
 from urllib.parse import parse_qs
 
+from .authentication import cached_token_user
+
 @database_sync_to_async
 def get_user(token_key):
-    try:
-        token = Token.objects.select_related('user').get(key=token_key)
-        return token.user
-    except Token.DoesNotExist:
+    # Same cached lookup as the HTTP API (see community.authentication).
+    user = cached_token_user(token_key)
+    if user is None or not user.is_active:
         return AnonymousUser()
+    return user
 
 class TokenAuthMiddleware:
     """
@@ -0,0 +1,93 @@
+# Generated by Django 5.2 on 2026-10-19 00:15
+
+import community.models
+import community.storage
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0013_mediaupload"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="mediaupload",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                max_length=255,
+                storage=community.storage.select_media_storage,
+                upload_to=community.models.get_post_media_path,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="postmedia",
+            name="file",
+            field=models.FileField(
+                max_length=255,
+                storage=community.storage.select_media_storage,
+                upload_to=community.models.get_post_media_path,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userprofile",
+            name="picture",
+            field=models.ImageField(
+                blank=True,
+                max_length=255,
+                null=True,
+                storage=community.storage.select_media_storage,
+                upload_to="profile_pics/",
+            ),
+        ),
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "digest",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("name", models.CharField(max_length=255)),
+                ("size", models.PositiveBigIntegerField(default=0)),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("ref_count", 0)),
+                        fields=["updated_at"],
+                        name="mediablob_unreferenced_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="postmedia",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="post_media",
+                to="community.mediablob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="picture_blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="profile_pictures",
+                to="community.mediablob",
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-19 00:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_vote_counts(apps, schema_editor):
+    PollOption = apps.get_model("community", "PollOption")
+    PollVote = apps.get_model("community", "PollVote")
+    vote_count = (
+        PollVote.objects.filter(option=OuterRef("pk"))
+        .order_by()
+        .values("option")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    PollOption.objects.update(vote_count=Coalesce(Subquery(vote_count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0014_media_blobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="poll",
+            name="closed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="poll",
+            name="closes_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="poll",
+            name="results_snapshot",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="polloption",
+            name="vote_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_vote_counts, migrations.RunPython.noop),
+    ]
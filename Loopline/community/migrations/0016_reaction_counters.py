@@ -0,0 +1,66 @@
+# Generated by Django 5.2 on 2026-10-19 00:34
+
+from django.db import migrations, models
+
+
+def backfill_reaction_counters(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Like = apps.get_model("community", "Like")
+    quote = schema_editor.quote_name
+    for model_name in ("statuspost", "comment"):
+        model = apps.get_model("community", model_name)
+        content_type = ContentType.objects.filter(
+            app_label="community", model=model_name
+        ).first()
+        if content_type is None:
+            continue  # Fresh database: nothing has been liked yet.
+        schema_editor.execute(
+            f"""
+            UPDATE {quote(model._meta.db_table)} AS target
+            SET like_count = counts.total, reaction_counts = counts.by_type
+            FROM (
+                SELECT object_id, SUM(n) AS total,
+                       jsonb_object_agg(reaction_type, n) AS by_type
+                FROM (
+                    SELECT object_id, reaction_type, COUNT(*) AS n
+                    FROM {quote(Like._meta.db_table)}
+                    WHERE content_type_id = %s
+                    GROUP BY object_id, reaction_type
+                ) per_type
+                GROUP BY object_id
+            ) counts
+            WHERE target.id = counts.object_id
+            """,
+            [content_type.id],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0015_poll_vote_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="reaction_counts",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="statuspost",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="statuspost",
+            name="reaction_counts",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(backfill_reaction_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2 on 2026-10-19 00:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_comment_threads(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Comment = apps.get_model("community", "Comment")
+    StatusPost = apps.get_model("community", "StatusPost")
+    comments = schema_editor.quote_name(Comment._meta.db_table)
+    posts = schema_editor.quote_name(StatusPost._meta.db_table)
+
+    schema_editor.execute(
+        f"""
+        WITH RECURSIVE tree (id, path) AS (
+            SELECT id, lpad(id::text, 10, '0') || '/'
+            FROM {comments} WHERE parent_id IS NULL
+            UNION ALL
+            SELECT child.id, tree.path || lpad(child.id::text, 10, '0') || '/'
+            FROM {comments} child JOIN tree ON child.parent_id = tree.id
+        )
+        UPDATE {comments} AS target SET path = tree.path
+        FROM tree WHERE target.id = tree.id
+        """
+    )
+    schema_editor.execute(
+        f"""
+        UPDATE {comments} AS target SET reply_count = counts.n
+        FROM (
+            SELECT parent_id, COUNT(*) AS n FROM {comments}
+            WHERE parent_id IS NOT NULL GROUP BY parent_id
+        ) counts
+        WHERE target.id = counts.parent_id
+        """
+    )
+    content_type = ContentType.objects.filter(
+        app_label="community", model="statuspost"
+    ).first()
+    if content_type is None:
+        return  # Fresh database: there are no comments yet.
+    schema_editor.execute(
+        f"""
+        UPDATE {posts} AS target SET comment_count = counts.n
+        FROM (
+            SELECT object_id, COUNT(*) AS n FROM {comments}
+            WHERE content_type_id = %s GROUP BY object_id
+        ) counts
+        WHERE target.id = counts.object_id
+        """,
+        [content_type.id],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0016_reaction_counters"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="path",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="reply_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="statuspost",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["path"], name="comment_path_idx", opclasses=["text_pattern_ops"]
+            ),
+        ),
+        migrations.RunPython(backfill_comment_threads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,164 @@
+# Generated by Django 5.2 on 2026-10-19 00:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Adding the comments index must not lock the table, so it is built
+    # concurrently, which cannot run inside a transaction. Existing rows are
+    # copied afterwards by `manage.py backfill_typed_engagement`.
+    atomic = False
+
+    dependencies = [
+        ("community", "0017_comment_threads"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CommentReaction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "reaction_type",
+                    models.CharField(
+                        choices=[
+                            ("like", "Like"),
+                            ("love", "Love"),
+                            ("happy", "Happy"),
+                            ("celebrate", "Celebrate"),
+                            ("insightful", "Insightful"),
+                            ("brilliant", "Brilliant"),
+                        ],
+                        default="like",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PostReaction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "reaction_type",
+                    models.CharField(
+                        choices=[
+                            ("like", "Like"),
+                            ("love", "Love"),
+                            ("happy", "Happy"),
+                            ("celebrate", "Celebrate"),
+                            ("insightful", "Insightful"),
+                            ("brilliant", "Brilliant"),
+                        ],
+                        default="like",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="post",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="post_comments",
+                to="community.statuspost",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="comment",
+            index=models.Index(fields=["post", "path"], name="comment_post_path_idx"),
+        ),
+        migrations.AddField(
+            model_name="commentreaction",
+            name="comment",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reactions",
+                to="community.comment",
+            ),
+        ),
+        migrations.AddField(
+            model_name="commentreaction",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="comment_reactions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="postreaction",
+            name="post",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reactions",
+                to="community.statuspost",
+            ),
+        ),
+        migrations.AddField(
+            model_name="postreaction",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="post_reactions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="commentreaction",
+            index=models.Index(
+                fields=["comment", "reaction_type"],
+                include=("user",),
+                name="commentreaction_type_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="commentreaction",
+            constraint=models.UniqueConstraint(
+                fields=("user", "comment"), name="unique_comment_reaction"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="postreaction",
+            index=models.Index(
+                fields=["post", "reaction_type"],
+                include=("user",),
+                name="postreaction_post_type_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="postreaction",
+            constraint=models.UniqueConstraint(
+                fields=("user", "post"), name="unique_post_reaction"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-19 00:54
+
+from django.db import migrations, models
+
+
+def backfill_member_counts(apps, schema_editor):
+    Group = apps.get_model("community", "Group")
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        f"""
+        UPDATE {quote(Group._meta.db_table)} AS g SET member_count = counts.n
+        FROM (
+            SELECT group_id, COUNT(*) AS n
+            FROM {quote(Group.members.through._meta.db_table)}
+            GROUP BY group_id
+        ) counts
+        WHERE g.id = counts.group_id
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0018_typed_engagement"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="group",
+            name="member_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_member_counts, migrations.RunPython.noop),
+    ]
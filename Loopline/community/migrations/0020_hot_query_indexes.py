@@ -0,0 +1,56 @@
+# Generated by Django 5.2 on 2026-10-19 01:04
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built concurrently so busy tables stay writable; that cannot run in a
+    # transaction.
+    atomic = False
+
+    dependencies = [
+        ("community", "0019_group_member_count"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="connectionrequest",
+            index=models.Index(
+                fields=["receiver", "status"], name="connreq_receiver_status_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="follow",
+            index=models.Index(
+                fields=["following", "follower"], name="follow_following_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="message",
+            index=models.Index(
+                fields=["conversation", "timestamp"], name="message_conversation_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "-timestamp"], name="notif_recipient_recent_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="statuspost",
+            index=models.Index(
+                fields=["author", "-created_at", "-id"], name="post_author_recent_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="statuspost",
+            index=models.Index(
+                fields=["group", "-created_at", "-id"], name="post_group_recent_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+def backfill_repost_counts(apps, schema_editor):
+    StatusPost = apps.get_model("community", "StatusPost")
+    posts = schema_editor.quote_name(StatusPost._meta.db_table)
+    schema_editor.execute(
+        f"""
+        UPDATE {posts} AS target SET repost_count = counts.n
+        FROM (
+            SELECT parent_post_id, COUNT(*) AS n FROM {posts}
+            WHERE parent_post_id IS NOT NULL GROUP BY parent_post_id
+        ) counts
+        WHERE target.id = counts.parent_post_id
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0021_hashtags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="statuspost",
+            name="repost_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_repost_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 5.2 on 2026-10-19 02:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def adopt_saved_posts_table(apps, schema_editor):
+    """
+    The table already exists as the plain many-to-many's. Rename its unique
+    constraint to the model's, and drop the profile index that
+    savedpost_recent_idx makes redundant.
+    """
+    SavedPost = apps.get_model("community", "SavedPost")
+    table = SavedPost._meta.db_table
+    quote = schema_editor.quote_name
+    with schema_editor.connection.cursor() as cursor:
+        constraints = schema_editor.connection.introspection.get_constraints(
+            cursor, table
+        )
+    for name, info in constraints.items():
+        if info["primary_key"] or info["foreign_key"]:
+            continue
+        if info["unique"] and info["columns"] == ["userprofile_id", "statuspost_id"]:
+            schema_editor.execute(
+                f"ALTER TABLE {quote(table)} RENAME CONSTRAINT {quote(name)} "
+                f"TO {quote('unique_saved_post')}"
+            )
+        elif (
+            info["index"]
+            and not info["unique"]
+            and info["columns"] == ["userprofile_id"]
+        ):
+            schema_editor.execute(f"DROP INDEX {quote(name)}")
+
+
+def restore_many_to_many_table(apps, schema_editor):
+    """Puts back the constraint name and index the plain many-to-many had."""
+    table = "community_userprofile_saved_posts"
+    quote = schema_editor.quote_name
+    columns = ["userprofile_id", "statuspost_id"]
+    unique_name = schema_editor._create_index_name(table, columns, suffix="_uniq")
+    index_name = schema_editor._create_index_name(table, columns[:1])
+    schema_editor.execute(
+        f"ALTER TABLE {quote(table)} RENAME CONSTRAINT {quote('unique_saved_post')} "
+        f"TO {quote(unique_name)}"
+    )
+    schema_editor.execute(
+        f"CREATE INDEX {quote(index_name)} ON {quote(table)} ({quote(columns[0])})"
+    )
+
+
+def backfill_saved_at(apps, schema_editor):
+    """Earlier saves weren't timed; keep them in the post order they had."""
+    SavedPost = apps.get_model("community", "SavedPost")
+    StatusPost = apps.get_model("community", "StatusPost")
+    saves = schema_editor.quote_name(SavedPost._meta.db_table)
+    posts = schema_editor.quote_name(StatusPost._meta.db_table)
+    schema_editor.execute(
+        f"""
+        UPDATE {saves} AS target SET saved_at = post.created_at
+        FROM {posts} post WHERE post.id = target.statuspost_id
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0022_repost_count"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="SavedPost",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "post",
+                            models.ForeignKey(
+                                db_column="statuspost_id",
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="saves",
+                                to="community.statuspost",
+                            ),
+                        ),
+                        (
+                            "profile",
+                            models.ForeignKey(
+                                db_column="userprofile_id",
+                                db_index=False,
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="saves",
+                                to="community.userprofile",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "community_userprofile_saved_posts",
+                        "constraints": [
+                            models.UniqueConstraint(
+                                fields=("profile", "post"), name="unique_saved_post"
+                            )
+                        ],
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="userprofile",
+                    name="saved_posts",
+                    field=models.ManyToManyField(
+                        blank=True,
+                        related_name="saved_by",
+                        through="community.SavedPost",
+                        to="community.statuspost",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(adopt_saved_posts_table, restore_many_to_many_table),
+        migrations.AddField(
+            model_name="savedpost",
+            name="saved_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_saved_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="savedpost",
+            index=models.Index(
+                fields=["profile", "-saved_at", "-post"], name="savedpost_recent_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 02:55
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built concurrently so reports can still be filed while it builds; that
+    # cannot run in a transaction.
+    atomic = False
+
+    dependencies = [
+        ("community", "0024_purge_jobs"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="report",
+            index=models.Index(
+                fields=["status", "content_type", "object_id"], name="report_queue_idx"
+            ),
+        ),
+    ]
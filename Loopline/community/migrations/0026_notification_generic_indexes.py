@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-19 03:58
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built concurrently so the notifications table stays writable; that
+    # cannot run in a transaction.
+    atomic = False
+
+    dependencies = [
+        ("community", "0025_report_queue_index"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="notification",
+            index=models.Index(
+                fields=["action_object_content_type", "action_object_object_id"],
+                name="notif_action_object_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="notification",
+            index=models.Index(
+                fields=["target_content_type", "target_object_object_id"],
+                name="notif_target_idx",
+            ),
+        ),
+    ]
@@ -1,5 +1,7 @@
 import os
-from django.db import models
+import uuid
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce, Now
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
@@ -8,8 +10,11 @@ from django.core.exceptions import ValidationError
 
 # from django.db.models.signals import post_save
 # from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.text import slugify
 
+from .storage import digest_from_name, select_media_storage
+
 User = settings.AUTH_USER_MODEL
 
 
@@ -32,6 +37,125 @@ def get_post_media_path(instance, filename):
 # --- MODELS START HERE ---
 
 
+class StoredCountersMixin:
+    """
+    For models with denormalized counter columns. Counters are only changed
+    with in-database increments, so a plain save() of an instance loaded
+    earlier would write stale counts back over them. Updates therefore leave
+    `counter_fields` alone unless they are named in update_fields.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class MediaBlobManager(models.Manager):
+    def _lock(self, cursor, digest):
+        # Held until the transaction ends. Serializes storing, referencing and
+        # pruning one blob's file, including while it has no row.
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [int(digest[:15], 16)])
+
+    def _upsert(self, cursor, digest, name, size, references):
+        cursor.execute(
+            f"""
+            INSERT INTO {self.model._meta.db_table}
+                (digest, name, size, ref_count, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, now(), now())
+            ON CONFLICT (digest) DO UPDATE
+            SET ref_count = {self.model._meta.db_table}.ref_count + %s,
+                updated_at = now()
+            """,
+            [digest, name, size, references, references],
+        )
+
+    def acquire(self, name):
+        """
+        Records one more reference to the blob stored under `name` and returns
+        its digest. Files that were stored before content addressing (and so
+        have no digest in their name) are not tracked and return None.
+        """
+        digest = digest_from_name(name)
+        if digest is None:
+            return None
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._lock(cursor, digest)
+            self._upsert(cursor, digest, name, select_media_storage().size(name), 1)
+        return digest
+
+    def hold(self, digest, name, size):
+        """
+        Marks the blob as just used, creating its row if need be, so that
+        `prune_media_blobs` leaves its file alone until a reference is taken.
+        Storage calls this before reusing a stored file, in a transaction it
+        checks the file in: the lock taken here waits for a prune of the blob
+        to finish.
+        """
+        with connection.cursor() as cursor:
+            self._lock(cursor, digest)
+            self._upsert(cursor, digest, name, size, 0)
+
+    def delete_file(self, digest, name):
+        """
+        Deletes the file of a pruned blob, once its row is gone, unless the
+        same content has been stored again since. Returns whether it did.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._lock(cursor, digest)
+            if self.filter(digest=digest).exists():
+                return False
+            select_media_storage().delete(name)
+        return True
+
+    def release(self, digest):
+        """
+        Drops one reference. Blobs that reach zero are left on disk for
+        `prune_media_blobs`, which deletes them after a grace period.
+        """
+        if digest is None:
+            return
+        self.filter(digest=digest, ref_count__gt=0).update(
+            ref_count=models.F("ref_count") - 1, updated_at=Now()
+        )
+
+
+class MediaBlob(models.Model):
+    """
+    One stored file in content-addressed media storage (see community.storage).
+    `ref_count` is the number of rows (post media, profile pictures, finished
+    uploads) currently using the blob.
+    """
+
+    digest = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = MediaBlobManager()
+
+    class Meta:
+        indexes = [
+            # Lets the pruning command find unreferenced blobs cheaply.
+            models.Index(
+                fields=["updated_at"],
+                name="mediablob_unreferenced_idx",
+                condition=models.Q(ref_count=0),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(
         User, on_delete=models.CASCADE, primary_key=True, related_name="profile"
@@ -116,12 +240,25 @@ class UserProfile(models.Model):
         models.CharField(max_length=100), blank=True, null=True, default=list
     )
     picture = models.ImageField(
-        upload_to="profile_pics/", null=True, blank=True, max_length=255
+        upload_to="profile_pics/",
+        storage=select_media_storage,
+        null=True,
+        blank=True,
+        max_length=255,
+    )
+    # The content-addressed blob behind `picture`, kept in sync by save().
+    picture_blob = models.ForeignKey(
+        MediaBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="profile_pictures",
     )
     updated_at = models.DateTimeField(auto_now=True)
 
     saved_posts = models.ManyToManyField(
-        "StatusPost", related_name="saved_by", blank=True
+        "StatusPost", through="SavedPost", related_name="saved_by", blank=True
     )
 
     def __str__(self):
@@ -130,6 +267,24 @@ class UserProfile(models.Model):
         except AttributeError:
             return f"UserProfile object (User ID: {self.user_id})"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "picture" in update_fields:
+            self._sync_picture_blob()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "picture_blob"}
+        super().save(*args, **kwargs)
+
+    def _sync_picture_blob(self):
+        """Moves the blob reference along when the picture changes."""
+        if self.picture and not self.picture._committed:
+            self.picture.save(self.picture.name, self.picture.file, save=False)
+        digest = digest_from_name(self.picture.name) if self.picture else None
+        if digest == self.picture_blob_id:
+            return
+        MediaBlob.objects.release(self.picture_blob_id)
+        self.picture_blob_id = MediaBlob.objects.acquire(self.picture.name)
+
 
 class Follow(models.Model):
     follower = models.ForeignKey(
@@ -142,6 +297,10 @@ class Follow(models.Model):
 
     class Meta:
         unique_together = ("follower", "following")
+        indexes = [
+            # Followers of a user; the unique index only serves "following of".
+            models.Index(fields=["following", "follower"], name="follow_following_idx"),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=~models.Q(follower=models.F("following")),
@@ -180,12 +339,17 @@ class ConnectionRequest(models.Model):
         # Ensures a user can only send one request to another user.
         unique_together = ("sender", "receiver")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["receiver", "status"], name="connreq_receiver_status_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.sender.username} -> {self.receiver.username} ({self.status})"
 
 
-class StatusPost(models.Model):
+class StatusPost(StoredCountersMixin, models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="status_posts"
     )
@@ -220,6 +384,16 @@ class StatusPost(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     likes = GenericRelation("Like", related_query_name="statuspost_likes")
 
+    # Maintained by community.reactions; never aggregated from Like on reads.
+    like_count = models.PositiveIntegerField(default=0)
+    reaction_counts = models.JSONField(default=dict, blank=True)
+    # Comments and replies on this post, maintained by the Comment signals.
+    comment_count = models.PositiveIntegerField(default=0)
+    # Reposts of this post, maintained by the StatusPost signals.
+    repost_count = models.PositiveIntegerField(default=0)
+
+    counter_fields = ("like_count", "reaction_counts", "comment_count", "repost_count")
+
     # --- REMOVED in favor of PostMedia model ---
     # image = models.ImageField(upload_to='post_images/', null=True, blank=True)
     # video = models.FileField(upload_to='post_videos/', null=True, blank=True)
@@ -227,6 +401,15 @@ class StatusPost(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Profile and group timelines, newest first (cursor order).
+            models.Index(
+                fields=["author", "-created_at", "-id"], name="post_author_recent_idx"
+            ),
+            models.Index(
+                fields=["group", "-created_at", "-id"], name="post_group_recent_idx"
+            ),
+        ]
 
     def clean(self):
         """
@@ -242,7 +425,53 @@ class StatusPost(models.Model):
         return f"Post by {author_username}: {self.content[:50] if self.content else 'Media Post'}..."
 
 
+class SavedPost(models.Model):
+    """A post a user has saved, and when (UserProfile.saved_posts)."""
+
+    profile = models.ForeignKey(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name="saves",
+        db_column="userprofile_id",
+        db_index=False,  # Covered by savedpost_recent_idx.
+    )
+    post = models.ForeignKey(
+        StatusPost,
+        on_delete=models.CASCADE,
+        related_name="saves",
+        db_column="statuspost_id",
+    )
+    saved_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # The table of the plain many-to-many this replaced.
+        db_table = "community_userprofile_saved_posts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "post"], name="unique_saved_post"
+            ),
+        ]
+        indexes = [
+            # A user's saved posts, most recently saved first (cursor order).
+            models.Index(
+                fields=["profile", "-saved_at", "-post"], name="savedpost_recent_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.profile_id} saved post {self.post_id}"
+
+
 # --- NEW MODEL for handling multiple media files per post ---
+class PostMediaQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create skips save(), so blob references are taken here instead.
+        objs = list(objs)
+        for media in objs:
+            media.link_blob()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class PostMedia(models.Model):
     """
     Represents a single media file (image or video) linked to a StatusPost.
@@ -256,20 +485,94 @@ class PostMedia(models.Model):
 
     post = models.ForeignKey(StatusPost, related_name="media", on_delete=models.CASCADE)
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPE_CHOICES)
-    file = models.FileField(upload_to=get_post_media_path, max_length=255)
+    file = models.FileField(
+        upload_to=get_post_media_path, storage=select_media_storage, max_length=255
+    )
+    blob = models.ForeignKey(
+        MediaBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="post_media",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = PostMediaQuerySet.as_manager()
+
     class Meta:
         ordering = ["created_at"]  # Order media by upload time
 
     def __str__(self):
         return f"{self.media_type.capitalize()} for Post ID {self.post.id}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.link_blob()
+        super().save(*args, **kwargs)
+
+    def link_blob(self):
+        """
+        Commits the file to storage (if it is a fresh upload) and takes a
+        reference on the blob it was stored as.
+        """
+        if self.file and not self.file._committed:
+            self.file.save(self.file.name, self.file.file, save=False)
+        if self.blob_id is None:
+            self.blob_id = MediaBlob.objects.acquire(self.file.name)
+
 
 # --- END NEW MODEL ---
 
 
-class Group(models.Model):
+class MediaUpload(models.Model):
+    """
+    A resumable, chunked upload of a single media file.
+    The client appends chunks at `offset` until it reaches `total_size`, then
+    finalizes the upload. The finished file can be attached to a post by ID.
+    """
+
+    STATUS_UPLOADING = "uploading"
+    STATUS_COMPLETE = "complete"
+    STATUS_ATTACHED = "attached"
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, "Uploading"),
+        (STATUS_COMPLETE, "Complete"),
+        (STATUS_ATTACHED, "Attached"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="media_uploads"
+    )
+    media_type = models.CharField(max_length=10, choices=PostMedia.MEDIA_TYPE_CHOICES)
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    # Number of bytes received so far. The next chunk must start here.
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_UPLOADING
+    )
+    # Only set once the upload has been finalized.
+    file = models.FileField(
+        upload_to=get_post_media_path,
+        storage=select_media_storage,
+        max_length=255,
+        blank=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return (
+            f"Upload {self.id} ({self.offset}/{self.total_size} bytes, {self.status})"
+        )
+
+
+class Group(StoredCountersMixin, models.Model):
     name = models.CharField(
         max_length=150
     )  # MODIFICATION: unique=True has been removed.
@@ -281,6 +584,8 @@ class Group(models.Model):
         User, on_delete=models.CASCADE, null=True, related_name="created_groups"
     )
     members = models.ManyToManyField(User, related_name="joined_groups", blank=True)
+    # Maintained by the Group.members signals.
+    member_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     PRIVACY_CHOICES = [
@@ -297,6 +602,8 @@ class Group(models.Model):
         help_text="Defines who can view content and how users can join.",
     )
 
+    counter_fields = ("member_count",)
+
     class Meta:
         ordering = ["-created_at"]
 
@@ -400,7 +707,7 @@ class GroupBlock(models.Model):
         return f"{self.user.username} blocked from {self.group.name}"
 
 
-class Comment(models.Model):
+class Comment(StoredCountersMixin, models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -411,12 +718,46 @@ class Comment(models.Model):
     parent = models.ForeignKey(
         "self", on_delete=models.CASCADE, blank=True, null=True, related_name="replies"
     )
+    # The same target as content_object when it is a StatusPost, as a real
+    # foreign key: deleting the post deletes its comments, and comment lists
+    # are an indexed lookup. Set on save; older rows are filled in by
+    # `manage.py backfill_typed_engagement`.
+    post = models.ForeignKey(
+        "StatusPost",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="post_comments",
+        db_index=False,  # Covered by comment_post_path_idx.
+    )
     likes = GenericRelation("Like", related_query_name="comment_likes")
 
+    # Maintained by community.reactions, like StatusPost's counters.
+    like_count = models.PositiveIntegerField(default=0)
+    reaction_counts = models.JSONField(default=dict, blank=True)
+    # Direct replies, maintained by the Comment signals.
+    reply_count = models.PositiveIntegerField(default=0)
+
+    # Materialized path: the zero-padded IDs of this comment's ancestors and
+    # itself, e.g. "0000000012/0000000345/". Sorting by path lists a thread
+    # depth-first, and a whole subtree is one index range scan on a prefix.
+    path = models.TextField(default="", editable=False)
+
+    counter_fields = ("like_count", "reaction_counts", "reply_count")
+
+    PATH_SEGMENT_LENGTH = 11  # 10 digits and a slash
+
     class Meta:
         ordering = ["created_at"]
         indexes = [
             models.Index(fields=["content_type", "object_id"]),
+            models.Index(
+                fields=["path"],
+                name="comment_path_idx",
+                opclasses=["text_pattern_ops"],
+            ),
+            models.Index(fields=["post", "path"], name="comment_post_path_idx"),
         ]
 
     def __str__(self):
@@ -432,6 +773,35 @@ class Comment(models.Model):
             target_str = f"related object (ContentType ID: {self.content_type_id}, Object ID: {self.object_id})"
         return f"Comment by {author_username} on {target_str[:50]}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if self.post_id is None and self.content_type_id == (
+            ContentType.objects.get_for_model(StatusPost).id
+        ):
+            self.post_id = self.object_id
+        super().save(*args, **kwargs)
+        if adding and not self.path:
+            # The path needs this comment's ID, so it is set right after insert.
+            parent_path = (
+                Comment.objects.filter(pk=self.parent_id)
+                .values_list("path", flat=True)
+                .first()
+                if self.parent_id
+                else ""
+            )
+            self.path = f"{parent_path or ''}{self.pk:010d}/"
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+    def subtree(self):
+        """This comment's descendants, depth-first."""
+        if not self.path:
+            return Comment.objects.none()
+        return (
+            Comment.objects.filter(path__startswith=self.path)
+            .exclude(pk=self.pk)
+            .order_by("path")
+        )
+
 
 class Like(models.Model):
 
@@ -489,6 +859,111 @@ class Like(models.Model):
             return f"{self.user.username} liked object ID {self.object_id} of type {self.content_type.model}"
 
 
+# Typed copies of Like, one table per target, with real foreign keys.
+# Like is still written first; every write path mirrors into these (see
+# community.reactions), and the read paths use them.
+class PostReaction(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="post_reactions",
+    )
+    post = models.ForeignKey(
+        StatusPost, on_delete=models.CASCADE, related_name="reactions"
+    )
+    reaction_type = models.CharField(
+        max_length=20, choices=Like.REACTION_TYPES, default="like"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="unique_post_reaction"
+            ),
+        ]
+        indexes = [
+            # Covers "who reacted to this post, and how" without the table.
+            models.Index(
+                fields=["post", "reaction_type"],
+                include=["user"],
+                name="postreaction_post_type_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.reaction_type} post {self.post_id}"
+
+
+class CommentReaction(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="comment_reactions",
+    )
+    comment = models.ForeignKey(
+        Comment, on_delete=models.CASCADE, related_name="reactions"
+    )
+    reaction_type = models.CharField(
+        max_length=20, choices=Like.REACTION_TYPES, default="like"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "comment"], name="unique_comment_reaction"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["comment", "reaction_type"],
+                include=["user"],
+                name="commentreaction_type_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.reaction_type} comment {self.comment_id}"
+
+
+# Hashtags parsed out of post content on save (see community.hashtags).
+class Hashtag(models.Model):
+    # Lower-cased, without the "#".
+    name = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.name}"
+
+
+class PostHashtag(models.Model):
+    post = models.ForeignKey(
+        StatusPost, on_delete=models.CASCADE, related_name="post_hashtags"
+    )
+    hashtag = models.ForeignKey(
+        Hashtag, on_delete=models.CASCADE, related_name="post_hashtags"
+    )
+    # The post's created_at, so a tag's timeline is one index scan.
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "hashtag"], name="unique_post_hashtag"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["hashtag", "-created_at", "-post"],
+                name="posthashtag_timeline_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"post {self.post_id} #{self.hashtag_id}"
+
+
 class Notification(models.Model):
     recipient = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -548,6 +1023,19 @@ class Notification(models.Model):
         ordering = ["-timestamp"]
         indexes = [
             models.Index(fields=["recipient", "is_read", "-timestamp"]),
+            # The notification list reads everything, newest first.
+            models.Index(
+                fields=["recipient", "-timestamp"], name="notif_recipient_recent_idx"
+            ),
+            # Finding the notifications about an object being purged.
+            models.Index(
+                fields=["action_object_content_type", "action_object_object_id"],
+                name="notif_action_object_idx",
+            ),
+            models.Index(
+                fields=["target_content_type", "target_object_object_id"],
+                name="notif_target_idx",
+            ),
         ]
 
     def __str__(self):
@@ -586,6 +1074,11 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["timestamp"]
+        indexes = [
+            models.Index(
+                fields=["conversation", "timestamp"], name="message_conversation_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Message from {self.sender.username} in Convo ID {self.conversation.id} at {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
@@ -596,32 +1089,73 @@ class Poll(models.Model):
     Represents a poll attached to a StatusPost.
     """
 
+    MAX_DURATION_HOURS = 24 * 30
+
     post = models.OneToOneField(
         StatusPost, on_delete=models.CASCADE, related_name="poll"
     )
     question = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Optional voting deadline. Once it passes (or the poll is closed early)
+    # the tallies are frozen into `results_snapshot`.
+    closes_at = models.DateTimeField(null=True, blank=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    # {"<option id>": vote count}, written once when the poll closes.
+    results_snapshot = models.JSONField(null=True, blank=True)
+
     def __str__(self):
         return f"Poll for Post ID {self.post.id}: {self.question}"
 
-    # --- PASTE THE NEW METHOD HERE ---
-    def recalculate_vote_counts(self):
+    @property
+    def is_closed(self):
+        if self.closed_at is not None:
+            return True
+        return self.closes_at is not None and self.closes_at <= timezone.now()
+
+    def get_vote_counts(self):
+        """
+        Returns {option_id: vote count}. Closed polls report their frozen
+        snapshot; open polls read the per-option counters (use
+        prefetch_related("options") when serializing many polls).
         """
-        Correctly recalculates vote counts for all options and the total for the poll
-        by querying the PollVote table, which is the source of truth.
+        if self.results_snapshot is not None:
+            return {
+                int(option_id): count
+                for option_id, count in self.results_snapshot.items()
+            }
+        return {option.id: option.vote_count for option in self.options.all()}
+
+    def close(self):
         """
-        # Note: The PollOption and Poll models do not store vote counts directly.
-        # This method is designed to work with your existing structure where
-        # PollVote is the sole record of votes. We will add counts to the serializer later if needed,
-        # but the backend logic relies on querying PollVote.
+        Freezes the current tallies into `results_snapshot`. Safe to call more
+        than once; only the first call takes the snapshot.
+        """
+        with transaction.atomic():
+            poll = Poll.objects.select_for_update().get(pk=self.pk)
+            if poll.closed_at is None:
+                poll.results_snapshot = {
+                    str(option_id): count
+                    for option_id, count in poll.options.values_list("id", "vote_count")
+                }
+                poll.closed_at = timezone.now()
+                poll.save(update_fields=["results_snapshot", "closed_at"])
+        self.closed_at = poll.closed_at
+        self.results_snapshot = poll.results_snapshot
 
-        # This method currently ensures data integrity but does not update any fields on Poll or PollOption
-        # because you don't have a `votes` or `total_votes` field on them.
-        # Its primary purpose is to be a placeholder for when we call it from the view.
-        # The key is that the view will now have a method to call.
-        # Let's adjust this to be more robust for the future.
-        pass  # We will replace this logic in the view itself for now to be simpler.
+    def recalculate_vote_counts(self):
+        """
+        Rebuilds the per-option counters from the PollVote rows, which remain
+        the source of truth. Only needed to repair counters by hand.
+        """
+        vote_count = (
+            PollVote.objects.filter(option=models.OuterRef("pk"))
+            .order_by()
+            .values("option")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        self.options.update(vote_count=Coalesce(models.Subquery(vote_count), 0))
 
 
 class PollOption(models.Model):
@@ -631,6 +1165,8 @@ class PollOption(models.Model):
 
     poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name="options")
     text = models.CharField(max_length=100)
+    # Maintained by the PollVote signals in the same transaction as the vote.
+    vote_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -715,6 +1251,14 @@ class Report(models.Model):
         ordering = ["-created_at"]
         # A user can only report a specific piece of content once.
         unique_together = ("reporter", "content_type", "object_id")
+        indexes = [
+            # The moderation queue groups open reports by target, and
+            # resolving a target updates all of its reports at once.
+            models.Index(
+                fields=["status", "content_type", "object_id"],
+                name="report_queue_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Report by {self.reporter.username} on {self.content_object} ({self.get_reason_display()})"
@@ -934,3 +1478,42 @@ class RecommendationImpression(models.Model):
 
     def __str__(self):
         return f"{self.user.username} saw {self.suggested_user.username} ({self.impression_count} times)"
+
+
+class PurgeJob(models.Model):
+    """
+    A batched deletion of some rows and everything that depends on them (see
+    community.purge), with how many rows of each model it has deleted so far.
+    Run, and resumed after an interruption, by `manage.py run_purge_jobs`.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    label = models.CharField(max_length=255, blank=True)
+    # The model of the rows to delete, as "app_label.ModelName".
+    model = models.CharField(max_length=100)
+    object_ids = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True
+    )
+    # {"app_label.ModelName": rows deleted}, updated as the job goes.
+    deleted = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"Purge {self.pk}: {self.label or self.model} ({self.status})"
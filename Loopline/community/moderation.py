@@ -0,0 +1,148 @@
+# community/moderation.py
+"""
+The moderation queue: open reports grouped by the content they are about.
+
+Report rows are one per reporter, so a spam post reported hundreds of times
+is hundreds of rows. Moderators work on targets instead - one row per piece
+of content with how often, why and how recently it was reported - and a
+decision on a target applies to all of its reports.
+
+Priority is the sum of the open reports' reason weights (REASON_WEIGHTS),
+so ten spam reports outrank one, and one report of violence outranks a
+couple of spam reports. Ties go to the most recently reported target.
+
+resolve() handles any number of targets in one transaction with a handful
+of set-based statements: one UPDATE for all of their reports, and a purge
+(see community.purge) per content type when the content is deleted.
+"""
+from collections import defaultdict
+from functools import partial
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Max, Min, Q, Sum, Value, When
+from django.utils import timezone
+
+from .models import Report, StatusPost
+from .purge import Purger
+from .signals import broadcast_post_deleted
+
+OPEN_STATUSES = ("PENDING", "REVIEWED")
+
+REASON_WEIGHTS = {
+    "VIOLENCE": 5,
+    "HATE_SPEECH": 4,
+    "HARASSMENT": 3,
+    "SPAM": 2,
+    "OTHER": 1,
+}
+
+
+def moderation_queue():
+    """
+    One row per reported target with open reports, highest priority first:
+    content_type, object_id, reports, priority, reasons (the open reports'
+    distinct reasons), first_reported and last_reported.
+    """
+    priority = Case(
+        *[
+            When(reason=reason, then=Value(weight))
+            for reason, weight in REASON_WEIGHTS.items()
+        ],
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    return (
+        Report.objects.filter(status__in=OPEN_STATUSES)
+        .values("content_type", "object_id")
+        .annotate(
+            reports=Count("id"),
+            priority=Sum(priority),
+            first_reported=Min("created_at"),
+            last_reported=Max("created_at"),
+        )
+        .order_by("-priority", "-last_reported", "content_type", "object_id")
+    )
+
+
+def reasons_for(targets):
+    """{(content type id, object id): {reason: open reports}} for `targets`."""
+    reasons = defaultdict(dict)
+    rows = (
+        Report.objects.filter(_matching(targets), status__in=OPEN_STATUSES)
+        .values_list("content_type", "object_id", "reason")
+        .annotate(count=Count("id"))
+    )
+    for content_type_id, object_id, reason, count in rows:
+        reasons[content_type_id, object_id][reason] = count
+    return reasons
+
+
+def load_targets(targets):
+    """{(content type id, object id): object} for the targets that still exist."""
+    objects = {}
+    for content_type_id, object_ids in _by_type(targets).items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+        for pk, obj in model._base_manager.in_bulk(object_ids).items():
+            objects[content_type_id, pk] = obj
+    return objects
+
+
+def resolve(targets, moderator, delete_content, notes=""):
+    """
+    Closes every open report on `targets`, (content type id, object id)
+    pairs: as "Action Taken" with the content deleted, or as "Dismissed".
+    Returns (reports closed, objects deleted).
+    """
+    targets = set(targets)
+    if not targets:
+        return 0, 0
+    status = "ACTION_TAKEN" if delete_content else "DISMISSED"
+    with transaction.atomic():
+        closed = Report.objects.filter(
+            _matching(targets), status__in=OPEN_STATUSES
+        ).update(
+            status=status,
+            moderator=moderator,
+            moderated_at=timezone.now(),
+            moderator_notes=notes,
+        )
+        deleted = 0
+        if delete_content:
+            for content_type_id, object_ids in _by_type(targets).items():
+                deleted += _delete(content_type_id, object_ids)
+    return closed, deleted
+
+
+def _delete(content_type_id, object_ids):
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model is None:
+        return 0
+    posts = []
+    if model is StatusPost:
+        posts = list(
+            StatusPost.objects.filter(pk__in=object_ids).values_list("pk", "author_id")
+        )
+    # The reports themselves stay, as the record of what was done.
+    purger = Purger(keep=(Report,))
+    purger.purge(model, object_ids)
+    # The purge sends no post_delete signals; feeds still drop the post live.
+    for post_id, author_id in posts:
+        transaction.on_commit(partial(broadcast_post_deleted, post_id, author_id))
+    return purger.deleted[model._meta.label]
+
+
+def _by_type(targets):
+    object_ids = defaultdict(list)
+    for content_type_id, object_id in targets:
+        object_ids[int(content_type_id)].append(int(object_id))
+    return object_ids
+
+
+def _matching(targets):
+    match = Q(pk__in=[])
+    for content_type_id, object_ids in _by_type(targets).items():
+        match |= Q(content_type_id=content_type_id, object_id__in=object_ids)
+    return match
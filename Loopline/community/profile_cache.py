@@ -0,0 +1,172 @@
+# community/profile_cache.py
+"""
+The profile page, cached as one document per user.
+
+Everything on a profile that looks the same to every viewer - the profile
+fields, skill categories with their skills, education, experience, social
+links and the follower/following/connection/post counts - is built with a
+fixed number of queries and cached as a single blob:
+
+    profile:version:<user id>                  the current version
+    profile:doc:<user id>:<schema>.<version>   the document
+
+Anything that changes the document bumps the version (see the profile
+signals), so a stale blob is simply never read again and expires on its own.
+
+What depends on the viewer - the relationship status and whether they may
+see the email address and phone number - is overlaid per request from one
+Follow query (and one ConnectionRequest query when the two aren't
+connected). The raw contact details are kept beside the document, never in
+it.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .db_routing import primary_reads
+from .models import ConnectionRequest, Follow, UserProfile
+from .serializers import ProfileDocumentSerializer
+
+# Bump when the document's shape changes, so old blobs are ignored.
+DOCUMENT_SCHEMA = 1
+
+
+def _version_key(user_id):
+    return f"profile:version:{user_id}"
+
+
+def _document_key(user_id, version):
+    return f"profile:doc:{user_id}:{DOCUMENT_SCHEMA}.{version}"
+
+
+def _current_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # A fresh start rather than 1, so an evicted counter can't come back
+        # to a version whose document is still cached.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(user_ids):
+    for user_id in user_ids:
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            pass  # No version yet, so nothing cached to invalidate.
+
+
+def invalidate_profile_documents(*user_ids):
+    """
+    Retires the users' cached documents, now and again once the transaction
+    commits, so a request racing the change can't cache the old state.
+    """
+    _bump(user_ids)
+    transaction.on_commit(lambda: _bump(user_ids))
+
+
+def profile_document(profile, request):
+    """The cached viewer-independent document for `profile`, built if need be."""
+    key = _document_key(profile.user_id, _current_version(profile.user_id))
+    document = cache.get(key)
+    if document is None:
+        # Built from the primary: a replica that is behind would cache the
+        # old state under the version the change just bumped.
+        with primary_reads():
+            profile = (
+                UserProfile.objects.select_related("user")
+                .prefetch_related(
+                    "skill_categories__skills",
+                    "education_history",
+                    "experience_history",
+                    "social_links",
+                )
+                .get(pk=profile.pk)
+            )
+            document = {
+                "profile": dict(
+                    ProfileDocumentSerializer(
+                        profile, context={"request": request}
+                    ).data
+                ),
+                "email": profile.user.email,
+                "phone_number": profile.phone_number,
+            }
+        cache.set(key, document, settings.PROFILE_DOCUMENT_TTL)
+    return document
+
+
+def _relationship(viewer, user_id):
+    """(viewer follows user, user follows viewer), in one query."""
+    followers = set(
+        Follow.objects.filter(
+            Q(follower=viewer, following_id=user_id)
+            | Q(follower_id=user_id, following=viewer)
+        ).values_list("follower_id", flat=True)
+    )
+    return viewer.pk in followers, user_id in followers
+
+
+def _relationship_status(viewer, user_id, follows, followed_back):
+    if follows and followed_back:
+        connection_status = "connected"
+    else:
+        pending = set(
+            ConnectionRequest.objects.filter(
+                Q(sender=viewer, receiver_id=user_id)
+                | Q(sender_id=user_id, receiver=viewer),
+                status="pending",
+            ).values_list("sender_id", flat=True)
+        )
+        if viewer.pk in pending:
+            connection_status = "request_sent"
+        elif user_id in pending:
+            connection_status = "request_received"
+        else:
+            connection_status = "not_connected"
+    return {
+        "connection_status": connection_status,
+        "is_followed_by_request_user": follows,
+    }
+
+
+def profile_for_viewer(profile, request):
+    """The profile as `request.user` may see it."""
+    document = profile_document(profile, request)
+    data = dict(document["profile"])
+    viewer = request.user
+    user_id = profile.user_id
+    is_self = viewer.is_authenticated and viewer.pk == user_id
+    follows = followed_back = False
+    if not viewer.is_authenticated:
+        data["relationship_status"] = None
+    elif is_self:
+        data["relationship_status"] = {
+            "connection_status": "self",
+            "is_followed_by_request_user": False,
+        }
+    else:
+        follows, followed_back = _relationship(viewer, user_id)
+        data["relationship_status"] = _relationship_status(
+            viewer, user_id, follows, followed_back
+        )
+
+    def visible(value, setting):
+        if is_self or setting == "public":
+            return value
+        if not viewer.is_authenticated:
+            return None
+        if setting == "followers" and follows:
+            return value
+        if setting == "connections" and follows and followed_back:
+            return value
+        return None
+
+    data["email"] = visible(document["email"], data["email_visibility"])
+    data["phone_number"] = visible(document["phone_number"], data["phone_visibility"])
+    return data
@@ -0,0 +1,329 @@
+# community/purge.py
+"""
+Batched deletion of rows and everything that depends on them.
+
+Django's delete() first collects every related row into memory, then
+deletes the lot in one transaction. For a heavy user, or a few thousand
+seeded ones, that is millions of objects and locks held for minutes. Here
+the dependents are found from the model graph instead, and deleted before
+the rows they depend on, a keyset-ordered batch at a time:
+
+    DELETE FROM <table> WHERE id IN (<batch_size ids>)
+
+with each batch in its own short transaction. Rows that only point at the
+deleted ones through a generic (content type, object id) pair - likes,
+comments, reports and notifications - have no foreign key to follow, so
+they are looked up explicitly (GENERIC_REFERENCES).
+
+Raw deletes send no post_delete signals, so what those would have done is
+done here from the deleted rows (see the hooks below): counters on surviving
+rows, media blob references, and the caches keyed on users (tokens, profile
+documents, group visibility, the mention index). Live post_deleted pushes
+are not sent.
+
+A PurgeJob records what to delete and how far it has got. Every batch
+commits as it goes and the walk only finds rows that still exist, so a job
+that stopped part way is finished by running it again.
+"""
+import functools
+import traceback
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from redis.exceptions import RedisError
+from rest_framework.authtoken.models import Token
+
+from .authentication import forget_tokens
+from .mentions import index_users
+from .models import (
+    Comment,
+    Follow,
+    Group,
+    Like,
+    MediaBlob,
+    Notification,
+    PollOption,
+    PollVote,
+    PostMedia,
+    PurgeJob,
+    Report,
+    StatusPost,
+    UserProfile,
+)
+from .profile_cache import invalidate_profile_documents
+from .reactions import REACTION_TARGET_MODELS, apply_reaction_deltas
+from .visibility import invalidate_member_groups, invalidate_public_groups
+
+BATCH_SIZE = 1000
+
+# (model, content type field, object id field) of every generic reference
+# that should die with the object it points at.
+GENERIC_REFERENCES = [
+    (Like, "content_type", "object_id"),
+    (Comment, "content_type", "object_id"),
+    (Report, "content_type", "object_id"),
+    (Notification, "action_object_content_type", "action_object_object_id"),
+    (Notification, "target_content_type", "target_object_object_id"),
+]
+
+
+class PurgeError(Exception):
+    pass
+
+
+@functools.cache
+def _dependents(model):
+    """(model, foreign key) of every relation pointing at `model`, M2M tables included."""
+    return [
+        (relation.related_model, relation.field)
+        for relation in model._meta.get_fields(include_hidden=True)
+        if relation.auto_created
+        and not relation.concrete
+        and (relation.one_to_many or relation.one_to_one)
+    ]
+
+
+def _has_integer_pk(model):
+    """Generic references store integer ids, so only these can be their targets."""
+    pk = model._meta.pk
+    while pk.is_relation:
+        pk = pk.target_field
+    return isinstance(pk, models.IntegerField)
+
+
+# --- What the post_delete signals would have done ---
+# Each hook gets the listed columns of the rows just deleted (DELETE ...
+# RETURNING) and runs in the same transaction as the delete.
+_hooks = {}
+
+
+def _after_delete(model, *columns):
+    def register(function):
+        _hooks[model] = (columns, function)
+        return function
+
+    return register
+
+
+def _decrement(model, field, counts):
+    for pk, count in counts.items():
+        if pk is not None:
+            model.objects.filter(pk=pk).update(**{field: Greatest(F(field) - count, 0)})
+
+
+@_after_delete(Like, "content_type_id", "object_id", "reaction_type")
+def _uncount_likes(rows):
+    deltas = defaultdict(Counter)
+    for content_type_id, object_id, reaction_type in rows:
+        deltas[content_type_id, object_id][reaction_type] -= 1
+    for (content_type_id, object_id), reaction_deltas in deltas.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model in REACTION_TARGET_MODELS:
+            apply_reaction_deltas(
+                model, object_id, sum(reaction_deltas.values()), reaction_deltas
+            )
+
+
+@_after_delete(Comment, "parent_id", "content_type_id", "object_id")
+def _uncount_comments(rows):
+    post_type_id = ContentType.objects.get_for_model(StatusPost).id
+    _decrement(Comment, "reply_count", Counter(parent for parent, _, _ in rows))
+    _decrement(
+        StatusPost,
+        "comment_count",
+        Counter(post for _, type_id, post in rows if type_id == post_type_id),
+    )
+
+
+@_after_delete(StatusPost, "parent_post_id", "author_id")
+def _uncount_reposts(rows):
+    _decrement(StatusPost, "repost_count", Counter(parent for parent, _ in rows))
+    invalidate_profile_documents(*{author for _, author in rows})
+
+
+@_after_delete(PollVote, "option_id")
+def _uncount_poll_votes(rows):
+    _decrement(PollOption, "vote_count", Counter(row[0] for row in rows))
+
+
+@_after_delete(Group.members.through, "group_id", "user_id")
+def _uncount_group_members(rows):
+    _decrement(Group, "member_count", Counter(group for group, _ in rows))
+    invalidate_member_groups(*{user for _, user in rows})
+
+
+@_after_delete(Group, "id")
+def _forget_groups(rows):
+    invalidate_public_groups()
+
+
+@_after_delete(Follow, "follower_id", "following_id")
+def _forget_follows(rows):
+    invalidate_profile_documents(*{user for row in rows for user in row})
+
+
+@_after_delete(Token, "key")
+def _forget_tokens(rows):
+    forget_tokens(row[0] for row in rows)
+
+
+@_after_delete(PostMedia, "blob_id")
+def _release_post_media(rows):
+    for (blob_id,) in rows:
+        MediaBlob.objects.release(blob_id)
+
+
+@_after_delete(UserProfile, "picture_blob_id")
+def _release_profile_pictures(rows):
+    for (blob_id,) in rows:
+        MediaBlob.objects.release(blob_id)
+
+
+def _unindex_users(user_ids):
+    try:
+        index_users(user_ids)
+    except RedisError:
+        pass  # A rebuild_mention_index catches up.
+
+
+@_after_delete(get_user_model(), "id")
+def _unindex_deleted_users(rows):
+    user_ids = [row[0] for row in rows]
+    transaction.on_commit(lambda: _unindex_users(user_ids))
+
+
+# --- The engine ---
+
+
+class Purger:
+    """
+    Deletes rows with all their dependents, `batch_size` rows per statement.
+    `deleted` counts the rows deleted per model label; `progress` is called
+    with it after every batch. Generic references from the models in `keep`
+    to the rows passed to purge() are left alone, as moderation does with
+    the reports on content it deletes.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, progress=None, keep=()):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.keep = keep
+        self.deleted = Counter()
+
+    def purge(self, model, ids):
+        ids = sorted(ids)
+        for start in range(0, len(ids), self.batch_size):
+            self._purge_batch(model, ids[start : start + self.batch_size], root=True)
+
+    def _purge_batch(self, model, ids, root=False):
+        for related, field in _dependents(model):
+            on_delete = field.remote_field.on_delete
+            lookup = {f"{field.name}__in": ids}
+            if on_delete is models.CASCADE:
+                self._purge_matching(related, lookup)
+            elif on_delete is models.SET_NULL:
+                related._base_manager.filter(**lookup).update(**{field.name: None})
+            elif on_delete is not models.DO_NOTHING:
+                if related._base_manager.filter(**lookup).exists():
+                    raise PurgeError(
+                        f"{related._meta.label}.{field.name} "
+                        f"({on_delete.__name__}) still refers to {model._meta.label}."
+                    )
+        if _has_integer_pk(model):
+            content_type = ContentType.objects.get_for_model(model)
+            for related, type_field, id_field in GENERIC_REFERENCES:
+                if root and related in self.keep:
+                    continue
+                self._purge_matching(
+                    related, {type_field: content_type, f"{id_field}__in": ids}
+                )
+        self._delete(model, ids)
+
+    def _purge_matching(self, model, lookup):
+        """Purges the rows matching `lookup`, in primary key order."""
+        queryset = (
+            model._base_manager.filter(**lookup)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        last = None
+        while True:
+            page = queryset if last is None else queryset.filter(pk__gt=last)
+            batch = list(page[: self.batch_size])
+            if not batch:
+                return
+            self._purge_batch(model, batch)
+            last = batch[-1]
+
+    def _delete(self, model, ids):
+        quote = connection.ops.quote_name
+        columns, hook = _hooks.get(model, ((), None))
+        sql = "DELETE FROM {} WHERE {} IN ({})".format(
+            quote(model._meta.db_table),
+            quote(model._meta.pk.column),
+            ", ".join(["%s"] * len(ids)),
+        )
+        if columns:
+            sql += " RETURNING " + ", ".join(quote(column) for column in columns)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(sql, ids)
+                rows = cursor.fetchall() if columns else None
+                count = cursor.rowcount
+            if hook and rows:
+                hook(rows)
+        if count:
+            self.deleted[model._meta.label] += count
+            if self.progress:
+                self.progress(self.deleted)
+
+
+def schedule_purge(queryset, label=""):
+    """A PurgeJob for the rows of `queryset`; run_purge_jobs carries it out."""
+    return PurgeJob.objects.create(
+        label=label,
+        model=queryset.model._meta.label,
+        object_ids=list(queryset.order_by("pk").values_list("pk", flat=True)),
+    )
+
+
+def run_purge_job(job, batch_size=BATCH_SIZE, progress=None):
+    """
+    Runs (or resumes) a job, saving its progress after every batch. A failure
+    marks the job failed and is re-raised; running it again carries on.
+    """
+    previous = Counter(job.deleted)
+
+    def save_progress(deleted):
+        job.deleted = dict(previous + deleted)
+        PurgeJob.objects.filter(pk=job.pk).update(deleted=job.deleted)
+        if progress:
+            progress(job)
+
+    job.status, job.error = PurgeJob.RUNNING, ""
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=["status", "error", "started_at"])
+    try:
+        Purger(batch_size, save_progress).purge(
+            apps.get_model(job.model), job.object_ids
+        )
+    except Exception:
+        job.status, job.error = PurgeJob.FAILED, traceback.format_exc()
+        job.save(update_fields=["status", "error"])
+        raise
+    job.status, job.finished_at = PurgeJob.DONE, timezone.now()
+    job.save(update_fields=["status", "finished_at"])
+    return job
+
+
+def purge_now(queryset, batch_size=BATCH_SIZE):
+    """Purges the rows of `queryset` in this process; returns the counts."""
+    purger = Purger(batch_size)
+    purger.purge(queryset.model, queryset.values_list("pk", flat=True))
+    return dict(purger.deleted)
@@ -0,0 +1,631 @@
+# community/reactions.py
+"""
+Reactions ("likes") on posts and comments.
+
+Like and reaction counts are stored on the target row (`like_count` and
+`reaction_counts`) instead of being aggregated from Like rows on every read.
+
+toggle_reaction() is the API's hot path: a single SQL statement inserts,
+changes or removes the user's Like, moves the target's counters and returns
+the new counts. ORM writes elsewhere (bots, admin, tests) keep the counters
+in step through the Like signals, which call apply_reaction_deltas().
+
+Write-behind mode (settings.LIKE_WRITE_BEHIND_ENABLED)
+-------------------------------------------------------
+Every toggle still locks the target row to move its counters, so a viral
+post serializes all of its likers on one row. A target that takes more than
+LIKE_HOT_THRESHOLD toggles within LIKE_HOT_WINDOW seconds is marked hot, and
+its toggles go to Redis instead:
+
+    likes:pending:<ct>:<id>   user id -> wanted reaction ("" = removed)
+    likes:delta:<ct>:<id>     reaction -> change not yet in the DB
+    likes:dirty               targets with pending reactions
+
+Responses add the delta to the stored counts, so callers always see their own
+write. `manage.py flush_like_buffer` writes each target's pending reactions
+to Like in one batch and recounts the target from Like.
+
+Only the toggle's own response reads the buffer. Feeds, post and comment
+pages and viewer_reactions() read the database, so a buffered toggle - the
+user's own included - shows there once the next flush has run; run the
+flush command with a short --interval while write-behind is on.
+
+Typed reaction tables
+---------------------
+Like reaches its target through a generic relation. PostReaction and
+CommentReaction hold the same rows with real foreign keys, and the read
+paths use them once settings.ENGAGEMENT_TYPED_READS is on. Every write to
+Like is mirrored into them in the same transaction: the SQL paths here
+write both tables, and ORM writes go through the Like signals. Rows from
+before the typed tables are copied by `manage.py backfill_typed_engagement`.
+"""
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+
+from .models import Comment, CommentReaction, Like, PostReaction, StatusPost
+from .redis_client import get_redis
+
+# Models that can be reacted to.
+REACTION_TARGET_MODELS = (StatusPost, Comment)
+# The typed reaction table of each target, and its foreign key to the target.
+TYPED_REACTION_MODELS = {
+    StatusPost: (PostReaction, "post"),
+    Comment: (CommentReaction, "comment"),
+}
+REACTION_TYPES = frozenset(value for value, _ in Like.REACTION_TYPES)
+
+DIRTY_KEY = "likes:dirty"
+# The delta hash field holding the change in like_count.
+TOTAL_FIELD = "_total"
+# How long a target's flush counter outlives its last flush.
+FLUSH_COUNT_TTL = 3600
+
+
+class ReactionTargetNotFound(Exception):
+    pass
+
+
+def get_reaction_target_model(content_type_id):
+    """Returns the model behind a content type ID, if it can be reacted to."""
+    try:
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+    except ContentType.DoesNotExist:
+        return None
+    return model if model in REACTION_TARGET_MODELS else None
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _typed_table(model):
+    """The typed reaction table for a target model, and its FK column."""
+    typed_model, field_name = TYPED_REACTION_MODELS[model]
+    column = typed_model._meta.get_field(field_name).column
+    return _table(typed_model), connection.ops.quote_name(column)
+
+
+def _decode_counts(value):
+    # Raw cursors return jsonb as text; Django only decodes it for model fields.
+    return json.loads(value) if isinstance(value, str) else (value or {})
+
+
+# ==================================
+# Stored counters
+# ==================================
+def apply_reaction_deltas(model, object_id, like_delta, reaction_deltas):
+    """
+    Moves a target's counters by the given amounts in one UPDATE.
+    `reaction_deltas` maps reaction types to changes, e.g. {"love": -1}.
+    Reaction types whose count reaches zero are dropped from the JSON.
+    """
+    counts_sql, params = "reaction_counts", []
+    for reaction_type, delta in reaction_deltas.items():
+        if not delta:
+            continue
+        counts_sql += (
+            " || jsonb_build_object(%s, NULLIF(GREATEST("
+            "COALESCE((reaction_counts ->> %s)::int, 0) + %s, 0), 0))"
+        )
+        params += [reaction_type, reaction_type, delta]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {_table(model)}
+            SET like_count = GREATEST(like_count + %s, 0),
+                reaction_counts = jsonb_strip_nulls({counts_sql})
+            WHERE id = %s
+            """,
+            [like_delta, *params, object_id],
+        )
+
+
+def recount_reactions(model, object_id):
+    """Rebuilds a target's counters from its Like rows."""
+    content_type = ContentType.objects.get_for_model(model)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {_table(model)}
+            SET like_count = counts.total, reaction_counts = counts.by_type
+            FROM (
+                SELECT COALESCE(SUM(n), 0) AS total,
+                       COALESCE(jsonb_object_agg(reaction_type, n), '{{}}') AS by_type
+                FROM (
+                    SELECT reaction_type, COUNT(*) AS n
+                    FROM {_table(Like)}
+                    WHERE content_type_id = %s AND object_id = %s
+                    GROUP BY reaction_type
+                ) per_type
+            ) counts
+            WHERE id = %s
+            """,
+            [content_type.id, object_id, object_id],
+        )
+
+
+# ==================================
+# Typed reaction tables
+# ==================================
+def mirror_like(like):
+    """Copies a saved Like into its typed table."""
+    model = like.content_type.model_class()
+    if model not in TYPED_REACTION_MODELS:
+        return
+    typed_model, field_name = TYPED_REACTION_MODELS[model]
+    typed_model.objects.update_or_create(
+        user_id=like.user_id,
+        **{f"{field_name}_id": like.object_id},
+        defaults={"reaction_type": like.reaction_type, "created_at": like.created_at},
+    )
+
+
+def unmirror_like(like):
+    """Removes a deleted Like from its typed table."""
+    model = like.content_type.model_class()
+    if model not in TYPED_REACTION_MODELS:
+        return
+    typed_model, field_name = TYPED_REACTION_MODELS[model]
+    typed_model.objects.filter(
+        user_id=like.user_id, **{f"{field_name}_id": like.object_id}
+    ).delete()
+
+
+def viewer_reactions(user, model):
+    """
+    The user's reactions on `model` targets, as a queryset of rows with
+    `reaction_type` (typed rows, or Like rows until the switch).
+    """
+    if settings.ENGAGEMENT_TYPED_READS:
+        reactions = TYPED_REACTION_MODELS[model][0].objects.all()
+    else:
+        reactions = Like.objects.filter(
+            content_type=ContentType.objects.get_for_model(model)
+        )
+    if not user.is_authenticated:
+        return reactions.none()
+    return reactions.filter(user=user)
+
+
+def viewer_reaction_type(user, obj):
+    """The user's reaction type on one post or comment, or None."""
+    model = type(obj)
+    if settings.ENGAGEMENT_TYPED_READS:
+        _, field_name = TYPED_REACTION_MODELS[model]
+        target = {f"{field_name}_id": obj.pk}
+    else:
+        target = {"object_id": obj.pk}
+    return (
+        viewer_reactions(user, model)
+        .filter(**target)
+        .values_list("reaction_type", flat=True)
+        .first()
+    )
+
+
+def reacted_ids(user, model, object_ids):
+    """The IDs among `object_ids` that the user has reacted to, in one query."""
+    if not object_ids:
+        return set()
+    if settings.ENGAGEMENT_TYPED_READS:
+        _, field_name = TYPED_REACTION_MODELS[model]
+        return set(
+            viewer_reactions(user, model)
+            .filter(**{f"{field_name}_id__in": object_ids})
+            .values_list(f"{field_name}_id", flat=True)
+        )
+    return set(
+        viewer_reactions(user, model)
+        .filter(object_id__in=object_ids)
+        .values_list("object_id", flat=True)
+    )
+
+
+# ==================================
+# Toggling
+# ==================================
+def toggle_reaction(user, model, object_id, reaction_type):
+    """
+    Reacting with the user's current reaction removes it; any other reaction
+    replaces it. Returns the API response: the user's new state plus the
+    target's counts. Raises ReactionTargetNotFound for a missing target.
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    if settings.LIKE_WRITE_BEHIND_ENABLED and _is_buffered(content_type.id, object_id):
+        return _toggle_buffered(user, model, content_type, object_id, reaction_type)
+    return _toggle_in_database(user, model, content_type, object_id, reaction_type)
+
+
+def _toggle_in_database(user, model, content_type, object_id, reaction_type):
+    like_table, target_table = _table(Like), _table(model)
+    typed_table, typed_fk = _typed_table(model)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH target AS (
+                SELECT id FROM {target_table} WHERE id = %(object_id)s
+            ),
+            existing AS (
+                SELECT id, reaction_type FROM {like_table}
+                WHERE user_id = %(user_id)s
+                  AND content_type_id = %(content_type_id)s
+                  AND object_id = %(object_id)s
+                FOR UPDATE
+            ),
+            removed AS (
+                DELETE FROM {like_table} l USING existing e
+                WHERE l.id = e.id AND e.reaction_type = %(reaction_type)s
+                RETURNING l.id
+            ),
+            changed AS (
+                UPDATE {like_table} l SET reaction_type = %(reaction_type)s
+                FROM existing e
+                WHERE l.id = e.id AND e.reaction_type <> %(reaction_type)s
+                RETURNING e.reaction_type AS old_type
+            ),
+            inserted AS (
+                INSERT INTO {like_table}
+                    (user_id, content_type_id, object_id, reaction_type, created_at)
+                SELECT %(user_id)s, %(content_type_id)s, id, %(reaction_type)s, now()
+                FROM target
+                WHERE NOT EXISTS (SELECT 1 FROM existing)
+                ON CONFLICT (user_id, content_type_id, object_id) DO NOTHING
+                RETURNING id
+            ),
+            typed_removed AS (
+                DELETE FROM {typed_table}
+                WHERE user_id = %(user_id)s AND {typed_fk} = %(object_id)s
+                  AND EXISTS (SELECT 1 FROM removed)
+            ),
+            typed_saved AS (
+                INSERT INTO {typed_table}
+                    (user_id, {typed_fk}, reaction_type, created_at)
+                SELECT %(user_id)s, id, %(reaction_type)s, now()
+                FROM target
+                WHERE NOT EXISTS (SELECT 1 FROM removed)
+                ON CONFLICT (user_id, {typed_fk})
+                DO UPDATE SET reaction_type = EXCLUDED.reaction_type
+            ),
+            counted AS (
+                UPDATE {target_table} t
+                SET like_count = GREATEST(
+                        t.like_count
+                        + (SELECT COUNT(*) FROM inserted)
+                        - (SELECT COUNT(*) FROM removed), 0),
+                    reaction_counts = jsonb_strip_nulls(
+                        t.reaction_counts
+                        || jsonb_build_object(%(reaction_type)s, NULLIF(GREATEST(
+                            COALESCE((t.reaction_counts ->> %(reaction_type)s)::int, 0)
+                            + (SELECT COUNT(*) FROM inserted)
+                            + (SELECT COUNT(*) FROM changed)
+                            - (SELECT COUNT(*) FROM removed), 0), 0))
+                        || COALESCE((
+                            SELECT jsonb_build_object(c.old_type, NULLIF(GREATEST(
+                                COALESCE((t.reaction_counts ->> c.old_type)::int, 0) - 1,
+                                0), 0))
+                            FROM changed c
+                        ), '{{}}')
+                    )
+                WHERE t.id = %(object_id)s
+                RETURNING t.like_count, t.reaction_counts
+            )
+            SELECT
+                (SELECT id FROM inserted),
+                EXISTS (SELECT 1 FROM removed),
+                (SELECT like_count FROM counted),
+                (SELECT reaction_counts FROM counted)
+            """,
+            {
+                "user_id": user.id,
+                "content_type_id": content_type.id,
+                "object_id": object_id,
+                "reaction_type": reaction_type,
+            },
+        )
+        like_id, was_removed, like_count, reaction_counts = cursor.fetchone()
+
+    if like_count is None:
+        raise ReactionTargetNotFound
+    if like_id is not None:
+        # The raw INSERT skips post_save, so send the notification here.
+        # This dynamic import prevents circular dependency issues.
+        from .signals import notify_about_like
+
+        notify_about_like(
+            Like(
+                id=like_id,
+                user=user,
+                content_type=content_type,
+                object_id=object_id,
+                reaction_type=reaction_type,
+            )
+        )
+    return {
+        "liked": not was_removed,
+        "reaction_type": reaction_type,
+        "like_count": like_count,
+        "reaction_counts": _decode_counts(reaction_counts),
+    }
+
+
+# ==================================
+# Write-behind buffer for hot targets
+# ==================================
+class _BufferKeys:
+    def __init__(self, content_type_id, object_id):
+        self.target = f"{content_type_id}:{object_id}"
+        self.rate = f"likes:rate:{self.target}"
+        self.hot = f"likes:hot:{self.target}"
+        self.pending = f"likes:pending:{self.target}"
+        self.delta = f"likes:delta:{self.target}"
+        # Batches taken by a flush that has not finished yet.
+        self.flushing_pending = f"likes:flushing:pending:{self.target}"
+        self.flushing_delta = f"likes:flushing:delta:{self.target}"
+        # Counts finished flushes, so a toggle can tell that the Like row it
+        # read may already be out of date.
+        self.flushes = f"likes:flushes:{self.target}"
+
+
+def _buffer_redis():
+    return get_redis(settings.LIKE_BUFFER_REDIS_URL)
+
+
+def _is_buffered(content_type_id, object_id):
+    """
+    Counts this toggle towards the target's rate and reports whether it
+    should be buffered: the target is hot, or still has unflushed reactions
+    (which must be read before the database).
+    """
+    keys = _BufferKeys(content_type_id, object_id)
+    redis = _buffer_redis()
+    pipe = redis.pipeline(transaction=False)
+    pipe.set(keys.rate, 0, ex=settings.LIKE_HOT_WINDOW, nx=True)
+    pipe.incr(keys.rate)
+    pipe.exists(keys.hot, keys.pending, keys.flushing_pending)
+    _, rate, buffered = pipe.execute()
+    if buffered:
+        return True
+    if rate >= settings.LIKE_HOT_THRESHOLD:
+        redis.set(keys.hot, 1, ex=settings.LIKE_HOT_TTL)
+        return True
+    return False
+
+
+# Toggles one user's buffered reaction and returns (wanted reaction, delta,
+# flushing delta). The user's current reaction is their pending one, else the
+# one in a flush under way, else the Like row read before the call (ARGV[3]).
+# That row is only trusted if no flush has finished since it was read
+# (ARGV[4]); otherwise nil is returned and the caller reads it again.
+_TOGGLE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current then
+    current = redis.call('HGET', KEYS[2], ARGV[1])
+end
+if not current then
+    if (redis.call('GET', KEYS[5]) or '0') ~= ARGV[4] then
+        return nil
+    end
+    current = ARGV[3]
+end
+local wanted = ARGV[2]
+if current == wanted then
+    wanted = ''
+end
+redis.call('HSET', KEYS[1], ARGV[1], wanted)
+local total = 0
+if current ~= '' then
+    redis.call('HINCRBY', KEYS[3], current, -1)
+    total = total - 1
+end
+if wanted ~= '' then
+    redis.call('HINCRBY', KEYS[3], wanted, 1)
+    total = total + 1
+end
+redis.call('HINCRBY', KEYS[3], ARGV[5], total)
+redis.call('SADD', KEYS[6], ARGV[6])
+return {wanted, redis.call('HGETALL', KEYS[3]), redis.call('HGETALL', KEYS[4])}
+"""
+
+
+def _pairs(flat):
+    return dict(zip(flat[::2], flat[1::2]))
+
+
+def _toggle_buffered(user, model, content_type, object_id, reaction_type):
+    keys = _BufferKeys(content_type.id, object_id)
+    redis = _buffer_redis()
+    result = None
+    while result is None:
+        flushes = redis.get(keys.flushes) or "0"
+        stored = (
+            model.objects.filter(pk=object_id)
+            .values("like_count", "reaction_counts")
+            .first()
+        )
+        if stored is None:
+            raise ReactionTargetNotFound
+        current = (
+            Like.objects.filter(
+                user=user, content_type=content_type, object_id=object_id
+            )
+            .values_list("reaction_type", flat=True)
+            .first()
+        ) or ""
+        result = redis.eval(
+            _TOGGLE_SCRIPT,
+            6,
+            keys.pending,
+            keys.flushing_pending,
+            keys.delta,
+            keys.flushing_delta,
+            keys.flushes,
+            DIRTY_KEY,
+            user.id,
+            reaction_type,
+            current,
+            flushes,
+            TOTAL_FIELD,
+            keys.target,
+        )
+    wanted, delta, flushing_delta = result[0], _pairs(result[1]), _pairs(result[2])
+
+    reaction_counts = dict(stored["reaction_counts"])
+    like_count = stored["like_count"]
+    for pending_delta in (delta, flushing_delta):
+        for field, change in pending_delta.items():
+            if field == TOTAL_FIELD:
+                like_count += int(change)
+            else:
+                reaction_counts[field] = reaction_counts.get(field, 0) + int(change)
+    return {
+        "liked": bool(wanted),
+        "reaction_type": reaction_type,
+        "like_count": max(like_count, 0),
+        "reaction_counts": {
+            field: count for field, count in reaction_counts.items() if count > 0
+        },
+    }
+
+
+# Moves a target's pending reactions aside for flushing, unless a previous
+# flush of this target died half way, in which case that batch is retried.
+_CLAIM_BATCH_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 0 then
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        redis.call('RENAME', KEYS[1], KEYS[3])
+    end
+    if redis.call('EXISTS', KEYS[2]) == 1 then
+        redis.call('RENAME', KEYS[2], KEYS[4])
+    end
+end
+return redis.call('HGETALL', KEYS[3])
+"""
+
+
+def flush_like_buffer():
+    """Writes every buffered reaction to the database. Returns how many."""
+    redis = _buffer_redis()
+    flushed = 0
+    for target in redis.smembers(DIRTY_KEY):
+        # Toggles arriving from now on re-mark the target for the next run.
+        redis.srem(DIRTY_KEY, target)
+        content_type_id, object_id = (int(part) for part in target.split(":"))
+        flushed += _flush_target(redis, content_type_id, object_id)
+    return flushed
+
+
+def _flush_target(redis, content_type_id, object_id):
+    keys = _BufferKeys(content_type_id, object_id)
+    claimed = redis.eval(
+        _CLAIM_BATCH_SCRIPT,
+        4,
+        keys.pending,
+        keys.delta,
+        keys.flushing_pending,
+        keys.flushing_delta,
+    )
+    pending = _pairs(claimed)
+    model = get_reaction_target_model(content_type_id)
+
+    if pending and model is not None:
+        with transaction.atomic():
+            # A target deleted since the toggles simply drops them.
+            if model.objects.filter(pk=object_id).exists():
+                inserted = _write_pending(model, content_type_id, object_id, pending)
+                recount_reactions(model, object_id)
+                _notify_inserted(content_type_id, object_id, inserted)
+
+    # One transaction, so no toggle sees the batch gone but the count unmoved.
+    pipe = redis.pipeline()
+    pipe.delete(keys.flushing_pending, keys.flushing_delta)
+    pipe.incr(keys.flushes)
+    pipe.expire(keys.flushes, FLUSH_COUNT_TTL)
+    pipe.execute()
+    if redis.exists(keys.pending):
+        redis.sadd(DIRTY_KEY, keys.target)
+    return len(pending)
+
+
+def _write_pending(model, content_type_id, object_id, pending):
+    """
+    Applies {user id: wanted reaction} to Like, and its typed table, with
+    one DELETE and one upsert each. Returns (like id, user id, reaction) for
+    the newly created likes.
+    """
+    removed = [int(user_id) for user_id, wanted in pending.items() if not wanted]
+    wanted = [(int(user_id), value) for user_id, value in pending.items() if value]
+    like_table = _table(Like)
+    typed_table, typed_fk = _typed_table(model)
+    with connection.cursor() as cursor:
+        if removed:
+            cursor.execute(
+                f"""
+                DELETE FROM {like_table}
+                WHERE content_type_id = %s AND object_id = %s AND user_id = ANY(%s)
+                """,
+                [content_type_id, object_id, removed],
+            )
+            cursor.execute(
+                f"""
+                DELETE FROM {typed_table}
+                WHERE {typed_fk} = %s AND user_id = ANY(%s)
+                """,
+                [object_id, removed],
+            )
+        if not wanted:
+            return []
+        # The join skips users deleted while their reaction was buffered.
+        cursor.execute(
+            f"""
+            INSERT INTO {like_table}
+                (user_id, content_type_id, object_id, reaction_type, created_at)
+            SELECT u.id, %s, %s, v.reaction_type, now()
+            FROM unnest(%s::int[], %s::varchar[]) AS v(user_id, reaction_type)
+            JOIN {_table(get_user_model())} u ON u.id = v.user_id
+            ON CONFLICT (user_id, content_type_id, object_id)
+            DO UPDATE SET reaction_type = EXCLUDED.reaction_type
+            RETURNING id, user_id, reaction_type, (xmax = 0) AS inserted
+            """,
+            [
+                content_type_id,
+                object_id,
+                [user_id for user_id, _ in wanted],
+                [value for _, value in wanted],
+            ],
+        )
+        inserted = [row[:3] for row in cursor.fetchall() if row[3]]
+        cursor.execute(
+            f"""
+            INSERT INTO {typed_table} (user_id, {typed_fk}, reaction_type, created_at)
+            SELECT user_id, object_id, reaction_type, created_at
+            FROM {like_table}
+            WHERE content_type_id = %s AND object_id = %s AND user_id = ANY(%s)
+            ON CONFLICT (user_id, {typed_fk})
+            DO UPDATE SET reaction_type = EXCLUDED.reaction_type
+            """,
+            [content_type_id, object_id, [user_id for user_id, _ in wanted]],
+        )
+        return inserted
+
+
+def _notify_inserted(content_type_id, object_id, inserted):
+    if not inserted:
+        return
+    # This dynamic import prevents circular dependency issues.
+    from .signals import notify_about_like
+
+    users = get_user_model().objects.in_bulk([user_id for _, user_id, _ in inserted])
+    for like_id, user_id, reaction_type in inserted:
+        notify_about_like(
+            Like(
+                id=like_id,
+                user=users[user_id],
+                content_type_id=content_type_id,
+                object_id=object_id,
+                reaction_type=reaction_type,
+            )
+        )
@@ -0,0 +1,17 @@
+# community/redis_client.py
+"""
+Direct Redis access for features that need more than the cache API offers
+(hashes, sets, scripts). One connection pool per URL, shared by the process.
+"""
+import redis
+from django.conf import settings
+
+_clients = {}
+
+
+def get_redis(url=None):
+    url = url or settings.REDIS_URL
+    client = _clients.get(url)
+    if client is None:
+        client = _clients[url] = redis.Redis.from_url(url, decode_responses=True)
+    return client
@@ -0,0 +1,114 @@
+# community/renderers.py
+"""
+Fast response encoding: orjson for JSON, MessagePack for clients that ask
+for it with `Accept: application/msgpack` (or `?format=msgpack`).
+
+orjson writes the same JSON as DRF's stdlib encoder for everything our
+serializers produce, several times faster. The few types it does not know
+natively (lazy translations, Decimal, timedelta, querysets, ...) go through
+`_default`, mirroring rest_framework.utils.encoders.JSONEncoder. UTC
+datetimes end in "Z", as DRF writes them.
+
+`frame()` is the same encoder for WebSocket text frames. Signals encode a
+push once and the consumers forward the text, instead of every socket
+re-encoding the same message.
+"""
+import datetime
+import decimal
+import uuid
+
+import msgpack
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """What orjson can't encode itself, the way DRF's JSONEncoder does it."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # Serializers already turn Decimals into strings unless
+        # COERCE_DECIMAL_TO_STRING is off, so this only sees the latter.
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__getitem__") and hasattr(obj, "keys"):
+        return dict(obj)
+    if hasattr(obj, "__iter__"):
+        return tuple(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(data, indent=False):
+    return orjson.dumps(
+        data, default=_default, option=OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+    )
+
+
+def frame(message):
+    """A WebSocket text frame for `message`."""
+    return dumps(message).decode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer on orjson. An `indent` in the Accept header pretty-prints."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        return dumps(data, indent=bool(indent))
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser on orjson."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+def _msgpack_default(obj):
+    # MessagePack has no date or UUID types; send them as JSON would.
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        if representation.endswith("+00:00"):
+            representation = representation[:-6] + "Z"
+        return representation
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    return _default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Binary, smaller and cheaper to decode than JSON on phones. Same data as
+    the JSON responses, with dates and UUIDs as strings.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
@@ -1,10 +1,14 @@
 import json
+from datetime import timedelta
 from rest_framework import serializers, validators
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
-from django.db.models import Count
+from django.utils import timezone
 from .utils import process_mentions
+from .uploads import attach_uploads, UploadAlreadyAttached
+from .reactions import reacted_ids, viewer_reaction_type
 from dj_rest_auth.registration.serializers import RegisterSerializer
 from dj_rest_auth.serializers import PasswordResetConfirmSerializer
 from allauth.account.forms import SetPasswordForm as AllAuthSetPasswordForm
@@ -20,6 +24,7 @@ from .models import (
     Follow,
     StatusPost,
     PostMedia,
+    MediaUpload,
     Group,
     Comment,
     Like,
@@ -37,6 +42,7 @@ from .models import (
     Education,
     Experience,
     SocialLink,
+    SavedPost,
 )
 
 User = get_user_model()
@@ -53,6 +59,35 @@ class PostMediaSerializer(serializers.ModelSerializer):
         fields = ["id", "media_type", "file_url"]
 
 
+class MediaUploadSerializer(serializers.ModelSerializer):
+    """
+    Describes a resumable upload. Clients create one with the file's name,
+    type and size, then send the bytes in chunks to the upload URL.
+    """
+
+    class Meta:
+        model = MediaUpload
+        fields = [
+            "id",
+            "media_type",
+            "filename",
+            "total_size",
+            "offset",
+            "status",
+            "created_at",
+        ]
+        read_only_fields = ["id", "offset", "status", "created_at"]
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("total_size must be greater than zero.")
+        if value > settings.MEDIA_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Uploads are limited to {settings.MEDIA_UPLOAD_MAX_SIZE} bytes."
+            )
+        return value
+
+
 class PollOptionSerializer(serializers.ModelSerializer):
     vote_count = serializers.SerializerMethodField()
 
@@ -61,50 +96,82 @@ class PollOptionSerializer(serializers.ModelSerializer):
         fields = ["id", "text", "vote_count"]
 
     def get_vote_count(self, obj):
-        # The 'votes' related_name on PollVote is pre-counted in the PollSerializer context
-        return self.context.get("vote_counts", {}).get(obj.id, 0)
+        # PollSerializer puts the poll's counts (live or frozen) in the context
+        return self.context.get("vote_counts", {}).get(obj.id, obj.vote_count)
 
 
 class PollSerializer(serializers.ModelSerializer):
     options = PollOptionSerializer(many=True, read_only=True)
     total_votes = serializers.SerializerMethodField()
     user_vote = serializers.SerializerMethodField()
+    is_closed = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Poll
-        fields = ["id", "question", "options", "total_votes", "user_vote"]
+        fields = [
+            "id",
+            "question",
+            "options",
+            "total_votes",
+            "user_vote",
+            "closes_at",
+            "is_closed",
+        ]
 
-    # --- THIS IS THE CORRECTED METHOD ---
     def get_total_votes(self, obj):
-        """
-        Calculates the total votes by summing the pre-calculated counts
-        from the context, which was populated by to_representation.
-        This avoids a redundant database query.
-        """
-        vote_counts_dict = self.context.get("vote_counts", {})
-        return sum(vote_counts_dict.values())
+        return sum(self.context.get("vote_counts", {}).values())
 
     def get_user_vote(self, obj):
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return None
 
-        vote = obj.votes.filter(user=request.user).first()
-        return vote.option_id if vote else None
+        # List views prefetch only the viewer's own vote (see
+        # viewer_poll_vote_prefetch); fall back to a single lookup otherwise.
+        if hasattr(obj, "viewer_votes"):
+            return obj.viewer_votes[0].option_id if obj.viewer_votes else None
+        return (
+            obj.votes.filter(user=request.user)
+            .values_list("option_id", flat=True)
+            .first()
+        )
 
     def to_representation(self, instance):
         """
-        Optimize vote counting to avoid N+1 queries.
-        We count all votes for all options in one go.
+        Vote counts come from the per-option counters (or the snapshot taken
+        when the poll closed), so no vote rows are loaded or counted here.
         """
-        vote_counts = {
-            item["id"]: item["count"]
-            for item in instance.options.annotate(count=Count("votes")).values(
-                "id", "count"
-            )
-        }
+        self.context["vote_counts"] = instance.get_vote_counts()
+        return super().to_representation(instance)
+
+
+class PollTalliesSerializer(serializers.Serializer):
+    """
+    The lightweight response of a vote: just the numbers that changed,
+    instead of the whole re-serialized post.
+    """
+
+    poll_id = serializers.IntegerField(source="id")
+    post_id = serializers.IntegerField()
+    options = serializers.SerializerMethodField()
+    total_votes = serializers.SerializerMethodField()
+    user_vote = serializers.SerializerMethodField()
+    is_closed = serializers.BooleanField()
+
+    def get_options(self, obj):
+        return [
+            {"id": option_id, "vote_count": count}
+            for option_id, count in self.context["vote_counts"].items()
+        ]
 
-        self.context["vote_counts"] = vote_counts
+    def get_total_votes(self, obj):
+        return sum(self.context["vote_counts"].values())
+
+    def get_user_vote(self, obj):
+        return self.context.get("user_vote")
+
+    def to_representation(self, instance):
+        self.context["vote_counts"] = instance.get_vote_counts()
         return super().to_representation(instance)
 
 
@@ -577,6 +644,25 @@ class UserProfileSerializer(serializers.ModelSerializer):
         }
 
 
+class ProfileDocumentSerializer(UserProfileSerializer):
+    """
+    The part of a profile that is the same for every viewer, as cached by
+    community.profile_cache. The viewer-dependent fields are overlaid there.
+    """
+
+    email = None
+    phone_number = None
+    relationship_status = None
+
+    class Meta(UserProfileSerializer.Meta):
+        fields = [
+            field
+            for field in UserProfileSerializer.Meta.fields
+            if field not in ("email", "phone_number", "relationship_status")
+        ]
+        read_only_fields = fields
+
+
 # --- REPLACE your existing UserProfileUpdateSerializer with this one ---
 # --- REPLACE your existing UserProfileUpdateSerializer with this complete version ---
 
@@ -689,6 +775,10 @@ class StatusPostSerializer(serializers.ModelSerializer):
     videos = serializers.ListField(
         child=serializers.FileField(use_url=False), write_only=True, required=False
     )
+    # IDs of finished resumable uploads (see MediaUpload) to attach as media.
+    upload_ids = serializers.ListField(
+        child=serializers.UUIDField(), write_only=True, required=False
+    )
     media_to_delete = serializers.CharField(
         write_only=True, required=False, allow_blank=True
     )
@@ -722,9 +812,11 @@ class StatusPostSerializer(serializers.ModelSerializer):
             "object_id",
             "post_type",
             "comment_count",
+            "repost_count",
             "media",
             "images",
             "videos",
+            "upload_ids",
             "media_to_delete",
             "poll",
             "poll_data",
@@ -747,6 +839,7 @@ class StatusPostSerializer(serializers.ModelSerializer):
             "object_id",
             "post_type",
             "comment_count",
+            "repost_count",
             "media",
             "poll",
             "group",
@@ -784,6 +877,28 @@ class StatusPostSerializer(serializers.ModelSerializer):
                 "Invalid format. media_to_delete must be a JSON-formatted array of integers."
             )
 
+    def validate_upload_ids(self, value):
+        """
+        Resolves upload IDs to finished uploads owned by the requesting user.
+        """
+        if not value:
+            return []
+        request = self.context.get("request")
+        unique_ids = list(dict.fromkeys(value))
+        uploads = list(
+            MediaUpload.objects.filter(
+                id__in=unique_ids,
+                owner=request.user,
+                status=MediaUpload.STATUS_COMPLETE,
+            )
+        )
+        if len(uploads) != len(unique_ids):
+            raise serializers.ValidationError(
+                "One or more uploads do not exist, are not finished, or are already attached."
+            )
+        uploads_by_id = {upload.id: upload for upload in uploads}
+        return [uploads_by_id[upload_id] for upload_id in unique_ids]
+
     def validate_poll_data(self, value):
         if not value:
             return None
@@ -824,6 +939,18 @@ class StatusPostSerializer(serializers.ModelSerializer):
                     )
                 if any(not str(opt).strip() for opt in data["options"]):
                     raise serializers.ValidationError("Poll options cannot be empty.")
+            if data.get("duration_hours") is not None:
+                try:
+                    duration_hours = int(data["duration_hours"])
+                except (TypeError, ValueError):
+                    raise serializers.ValidationError(
+                        "duration_hours must be a whole number."
+                    )
+                if not 1 <= duration_hours <= Poll.MAX_DURATION_HOURS:
+                    raise serializers.ValidationError(
+                        f"duration_hours must be between 1 and {Poll.MAX_DURATION_HOURS}."
+                    )
+                data["duration_hours"] = duration_hours
             return data
         except json.JSONDecodeError:
             raise serializers.ValidationError("Invalid JSON format for poll data.")
@@ -835,6 +962,7 @@ class StatusPostSerializer(serializers.ModelSerializer):
         ).strip()
         new_images = data.get("images", [])
         new_videos = data.get("videos", [])
+        new_uploads = data.get("upload_ids", [])
         poll_data = data.get("poll_data")
 
         # --- THE FIX: Check if this post is a repost ---
@@ -850,7 +978,10 @@ class StatusPostSerializer(serializers.ModelSerializer):
                 id__in=media_to_delete_ids
             ).count()
             final_media_count = (
-                surviving_media_count + len(new_images) + len(new_videos)
+                surviving_media_count
+                + len(new_images)
+                + len(new_videos)
+                + len(new_uploads)
             )
             # Allow empty if it's a repost
             if (
@@ -868,6 +999,7 @@ class StatusPostSerializer(serializers.ModelSerializer):
                 not content
                 and not new_images
                 and not new_videos
+                and not new_uploads
                 and not poll_data
                 and not is_repost
             ):
@@ -881,6 +1013,7 @@ class StatusPostSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         images_data = validated_data.pop("images", [])
         videos_data = validated_data.pop("videos", [])
+        uploads = validated_data.pop("upload_ids", [])
         poll_data = validated_data.pop("poll_data", None)
         validated_data.pop("media_to_delete", None)
 
@@ -922,8 +1055,16 @@ class StatusPostSerializer(serializers.ModelSerializer):
             )
         if media_to_create:
             PostMedia.objects.bulk_create(media_to_create)
+        self._attach_uploads(post, uploads)
         if poll_data:
-            poll = Poll.objects.create(post=post, question=poll_data["question"])
+            closes_at = None
+            if poll_data.get("duration_hours"):
+                closes_at = timezone.now() + timedelta(
+                    hours=poll_data["duration_hours"]
+                )
+            poll = Poll.objects.create(
+                post=post, question=poll_data["question"], closes_at=closes_at
+            )
             poll_options_to_create = [
                 PollOption(poll=poll, text=option_text)
                 for option_text in poll_data["options"]
@@ -940,6 +1081,7 @@ class StatusPostSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         images_data = validated_data.pop("images", [])
         videos_data = validated_data.pop("videos", [])
+        uploads = validated_data.pop("upload_ids", [])
         media_to_delete_ids = validated_data.pop("media_to_delete", [])
         poll_data = validated_data.pop("poll_data", None)
         original_content = instance.content
@@ -957,6 +1099,7 @@ class StatusPostSerializer(serializers.ModelSerializer):
             )
         if media_to_create:
             PostMedia.objects.bulk_create(media_to_create)
+        self._attach_uploads(instance, uploads)
         if poll_data and hasattr(instance, "poll"):
             poll = instance.poll
             poll.question = poll_data.get("question", poll.question)
@@ -992,49 +1135,56 @@ class StatusPostSerializer(serializers.ModelSerializer):
             )
         return self.Meta.model.objects.get(pk=instance.pk)
 
+    def _attach_uploads(self, post, uploads):
+        try:
+            attach_uploads(post, uploads)
+        except UploadAlreadyAttached:
+            raise serializers.ValidationError(
+                {"upload_ids": "One or more uploads are already attached to a post."}
+            )
+
     def get_is_saved(self, obj):
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return False
-        return obj.saved_by.filter(user=request.user).exists()
+        # List views prefetch only the viewer's own save (see
+        # viewer_save_prefetch); fall back to a single lookup otherwise.
+        if hasattr(obj, "viewer_saves"):
+            return bool(obj.viewer_saves)
+        return SavedPost.objects.filter(profile_id=request.user.pk, post=obj).exists()
 
     def get_like_count(self, obj):
-        return obj.likes.count() if hasattr(obj, "likes") else 0
+        return obj.like_count
+
+    def get_viewer_reaction(self, obj):
+        """
+        The current user's reaction type on `obj`, or None. List views
+        prefetch it (see viewer_like_prefetch); otherwise it is one lookup.
+        """
+        request = self.context.get("request")
+        if not request or not request.user.is_authenticated:
+            return None
+        if hasattr(obj, "viewer_likes"):
+            return obj.viewer_likes[0].reaction_type if obj.viewer_likes else None
+        return viewer_reaction_type(request.user, obj)
 
     def get_is_liked_by_user(self, obj):
-        user = self.context.get("request").user
-        if user and user.is_authenticated:
-            content_type = ContentType.objects.get_for_model(obj)
-            return Like.objects.filter(
-                content_type=content_type, object_id=obj.pk, user=user
-            ).exists()
-        return False
+        return self.get_viewer_reaction(obj) is not None
 
     def get_user_reaction(self, obj):
         """
         Returns the specific type of reaction the current user has given
         (e.g., 'love', 'celebrate') or None if they haven't reacted.
         """
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            content_type = ContentType.objects.get_for_model(obj)
-            like = Like.objects.filter(
-                content_type=content_type, object_id=obj.pk, user=request.user
-            ).first()
-            if like:
-                return like.reaction_type
-        return None
+        return self.get_viewer_reaction(obj)
 
     def get_reaction_counts(self, obj):
         """
         Returns a dictionary showing how many of each emoji type exist.
         Example: {"like": 5, "love": 2}
         """
-        # We query the related 'likes', group them by type, and count them
-        counts = obj.likes.values("reaction_type").annotate(
-            count=Count("reaction_type")
-        )
-        return {item["reaction_type"]: item["count"] for item in counts}
+        # Stored on the post by community.reactions
+        return obj.reaction_counts
 
     def get_content_type_id(self, obj):
         return ContentType.objects.get_for_model(obj).id
@@ -1046,21 +1196,28 @@ class StatusPostSerializer(serializers.ModelSerializer):
         return obj.__class__.__name__.lower()
 
     def get_comment_count(self, obj):
-        if obj and obj.pk:
-            content_type = ContentType.objects.get_for_model(obj)
-            return Comment.objects.filter(
-                content_type=content_type, object_id=obj.pk
-            ).count()
-        return 0
+        # Stored on the post by the Comment signals
+        return getattr(obj, "comment_count", 0)
 
     def get_parent_post(self, obj):
         """
         If this post is a repost, we return the full data of the original post.
+        Each original is serialized once per response, however many reposts
+        of it are on the page (list views load them with parent_post_prefetch).
+
+        Only one level is nested: reposting a repost points at the root (see
+        create), so an original's own parent_post is always null, even for
+        older chains whose links parent_post_prefetch does not load.
         """
-        if obj.parent_post:
+        if obj.parent_post_id is None or self.context.get("nested_parent_post"):
+            return None
+        serialized = self.context.setdefault("serialized_parent_posts", {})
+        if obj.parent_post_id not in serialized:
             # We call the same serializer again to show the original author/content
-            return StatusPostSerializer(obj.parent_post, context=self.context).data
-        return None
+            serialized[obj.parent_post_id] = StatusPostSerializer(
+                obj.parent_post, context={**self.context, "nested_parent_post": True}
+            ).data
+        return serialized[obj.parent_post_id]
 
 
 # --- END OF REPLACEMENT FOR StatusPostSerializer ---
@@ -1118,7 +1275,7 @@ class FeedItemSerializer(serializers.Serializer):
 
     # CORRECT INDENTATION: This is now a method of the class
     def get_like_count(self, obj):
-        return obj.likes.count() if hasattr(obj, "likes") else 0
+        return getattr(obj, "like_count", 0)
 
     # CORRECT INDENTATION: This is now a method of the class
     def get_is_liked_by_user(self, obj):
@@ -1142,24 +1299,61 @@ class FeedItemSerializer(serializers.Serializer):
 
     # CORRECT INDENTATION: This is now a method of the class
     def get_comment_count(self, obj):
-        if obj and obj.pk:
-            content_type = ContentType.objects.get_for_model(obj)
-            return Comment.objects.filter(
-                content_type=content_type, object_id=obj.pk
-            ).count()
-        return 0
+        # Stored on the post by the Comment signals
+        return getattr(obj, "comment_count", 0)
 
 
 # In community/serializers.py
 
 
+def group_membership_statuses(user, groups):
+    """
+    The viewer's membership status for each group on a page, as
+    {group id: status}, in at most three queries for the whole page.
+    Precedence: blocked, creator, member, pending, none.
+    """
+    if not user.is_authenticated or not groups:
+        return {group.pk: "none" for group in groups}
+    group_ids = [group.pk for group in groups]
+    blocked = set(
+        GroupBlock.objects.filter(user=user, group_id__in=group_ids).values_list(
+            "group_id", flat=True
+        )
+    )
+    joined = set(
+        Group.members.through.objects.filter(
+            user_id=user.pk, group_id__in=group_ids
+        ).values_list("group_id", flat=True)
+    )
+    private_ids = [g.pk for g in groups if g.privacy_level == "private"]
+    pending = set(
+        GroupJoinRequest.objects.filter(
+            user=user, group_id__in=private_ids, status="pending"
+        ).values_list("group_id", flat=True)
+        if private_ids
+        else []
+    )
+
+    statuses = {}
+    for group in groups:
+        if group.pk in blocked:
+            statuses[group.pk] = "blocked"
+        elif group.creator_id == user.pk:
+            statuses[group.pk] = "creator"
+        elif group.pk in joined:
+            statuses[group.pk] = "member"
+        elif group.pk in pending:
+            statuses[group.pk] = "pending"
+        else:
+            statuses[group.pk] = "none"
+    return statuses
+
+
 class GroupSerializer(serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
-    member_count = serializers.IntegerField(source="members.count", read_only=True)
     membership_status = serializers.SerializerMethodField()
 
-    # --- CHANGE 1: 'members' is now a SerializerMethodField ---
-    members = serializers.SerializerMethodField()
+    # Members are listed by GroupMemberListView, a page at a time.
 
     class Meta:
         model = Group
@@ -1173,59 +1367,18 @@ class GroupSerializer(serializers.ModelSerializer):
             "membership_status",
             "created_at",
             "privacy_level",
-            "members",
         ]
         read_only_fields = ["creator", "member_count", "created_at"]
 
-    # NEW, FIXED METHOD
     def get_membership_status(self, obj):
+        # List views resolve the whole page at once (see GroupListView).
+        statuses = self.context.get("membership_statuses")
+        if statuses is not None and obj.pk in statuses:
+            return statuses[obj.pk]
         request = self.context.get("request")
-        if not request or not request.user.is_authenticated:
+        if not request:
             return "none"
-
-        user = request.user
-
-        # --- THIS IS THE FIX ---
-        # Check for a block record first. It's the highest priority status.
-        # The related_name on the Group model for GroupBlock is likely 'blocked_users_info' or similar.
-        # Let's use the explicit model query which is safer.
-        if GroupBlock.objects.filter(group=obj, user=user).exists():
-            return "blocked"
-        # --- END OF FIX ---
-
-        if obj.creator == user:
-            return "creator"
-
-        if obj.members.filter(pk=user.pk).exists():
-            return "member"
-
-        if (
-            obj.privacy_level == "private"
-            and obj.join_requests.filter(user=user, status="pending").exists()
-        ):
-            return "pending"
-
-        return "none"
-
-    # --- CHANGE 2: The new method that contains our security logic ---
-    def get_members(self, obj):
-        """
-        Conditionally returns the list of group members.
-        - For public groups, always returns the member list.
-        - For private groups, only returns the member list to other members/creator.
-        - For non-members of private groups, returns an empty list.
-        """
-        membership_status = self.get_membership_status(obj)
-
-        # Allow access if the group is public OR if the user is a member/creator
-        if obj.privacy_level == "public" or membership_status in ["creator", "member"]:
-            queryset = obj.members.all()
-            # We must pass the context down to the UserSerializer
-            # so it can correctly build absolute image URLs.
-            return UserSerializer(queryset, many=True, context=self.context).data
-
-        # For non-members of a private group, return a safe empty list
-        return []
+        return group_membership_statuses(request.user, [obj])[obj.pk]
 
 
 # =====================================================================================
@@ -1297,6 +1450,7 @@ class CommentSerializer(serializers.ModelSerializer):
             "like_count",
             "is_liked_by_user",
             "comment_content_type_id",
+            "reply_count",
         ]
         # FIXED: Only list the fields that SHOULD NOT be editable
         read_only_fields = [
@@ -1309,6 +1463,7 @@ class CommentSerializer(serializers.ModelSerializer):
             "like_count",
             "is_liked_by_user",
             "comment_content_type_id",
+            "reply_count",
         ]
 
     def create(self, validated_data):
@@ -1329,21 +1484,49 @@ class CommentSerializer(serializers.ModelSerializer):
         return comment
 
     def get_like_count(self, obj: Comment) -> int:
-        return obj.likes.count()
+        return obj.like_count
 
     def get_is_liked_by_user(self, obj: Comment) -> bool:
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return False
-        content_type = ContentType.objects.get_for_model(Comment)
-        return Like.objects.filter(
-            content_type=content_type, object_id=obj.pk, user=request.user
-        ).exists()
+        # List views look up the viewer's likes for the whole page at once
+        # (see liked_comment_ids); single comments fall back to a query.
+        if "liked_comment_ids" in self.context:
+            return obj.pk in self.context["liked_comment_ids"]
+        return viewer_reaction_type(request.user, obj) is not None
 
     def get_comment_content_type_id_for_like(self, obj: Comment) -> int:
         return ContentType.objects.get_for_model(Comment).id
 
 
+def liked_comment_ids(user, comments):
+    """The IDs among `comments` that `user` has liked, in one query."""
+    return reacted_ids(user, Comment, [comment.pk for comment in comments])
+
+
+class CommentThreadSerializer(CommentSerializer):
+    """
+    A top-level comment with a preview of its thread: the first replies in
+    depth-first order, and a cursor URL for the rest. The view loads the
+    previews for the whole page up front (see CommentThreadListView).
+    """
+
+    replies = serializers.SerializerMethodField()
+    more_replies = serializers.SerializerMethodField()
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ["replies", "more_replies"]
+        read_only_fields = fields
+
+    def get_replies(self, obj):
+        replies = self.context["reply_previews"].get(obj.pk, [])
+        return CommentSerializer(replies, many=True, context=self.context).data
+
+    def get_more_replies(self, obj):
+        return self.context["more_replies_urls"].get(obj.pk)
+
+
 class MessageSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
 
@@ -2,15 +2,28 @@
 # --- ADDED REAL-TIME POST DELETION SIGNAL (Corrected Model Name) ---
 
 import re
-from django.db.models.signals import post_save, post_delete # <--- ADD post_delete
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed # <--- ADD post_delete
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from .models import UserProfile, Follow, Like, StatusPost, Notification, Comment, GroupJoinRequest 
+from .models import UserProfile, Follow, Like, StatusPost, Notification, Comment, Group, GroupJoinRequest, PostMedia, MediaBlob, PollOption, PollVote
+from .models import Education, Experience, SkillCategory, Skill, SocialLink
 
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from .serializers import NotificationSerializer, LivePostSerializer
+from .live_polls import publish_poll_tallies
+from .visibility import invalidate_member_groups, invalidate_public_groups, is_public_post
+from .reactions import REACTION_TARGET_MODELS, apply_reaction_deltas, mirror_like, unmirror_like
+from .hashtags import count_hashtag_uses, sync_post_hashtags
+from .mentions import index_user
+from .authentication import INVALIDATING_FIELDS, forget_tokens, forget_user_tokens
+from .profile_cache import invalidate_profile_documents
+from .renderers import frame
+from rest_framework.authtoken.models import Token
 
 User = get_user_model()
 
@@ -26,10 +39,12 @@ def post_deleted_signal(sender, instance, **kwargs):
     Broadcasts a 'post_deleted' event to the author AND all of their followers,
     ensuring real-time UI consistency across all relevant clients.
     """
-    author = instance.author
-    if not author:
-        return
+    if instance.author_id:
+        broadcast_post_deleted(instance.id, instance.author_id)
+
 
+def broadcast_post_deleted(post_id, author_id):
+    """The 'post_deleted' push, for deletes that bypass the signal (moderation)."""
     channel_layer = get_channel_layer()
     
     # --- FIX #1: The payload is now correctly nested ---
@@ -37,27 +52,29 @@ def post_deleted_signal(sender, instance, **kwargs):
     message_to_send = {
         'type': 'post_deleted',
         'payload': {
-            'post_id': instance.id
+            'post_id': post_id
         }
     }
 
     # --- FIX #2: We find all relevant users (author + followers) ---
-    follower_ids = Follow.objects.filter(following=author).values_list('follower_id', flat=True)
-    recipient_user_ids = list(follower_ids) + [author.id]
+    follower_ids = Follow.objects.filter(following_id=author_id).values_list('follower_id', flat=True)
+    recipient_user_ids = list(follower_ids) + [author_id]
 
     # --- FIX #3: We broadcast to each user's personal group ---
     # We will use the 'send_live_post' handler type for consistency,
     # as this is a "live" update related to a post.
+    # Encoded once here; each recipient's consumer forwards the text.
+    text = frame(message_to_send)
     for user_id in recipient_user_ids:
         async_to_sync(channel_layer.group_send)(
             f"user_{user_id}",
             {
                 'type': 'send_live_post', # Re-using the existing, correct handler type
-                'message': message_to_send
+                'text': text
             }
         )
     
-    print(f"!!! REAL-TIME (Post Deleted): Sent post_deleted signal for ID {instance.id} to {len(recipient_user_ids)} users !!!")
+    print(f"!!! REAL-TIME (Post Deleted): Sent post_deleted signal for ID {post_id} to {len(recipient_user_ids)} users !!!")
 # =================================================================================
 
 
@@ -72,10 +89,10 @@ def send_new_notification_signal(sender, instance, created, **kwargs):
         group_name = f'user_{instance.recipient.id}'
         message_data = {
             'type': 'send_notification',
-            'message': {
+            'text': frame({
                 'type': 'new_notification',
                 'payload': serializer.data
-            }
+            })
         }
         async_to_sync(channel_layer.group_send)(group_name, message_data)
         print(f"!!! REAL-TIME (Notification Created): Sent '{instance.notification_type}' to group {group_name} !!!")
@@ -92,6 +109,10 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=Like, dispatch_uid="create_like_notification_signal")
 def create_like_notification(sender, instance, created, **kwargs):
     if not created: return
+    notify_about_like(instance)
+
+# Also called directly by community.reactions, whose SQL writes skip post_save.
+def notify_about_like(instance):
     liked_object, liker, post_target = instance.content_object, instance.user, instance.parent_post
     if isinstance(liked_object, StatusPost):
         recipient, verb, notification_target = liked_object.author, "liked your post", liked_object
@@ -212,12 +233,295 @@ def send_live_post_to_followers(sender, instance, created, **kwargs):
     if not followers: return
     serializer = LivePostSerializer(instance)
     channel_layer = get_channel_layer()
+    # Encoded once for every follower rather than once per socket.
     message_data = {
         'type': 'send_live_post',
-        'message': {'type': 'new_post', 'payload': serializer.data}
+        'text': frame({'type': 'new_post', 'payload': serializer.data})
     }
     for follow_relation in followers:
         follower = follow_relation.follower
         group_name = f'user_{follower.id}'
         async_to_sync(channel_layer.group_send)(group_name, message_data)
-        print(f"!!! REAL-TIME (New Post): Sent post ID {instance.id} to group {group_name} for user {follower.username} !!!")
\ No newline at end of file
+        print(f"!!! REAL-TIME (New Post): Sent post ID {instance.id} to group {group_name} for user {follower.username} !!!")
+
+# --- MEDIA BLOB REFERENCES ---
+# Deleting a row that uses a content-addressed blob drops its reference.
+# The file itself is removed later by `prune_media_blobs`.
+@receiver(post_delete, sender=PostMedia, dispatch_uid="release_post_media_blob_signal")
+def release_post_media_blob(sender, instance, **kwargs):
+    MediaBlob.objects.release(instance.blob_id)
+
+
+@receiver(post_delete, sender=UserProfile, dispatch_uid="release_profile_picture_blob_signal")
+def release_profile_picture_blob(sender, instance, **kwargs):
+    MediaBlob.objects.release(instance.picture_blob_id)
+
+
+# --- POLL VOTE COUNTERS ---
+# Each PollVote insert/delete moves its option's counter in the same
+# transaction, using F() so concurrent votes never lose an update.
+@receiver(post_save, sender=PollVote, dispatch_uid="increment_poll_option_count_signal")
+def increment_poll_option_count(sender, instance, created, **kwargs):
+    if not created: return
+    PollOption.objects.filter(pk=instance.option_id).update(vote_count=F('vote_count') + 1)
+
+
+@receiver(post_delete, sender=PollVote, dispatch_uid="decrement_poll_option_count_signal")
+def decrement_poll_option_count(sender, instance, **kwargs):
+    PollOption.objects.filter(pk=instance.option_id, vote_count__gt=0).update(vote_count=F('vote_count') - 1)
+
+
+# --- LIVE POLL TALLIES ---
+# Subscribers of the poll get the new counts once the vote has committed.
+# live_polls coalesces bursts, so this is cheap to call on every vote.
+@receiver(post_save, sender=PollVote, dispatch_uid="live_poll_tallies_on_vote_signal")
+@receiver(post_delete, sender=PollVote, dispatch_uid="live_poll_tallies_on_unvote_signal")
+def push_live_poll_tallies(sender, instance, **kwargs):
+    poll_id = instance.poll_id
+    transaction.on_commit(lambda: publish_poll_tallies(poll_id))
+
+
+# --- REACTION COUNTERS ---
+# ORM writes to Like (bots, admin, tests) move the stored counters here.
+# The API's toggle writes Like with SQL and updates the counters itself.
+@receiver(pre_save, sender=Like, dispatch_uid="remember_previous_reaction_signal")
+def remember_previous_reaction(sender, instance, **kwargs):
+    instance._previous_reaction_type = None
+    if not instance._state.adding:
+        instance._previous_reaction_type = Like.objects.filter(pk=instance.pk).values_list('reaction_type', flat=True).first()
+
+
+def move_reaction_counters(like, like_delta, reaction_deltas):
+    model = like.content_type.model_class()
+    if model in REACTION_TARGET_MODELS:
+        apply_reaction_deltas(model, like.object_id, like_delta, reaction_deltas)
+
+
+@receiver(post_save, sender=Like, dispatch_uid="count_reaction_on_save_signal")
+def count_reaction_on_save(sender, instance, created, **kwargs):
+    if created:
+        move_reaction_counters(instance, 1, {instance.reaction_type: 1})
+        return
+    previous = getattr(instance, '_previous_reaction_type', None)
+    if previous and previous != instance.reaction_type:
+        move_reaction_counters(instance, 0, {previous: -1, instance.reaction_type: 1})
+
+
+@receiver(post_delete, sender=Like, dispatch_uid="uncount_reaction_on_delete_signal")
+def uncount_reaction_on_delete(sender, instance, **kwargs):
+    move_reaction_counters(instance, -1, {instance.reaction_type: -1})
+
+
+# --- TYPED REACTION TABLES ---
+# ORM writes to Like are mirrored into PostReaction/CommentReaction. The SQL
+# paths in community.reactions write both tables themselves.
+@receiver(post_save, sender=Like, dispatch_uid="mirror_like_on_save_signal")
+def mirror_like_on_save(sender, instance, **kwargs):
+    mirror_like(instance)
+
+
+@receiver(post_delete, sender=Like, dispatch_uid="unmirror_like_on_delete_signal")
+def unmirror_like_on_delete(sender, instance, **kwargs):
+    unmirror_like(instance)
+
+
+# --- GROUP MEMBER COUNTERS ---
+# Group.member_count follows every change to Group.members, from either side
+# of the relation. Django only reports rows it actually added or removed.
+@receiver(m2m_changed, sender=Group.members.through, dispatch_uid="count_group_members_signal")
+def count_group_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove') and pk_set:
+        delta = 1 if action == 'post_add' else -1
+        if reverse:
+            # user.joined_groups.add(*groups): one membership per group.
+            Group.objects.filter(pk__in=pk_set).update(member_count=Greatest(F('member_count') + delta, 0))
+        else:
+            Group.objects.filter(pk=instance.pk).update(member_count=Greatest(F('member_count') + delta * len(pk_set), 0))
+    elif action == 'pre_clear' and reverse:
+        # The cleared groups are unknown after the fact.
+        Group.objects.filter(members=instance).update(member_count=Greatest(F('member_count') - 1, 0))
+    elif action == 'post_clear' and not reverse:
+        Group.objects.filter(pk=instance.pk).update(member_count=0)
+
+
+# --- GROUP VISIBILITY SETS ---
+# Drop the cached sets community.visibility builds feeds from. They are
+# dropped again on commit, in case a concurrent request re-cached the old
+# rows in between.
+def drop_cached(invalidate, *args):
+    invalidate(*args)
+    transaction.on_commit(lambda: invalidate(*args))
+
+
+@receiver(m2m_changed, sender=Group.members.through, dispatch_uid="invalidate_member_groups_signal")
+def invalidate_member_groups_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action in ('post_add', 'post_remove', 'pre_clear'):
+        drop_cached(invalidate_member_groups, instance.pk)
+    elif action in ('post_add', 'post_remove') and pk_set:
+        drop_cached(invalidate_member_groups, *pk_set)
+    elif action == 'pre_clear':
+        drop_cached(invalidate_member_groups, *instance.members.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Group, dispatch_uid="invalidate_public_groups_on_save_signal")
+@receiver(post_delete, sender=Group, dispatch_uid="invalidate_public_groups_on_delete_signal")
+def invalidate_public_groups_on_change(sender, **kwargs):
+    drop_cached(invalidate_public_groups)
+
+
+# Deleting a user removes their memberships without m2m_changed.
+@receiver(pre_delete, sender=User, dispatch_uid="uncount_deleted_user_memberships_signal")
+def uncount_deleted_user_memberships(sender, instance, **kwargs):
+    Group.objects.filter(members=instance).update(member_count=Greatest(F('member_count') - 1, 0))
+
+
+# --- COMMENT COUNTERS ---
+# Keep Comment.reply_count and StatusPost.comment_count in step, so threads
+# and feeds never have to COUNT comments.
+def move_comment_counters(comment, delta):
+    if comment.parent_id:
+        Comment.objects.filter(pk=comment.parent_id).update(reply_count=Greatest(F('reply_count') + delta, 0))
+    if comment.content_type_id == ContentType.objects.get_for_model(StatusPost).id:
+        StatusPost.objects.filter(pk=comment.object_id).update(comment_count=Greatest(F('comment_count') + delta, 0))
+
+
+@receiver(post_save, sender=Comment, dispatch_uid="count_comment_on_save_signal")
+def count_comment_on_save(sender, instance, created, **kwargs):
+    if created:
+        move_comment_counters(instance, 1)
+
+
+@receiver(post_delete, sender=Comment, dispatch_uid="uncount_comment_on_delete_signal")
+def uncount_comment_on_delete(sender, instance, **kwargs):
+    move_comment_counters(instance, -1)
+
+
+# --- REPOST COUNTERS ---
+# Keep StatusPost.repost_count in step, so no one has to COUNT reposts.
+@receiver(post_save, sender=StatusPost, dispatch_uid="count_repost_on_save_signal")
+def count_repost_on_save(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.parent_post_id:
+        StatusPost.objects.filter(pk=instance.parent_post_id).update(repost_count=F('repost_count') + 1)
+
+
+@receiver(post_delete, sender=StatusPost, dispatch_uid="uncount_repost_on_delete_signal")
+def uncount_repost_on_delete(sender, instance, **kwargs):
+    if instance.parent_post_id:
+        StatusPost.objects.filter(pk=instance.parent_post_id).update(repost_count=Greatest(F('repost_count') - 1, 0))
+
+
+# --- HASHTAGS ---
+# A post's tags are indexed as it is saved, and count towards trending once
+# it has committed, if everyone may see the post: trending is shown to all.
+@receiver(post_save, sender=StatusPost, dispatch_uid="index_post_hashtags_signal")
+def index_post_hashtags(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and "content" not in update_fields):
+        return
+    added = sync_post_hashtags(instance, created=created)
+    if added and is_public_post(instance):
+        transaction.on_commit(lambda: count_hashtag_uses(added))
+
+
+# --- MENTION INDEX ---
+# Keeps the @mention typeahead in step with the names users can be found by.
+MENTION_USER_FIELDS = {"username", "first_name", "last_name", "is_active"}
+
+
+@receiver(post_save, sender=User, dispatch_uid="index_user_mentions_on_save_signal")
+def index_user_mentions_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not MENTION_USER_FIELDS & set(update_fields)):
+        return
+    transaction.on_commit(lambda: index_user(instance.pk))
+
+
+@receiver(post_save, sender=UserProfile, dispatch_uid="index_profile_mentions_on_save_signal")
+def index_profile_mentions_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created or (update_fields is not None and "display_name" not in update_fields):
+        return
+    transaction.on_commit(lambda: index_user(instance.user_id))
+
+
+@receiver(post_delete, sender=User, dispatch_uid="unindex_user_mentions_on_delete_signal")
+def unindex_user_mentions_on_delete(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: index_user(user_id))
+
+
+# --- TOKEN AUTH CACHE ---
+# Drop cached token lookups (see community.authentication) on logout, and
+# when a password, the active flag or the cached identity fields change.
+@receiver(post_delete, sender=Token, dispatch_uid="forget_deleted_token_signal")
+def forget_deleted_token(sender, instance, **kwargs):
+    forget_tokens([instance.key])
+
+
+@receiver(post_save, sender=User, dispatch_uid="forget_changed_user_tokens_signal")
+def forget_changed_user_tokens(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw or (update_fields is not None and not INVALIDATING_FIELDS & set(update_fields)):
+        return
+    forget_user_tokens(instance.pk)
+
+
+# --- PROFILE DOCUMENTS ---
+# Retire a user's cached profile page (see community.profile_cache) whenever
+# anything shown on it changes, whichever view or admin made the change.
+PROFILE_USER_FIELDS = {"username", "first_name", "last_name", "email"}
+
+
+@receiver(post_save, sender=UserProfile, dispatch_uid="invalidate_profile_document_on_save_signal")
+def invalidate_profile_document_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_profile_documents(instance.user_id)
+
+
+@receiver(post_save, sender=User, dispatch_uid="invalidate_profile_document_on_user_save_signal")
+def invalidate_profile_document_on_user_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw or (update_fields is not None and not PROFILE_USER_FIELDS & set(update_fields)):
+        return
+    invalidate_profile_documents(instance.pk)
+
+
+@receiver(post_save, sender=Education, dispatch_uid="invalidate_profile_document_on_education_save_signal")
+@receiver(post_delete, sender=Education, dispatch_uid="invalidate_profile_document_on_education_delete_signal")
+@receiver(post_save, sender=Experience, dispatch_uid="invalidate_profile_document_on_experience_save_signal")
+@receiver(post_delete, sender=Experience, dispatch_uid="invalidate_profile_document_on_experience_delete_signal")
+@receiver(post_save, sender=SkillCategory, dispatch_uid="invalidate_profile_document_on_category_save_signal")
+@receiver(post_delete, sender=SkillCategory, dispatch_uid="invalidate_profile_document_on_category_delete_signal")
+def invalidate_profile_document_on_section_change(sender, instance, raw=False, **kwargs):
+    # The profile's primary key is its user's.
+    if not raw:
+        invalidate_profile_documents(instance.user_profile_id)
+
+
+@receiver(post_save, sender=Skill, dispatch_uid="invalidate_profile_document_on_skill_save_signal")
+@receiver(post_delete, sender=Skill, dispatch_uid="invalidate_profile_document_on_skill_delete_signal")
+def invalidate_profile_document_on_skill_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    profile_ids = SkillCategory.objects.filter(pk=instance.category_id).values_list(
+        "user_profile_id", flat=True
+    )
+    invalidate_profile_documents(*profile_ids)
+
+
+@receiver(post_save, sender=SocialLink, dispatch_uid="invalidate_profile_document_on_link_save_signal")
+@receiver(post_delete, sender=SocialLink, dispatch_uid="invalidate_profile_document_on_link_delete_signal")
+def invalidate_profile_document_on_link_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_profile_documents(instance.profile_id)
+
+
+@receiver(post_save, sender=Follow, dispatch_uid="invalidate_profile_documents_on_follow_signal")
+@receiver(post_delete, sender=Follow, dispatch_uid="invalidate_profile_documents_on_unfollow_signal")
+def invalidate_profile_documents_on_follow_change(sender, instance, raw=False, **kwargs):
+    # Both sides' follower, following and connection counts move.
+    if not raw:
+        invalidate_profile_documents(instance.follower_id, instance.following_id)
+
+
+@receiver(post_save, sender=StatusPost, dispatch_uid="invalidate_profile_document_on_post_signal")
+@receiver(post_delete, sender=StatusPost, dispatch_uid="invalidate_profile_document_on_unpost_signal")
+def invalidate_profile_document_on_post_change(sender, instance, raw=False, created=True, **kwargs):
+    # Only the post count is on the profile, so edits don't matter.
+    if created and not raw:
+        invalidate_profile_documents(instance.author_id)
@@ -0,0 +1,576 @@
+# community/soak.py
+"""
+A soak test for the activity socket (ws/activity/) and the channel layer
+behind it, run against a real ASGI server and Redis.
+
+It opens one authenticated socket per test user, then drives posts, likes,
+comments and follows through the HTTP API at the given rates. Each action
+expects a push to particular sockets:
+
+    post     "new_post" to the author's connected followers
+    like     a "like" notification to the post's author
+    comment  a "comment" notification to the post's author
+    follow   a "follow" notification to the followed user
+
+and every push is matched against those expectations, giving end-to-end
+latency (from sending the API request to receiving the push) and counts of
+dropped and duplicated events. The server's memory per socket and the
+channel layer's queue depth are sampled meanwhile.
+
+Nothing here imports Django, so the module also runs on its own, e.g. from
+a different machine than the server:
+
+    python community/soak.py --users-file soak_users.json --duration 60
+
+`manage.py soak_activity` prepares the users, their tokens and follow graph,
+writes that file if asked, and runs the same test.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import struct
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+ACTIONS = ("post", "like", "comment", "follow")
+
+
+class WebSocketClosed(Exception):
+    pass
+
+
+class WebSocket:
+    """A minimal RFC 6455 client: text frames, pings and closing."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url, timeout=30):
+        parts = urlsplit(url)
+        secure = parts.scheme == "wss"
+        port = parts.port or (443 if secure else 80)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, port, ssl=secure or None),
+            timeout,
+        )
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write(
+            (
+                f"GET {path} HTTP/1.1\r\n"
+                f"Host: {parts.netloc}\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Key: {key}\r\n"
+                "Sec-WebSocket-Version: 13\r\n\r\n"
+            ).encode()
+        )
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        headers = {
+            name.strip().lower(): value.strip()
+            for name, _, value in (line.partition(":") for line in header_lines if line)
+        }
+        accept = base64.b64encode(
+            hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()
+        ).decode()
+        if (
+            " 101 " not in f"{status_line} "
+            or headers.get("sec-websocket-accept") != accept
+        ):
+            writer.close()
+            raise WebSocketClosed(f"Handshake refused: {status_line}")
+        return cls(reader, writer)
+
+    async def _send_frame(self, opcode, payload):
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 1 << 16:
+            header += bytes([0x80 | 126]) + struct.pack("!H", length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack("!Q", length)
+        # Clients must mask what they send.
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.writer.write(header + mask + masked)
+        await self.writer.drain()
+
+    async def send(self, text):
+        await self._send_frame(0x1, text.encode())
+
+    async def recv(self):
+        """The next text message; raises WebSocketClosed once closed."""
+        message = b""
+        while True:
+            try:
+                first, second = await self.reader.readexactly(2)
+                length = second & 0x7F
+                if length == 126:
+                    (length,) = struct.unpack("!H", await self.reader.readexactly(2))
+                elif length == 127:
+                    (length,) = struct.unpack("!Q", await self.reader.readexactly(8))
+                payload = await self.reader.readexactly(length)
+            except (asyncio.IncompleteReadError, ConnectionError) as exc:
+                raise WebSocketClosed(str(exc))
+            opcode = first & 0x0F
+            if opcode == 0x8:
+                raise WebSocketClosed("Closed by the server")
+            if opcode == 0x9:
+                await self._send_frame(0xA, payload)
+                continue
+            if opcode in (0x0, 0x1, 0x2):
+                message += payload
+                if first & 0x80:
+                    return message.decode()
+
+    async def close(self):
+        try:
+            await self._send_frame(0x8, struct.pack("!H", 1000))
+        except ConnectionError:
+            pass
+        self.writer.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 2)
+
+
+def server_rss(pid):
+    """The resident memory of process `pid` in bytes, or None if unknown."""
+    if not pid:
+        return None
+    try:
+        import psutil
+    except ImportError:
+        try:
+            with open(f"/proc/{pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            return None
+        return None
+    try:
+        return psutil.Process(pid).memory_info().rss
+    except psutil.Error:
+        return None
+
+
+class Soak:
+    def __init__(
+        self,
+        users,
+        follows,
+        post_content_type_id,
+        base_url,
+        ws_url,
+        rates,
+        duration,
+        drain=5.0,
+        server_pid=None,
+        redis_url=None,
+        channel_prefix="asgi",
+        seed=0,
+        log=print,
+    ):
+        self.users = users
+        self.followers = defaultdict(set)
+        for follower, following in follows:
+            self.followers[following].add(follower)
+        self.post_content_type_id = post_content_type_id
+        self.base_url = base_url.rstrip("/")
+        self.ws_url = ws_url.rstrip("/")
+        self.rates = rates
+        self.duration = duration
+        self.drain = drain
+        self.server_pid = server_pid
+        self.redis_url = redis_url
+        self.channel_prefix = channel_prefix
+        self.rng = random.Random(seed)
+        self.log = log
+
+        self.sockets = {}
+        self.posts = []  # (post id, author id)
+        self.liked = set()
+        # Expected pushes: key -> (sent at, {recipient id: received count}).
+        self.expected = {}
+        # Pushes that beat their API response: key -> [(recipient, time)].
+        self.early = defaultdict(list)
+        self.latencies = defaultdict(list)
+        self.unexpected = 0
+        self.actions = Counter()
+        self.errors = Counter()
+        self.disconnects = 0
+        self.queue_depths = []
+
+    # --- Sockets ---
+
+    async def open_sockets(self):
+        async def open_one(user):
+            url = f"{self.ws_url}/ws/activity/?token={user['token']}"
+            try:
+                self.sockets[user["id"]] = await WebSocket.connect(url)
+            except (OSError, asyncio.TimeoutError, WebSocketClosed):
+                self.errors["connect"] += 1
+
+        # In waves, so the server's accept queue isn't the thing measured.
+        for start in range(0, len(self.users), 100):
+            await asyncio.gather(*map(open_one, self.users[start : start + 100]))
+
+    async def listen(self, user_id, socket):
+        while True:
+            try:
+                message = json.loads(await socket.recv())
+            except WebSocketClosed:
+                if not self.closing:
+                    self.disconnects += 1
+                self.sockets.pop(user_id, None)
+                return
+            except ValueError:
+                continue
+            key = self.event_key(message, user_id)
+            if key is not None:
+                self.received(key, user_id, time.perf_counter())
+
+    @staticmethod
+    def event_key(message, user_id):
+        payload = message.get("payload") or {}
+        if message.get("type") == "new_post":
+            return ("post", payload.get("id"))
+        if message.get("type") != "new_notification":
+            return None
+        kind = payload.get("notification_type")
+        actor = (payload.get("actor") or {}).get("id")
+        if kind == "like":
+            return ("like", actor, (payload.get("target") or {}).get("id"))
+        if kind == "comment":
+            return ("comment", (payload.get("action_object") or {}).get("id"))
+        if kind == "follow":
+            return ("follow", actor, user_id)
+        return None
+
+    def received(self, key, user_id, at):
+        if key not in self.expected:
+            self.early[key].append((user_id, at))
+            return
+        sent_at, recipients = self.expected[key]
+        if user_id not in recipients:
+            self.unexpected += 1
+            return
+        recipients[user_id] += 1
+        if recipients[user_id] == 1:
+            self.latencies[key[0]].append((at - sent_at) * 1000)
+
+    def expect(self, key, sent_at, recipients):
+        self.expected[key] = (
+            sent_at,
+            {user_id: 0 for user_id in recipients if user_id in self.sockets},
+        )
+        for user_id, at in self.early.pop(key, ()):
+            self.received(key, user_id, at)
+
+    # --- Traffic ---
+
+    async def api(self, method, path, user, body=None):
+        def request():
+            req = urllib.request.Request(
+                self.base_url + path,
+                data=json.dumps(body).encode() if body is not None else None,
+                method=method,
+                headers={
+                    "Authorization": f"Token {user['token']}",
+                    "Content-Type": "application/json",
+                },
+            )
+            with urllib.request.urlopen(req, timeout=30) as response:
+                return json.loads(response.read() or b"null")
+
+        return await asyncio.to_thread(request)
+
+    async def act(self, action):
+        user = self.rng.choice(self.users)
+        sent_at = time.perf_counter()
+        try:
+            if action == "post":
+                post = await self.api(
+                    "POST", "/api/posts/", user, {"content": "Soak test"}
+                )
+                self.posts.append((post["id"], user["id"]))
+                self.expect(("post", post["id"]), sent_at, self.followers[user["id"]])
+            elif action in ("like", "comment"):
+                if not self.posts:
+                    return
+                post_id, author_id = self.rng.choice(self.posts)
+                if author_id == user["id"]:
+                    return
+                if action == "like":
+                    if (user["id"], post_id) in self.liked:
+                        return  # A second like would take the first back.
+                    self.liked.add((user["id"], post_id))
+                    await self.api(
+                        "POST",
+                        f"/api/content/{self.post_content_type_id}/{post_id}/like/",
+                        user,
+                        {"reaction_type": "like"},
+                    )
+                    self.expect(("like", user["id"], post_id), sent_at, [author_id])
+                else:
+                    comment = await self.api(
+                        "POST",
+                        f"/api/comments/statuspost/{post_id}/",
+                        user,
+                        {"content": "Soak test"},
+                    )
+                    self.expect(("comment", comment["id"]), sent_at, [author_id])
+            elif action == "follow":
+                target = self.rng.choice(self.users)
+                if target is user or user["id"] in self.followers[target["id"]]:
+                    return
+                self.followers[target["id"]].add(user["id"])
+                result = await self.api(
+                    "POST", f"/api/users/{target['username']}/follow/", user
+                )
+                if "status" not in result:
+                    return  # Already following (the users file is stale): no push.
+                self.expect(
+                    ("follow", user["id"], target["id"]), sent_at, [target["id"]]
+                )
+                if result["status"] == "connected":
+                    self.followers[user["id"]].add(target["id"])
+        except (OSError, ValueError, KeyError, urllib.error.HTTPError):
+            self.errors[action] += 1
+            return
+        self.actions[action] += 1
+
+    async def drive(self, action, rate, deadline, tasks):
+        # Poisson arrivals, each action its own task so slow responses don't
+        # lower the rate.
+        while True:
+            await asyncio.sleep(self.rng.expovariate(rate))
+            if time.monotonic() >= deadline:
+                return
+            tasks.add(asyncio.create_task(self.act(action)))
+
+    async def sample_queues(self):
+        """Samples the messages waiting in channel layer queues, every second."""
+        import redis.asyncio as redis
+
+        client = redis.from_url(self.redis_url)
+        group_prefix = f"{self.channel_prefix}:group:".encode()
+        try:
+            while True:
+                depth = 0
+                async for key in client.scan_iter(
+                    f"{self.channel_prefix}*", count=1000
+                ):
+                    if not key.startswith(group_prefix):
+                        depth += await client.zcard(key)
+                self.queue_depths.append(depth)
+                await asyncio.sleep(1)
+        finally:
+            await client.aclose()
+
+    # --- Run ---
+
+    async def run(self):
+        self.closing = False
+        rss_before = server_rss(self.server_pid)
+        self.log(f"Opening {len(self.users)} sockets...")
+        await self.open_sockets()
+        rss_after = server_rss(self.server_pid)
+        connected = len(self.sockets)
+        listeners = [
+            asyncio.create_task(self.listen(user_id, socket))
+            for user_id, socket in list(self.sockets.items())
+        ]
+        sampler = asyncio.create_task(self.sample_queues()) if self.redis_url else None
+
+        self.log(f"{connected} connected; driving traffic for {self.duration}s...")
+        started = time.monotonic()
+        deadline = started + self.duration
+        tasks = set()
+        await asyncio.gather(
+            *(
+                self.drive(action, rate, deadline, tasks)
+                for action, rate in self.rates.items()
+                if rate > 0
+            )
+        )
+        if tasks:
+            await asyncio.wait(tasks)
+        # Give the last pushes time to arrive.
+        await asyncio.sleep(self.drain)
+        seconds = time.monotonic() - started
+
+        self.closing = True
+        if sampler:
+            sampler.cancel()
+        for listener in listeners:
+            listener.cancel()
+        await asyncio.gather(*(socket.close() for socket in self.sockets.values()))
+        return self.report(connected, rss_before, rss_after, seconds)
+
+    def report(self, connected, rss_before, rss_after, seconds):
+        pushes = {}
+        for kind in ACTIONS:
+            counts = [
+                count
+                for key, (_, recipients) in self.expected.items()
+                if key[0] == kind
+                for count in recipients.values()
+            ]
+            latencies = self.latencies[kind]
+            pushes[kind] = {
+                "actions": self.actions[kind],
+                "errors": self.errors[kind],
+                "expected": len(counts),
+                "delivered": sum(1 for count in counts if count),
+                "dropped": sum(1 for count in counts if not count),
+                "duplicated": sum(count - 1 for count in counts if count > 1),
+                "p50_ms": percentile(latencies, 0.50),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+                "max_ms": round(max(latencies), 2) if latencies else None,
+            }
+        per_socket = None
+        if rss_before is not None and rss_after is not None and connected:
+            per_socket = round((rss_after - rss_before) / connected)
+        depths = self.queue_depths
+        return {
+            "sockets": len(self.users),
+            "connected": connected,
+            "connect_errors": self.errors["connect"],
+            "disconnected": self.disconnects,
+            "seconds": round(seconds, 1),
+            "rates": self.rates,
+            "pushes": pushes,
+            "unexpected_pushes": self.unexpected
+            + sum(len(early) for early in self.early.values()),
+            "server_memory": {
+                "before_bytes": rss_before,
+                "after_bytes": rss_after,
+                "per_socket_bytes": per_socket,
+            },
+            "channel_queue_depth": {
+                "peak": max(depths, default=None),
+                "mean": round(sum(depths) / len(depths), 1) if depths else None,
+            },
+        }
+
+
+def format_report(report):
+    lines = [
+        f"{report['connected']}/{report['sockets']} sockets connected "
+        f"({report['connect_errors']} failed, {report['disconnected']} dropped "
+        f"during the run), {report['seconds']}s"
+    ]
+    for kind, stats in report["pushes"].items():
+        lines.append(
+            f"  {kind:<8} {stats['actions']:>6} sent {stats['errors']:>4} failed  "
+            f"pushes {stats['delivered']}/{stats['expected']} "
+            f"({stats['dropped']} dropped, {stats['duplicated']} duplicated)  "
+            f"p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms"
+        )
+    lines.append(f"  Unexpected pushes: {report['unexpected_pushes']}")
+    memory = report["server_memory"]
+    if memory["per_socket_bytes"] is not None:
+        lines.append(
+            f"  Server memory: {memory['before_bytes']} -> {memory['after_bytes']} "
+            f"bytes, {memory['per_socket_bytes']} per socket"
+        )
+    depth = report["channel_queue_depth"]
+    if depth["peak"] is not None:
+        lines.append(
+            f"  Channel queue depth: peak {depth['peak']}, mean {depth['mean']}"
+        )
+    return "\n".join(lines)
+
+
+def add_arguments(parser):
+    """The options shared by this script and `manage.py soak_activity`."""
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--ws-url", help="Default: --base-url with ws:// or wss://.")
+    parser.add_argument("--duration", type=float, default=60.0)
+    for action, rate in (
+        ("post", 1.0),
+        ("like", 5.0),
+        ("comment", 2.0),
+        ("follow", 1.0),
+    ):
+        parser.add_argument(
+            f"--{action}s-per-second", type=float, default=rate, dest=f"{action}_rate"
+        )
+    parser.add_argument(
+        "--drain", type=float, default=5.0, help="Seconds to wait for late pushes."
+    )
+    parser.add_argument(
+        "--server-pid", type=int, help="ASGI server process, to measure its memory."
+    )
+    parser.add_argument(
+        "--redis-url", help="The channel layer's Redis, to sample its queue depth."
+    )
+    parser.add_argument("--channel-prefix", default="asgi")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+
+
+def run_soak(users, follows, post_content_type_id, options, log=print):
+    base_url = options["base_url"]
+    ws_url = options["ws_url"] or base_url.replace("http", "ws", 1)
+    soak = Soak(
+        users,
+        follows,
+        post_content_type_id,
+        base_url=base_url,
+        ws_url=ws_url,
+        rates={action: options[f"{action}_rate"] for action in ACTIONS},
+        duration=options["duration"],
+        drain=options["drain"],
+        server_pid=options["server_pid"],
+        redis_url=options["redis_url"],
+        channel_prefix=options["channel_prefix"],
+        seed=options["seed"],
+        log=log,
+    )
+    report = asyncio.run(soak.run())
+    if options["output"]:
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--users-file",
+        required=True,
+        help="Written by `manage.py soak_activity --users-file ... --setup-only`.",
+    )
+    add_arguments(parser)
+    options = vars(parser.parse_args(argv))
+    with open(options["users_file"]) as users_file:
+        setup = json.load(users_file)
+    report = run_soak(
+        setup["users"], setup["follows"], setup["post_content_type_id"], options
+    )
+    print(json.dumps(report, indent=2) if options["json"] else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# community/storage.py
+"""
+Content-addressed storage for user media.
+
+Every file is stored once, under the SHA-256 digest of its bytes:
+
+    blobs/3f/a2/3fa2...e9.jpg
+
+Uploading the same image a thousand times (as the seed and bot commands do)
+writes it to disk once. Because a blob's name is derived from its content,
+a blob URL never changes meaning and can be cached forever.
+
+Which rows use a blob, and when it can be removed, is tracked by the
+MediaBlob model (see community.models).
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import transaction
+
+BLOB_DIR = "blobs"
+# Blob contents never change, so clients and CDNs may cache them for a year.
+BLOB_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def compute_digest(content):
+    """Hashes a File in chunks, so large videos are never read into memory."""
+    sha256 = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        sha256.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return sha256.hexdigest()
+
+
+def blob_name_for(digest, original_name):
+    extension = os.path.splitext(original_name)[1].lower()
+    return "/".join([BLOB_DIR, digest[:2], digest[2:4], f"{digest}{extension}"])
+
+
+def digest_from_name(name):
+    """Returns the digest encoded in a blob name, or None for legacy files."""
+    if not name or not name.startswith(f"{BLOB_DIR}/"):
+        return None
+    digest = os.path.splitext(os.path.basename(name))[0]
+    return digest if len(digest) == 64 else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    A FileSystemStorage that ignores the incoming file name (apart from its
+    extension) and stores the content under its digest, skipping the write
+    entirely if that content is already on disk.
+    """
+
+    def _save(self, name, content):
+        from .models import MediaBlob
+
+        digest = compute_digest(content)
+        blob_name = blob_name_for(digest, name)
+        # The file may be in the middle of being pruned, so whether it is
+        # there is only settled once the blob is held.
+        with transaction.atomic():
+            MediaBlob.objects.hold(digest, blob_name, content.size)
+            if self.exists(blob_name):
+                return blob_name
+        try:
+            return super()._save(blob_name, content)
+        except FileExistsError:
+            # A concurrent upload of the same content wrote it first.
+            return blob_name
+
+    def get_available_name(self, name, max_length=None):
+        # A blob that exists already holds these bytes; renaming it would
+        # store an untracked copy, so the collision is left to _save.
+        if digest_from_name(name) and self.exists(name):
+            raise FileExistsError(name)
+        return super().get_available_name(name, max_length=max_length)
+
+
+def select_media_storage():
+    """Storage callable for media fields, so tests and deployments can swap it."""
+    return storages["media_blobs"]
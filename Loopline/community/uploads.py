@@ -0,0 +1,182 @@
+# community/uploads.py
+"""
+Helpers for resumable, chunked media uploads (tus-style).
+
+A client creates an upload, PATCHes the file in chunks at increasing offsets,
+and finalizes it once every byte has arrived. Chunks are streamed straight
+from the request body into a temporary ``.part`` file on disk, so a 500 MB
+video never sits in memory, and an interrupted upload can resume from the
+last offset the server acknowledged. Uploads that stall or are never
+attached are deleted by `manage.py prune_stale_uploads`.
+"""
+import os
+
+from django.conf import settings
+from django.core.files import File, locks
+from django.utils import timezone
+
+from .storage import digest_from_name
+
+# How much of the request body we read per iteration when appending a chunk.
+STREAM_READ_SIZE = 64 * 1024
+
+
+class UploadOffsetMismatch(Exception):
+    """The client sent a chunk for an offset the server has not reached."""
+
+
+class UploadTooLarge(Exception):
+    """The chunk would take the upload past its declared total size."""
+
+
+class UploadAlreadyAttached(Exception):
+    """One of the uploads was claimed by another post in the meantime."""
+
+
+class UploadBusy(Exception):
+    """Another request is writing a chunk of the same upload."""
+
+
+class AssembledUploadFile(File):
+    """
+    Wraps the fully assembled ``.part`` file.
+
+    Exposing ``temporary_file_path`` lets FileSystemStorage move the file
+    into place instead of copying it a second time.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def get_temp_dir():
+    return str(settings.MEDIA_UPLOAD_TEMP_DIR)
+
+
+def get_temp_path(upload):
+    return os.path.join(get_temp_dir(), f"{upload.pk}.part")
+
+
+def create_temp_file(upload):
+    """Creates the empty ``.part`` file a new upload will be appended to."""
+    os.makedirs(get_temp_dir(), exist_ok=True)
+    open(get_temp_path(upload), "wb").close()
+
+
+def remove_temp_file(upload):
+    try:
+        os.remove(get_temp_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def append_chunk(upload, stream, offset, length):
+    """
+    Streams ``length`` bytes from ``stream`` into the upload's ``.part`` file
+    starting at ``offset``, then records the new offset on ``upload``.
+
+    Slow clients take as long as they like to send a chunk, so the body is
+    streamed with no transaction open. An exclusive lock on the ``.part``
+    file keeps a second request for the upload out in the meantime (it gets
+    UploadBusy), and the row is only locked at the end, to check the upload
+    is still where the chunk started and move its offset on.
+    """
+    from .models import MediaUpload
+
+    if length > settings.MEDIA_UPLOAD_MAX_CHUNK_SIZE:
+        raise UploadTooLarge()
+    if offset + length > upload.total_size:
+        raise UploadTooLarge()
+
+    with open(get_temp_path(upload), "r+b") as part_file:
+        if not locks.lock(part_file, locks.LOCK_EX | locks.LOCK_NB):
+            raise UploadBusy()
+        try:
+            # The offset as of now, not as of when the request came in.
+            upload.refresh_from_db(fields=["offset", "status"])
+            if upload.status != MediaUpload.STATUS_UPLOADING or offset != upload.offset:
+                raise UploadOffsetMismatch()
+
+            written = 0
+            part_file.seek(offset)
+            # Anything past the acknowledged offset is left over from a chunk
+            # that was interrupted mid-write; it is overwritten now.
+            part_file.truncate()
+            while written < length:
+                data = stream.read(min(STREAM_READ_SIZE, length - written))
+                if not data:
+                    break
+                part_file.write(data)
+                written += len(data)
+            part_file.flush()
+
+            # Checked and moved in one UPDATE, under its row lock. Finalizing
+            # or deleting the upload meanwhile wins.
+            advanced = MediaUpload.objects.filter(
+                pk=upload.pk,
+                status=MediaUpload.STATUS_UPLOADING,
+                offset=offset,
+            ).update(offset=offset + written, updated_at=timezone.now())
+            if not advanced:
+                upload.refresh_from_db(fields=["offset", "status"])
+                raise UploadOffsetMismatch()
+            upload.offset = offset + written
+        finally:
+            locks.unlock(part_file)
+    return upload.offset
+
+
+def finalize_upload(upload):
+    """
+    Moves the assembled ``.part`` file into media storage and marks the
+    upload as complete. The row is saved by the caller.
+    """
+    from .models import MediaBlob, MediaUpload
+
+    with open(get_temp_path(upload), "rb") as part_file:
+        upload.file.save(upload.filename, AssembledUploadFile(part_file), save=False)
+    # The storage moves the file into place, or skips it entirely when the
+    # same content is already stored; either way the .part file goes.
+    remove_temp_file(upload)
+    # The finished upload holds a blob reference until it is attached.
+    MediaBlob.objects.acquire(upload.file.name)
+    upload.status = MediaUpload.STATUS_COMPLETE
+
+
+def attach_uploads(post, uploads):
+    """
+    Attaches already-uploaded media to a post without touching the file
+    contents: the new PostMedia rows simply point at the stored files.
+    """
+    from .models import MediaBlob, MediaUpload, PostMedia
+
+    if not uploads:
+        return []
+    # Claiming the uploads first (the UPDATE row-locks them) means two posts
+    # racing for the same upload cannot both attach it.
+    claimed = MediaUpload.objects.filter(
+        pk__in=[upload.pk for upload in uploads],
+        status=MediaUpload.STATUS_COMPLETE,
+    ).update(status=MediaUpload.STATUS_ATTACHED)
+    if claimed != len(uploads):
+        raise UploadAlreadyAttached()
+    media = PostMedia.objects.bulk_create(
+        [
+            PostMedia(post=post, media_type=upload.media_type, file=upload.file.name)
+            for upload in uploads
+        ]
+    )
+    # The post media now hold their own references.
+    for item in media:
+        MediaBlob.objects.release(item.blob_id)
+    return media
+
+
+def discard_upload(upload):
+    """Deletes an unattached upload along with its partial or finished file."""
+    from .models import MediaBlob
+
+    remove_temp_file(upload)
+    if upload.file:
+        MediaBlob.objects.release(digest_from_name(upload.file.name))
+    upload.delete()
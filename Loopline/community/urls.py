@@ -90,9 +90,22 @@ urlpatterns = [
     ),
     # --- Search ---
     path("search/users/", views.UserSearchAPIView.as_view(), name="user-search"),
+    path(
+        "search/mentions/", views.MentionSuggestView.as_view(), name="mention-suggest"
+    ),
     path(
         "search/content/", views.ContentSearchAPIView.as_view(), name="content-search"
     ),
+    path(
+        "hashtags/trending/",
+        views.TrendingHashtagsView.as_view(),
+        name="hashtag-trending",
+    ),
+    path(
+        "hashtags/<str:name>/posts/",
+        views.HashtagPostListView.as_view(),
+        name="hashtag-post-list",
+    ),
     # --- Posts & Content ---
     path(
         "posts/",
@@ -104,6 +117,18 @@ urlpatterns = [
         views.StatusPostRetrieveUpdateDestroyView.as_view(),
         name="statuspost-detail",
     ),
+    # --- Resumable Media Uploads ---
+    path("uploads/", views.MediaUploadCreateView.as_view(), name="upload-create"),
+    path(
+        "uploads/<uuid:upload_id>/",
+        views.MediaUploadDetailView.as_view(),
+        name="upload-detail",
+    ),
+    path(
+        "uploads/<uuid:upload_id>/finalize/",
+        views.MediaUploadFinalizeView.as_view(),
+        name="upload-finalize",
+    ),
     path(
         "posts/<int:post_id>/reactions/",
         views.PostReactionListView.as_view(),
@@ -129,6 +154,11 @@ urlpatterns = [
         views.GroupTransferOwnershipView.as_view(),
         name="group-transfer-ownership",
     ),
+    path(
+        "groups/<slug:slug>/members/",
+        views.GroupMemberListView.as_view(),
+        name="group-member-list",
+    ),
     path(
         "groups/<slug:slug>/membership/",
         views.GroupMembershipView.as_view(),
@@ -165,6 +195,16 @@ urlpatterns = [
         views.CommentListCreateAPIView.as_view(),
         name="comment-list-create",
     ),
+    path(
+        "comments/<str:content_type>/<int:object_id>/threads/",
+        views.CommentThreadListView.as_view(),
+        name="comment-threads",
+    ),
+    path(
+        "comments/<int:pk>/replies/",
+        views.CommentRepliesListView.as_view(),
+        name="comment-replies",
+    ),
     path(
         "comments/<int:pk>/",
         views.CommentRetrieveUpdateDestroyAPIView.as_view(),
@@ -222,6 +262,7 @@ urlpatterns = [
     path("posts/saved/", views.SavedPostListView.as_view(), name="saved-post-list"),
     # --- System ---
     path("health-check/", views.health_check_view, name="health-check"),
+    path("health-check/db/", views.database_health_view, name="database-health-check"),
 ]
 
 # Append the main router urls (connections/requests)
@@ -7,7 +7,10 @@ from django.contrib.auth import logout as django_logout
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib.contenttypes.models import ContentType
 from django.http import Http404
-from django.db.models import Q, Count, Value, CharField, Case, When
+from django.urls import reverse
+from django.views.static import serve
+from django.db.models import Q, Count, F, Value, CharField, Case, When, Prefetch
+from django.db.models.expressions import RawSQL
 from django.db import transaction
 from django.utils import timezone
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
@@ -34,15 +37,19 @@ from rest_framework.permissions import (
     AllowAny,
     IsAuthenticatedOrReadOnly,
 )
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
 
 from rest_framework.views import APIView
 from rest_framework.pagination import (
+    BasePagination,
+    Cursor,
     PageNumberPagination,
     CursorPagination,
 )  # NEW: Import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.authtoken.models import Token
 from rest_framework.filters import SearchFilter
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import api_view, permission_classes, action
 
 # from dj_rest_auth.views import LogoutView
@@ -52,6 +59,7 @@ from .models import (
     UserProfile,
     Follow,
     StatusPost,
+    MediaUpload,
     Group,
     Comment,
     Like,
@@ -71,15 +79,19 @@ from .models import (
     Education,
     Experience,
     RecommendationImpression,
+    Hashtag,
+    SavedPost,
 )
 from .serializers import (
     UserSerializer,
     UserProfileSerializer,
     UserProfileUpdateSerializer,
     StatusPostSerializer,
+    MediaUploadSerializer,
     GroupSerializer,
     GroupJoinRequestSerializer,
     CommentSerializer,
+    CommentThreadSerializer,
     ConversationSerializer,
     MessageSerializer,
     MessageCreateSerializer,
@@ -94,6 +106,9 @@ from .serializers import (
     ExperienceSerializer,
     NetworkUserSerializer,
     NxtTurnSocialLoginSerializer,
+    PollTalliesSerializer,
+    group_membership_statuses,
+    liked_comment_ids,
 )
 from .permissions import (
     IsOwnerOrReadOnly,
@@ -102,9 +117,105 @@ from .permissions import (
     IsGroupCreator,
     IsGroupMemberOrPublicReadOnly,
 )
+from .reactions import (
+    REACTION_TYPES,
+    ReactionTargetNotFound,
+    get_reaction_target_model,
+    toggle_reaction,
+    viewer_reactions,
+)
+from .visibility import visible_posts_q
+from .feed_ranking import load_snapshot, ranked_post_ids, save_snapshot
+from .hashtags import (
+    HASHTAG_RE,
+    TOP_K_CAPACITY,
+    TRENDING_WINDOWS,
+    trending_hashtags,
+)
+from .db_health import database_status
+from .mentions import MAX_SUGGESTIONS, suggest_mentions
+from .authentication import CachedTokenAuthentication, forget_user_tokens
+from .profile_cache import profile_for_viewer
+from .storage import BLOB_CACHE_CONTROL, BLOB_DIR, select_media_storage
+from .uploads import (
+    UploadBusy,
+    UploadOffsetMismatch,
+    UploadTooLarge,
+    append_chunk,
+    create_temp_file,
+    discard_upload,
+    finalize_upload,
+)
 
 User = get_user_model()
 
+
+def viewer_poll_vote_prefetch(user):
+    """
+    Prefetches only the viewer's own vote on each poll (as `poll.viewer_votes`).
+    Tallies come from the PollOption counters, so no other vote rows are needed.
+    """
+    if user.is_authenticated:
+        votes = PollVote.objects.filter(user=user)
+    else:
+        votes = PollVote.objects.none()
+    return Prefetch("poll__votes", queryset=votes, to_attr="viewer_votes")
+
+
+def viewer_like_prefetch(user):
+    """
+    Prefetches only the viewer's own reaction on each post (as
+    `post.viewer_likes`). Counts are stored on the post itself.
+    """
+    likes = viewer_reactions(user, StatusPost)
+    if settings.ENGAGEMENT_TYPED_READS:
+        return Prefetch("reactions", queryset=likes, to_attr="viewer_likes")
+    return Prefetch("likes", queryset=likes, to_attr="viewer_likes")
+
+
+def viewer_save_prefetch(user):
+    """
+    Prefetches only the viewer's own save of each post (as
+    `post.viewer_saves`), so `is_saved` needs no query per post.
+    """
+    if user.is_authenticated:
+        saves = SavedPost.objects.filter(profile_id=user.pk)
+    else:
+        saves = SavedPost.objects.none()
+    return Prefetch("saves", queryset=saves, to_attr="viewer_saves")
+
+
+def parent_post_prefetch(user):
+    """
+    Loads the original posts of the reposts on a page in one pass (as
+    `post.parent_post`), with what the serializer reads from them. A post
+    reposted many times is loaded once.
+    """
+    return Prefetch(
+        "parent_post",
+        queryset=StatusPost.objects.select_related(
+            "author__profile", "group"
+        ).prefetch_related(
+            "media",
+            "poll__options",
+            viewer_like_prefetch(user),
+            viewer_poll_vote_prefetch(user),
+            viewer_save_prefetch(user),
+        ),
+    )
+
+
+def comments_on(model_name, object_id):
+    """
+    The comments on an object, by the post foreign key for posts (see
+    ENGAGEMENT_TYPED_READS) and by the generic relation otherwise.
+    """
+    if model_name == "statuspost" and settings.ENGAGEMENT_TYPED_READS:
+        return Comment.objects.filter(post_id=object_id)
+    content_type = get_object_or_404(ContentType, model=model_name)
+    return Comment.objects.filter(content_type=content_type, object_id=object_id)
+
+
 # ==================================
 # Custom Pagination Classes
 # ==================================
@@ -127,6 +238,107 @@ class PostCursorPagination(CursorPagination):
     page_size_query_param = "page_size"  # Allow client to specify page size
 
 
+# Members in join-independent, stable order; walks the (group, user) index.
+class GroupMemberCursorPagination(CursorPagination):
+    page_size = 20
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+# Comments sort by materialized path: creation order for top-level comments,
+# depth-first order within a thread.
+class CommentCursorPagination(CursorPagination):
+    page_size = 20
+    ordering = "path"
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+# Saved posts, most recently saved first, in the order of the SavedPost index
+# (see SavedPostListView's `saved_at`).
+class SavedPostCursorPagination(CursorPagination):
+    page_size = 10
+    ordering = ("-saved_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+# A tag's timeline, in the order of the PostHashtag index (see
+# HashtagPostListView's `tagged_at`).
+class HashtagCursorPagination(CursorPagination):
+    page_size = 10
+    ordering = ("-tagged_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+class RankedFeedPagination(BasePagination):
+    """
+    Pages through a ranking of post IDs saved as a snapshot (see
+    community.feed_ranking), so scores moving between requests can't repeat
+    or skip posts. The cursor is the snapshot's token and an offset.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    cursor_query_param = "cursor"
+
+    def paginate_ids(self, request, rank):
+        """The IDs on the requested page; `rank()` ranks afresh when needed."""
+        self.request = request
+        token, self.offset = self.decode_cursor(request)
+        ranking = load_snapshot(request.user, token) if token else None
+        if ranking is None:
+            # A first page, or the snapshot expired: carry on from the same
+            # offset in a new ranking.
+            ranking = rank()
+            token = save_snapshot(request.user, ranking)
+        self.token = token
+        self.page_size = self.get_page_size(request)
+        self.has_next = self.offset + self.page_size < len(ranking)
+        return ranking[self.offset : self.offset + self.page_size]
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor is None:
+            return None, 0
+        token, _, offset = cursor.rpartition(".")
+        if not token or not offset.isdigit():
+            raise NotFound("Invalid cursor")
+        return token, int(offset)
+
+    def link_to(self, offset):
+        if offset is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            f"{self.token}.{offset}",
+        )
+
+    def get_paginated_response(self, data):
+        previous = None
+        if self.offset > 0:
+            previous = max(self.offset - self.page_size, 0)
+        following = self.offset + self.page_size if self.has_next else None
+        return Response(
+            {
+                "next": self.link_to(following),
+                "previous": self.link_to(previous),
+                "results": data,
+            }
+        )
+
+
 # ==================================
 # User Profile & Follower Views
 # ==================================
@@ -152,16 +364,17 @@ class UserProfileDetailView(generics.RetrieveUpdateAPIView):
     def get_serializer_context(self):
         return {**super().get_serializer_context(), "request": self.request}
 
+    def retrieve(self, request, *args, **kwargs):
+        # The cached document plus this viewer's fields (see profile_cache).
+        return Response(profile_for_viewer(self.get_object(), request))
+
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop("partial", False)
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-        response_serializer = UserProfileSerializer(
-            instance, context=self.get_serializer_context()
-        )
-        return Response(response_serializer.data)
+        return Response(profile_for_viewer(instance, request))
 
 
 class BaseProfileSectionViewSet(viewsets.ModelViewSet):
@@ -299,7 +512,14 @@ class UserPostListView(generics.ListAPIView):
         return (
             StatusPost.objects.filter(author=user)
             .select_related("author__profile")
-            .prefetch_related("likes", "media", "poll__options", "poll__votes")
+            .prefetch_related(
+                "media",
+                "poll__options",
+                viewer_like_prefetch(self.request.user),
+                viewer_poll_vote_prefetch(self.request.user),
+                viewer_save_prefetch(self.request.user),
+                parent_post_prefetch(self.request.user),
+            )
             .order_by("-created_at")
         )
 
@@ -321,7 +541,7 @@ class UserPostListView(generics.ListAPIView):
 
 
 class FollowToggleView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, username, format=None):
@@ -582,7 +802,7 @@ class ConnectionRequestViewSet(
 
 class AcceptConnectionRequestView(APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     def post(self, request, username, format=None):
         sender = get_object_or_404(User, username__iexact=username)
@@ -634,6 +854,26 @@ class UserSearchAPIView(generics.ListAPIView):
         return queryset.order_by("priority", "username")
 
 
+class MentionSuggestView(APIView):
+    """
+    @mention typeahead: users whose username or name starts with ?q, the
+    viewer's own people first (see community.mentions). Not paginated;
+    ?limit is at most MAX_SUGGESTIONS.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        try:
+            limit = int(request.query_params.get("limit", 5))
+        except ValueError:
+            limit = 5
+        limit = min(max(limit, 1), MAX_SUGGESTIONS)
+        users = suggest_mentions(request.user, request.query_params.get("q", ""), limit)
+        serializer = UserSerializer(users, many=True, context={"request": request})
+        return Response({"results": serializer.data})
+
+
 class ContentSearchAPIView(generics.ListAPIView):
     serializer_class = StatusPostSerializer
     permission_classes = [IsAuthenticated]
@@ -646,10 +886,25 @@ class ContentSearchAPIView(generics.ListAPIView):
         if not query or not query.strip():
             return StatusPost.objects.none()
 
+        # A lone "#tag" is looked up in the hashtag index instead.
+        tag = HASHTAG_RE.fullmatch(query.strip())
+        if tag:
+            matching = StatusPost.objects.filter(
+                post_hashtags__hashtag__name=tag.group(1).lower()
+            )
+        else:
+            matching = StatusPost.objects.filter(content__icontains=query)
+
         queryset = (
-            StatusPost.objects.filter(content__icontains=query)
-            .select_related("author__profile")
-            .prefetch_related("media", "likes", "poll__options", "poll__votes")
+            matching.select_related("author__profile")
+            .prefetch_related(
+                "media",
+                "poll__options",
+                viewer_like_prefetch(self.request.user),
+                viewer_poll_vote_prefetch(self.request.user),
+                viewer_save_prefetch(self.request.user),
+                parent_post_prefetch(self.request.user),
+            )
             .order_by("-created_at")
         )
 
@@ -659,13 +914,75 @@ class ContentSearchAPIView(generics.ListAPIView):
         return {"request": self.request}
 
 
+class HashtagPostListView(generics.ListAPIView):
+    """
+    Posts tagged with a hashtag, newest first, with the feed's group
+    visibility rules. Walks the tag's PostHashtag index.
+    """
+
+    serializer_class = StatusPostSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = HashtagCursorPagination
+
+    def get_queryset(self):
+        hashtag = get_object_or_404(Hashtag, name=self.kwargs["name"].lower())
+        return (
+            StatusPost.objects.filter(post_hashtags__hashtag=hashtag)
+            .filter(visible_posts_q(self.request.user))
+            .annotate(tagged_at=F("post_hashtags__created_at"))
+            .select_related("author__profile", "group")
+            .prefetch_related(
+                "media",
+                "poll__options",
+                viewer_like_prefetch(self.request.user),
+                viewer_poll_vote_prefetch(self.request.user),
+                viewer_save_prefetch(self.request.user),
+                parent_post_prefetch(self.request.user),
+            )
+        )
+
+    def get_serializer_context(self):
+        return {"request": self.request}
+
+
+class TrendingHashtagsView(APIView):
+    """
+    The most used hashtags over a sliding window (?window=1h, 24h or 7d;
+    default 24h), read from the streaming counters in community.hashtags.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        window = request.query_params.get("window", "24h")
+        if window not in TRENDING_WINDOWS:
+            return Response(
+                {"detail": f"window must be one of {', '.join(TRENDING_WINDOWS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+        limit = min(max(limit, 1), TOP_K_CAPACITY)
+        return Response(
+            {
+                "window": window,
+                "results": [
+                    {"name": name, "uses": uses}
+                    for name, uses in trending_hashtags(window, limit)
+                ],
+            }
+        )
+
+
 # ==================================
 # Status Post Views
 # ==================================
 class StatusPostListCreateView(generics.ListCreateAPIView):
     queryset = (
         StatusPost.objects.select_related("author__profile", "group__creator")
-        .prefetch_related("likes", "media", "poll__options", "poll__votes")
+        .prefetch_related("media", "poll__options")
         .order_by("-created_at")
     )
     serializer_class = StatusPostSerializer
@@ -683,6 +1000,18 @@ class StatusPostListCreateView(generics.ListCreateAPIView):
                 return [IsAuthenticated()]
         return [IsAuthenticated()]
 
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .prefetch_related(
+                viewer_like_prefetch(self.request.user),
+                viewer_poll_vote_prefetch(self.request.user),
+                viewer_save_prefetch(self.request.user),
+                parent_post_prefetch(self.request.user),
+            )
+        )
+
     def perform_create(self, serializer):
         group = serializer.validated_data.get("group", None)
         serializer.save(author=self.request.user, group=group)
@@ -694,7 +1023,7 @@ class StatusPostListCreateView(generics.ListCreateAPIView):
 class StatusPostRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = (
         StatusPost.objects.select_related("author__profile")
-        .prefetch_related("likes", "media", "poll__options", "poll__votes")
+        .prefetch_related("media", "poll__options")
         .all()
     )
     serializer_class = StatusPostSerializer
@@ -705,6 +1034,152 @@ class StatusPostRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView)
         return {"request": self.request}
 
 
+# ==================================
+# Resumable Upload Views
+# ==================================
+class MediaUploadCreateView(generics.CreateAPIView):
+    """
+    Starts a resumable upload. The response carries the upload's URL in the
+    `Location` header; the client then PATCHes the file to it in chunks.
+    """
+
+    serializer_class = MediaUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def perform_create(self, serializer):
+        upload = serializer.save(owner=self.request.user)
+        create_temp_file(upload)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response["Location"] = request.build_absolute_uri(
+            f"{request.path}{response.data['id']}/"
+        )
+        response["Upload-Offset"] = "0"
+        return response
+
+
+class MediaUploadDetailView(APIView):
+    """
+    The tus-style resource for a single upload.
+    - HEAD/GET report how many bytes the server has (the `Upload-Offset`).
+    - PATCH appends the request body at the offset given in `Upload-Offset`.
+    - DELETE abandons the upload.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_upload(self, request, upload_id, lock=False):
+        queryset = MediaUpload.objects.filter(owner=request.user)
+        if lock:
+            queryset = queryset.select_for_update()
+        return get_object_or_404(queryset, pk=upload_id)
+
+    def _offset_response(self, upload, status_code=status.HTTP_200_OK):
+        response = Response(MediaUploadSerializer(upload).data, status=status_code)
+        response["Upload-Offset"] = str(upload.offset)
+        response["Upload-Length"] = str(upload.total_size)
+        response["Cache-Control"] = "no-store"
+        return response
+
+    def get(self, request, upload_id, format=None):
+        return self._offset_response(self.get_upload(request, upload_id))
+
+    def head(self, request, upload_id, format=None):
+        return self._offset_response(self.get_upload(request, upload_id))
+
+    def patch(self, request, upload_id, format=None):
+        try:
+            offset = int(request.headers["Upload-Offset"])
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "A numeric Upload-Offset header is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Without a length the chunk would read as empty and the client would
+        # resend it forever; chunked transfer encoding is not supported.
+        try:
+            length = int(request.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "A Content-Length header is required."},
+                status=status.HTTP_411_LENGTH_REQUIRED,
+            )
+
+        upload = self.get_upload(request, upload_id)
+        if upload.status != MediaUpload.STATUS_UPLOADING:
+            return Response(
+                {"detail": "This upload has already been finalized."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        try:
+            # Read straight from the request stream so the chunk is never
+            # buffered in memory as request.body.
+            append_chunk(upload, request.stream, offset, length)
+        except UploadOffsetMismatch:
+            response = Response(
+                {"detail": "Upload-Offset does not match the server offset."},
+                status=status.HTTP_409_CONFLICT,
+            )
+            response["Upload-Offset"] = str(upload.offset)
+            return response
+        except UploadBusy:
+            return Response(
+                {"detail": "Another chunk of this upload is still being sent."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except UploadTooLarge:
+            return Response(
+                {"detail": "This chunk is too large for the upload."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        except (FileNotFoundError, MediaUpload.DoesNotExist):
+            raise Http404  # Deleted while the chunk was on its way.
+
+        return self._offset_response(upload)
+
+    def delete(self, request, upload_id, format=None):
+        upload = self.get_upload(request, upload_id)
+        if upload.status == MediaUpload.STATUS_ATTACHED:
+            return Response(
+                {"detail": "Attached uploads cannot be deleted."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        discard_upload(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MediaUploadFinalizeView(APIView):
+    """
+    Completes an upload once every byte has arrived. The returned ID can then
+    be passed to the post endpoints as `upload_ids`.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id, format=None):
+        with transaction.atomic():
+            upload = get_object_or_404(
+                MediaUpload.objects.select_for_update().filter(owner=request.user),
+                pk=upload_id,
+            )
+            if upload.status != MediaUpload.STATUS_UPLOADING:
+                return Response(
+                    MediaUploadSerializer(upload).data, status=status.HTTP_200_OK
+                )
+            if upload.offset != upload.total_size:
+                response = Response(
+                    {"detail": "The upload is not complete yet."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+                response["Upload-Offset"] = str(upload.offset)
+                return response
+            finalize_upload(upload)
+            upload.save()
+
+        return Response(MediaUploadSerializer(upload).data, status=status.HTTP_200_OK)
+
+
 # ==================================
 # Like View
 # ==================================
@@ -715,53 +1190,27 @@ class LikeToggleAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
-        content_type_id = kwargs.get("content_type_id")
-        object_id = kwargs.get("object_id")
+        model = get_reaction_target_model(kwargs.get("content_type_id"))
+        if model is None:
+            raise Http404
 
         # Get the specific reaction type from the request body (defaults to 'like')
         reaction_type = request.data.get("reaction_type", "like")
+        if reaction_type not in REACTION_TYPES:
+            return Response(
+                {"detail": "Invalid reaction type."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        content_type = get_object_or_404(ContentType, pk=content_type_id)
-        target_object = get_object_or_404(content_type.model_class(), pk=object_id)
-
-        # Look for an existing reaction by this user on this object
-        like, created = Like.objects.get_or_create(
-            user=request.user, content_type=content_type, object_id=target_object.id
-        )
-
-        if not created:
-            # SCENARIO: User already reacted.
-            if like.reaction_type == reaction_type:
-                # If they clicked the SAME emoji, they want to remove it (Unlike)
-                like.delete()
-                result_liked = False
-            else:
-                # If they clicked a DIFFERENT emoji, they want to change their reaction
-                like.reaction_type = reaction_type
-                like.save()
-                result_liked = True
-        else:
-            # SCENARIO: New reaction.
-            like.reaction_type = reaction_type
-            like.save()
-            result_liked = True
-
-        # --- THE FIX: Calculate the breakdown before returning ---
-        counts = target_object.likes.values("reaction_type").annotate(
-            count=Count("reaction_type")
-        )
-        reaction_counts = {item["reaction_type"]: item["count"] for item in counts}
-        # ---------------------------------------------------------
-
-        return Response(
-            {
-                "liked": result_liked,
-                "reaction_type": reaction_type,
-                "like_count": target_object.likes.count(),
-                "reaction_counts": reaction_counts,  # Now it exists!
-            },
-            status=status.HTTP_200_OK,
-        )
+        # One statement adds, changes or removes the reaction and returns the
+        # stored counts (see community.reactions).
+        try:
+            result = toggle_reaction(
+                request.user, model, kwargs.get("object_id"), reaction_type
+            )
+        except ReactionTargetNotFound:
+            raise Http404
+        return Response(result, status=status.HTTP_200_OK)
 
 
 class PostReactionListView(generics.ListAPIView):
@@ -819,7 +1268,6 @@ class ReportCreateAPIView(generics.CreateAPIView):
 # In community/views.py
 
 
-# Replace your existing PollVoteAPIView with this one.
 class PollVoteAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -827,31 +1275,41 @@ class PollVoteAPIView(APIView):
         poll = get_object_or_404(Poll, pk=poll_id)
         option = get_object_or_404(PollOption, pk=option_id, poll=poll)
 
-        # Use a database transaction to ensure data integrity
+        # The PollVote signals adjust the option counters inside this same
+        # transaction, so the tallies can never drift from the vote rows.
         with transaction.atomic():
-            # Find out if the current user has already voted on this specific poll
-            existing_vote = PollVote.objects.filter(
-                user=request.user, poll=poll
-            ).first()
+            # close() takes the same lock, so a vote either lands before the
+            # results are frozen or sees the poll closed.
+            poll = Poll.objects.select_for_update().get(pk=poll.pk)
+            if poll.is_closed:
+                # Freeze the results the first time anyone touches an expired
+                # poll, so readers stop depending on the live counters.
+                poll.close()
+                return Response(
+                    {"detail": "This poll is closed."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            existing_vote = (
+                PollVote.objects.select_for_update()
+                .filter(user=request.user, poll=poll)
+                .first()
+            )
 
             if existing_vote:
-                if existing_vote.option == option:
-                    # CASE 1: User clicked the same option again. We un-cast the vote.
-                    existing_vote.delete()
-                else:
-                    # CASE 2: User changed their mind. We update the vote to the new option.
-                    existing_vote.option = option
-                    existing_vote.save()
-            else:
-                # CASE 3: User has not voted yet. We create a new vote.
+                # Un-cast the vote. Clicking the same option again stops here;
+                # picking a different one re-casts it below.
+                existing_vote.delete()
+
+            if not existing_vote or existing_vote.option_id != option.id:
                 PollVote.objects.create(user=request.user, poll=poll, option=option)
+                user_vote = option.id
+            else:
+                user_vote = None
 
-        # After any change, we serialize the parent POST object. The serializer
-        # is responsible for fetching the latest vote counts from the related 'votes' manager.
-        # This is the "source of truth".
-        post_instance = poll.post
-        context = {"request": request}
-        serializer = StatusPostSerializer(instance=post_instance, context=context)
+        # Only the tallies changed; the client patches them into the post it
+        # already has instead of receiving the whole post again.
+        serializer = PollTalliesSerializer(poll, context={"user_vote": user_vote})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -889,11 +1347,7 @@ class GroupListView(generics.ListCreateAPIView):
     search_fields = ["name", "description", "slug"]
 
     def get_queryset(self):
-        return (
-            Group.objects.select_related("creator__profile")
-            .prefetch_related("members")
-            .all()
-        )
+        return Group.objects.select_related("creator__profile").all()
 
     def get_serializer_context(self):
         """
@@ -902,20 +1356,45 @@ class GroupListView(generics.ListCreateAPIView):
         """
         return {"request": self.request}
 
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+        context["membership_statuses"] = group_membership_statuses(request.user, page)
+        serializer = self.get_serializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
+
     def perform_create(self, serializer):
         group = serializer.save(creator=self.request.user)
         group.members.add(self.request.user)
+        group.refresh_from_db(fields=["member_count"])
 
 
 class GroupRetrieveAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Group.objects.prefetch_related(
-        "members__profile", "creator__profile"
-    ).all()
+    queryset = Group.objects.select_related("creator__profile").all()
     serializer_class = GroupSerializer
     permission_classes = [IsGroupMemberOrPublicReadOnly]  # <-- THIS IS THE FIX
     lookup_field = "slug"
 
 
+class GroupMemberListView(generics.ListAPIView):
+    """
+    A group's members, a page at a time. Anyone may list a public group's
+    members; a private group's are only shown to its members.
+    """
+
+    serializer_class = UserSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = GroupMemberCursorPagination
+
+    def get_queryset(self):
+        group = get_object_or_404(Group, slug=self.kwargs["slug"])
+        if group.privacy_level == "private" and group_membership_statuses(
+            self.request.user, [group]
+        )[group.pk] not in ("creator", "member"):
+            raise PermissionDenied("Only members can see who is in this group.")
+        return User.objects.filter(joined_groups=group).select_related("profile")
+
+
 # PASTE THIS ENTIRE CLASS TO REPLACE THE OLD ONE
 
 
@@ -1034,7 +1513,14 @@ class GroupPostListView(generics.ListAPIView):
         return (
             StatusPost.objects.filter(group__slug=group_slug)
             .select_related("author__profile", "group")
-            .prefetch_related("media", "likes", "poll__options", "poll__votes")
+            .prefetch_related(
+                "media",
+                "poll__options",
+                viewer_like_prefetch(self.request.user),
+                viewer_poll_vote_prefetch(self.request.user),
+                viewer_save_prefetch(self.request.user),
+                parent_post_prefetch(self.request.user),
+            )
             .order_by("-created_at")
         )  # IMPORTANT: Must match cursor pagination ordering
 
@@ -1066,16 +1552,19 @@ class CommentListCreateAPIView(generics.ListCreateAPIView):
         model_name = self.kwargs.get("content_type").lower()
         object_id = self.kwargs.get("object_id")
 
-        # 2. Find the ContentType record
-        content_type = get_object_or_404(ContentType, model=model_name)
-
-        # 3. Filter directly. This fixes the "Disappearing Comments" bug.
+        # 2. Filter directly. This fixes the "Disappearing Comments" bug.
         return (
-            Comment.objects.filter(content_type=content_type, object_id=object_id)
+            comments_on(model_name, object_id)
             .select_related("author__profile")  # UI team optimization
             .order_by("created_at")  # UI team optimization
         )
 
+    def list(self, request, *args, **kwargs):
+        comments = list(self.get_queryset())
+        context = self.get_serializer_context()
+        context["liked_comment_ids"] = liked_comment_ids(request.user, comments)
+        return Response(CommentSerializer(comments, many=True, context=context).data)
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context["request"] = self.request
@@ -1086,6 +1575,143 @@ class CommentListCreateAPIView(generics.ListCreateAPIView):
         serializer.save()
 
 
+class CommentThreadListView(generics.ListAPIView):
+    """
+    Top-level comments on an object, a page at a time, each with a preview
+    of its thread: the first `replies` replies (default 3, at most 10) in
+    depth-first order, plus a `more_replies` URL when the thread has more.
+
+    The previews for the whole page come from one query that reads, for
+    each thread, only its first few replies from the path index, however
+    large the thread is.
+    """
+
+    serializer_class = CommentThreadSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CommentCursorPagination
+
+    DEFAULT_REPLY_PREVIEWS = 3
+    MAX_REPLY_PREVIEWS = 10
+
+    def get_queryset(self):
+        model_name = self.kwargs.get("content_type").lower()
+        return (
+            comments_on(model_name, self.kwargs.get("object_id"))
+            .filter(parent__isnull=True)
+            .select_related("author__profile")
+        )
+
+    def get_reply_preview_count(self):
+        try:
+            count = int(self.request.query_params.get("replies", ""))
+        except ValueError:
+            return self.DEFAULT_REPLY_PREVIEWS
+        return max(0, min(count, self.MAX_REPLY_PREVIEWS))
+
+    def list(self, request, *args, **kwargs):
+        threads = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        previews, more_urls = self.load_reply_previews(threads)
+        context = self.get_serializer_context()
+        context["reply_previews"] = previews
+        context["more_replies_urls"] = more_urls
+        context["liked_comment_ids"] = liked_comment_ids(
+            request.user,
+            threads + [reply for replies in previews.values() for reply in replies],
+        )
+        serializer = self.get_serializer(threads, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
+
+    def load_reply_previews(self, threads):
+        limit = self.get_reply_preview_count()
+        previews = {thread.pk: [] for thread in threads}
+        truncated = set()
+        threads_with_replies = [t for t in threads if t.reply_count and t.path]
+        if not threads_with_replies:
+            return previews, {}
+
+        # A LATERAL subquery per thread walks the path index (text_pattern_ops,
+        # hence the ~<~ operators) from the thread's root and stops after
+        # limit + 1 replies; the extra one tells us whether there are more.
+        # "/" + 1 is "0", so the range ends just past the thread's subtree.
+        reply_ids = RawSQL(
+            f"""
+            SELECT reply.id
+            FROM unnest(%s::text[], %s::text[]) AS thread(low, high)
+            CROSS JOIN LATERAL (
+                SELECT id FROM {Comment._meta.db_table}
+                WHERE path ~>~ thread.low AND path ~<~ thread.high
+                ORDER BY path USING ~<~
+                LIMIT %s
+            ) AS reply
+            """,
+            (
+                [thread.path for thread in threads_with_replies],
+                [thread.path[:-1] + "0" for thread in threads_with_replies],
+                limit + 1,
+            ),
+        )
+        replies = (
+            Comment.objects.filter(pk__in=reply_ids)
+            .select_related("author__profile")
+            .order_by("path")
+        )
+        root_ids = {thread.path: thread.pk for thread in threads_with_replies}
+        for reply in replies:
+            root_id = root_ids[reply.path[: Comment.PATH_SEGMENT_LENGTH]]
+            if len(previews[root_id]) < limit:
+                previews[root_id].append(reply)
+            else:
+                truncated.add(root_id)
+
+        more_urls = {
+            thread.pk: comment_replies_url(
+                self.request,
+                thread,
+                after=previews[thread.pk][-1].path if previews[thread.pk] else None,
+            )
+            for thread in threads_with_replies
+            if thread.pk in truncated
+        }
+        return previews, more_urls
+
+
+def comment_replies_url(request, comment, after=None):
+    """
+    The URL of `comment`'s replies, starting after the reply with path
+    `after` (used to continue from a thread preview).
+    """
+    url = request.build_absolute_uri(
+        reverse("community:comment-replies", kwargs={"pk": comment.pk})
+    )
+    if after is None:
+        return url
+    paginator = CommentCursorPagination()
+    paginator.base_url = url
+    return paginator.encode_cursor(Cursor(offset=0, reverse=False, position=after))
+
+
+class CommentRepliesListView(generics.ListAPIView):
+    """
+    All replies under a comment, at any depth, in depth-first order, read
+    with a single range scan over the comment's materialized path.
+    """
+
+    serializer_class = CommentSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CommentCursorPagination
+
+    def get_queryset(self):
+        comment = get_object_or_404(Comment, pk=self.kwargs["pk"])
+        return comment.subtree().select_related("author__profile")
+
+    def list(self, request, *args, **kwargs):
+        replies = self.paginate_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+        context["liked_comment_ids"] = liked_comment_ids(request.user, replies)
+        serializer = CommentSerializer(replies, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
+
+
 class CommentRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Comment.objects.select_related("author__profile").all()
     serializer_class = CommentSerializer
@@ -1100,7 +1726,7 @@ class FeedListView(generics.ListAPIView):
     serializer_class = StatusPostSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = PostCursorPagination
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     # THIS IS THE NEW, FIXED CODE
     def get_queryset(self):
@@ -1115,22 +1741,42 @@ class FeedListView(generics.ListAPIView):
         # - It has no group (it's a personal, public wall post), OR
         # - Its group is public, OR
         # - Its group is private AND the current user is a member of that group.
-        privacy_q = (
-            Q(group__isnull=True)
-            | Q(group__privacy_level="public")
-            | Q(group__members=user)
-        )
+        # The group IDs come precomputed (see community.visibility), so there
+        # is no join on memberships and no DISTINCT.
+        privacy_q = visible_posts_q(user)
 
         # 3. Combine the filters and return the final queryset
         return (
             StatusPost.objects.filter(author_id__in=user_ids_for_feed)
             .filter(privacy_q)
             .select_related("author__profile", "group")
-            .prefetch_related("media", "likes", "poll__options", "poll__votes")
+            .prefetch_related(
+                "media",
+                "poll__options",
+                viewer_like_prefetch(self.request.user),
+                viewer_poll_vote_prefetch(self.request.user),
+                viewer_save_prefetch(self.request.user),
+                parent_post_prefetch(self.request.user),
+            )
             .order_by("-created_at", "-id")
-            .distinct()
         )
 
+    def list(self, request, *args, **kwargs):
+        # ?mode=top ranks the feed instead (see community.feed_ranking).
+        if request.query_params.get("mode") != "top":
+            return super().list(request, *args, **kwargs)
+        paginator = RankedFeedPagination()
+        page_ids = paginator.paginate_ids(
+            request, lambda: ranked_post_ids(request.user)
+        )
+        # Through the feed's own queryset, so posts deleted or hidden since
+        # the snapshot was taken drop out.
+        posts = self.get_queryset().in_bulk(page_ids)
+        serializer = self.get_serializer(
+            [posts[post_id] for post_id in page_ids if post_id in posts], many=True
+        )
+        return paginator.get_paginated_response(serializer.data)
+
     def get_serializer_context(self):
         return {"request": self.request}
 
@@ -1140,43 +1786,69 @@ class FeedListView(generics.ListAPIView):
 # ==================================
 class SavedPostToggleView(APIView):
     """
-    Toggles saving or unsaving a post for the currently authenticated user.
-    Expects a POST request to /api/community/posts/<pk>/save/
+    Saves (PUT) or unsaves (DELETE) a post for the currently authenticated
+    user at /api/posts/<pk>/save/. Both are idempotent, so a retried request
+    can't flip the result. POST still toggles, for older clients.
     """
 
     permission_classes = [IsAuthenticated]
 
-    def post(self, request, pk, format=None):
+    def _saved_post_response(self, request, post):
+        serializer = StatusPostSerializer(post, context={"request": request})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def put(self, request, pk, format=None):
         post = get_object_or_404(StatusPost, pk=pk)
-        profile = request.user.profile
+        # INSERT ... ON CONFLICT DO NOTHING: saving twice is a no-op.
+        SavedPost.objects.bulk_create(
+            [SavedPost(profile=request.user.profile, post=post)],
+            ignore_conflicts=True,
+        )
+        return self._saved_post_response(request, post)
 
-        if post in profile.saved_posts.all():
-            profile.saved_posts.remove(post)
-        else:
-            profile.saved_posts.add(post)
+    def delete(self, request, pk, format=None):
+        post = get_object_or_404(StatusPost, pk=pk)
+        SavedPost.objects.filter(profile=request.user.profile, post=post).delete()
+        return self._saved_post_response(request, post)
 
-        serializer = StatusPostSerializer(post, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def post(self, request, pk, format=None):
+        post = get_object_or_404(StatusPost, pk=pk)
+        unsaved, _ = SavedPost.objects.filter(
+            profile=request.user.profile, post=post
+        ).delete()
+        if not unsaved:
+            SavedPost.objects.bulk_create(
+                [SavedPost(profile=request.user.profile, post=post)],
+                ignore_conflicts=True,
+            )
+        return self._saved_post_response(request, post)
 
 
 class SavedPostListView(generics.ListAPIView):
     """
-    Returns a paginated list of posts saved by the currently authenticated user.
+    Returns the posts saved by the currently authenticated user, most
+    recently saved first, a cursor page at a time.
     """
 
     serializer_class = StatusPostSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = (
-        StandardResultsSetPagination  # KEEP: Offset pagination for saved posts
-    )
+    pagination_class = SavedPostCursorPagination
 
     def get_queryset(self):
         user = self.request.user
         return (
-            user.profile.saved_posts.select_related("author__profile", "group")
-            .prefetch_related("media", "likes", "poll__options", "poll__votes")
-            .order_by("-created_at")
-        )  # Order by most recently saved first, or by post creation date
+            StatusPost.objects.filter(saves__profile_id=user.pk)
+            .annotate(saved_at=F("saves__saved_at"))
+            .select_related("author__profile", "group")
+            .prefetch_related(
+                "media",
+                "poll__options",
+                viewer_like_prefetch(self.request.user),
+                viewer_poll_vote_prefetch(self.request.user),
+                viewer_save_prefetch(self.request.user),
+                parent_post_prefetch(self.request.user),
+            )
+        )
 
 
 # ==================================
@@ -1531,8 +2203,10 @@ class ForcefulLogoutView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
-        if hasattr(request.user, "auth_token") and request.user.auth_token is not None:
-            request.user.auth_token.delete()
+        # Drop the cached token lookups first, so no request in flight can
+        # authenticate with the token once it is gone.
+        forget_user_tokens(request.user.pk)
+        Token.objects.filter(user=request.user).delete()
 
         django_logout(request)
 
@@ -1553,6 +2227,36 @@ def health_check_view(request):
     return Response({"status": "ok"}, status=status.HTTP_200_OK)
 
 
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def database_health_view(request):
+    """
+    Pings every database, for load balancer health checks: 503 when the
+    primary can't be reached. Replicas report their lag, and staff also get
+    connection pool and server connection counts.
+    """
+    databases = {
+        alias: database_status(alias, detailed=request.user.is_staff)
+        for alias in settings.DATABASES
+    }
+    healthy = databases["default"]["ok"]
+    return Response(
+        {"status": "ok" if healthy else "unavailable", "databases": databases},
+        status=status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+def media_blob_view(request, path):
+    """
+    Serves a content-addressed media blob (development only, like the rest of
+    MEDIA_URL). A blob's name is the hash of its bytes, so the response can be
+    cached forever; a production web server should send the same header.
+    """
+    response = serve(request, path, document_root=select_media_storage().path(BLOB_DIR))
+    response["Cache-Control"] = BLOB_CACHE_CONTROL
+    return response
+
+
 # --- ADD THIS ENTIRE CLASS AT THE END OF THE FILE ---
 
 
@@ -0,0 +1,83 @@
+# community/visibility.py
+"""
+Which groups' posts a user may see, precomputed for feed filtering.
+
+A post is visible when it has no group, its group is public, or the viewer
+is a member of its group. Expressed as a join on the membership table, that
+fans out rows and forces DISTINCT on every feed query. Instead, the IDs of
+the groups a user can see are kept in the cache and the predicate becomes
+
+    group_id IS NULL OR group_id = ANY(<visible ids>)
+
+on StatusPost's own indexed column.
+
+Two sets make up the visible IDs:
+
+    visibility:public_groups      every public group
+    visibility:groups:<user id>   every group the user belongs to
+
+The first is dropped whenever a group is saved or deleted, the second
+whenever the user's memberships change (see the Group signals), so the
+views that change memberships need nothing of their own.
+"""
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Group
+
+PUBLIC_GROUPS_KEY = "visibility:public_groups"
+# Only a safety net: the signals invalidate on every change.
+VISIBILITY_TIMEOUT = 60 * 60
+
+
+def _member_key(user_id):
+    return f"visibility:groups:{user_id}"
+
+
+def public_group_ids():
+    ids = cache.get(PUBLIC_GROUPS_KEY)
+    if ids is None:
+        ids = list(
+            Group.objects.filter(privacy_level="public").values_list("id", flat=True)
+        )
+        cache.set(PUBLIC_GROUPS_KEY, ids, VISIBILITY_TIMEOUT)
+    return ids
+
+
+def member_group_ids(user_id):
+    key = _member_key(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(
+            Group.members.through.objects.filter(user_id=user_id).values_list(
+                "group_id", flat=True
+            )
+        )
+        cache.set(key, ids, VISIBILITY_TIMEOUT)
+    return ids
+
+
+def visible_group_ids(user):
+    """The IDs of every group whose posts `user` may see."""
+    ids = set(public_group_ids())
+    if user.is_authenticated:
+        ids.update(member_group_ids(user.pk))
+    return ids
+
+
+def is_public_post(post):
+    """Whether everyone, signed in or not, may see `post`."""
+    return post.group_id is None or post.group_id in public_group_ids()
+
+
+def visible_posts_q(user):
+    """The feed privacy predicate, with no join and no need for DISTINCT."""
+    return Q(group__isnull=True) | Q(group_id__in=sorted(visible_group_ids(user)))
+
+
+def invalidate_public_groups():
+    cache.delete(PUBLIC_GROUPS_KEY)
+
+
+def invalidate_member_groups(*user_ids):
+    cache.delete_many([_member_key(user_id) for user_id in user_ids])
@@ -72,6 +72,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "community.db_routing.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -106,6 +107,57 @@ else:
         }
     }
 
+# --- READ REPLICAS ---
+# Comma-separated database URLs, added as replica_1, replica_2, ... Safe API
+# requests read from them (see community/db_routing.py). To try it locally,
+# point a replica URL at the same database as the primary.
+DATABASE_REPLICAS = []
+for number, url in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICA_URLS", "").split(",")), start=1
+):
+    alias = f"replica_{number}"
+    DATABASES[alias] = dj_database_url.parse(
+        url.strip(), conn_max_age=600, ssl_require=IS_PRODUCTION
+    )
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ["community.db_routing.PrimaryReplicaRouter"]
+# Reads stay on the primary this long after a client writes.
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+# Replicas further behind than this are skipped...
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 2.0))
+# ...as measured at most this often per worker.
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", 5.0))
+
+# --- CONNECTION POOLING ---
+# "pool": each worker process keeps a psycopg connection pool per database.
+#   Requests and consumer database hops borrow a connection and hand it back,
+#   instead of ASGI threads each holding a persistent connection of their own.
+# "pgbouncer": for a pgbouncer in transaction mode in front of Postgres. No
+#   persistent connections, and no server-side cursors (.iterator()), which
+#   don't survive a transaction boundary through it.
+# "off": one connection per request (CONN_MAX_AGE in production), as before.
+# `manage.py benchmark_connections` compares them under load.
+DATABASE_POOL_MODE = os.getenv("DATABASE_POOL_MODE", "pool").lower()
+DATABASE_POOL_MIN_SIZE = int(os.getenv("DATABASE_POOL_MIN_SIZE", 2))
+DATABASE_POOL_MAX_SIZE = int(os.getenv("DATABASE_POOL_MAX_SIZE", 10))
+# Seconds a request waits for a free connection before failing.
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", 10.0))
+for database in DATABASES.values():
+    # With a pool, connections are checked as they're borrowed.
+    database["CONN_HEALTH_CHECKS"] = True
+    if DATABASE_POOL_MODE == "pool":
+        database["CONN_MAX_AGE"] = 0
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DATABASE_POOL_MIN_SIZE,
+            "max_size": DATABASE_POOL_MAX_SIZE,
+            "timeout": DATABASE_POOL_TIMEOUT,
+            "max_lifetime": 600,
+        }
+    elif DATABASE_POOL_MODE == "pgbouncer":
+        database["CONN_MAX_AGE"] = 0
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -121,6 +173,14 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "mediafiles"
 
+# --- RESUMABLE MEDIA UPLOADS ---
+# Partially uploaded files live here until they are finalized.
+MEDIA_UPLOAD_TEMP_DIR = os.getenv("MEDIA_UPLOAD_TEMP_DIR", BASE_DIR / "upload_chunks")
+MEDIA_UPLOAD_MAX_SIZE = int(os.getenv("MEDIA_UPLOAD_MAX_SIZE", 1024 * 1024 * 1024))
+MEDIA_UPLOAD_MAX_CHUNK_SIZE = int(
+    os.getenv("MEDIA_UPLOAD_MAX_CHUNK_SIZE", 16 * 1024 * 1024)
+)
+
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
@@ -128,6 +188,10 @@ STORAGES = {
     "staticfiles": {
         "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
     },
+    # Post media and profile pictures are stored once per unique content.
+    "media_blobs": {
+        "BACKEND": "community.storage.ContentAddressedStorage",
+    },
 }
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -160,7 +224,7 @@ ACCOUNT_CONFIRM_EMAIL_ON_GET = True
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "community.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -168,6 +232,18 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_FILTER_BACKENDS": ["rest_framework.filters.SearchFilter"],
+    # orjson for JSON; MessagePack when a client sends
+    # Accept: application/msgpack (see community/renderers.py).
+    "DEFAULT_RENDERER_CLASSES": [
+        "community.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "community.renderers.MessagePackRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "community.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 AUTHENTICATION_BACKENDS = (
@@ -230,15 +306,81 @@ CSRF_TRUSTED_ORIGINS = [
     "https://192.168.10.33.nip.io:5173",
 ]
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
         "CONFIG": {
-            "hosts": [os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")],
+            "hosts": [REDIS_URL],
         },
     },
 }
 
+# Shared by all workers, so anything coordinated through the cache (e.g. the
+# live poll push throttle) holds across processes.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_CACHE_URL", "redis://127.0.0.1:6379/1"),
+    },
+}
+
+# --- TOKEN AUTH CACHE ---
+# How long a token's user is cached in Redis, and in each process's memory
+# (see community/authentication.py). Logout and account changes invalidate
+# both; the in-process copy of other workers just expires, so keep it short.
+AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", 300))
+AUTH_TOKEN_LOCAL_TTL = int(os.getenv("AUTH_TOKEN_LOCAL_TTL", 5))
+
+# --- PROFILE DOCUMENT CACHE ---
+# Only a safety net: every change to a profile retires its cached document
+# (see community/profile_cache.py).
+PROFILE_DOCUMENT_TTL = int(os.getenv("PROFILE_DOCUMENT_TTL", 60 * 60))
+
+# --- LIVE POLL TALLIES ---
+# At most one tally push per poll per this many seconds (0 disables coalescing).
+POLL_TALLY_PUSH_WINDOW = float(os.getenv("POLL_TALLY_PUSH_WINDOW", 1.0))
+
+# --- REACTION WRITE-BEHIND ---
+# When enabled, a post or comment taking more than LIKE_HOT_THRESHOLD reaction
+# toggles within LIKE_HOT_WINDOW seconds buffers its reactions in Redis for
+# LIKE_HOT_TTL seconds; `manage.py flush_like_buffer` writes them to the DB.
+LIKE_WRITE_BEHIND_ENABLED = (
+    os.getenv("LIKE_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+)
+LIKE_BUFFER_REDIS_URL = os.getenv("LIKE_BUFFER_REDIS_URL", REDIS_URL)
+LIKE_HOT_THRESHOLD = int(os.getenv("LIKE_HOT_THRESHOLD", 50))
+LIKE_HOT_WINDOW = int(os.getenv("LIKE_HOT_WINDOW", 10))
+LIKE_HOT_TTL = int(os.getenv("LIKE_HOT_TTL", 300))
+
+# --- TRENDING HASHTAGS ---
+# Where the trending counters live (see community/hashtags.py).
+TRENDING_REDIS_URL = os.getenv("TRENDING_REDIS_URL", REDIS_URL)
+
+# --- MENTION AUTOCOMPLETE ---
+# Where the @mention prefix index lives (see community/mentions.py), and how
+# long a viewer's ranking of their own people is cached.
+MENTION_REDIS_URL = os.getenv("MENTION_REDIS_URL", REDIS_URL)
+MENTION_AFFINITY_TTL = int(os.getenv("MENTION_AFFINITY_TTL", 300))
+
+# --- TYPED ENGAGEMENT TABLES ---
+# Read reactions from PostReaction/CommentReaction and post comments through
+# Comment.post rather than the generic relations (the ranked feed and
+# @mention affinity included). Off until the typed tables are complete:
+# deploy, run `manage.py backfill_typed_engagement`, then set
+# ENGAGEMENT_TYPED_READS=true.
+ENGAGEMENT_TYPED_READS = os.getenv("ENGAGEMENT_TYPED_READS", "false").lower() == "true"
+
+# --- RANKED FEED ---
+# The home feed's ?mode=top ranks the newest FEED_RANK_CANDIDATES posts of
+# the last FEED_RANK_WINDOW_DAYS (see community/feed_ranking.py). A ranking
+# is kept FEED_RANK_SNAPSHOT_TTL seconds for paging through.
+FEED_RANK_CANDIDATES = int(os.getenv("FEED_RANK_CANDIDATES", 500))
+FEED_RANK_WINDOW_DAYS = int(os.getenv("FEED_RANK_WINDOW_DAYS", 7))
+FEED_RANK_HALF_LIFE_HOURS = float(os.getenv("FEED_RANK_HALF_LIFE_HOURS", 12.0))
+FEED_RANK_SNAPSHOT_TTL = int(os.getenv("FEED_RANK_SNAPSHOT_TTL", 30 * 60))
+
 # --- GOOGLE SOCIAL AUTHENTICATION ---
 SOCIALACCOUNT_PROVIDERS = {
     "google": {
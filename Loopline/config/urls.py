@@ -15,6 +15,7 @@ from community.views import (
     CustomConfirmEmailView,
     password_reset_redirect_view,
     GoogleLogin,
+    media_blob_view,
 )
 
 urlpatterns = [
@@ -44,4 +45,12 @@ if settings.DEBUG:
     # --- END OF FIX ---
 
 if settings.DEBUG:
+    # Content-addressed blobs are immutable, so they get long-lived cache headers.
+    urlpatterns.append(
+        re_path(
+            rf"^{settings.MEDIA_URL.lstrip('/')}blobs/(?P<path>.*)$",
+            media_blob_view,
+            name="media-blob",
+        )
+    )
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
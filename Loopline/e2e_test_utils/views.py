@@ -20,13 +20,9 @@ from community.models import (
     Poll,
     PollOption,
     UserProfile,
-    Skill,
-    SkillCategory,
-    Education,
-    Experience,
-    Comment,
     Like,
 )
+from community.purge import purge_now
 from allauth.account.models import EmailAddress
 
 User = get_user_model()
@@ -49,6 +45,10 @@ class TestSetupAPIView(APIView):
         action = request.data.get("action")
         data = request.data.get("data", {})
 
+        if action == "cleanup":
+            # Outside the transaction below: the purge commits batch by batch.
+            return self.cleanup()
+
         try:
             with transaction.atomic():
                 if action == "create_user":
@@ -347,50 +347,35 @@ class TestSetupAPIView(APIView):
                             status=status.HTTP_404_NOT_FOUND,
                         )
 
-                elif action == "cleanup":
-                    # --- 1. Identify users by the specific Cypress domain ONLY ---
-                    # We also exclude superusers as a final "emergency brake"
-                    users_to_delete = User.objects.filter(
-                        email__endswith="@cypresstest.com"
-                    ).exclude(is_superuser=True)
-
-                    # --- 2. Targeted cleanup of data belonging ONLY to these users ---
-                    # This ensures "Frontend Magic" is gone for Cypress users,
-                    # but if YOU created "Frontend Magic" on your real account, it stays!
-
-                    SkillCategory.objects.filter(
-                        user_profile__user__in=users_to_delete
-                    ).delete()
-                    Skill.objects.filter(
-                        category__user_profile__user__in=users_to_delete
-                    ).delete()
-                    Education.objects.filter(
-                        user_profile__user__in=users_to_delete
-                    ).delete()
-                    Experience.objects.filter(
-                        user_profile__user__in=users_to_delete
-                    ).delete()
-
-                    Comment.objects.filter(author__in=users_to_delete).delete()
-                    StatusPost.objects.filter(author__in=users_to_delete).delete()
-
-                    # Groups created by these specific test users
-                    groups_deleted_count, _ = Group.objects.filter(
-                        creator__in=users_to_delete
-                    ).delete()
-
-                    # --- 3. Finally, delete the test users themselves ---
-                    users_deleted_count, _ = users_to_delete.delete()
-
-                    return Response(
-                        {
-                            "status": "success",
-                            "message": "Domain-locked cleanup complete. Only @cypresstest.com users removed.",
-                            "users_deleted": users_deleted_count,
-                            "groups_deleted": groups_deleted_count,
-                        },
-                        status=status.HTTP_200_OK,
-                    )
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    def cleanup(self):
+        # --- 1. Identify users by the specific Cypress domain ONLY ---
+        # We also exclude superusers as a final "emergency brake"
+        users_to_delete = User.objects.filter(
+            email__endswith="@cypresstest.com"
+        ).exclude(is_superuser=True)
+
+        # --- 2. Purge the groups they created, then the users themselves ---
+        # Everything that belongs to them (posts, comments, likes, profile
+        # sections, ...) goes with them in small batches (see
+        # community/purge.py), so "Frontend Magic" is gone for Cypress users,
+        # but if YOU created "Frontend Magic" on your real account, it stays!
+        try:
+            groups_deleted = purge_now(
+                Group.objects.filter(creator__in=users_to_delete)
+            )
+            users_deleted = purge_now(users_to_delete)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "status": "success",
+                "message": "Domain-locked cleanup complete. Only @cypresstest.com users removed.",
+                "users_deleted": users_deleted.get(User._meta.label, 0),
+                "groups_deleted": groups_deleted.get(Group._meta.label, 0),
+            },
+            status=status.HTTP_200_OK,
+        )
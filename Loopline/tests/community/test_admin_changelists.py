@@ -0,0 +1,133 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_admin_changelists.py
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from community.admin_tools import EstimatedCountPaginator
+from community.models import Comment, Follow, Like, Report, StatusPost
+from tests.conftest import user_factory
+
+pytestmark = pytest.mark.django_db
+
+
+def admin_client(user_factory):
+    client = Client()
+    client.force_login(user_factory(username="admin", is_staff=True, is_superuser=True))
+    return client
+
+
+def populate(user_factory, count):
+    """`count` posts, each commented on, liked, reported and followed for."""
+    owner = user_factory(username_prefix="owner")
+    for _ in range(count):
+        fan = user_factory(username_prefix="fan")
+        post = StatusPost.objects.create(author=owner, content="Post")
+        comment = Comment.objects.create(
+            author=fan, content_object=post, content="Nice"
+        )
+        Like.objects.create(user=fan, content_object=comment)
+        Follow.objects.create(follower=fan, following=owner)
+        Report.objects.create(reporter=fan, content_object=comment, reason="SPAM")
+
+
+def changelist_queries(client, model):
+    url = reverse(f"admin:community_{model}_changelist")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.parametrize(
+    "model", ["notification", "report", "comment", "like", "statuspost"]
+)
+def test_changelist_queries_do_not_grow_with_the_page(user_factory, model):
+    """
+    Verifies the big changelists fetch the page's related and generic
+    objects in a fixed number of queries, however many rows are shown.
+    """
+    # Arrange
+    client = admin_client(user_factory)
+    populate(user_factory, 2)
+    changelist_queries(client, model)  # Warms the content type cache.
+    few = changelist_queries(client, model)
+    populate(user_factory, 6)
+
+    # Act
+    many = changelist_queries(client, model)
+
+    # Assert
+    assert many == few
+
+
+def test_author_filter_is_a_search_box_not_a_list_of_users(user_factory):
+    """
+    Verifies the post changelist filters by author through autocomplete
+    rather than rendering every user, and that the filter still applies.
+    """
+    # Arrange
+    client = admin_client(user_factory)
+    populate(user_factory, 3)
+    author = StatusPost.objects.first().author
+    url = reverse("admin:community_statuspost_changelist")
+
+    # Act
+    listing = client.get(url)
+    search = client.get(
+        reverse("admin:autocomplete"),
+        {
+            "app_label": "community",
+            "model_name": "statuspost",
+            "field_name": "author",
+            "term": "owner",
+        },
+    )
+    filtered = client.get(url, {"author__id__exact": author.pk})
+
+    # Assert
+    assert "admin-autocomplete" in listing.content.decode()
+    assert "fan_1" not in listing.content.decode()
+    assert [r["text"] for r in search.json()["results"]] == [author.username]
+    assert filtered.context["cl"].result_count == 3
+
+
+def test_report_content_author_link_filters_reports(user_factory):
+    """Verifies "Content Author" links to that author's reports only."""
+    # Arrange
+    client = admin_client(user_factory)
+    populate(user_factory, 3)
+    author = Comment.objects.order_by("id").first().author
+
+    # Act
+    response = client.get(
+        reverse("admin:community_report_changelist"), {"content_author": author.pk}
+    )
+
+    # Assert
+    assert response.context["cl"].result_count == 1
+
+
+def test_paginator_uses_the_planner_estimate_for_big_tables(user_factory):
+    """
+    Verifies past the threshold the paginator reads pg_class.reltuples
+    instead of counting, and counts exactly below it.
+    """
+    # Arrange
+    populate(user_factory, 5)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE community_statuspost")
+
+    class Tiny(EstimatedCountPaginator):
+        exact_below = 1
+
+    # Act
+    with CaptureQueriesContext(connection) as queries:
+        estimated = Tiny(StatusPost.objects.all(), 10).count
+    exact = EstimatedCountPaginator(StatusPost.objects.all(), 10).count
+
+    # Assert
+    assert estimated == exact == 5
+    assert "reltuples" in queries[0]["sql"]
+    assert not any("COUNT(" in query["sql"] for query in queries)
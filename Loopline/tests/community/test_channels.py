@@ -9,7 +9,8 @@ from rest_framework.authtoken.models import Token
 import asyncio
 
 
-from community.models import StatusPost, Follow, Like, Comment, Group, GroupJoinRequest, Notification
+from community.models import StatusPost, Follow, Like, Comment, Group, GroupJoinRequest, Notification, Poll, PollOption, PollVote
+from community import live_polls
 from config.asgi import application
 
 pytestmark = pytest.mark.django_db(transaction=True)
@@ -457,4 +458,74 @@ async def test_self_mention_in_post_does_not_send_realtime_notification():
     await create_post(author=user, content=f"A note for @{user.username}")
     await communicator.receive_nothing()
 
-    await communicator.disconnect()
\ No newline at end of file
+    await communicator.disconnect()
+
+# ===============================================================
+# LIVE POLL TALLIES
+# ===============================================================
+
+@database_sync_to_async
+def create_poll(author, question, option_texts):
+    post = StatusPost.objects.create(author=author, content=question)
+    poll = Poll.objects.create(post=post, question=question)
+    options = [PollOption.objects.create(poll=poll, text=text) for text in option_texts]
+    return poll, options
+
+@database_sync_to_async
+def cast_vote(user, poll, option):
+    return PollVote.objects.create(user=user, poll=poll, option=option)
+
+@pytest.mark.asyncio
+async def test_poll_votes_push_coalesced_tallies_to_subscribers(monkeypatch):
+    """
+    Verifies that a burst of votes produces one immediate push plus one
+    trailing push with the latest counts, and that pushes carry only counts.
+    """
+    # Arrange: run the end-of-window flush by hand instead of on a timer.
+    monkeypatch.setattr(live_polls, '_schedule_flush', lambda poll_id, delay: None)
+    author = await create_user('poll_author_rt')
+    watcher = await create_user('poll_watcher_rt')
+    voters = [await create_user(f'poll_voter_rt_{i}') for i in range(3)]
+    poll, (option_a, option_b) = await create_poll(author, "Tabs or spaces?", ["Tabs", "Spaces"])
+
+    communicator = WebsocketCommunicator(application, f"/ws/activity/?token={await get_auth_token(watcher)}")
+    connected, _ = await communicator.connect()
+    assert connected, "WebSocket connection failed."
+    await communicator.send_json_to({'type': 'subscribe_poll', 'poll_id': poll.id})
+    await communicator.receive_nothing()
+
+    # Act 1: The first vote is pushed straight away.
+    await cast_vote(voters[0], poll, option_a)
+    first_push = await communicator.receive_json_from(timeout=1)
+
+    # Act 2: Votes inside the window are held back...
+    await cast_vote(voters[1], poll, option_a)
+    await cast_vote(voters[2], poll, option_b)
+    assert await communicator.receive_nothing()
+
+    # ...until the window closes, when one push carries the latest counts.
+    await database_sync_to_async(live_polls.flush_poll_tallies)(poll.id)
+    trailing_push = await communicator.receive_json_from(timeout=1)
+
+    # Assert
+    assert first_push == {
+        'type': 'poll_tallies',
+        'payload': {
+            'poll_id': poll.id,
+            'post_id': poll.post_id,
+            'options': [
+                {'id': option_a.id, 'vote_count': 1},
+                {'id': option_b.id, 'vote_count': 0},
+            ],
+            'total_votes': 1,
+            'is_closed': False,
+        },
+    }
+    assert trailing_push['payload']['total_votes'] == 3
+    assert [o['vote_count'] for o in trailing_push['payload']['options']] == [2, 1]
+
+    # A quiet window sends nothing and frees the poll for the next vote.
+    await database_sync_to_async(live_polls.flush_poll_tallies)(poll.id)
+    assert await communicator.receive_nothing()
+
+    await communicator.disconnect()
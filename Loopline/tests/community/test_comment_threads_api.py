@@ -0,0 +1,145 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_comment_threads_api.py
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from rest_framework import status
+from community.models import Comment, Like, StatusPost
+
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def post(user_factory):
+    return StatusPost.objects.create(author=user_factory(), content="Discuss")
+
+
+def add_comment(post, author, content, parent=None):
+    return Comment.objects.create(
+        author=author, content=content, content_object=post, parent=parent
+    )
+
+
+def test_comments_get_paths_and_counters(user_factory, post):
+    """
+    Verifies new comments get a materialized path under their parent, and
+    that reply and comment counters follow creates and deletes.
+    """
+    # Arrange
+    author = user_factory()
+    root = add_comment(post, author, "Root")
+
+    # Act
+    reply = add_comment(post, author, "Reply", parent=root)
+    nested = add_comment(post, author, "Nested", parent=reply)
+
+    # Assert
+    assert nested.path == f"{root.pk:010d}/{reply.pk:010d}/{nested.pk:010d}/"
+    assert list(root.subtree()) == [reply, nested]
+    root.refresh_from_db()
+    post.refresh_from_db()
+    assert (root.reply_count, post.comment_count) == (1, 3)
+
+    # Act 2
+    reply.delete()
+
+    # Assert 2
+    root.refresh_from_db()
+    post.refresh_from_db()
+    assert (root.reply_count, post.comment_count) == (0, 1)
+
+
+def test_threads_page_embeds_reply_previews(user_factory, api_client_factory, post):
+    """
+    Verifies the threads endpoint pages top-level comments, embeds the first
+    replies of each thread with a link to the rest, and hydrates the
+    viewer's likes.
+    """
+    # Arrange
+    viewer = user_factory()
+    author = user_factory()
+    first = add_comment(post, author, "First")
+    replies = [add_comment(post, author, f"Reply {i}", parent=first) for i in range(3)]
+    nested = add_comment(post, author, "Nested", parent=replies[0])
+    second = add_comment(post, author, "Second")
+    add_comment(post, author, "Third")
+    Like.objects.create(user=viewer, content_object=nested)
+    client = api_client_factory(user=viewer)
+
+    # Act
+    response = client.get(
+        f"/api/comments/statuspost/{post.id}/threads/?page_size=2&replies=2"
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [c["content"] for c in data["results"]] == ["First", "Second"]
+    assert data["next"] is not None
+    thread = data["results"][0]
+    assert thread["reply_count"] == 3
+    assert [r["content"] for r in thread["replies"]] == ["Reply 0", "Nested"]
+    assert thread["replies"][1]["is_liked_by_user"] is True
+    assert data["results"][1]["replies"] == []
+    assert data["results"][1]["more_replies"] is None
+
+    # Act 2: Follow the thread's "more replies" link.
+    more = client.get(thread["more_replies"]).json()
+
+    # Assert 2
+    assert [r["content"] for r in more["results"]] == ["Reply 1", "Reply 2"]
+    assert more["next"] is None
+
+
+def test_each_thread_previews_its_own_replies(user_factory, api_client_factory, post):
+    """
+    Verifies every thread on a page gets its own first replies, and a "more"
+    link only when it has more than the preview shows.
+    """
+    # Arrange
+    author = user_factory()
+    big = add_comment(post, author, "Big")
+    for i in range(6):
+        add_comment(post, author, f"Big reply {i}", parent=big)
+    small = add_comment(post, author, "Small")
+    for i in range(2):
+        add_comment(post, author, f"Small reply {i}", parent=small)
+    client = api_client_factory(user=author)
+
+    # Act
+    response = client.get(f"/api/comments/statuspost/{post.id}/threads/?replies=2")
+
+    # Assert
+    big_thread, small_thread = response.json()["results"]
+    assert [r["content"] for r in big_thread["replies"]] == [
+        "Big reply 0",
+        "Big reply 1",
+    ]
+    assert big_thread["more_replies"] is not None
+    assert [r["content"] for r in small_thread["replies"]] == [
+        "Small reply 0",
+        "Small reply 1",
+    ]
+    assert small_thread["more_replies"] is None
+
+
+def test_replies_endpoint_pages_whole_subtree(user_factory, api_client_factory, post):
+    """
+    Verifies the replies endpoint lists a comment's descendants depth-first.
+    """
+    # Arrange
+    author = user_factory()
+    root = add_comment(post, author, "Root")
+    a = add_comment(post, author, "A", parent=root)
+    b = add_comment(post, author, "B", parent=root)
+    add_comment(post, author, "A1", parent=a)
+    add_comment(post, author, "B1", parent=b)
+    client = api_client_factory(user=user_factory())
+
+    # Act
+    page = client.get(f"/api/comments/{root.id}/replies/?page_size=3").json()
+    rest = client.get(page["next"]).json()
+
+    # Assert
+    assert [r["content"] for r in page["results"]] == ["A", "A1", "B"]
+    assert [r["content"] for r in rest["results"]] == ["B1"]
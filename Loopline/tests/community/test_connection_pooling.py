@@ -0,0 +1,59 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_connection_pooling.py
+import json
+
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import user_factory, api_client_factory
+
+
+@pytest.mark.django_db
+def test_database_health_check(user_factory, api_client_factory, settings):
+    """
+    Verifies the database health check pings the primary for anyone, and
+    shows connection details only to staff.
+    """
+    # Arrange
+    staff = user_factory(is_staff=True)
+
+    # Act
+    public = api_client_factory().get("/api/health-check/db/")
+    detailed = api_client_factory(user=staff).get("/api/health-check/db/")
+
+    # Assert
+    assert public.status_code == detailed.status_code == 200
+    assert public.json()["status"] == "ok"
+    assert set(public.json()["databases"]["default"]) == {"ok", "latency_ms"}
+    default = detailed.json()["databases"]["default"]
+    assert default["ok"] is True
+    assert "server_connections" in default
+    if settings.DATABASE_POOL_MODE == "pool":
+        assert default["pool"]["pool_max"] == settings.DATABASE_POOL_MAX_SIZE
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_connections_reports_load(user_factory, tmp_path):
+    """
+    Verifies the benchmark drives HTTP and WebSocket clients through the ASGI
+    application and reports their latency and the connections used.
+    """
+    # Arrange
+    user_factory(username="bench")
+    report_path = tmp_path / "report.json"
+
+    # Act
+    call_command(
+        "benchmark_connections",
+        "--http-clients=2",
+        "--ws-clients=2",
+        "--duration=1",
+        f"--output={report_path}",
+    )
+    report = json.loads(report_path.read_text())
+
+    # Assert
+    assert report["path"] == "/api/feed/"
+    for side in ("http", "websocket"):
+        assert report[side]["count"] > 0
+        assert report[side]["errors"] == 0
+    assert report["server_connections"]["peak"] >= 1
@@ -0,0 +1,135 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_db_routing.py
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.response import Response
+from community import db_routing
+from community.models import StatusPost
+
+router = db_routing.PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    """
+    Two replicas whose lag each test sets. No queries reach them, and these
+    tests run outside the test transaction, which would keep reads on the
+    primary.
+    """
+    lags = {"replica_1": 0.0, "replica_2": 0.0}
+    settings.DATABASE_REPLICAS = list(lags)
+    settings.REPLICA_LAG_CHECK_INTERVAL = 0
+    monkeypatch.setattr(db_routing, "replica_lag", lags.get)
+    monkeypatch.setattr(db_routing, "_lag_checks", {})
+    return lags
+
+
+def serve(method, path, token="alice", write=False, status=200):
+    """Runs a request through the middleware and returns where it read from."""
+    reads = []
+
+    def view(request):
+        reads.append(router.db_for_read(StatusPost))
+        if write:
+            router.db_for_write(StatusPost)
+            reads.append(router.db_for_read(StatusPost))
+        return HttpResponse(status=status)
+
+    request = getattr(RequestFactory(), method)(
+        path, HTTP_AUTHORIZATION=f"Token {token}"
+    )
+    db_routing.ReplicaRoutingMiddleware(view)(request)
+    return reads
+
+
+def test_safe_requests_read_from_a_healthy_replica(replicas):
+    """
+    Verifies safe API reads go to a replica that is keeping up, and to the
+    primary once the request itself has written.
+    """
+    # Arrange
+    replicas["replica_1"] = 30.0
+    replicas["replica_2"] = 0.5
+
+    # Act
+    reads = serve("get", "/api/feed/", write=True)
+    replicas["replica_2"] = None  # Unreachable.
+    fallback = serve("get", "/api/feed/")
+
+    # Assert
+    assert reads == ["replica_2", "default"]
+    # With no replica fit to read, reads fall back to the primary.
+    assert fallback == ["default"]
+
+
+def test_writes_pin_the_client_to_the_primary(replicas, settings):
+    """
+    Verifies a client's successful write pins only its own reads to the
+    primary, and that auth endpoints and writes never touch replicas.
+    """
+    # Arrange
+    settings.REPLICA_STICKY_SECONDS = 60
+
+    # Act
+    before = serve("get", "/api/feed/")
+    serve("post", "/api/posts/", status=400)
+    after_failed_write = serve("get", "/api/feed/")
+    in_write = serve("post", "/api/posts/", status=201)
+    after_write = serve("get", "/api/feed/")
+    other_client = serve("get", "/api/feed/", token="bob")
+    auth = serve("get", "/api/auth/user/", token="carol")
+
+    # Assert
+    assert before[0].startswith("replica_")
+    assert after_failed_write[0].startswith("replica_")
+    assert in_write == after_write == auth == ["default"]
+    assert other_client[0].startswith("replica_")
+
+
+def test_login_pins_the_token_it_issues(replicas, settings):
+    """
+    Verifies the token handed out by a login is pinned to the primary, so
+    the client's next request can find it, and that reads whose result is
+    cached stay on the primary.
+    """
+    # Arrange
+    settings.REPLICA_STICKY_SECONDS = 60
+    request = RequestFactory().post("/api/auth/login/")
+    db_routing.ReplicaRoutingMiddleware(lambda request: Response({"key": "dave"}))(
+        request
+    )
+    reads = []
+
+    def cached_read(request):
+        with db_routing.primary_reads():
+            reads.append(router.db_for_read(StatusPost))
+        return HttpResponse()
+
+    # Act
+    after_login = serve("get", "/api/feed/", token="dave")
+    db_routing.ReplicaRoutingMiddleware(cached_read)(
+        RequestFactory().get("/api/profiles/erin/", HTTP_AUTHORIZATION="Token erin")
+    )
+
+    # Assert
+    assert after_login == ["default"]
+    assert reads == ["default"]
+
+
+@pytest.mark.django_db
+def test_lag_check_and_no_replicas(settings):
+    """
+    Verifies the lag query runs against a real server, which as a primary is
+    never behind, and that without replicas the router stays out of the way.
+    """
+    # Arrange
+    settings.DATABASE_REPLICAS = []
+
+    # Act
+    lag = db_routing.replica_lag("default")
+    reads = serve("get", "/api/feed/")
+
+    # Assert
+    assert lag == 0.0
+    assert reads == [None]
+    assert router.db_for_write(StatusPost) is None
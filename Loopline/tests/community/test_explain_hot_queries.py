@@ -0,0 +1,70 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_explain_hot_queries.py
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from community.models import (
+    Conversation,
+    Follow,
+    Group,
+    Message,
+    RecommendationImpression,
+    StatusPost,
+)
+
+from tests.conftest import user_factory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_explain_hot_queries_reports_and_checks_baseline(user_factory, tmp_path):
+    """
+    Verifies the command explains every hot view without writing anything,
+    and that a run compared with its own report finds nothing new.
+    """
+    # Arrange
+    star, fan = user_factory(username="star"), user_factory()
+    Follow.objects.create(follower=fan, following=star)
+    group = Group.objects.create(creator=star, name="Busy")
+    StatusPost.objects.create(author=star, content="Hello", group=group)
+    conversation = Conversation.objects.create()
+    conversation.participants.add(star, fan)
+    Message.objects.create(conversation=conversation, sender=fan, content="Hi")
+    report_path = tmp_path / "report.json"
+
+    # Act
+    call_command("explain_hot_queries", "--min-rows=0", f"--output={report_path}")
+    report = json.loads(report_path.read_text())
+    call_command("explain_hot_queries", "--min-rows=0", f"--baseline={report_path}")
+
+    # Assert
+    assert report["user"] == "star"
+    views = {view["view"]: view for view in report["views"]}
+    assert set(views) == {
+        "feed",
+        "group_feed",
+        "profile_posts",
+        "discover",
+        "notifications",
+        "messages",
+    }
+    assert all(view["status"] == 200 and view["queries"] for view in views.values())
+    # Tiny tables are scanned sequentially, which --min-rows=0 reports.
+    assert any(
+        f["kind"] == "seq_scan" for view in views.values() for f in view["findings"]
+    )
+    # Discover records impressions; the rolled-back run must not.
+    assert not RecommendationImpression.objects.exists()
+
+
+def test_explain_hot_queries_fails_on_new_findings(user_factory, tmp_path):
+    """Verifies findings missing from the baseline fail the command."""
+    # Arrange
+    StatusPost.objects.create(author=user_factory(), content="Hello")
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"views": []}))
+
+    # Act & Assert
+    with pytest.raises(CommandError):
+        call_command("explain_hot_queries", "--min-rows=0", f"--baseline={baseline}")
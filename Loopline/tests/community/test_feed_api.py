@@ -185,4 +185,118 @@ def test_feed_pagination_works_correctly(user_factory, api_client_factory):
     
     # The first result on the second page should be "Post number 1",
     # as page 1 contained posts 11 down to 2.
-    assert data_page2['results'][0]['content'] == "Post number 1"
\ No newline at end of file
+    assert data_page2['results'][0]['content'] == "Post number 1"
+
+def test_feed_visibility_follows_membership_changes(feed_scenario, api_client_factory):
+    """
+    Verifies the cached group-visibility sets are refreshed when the viewer
+    joins or leaves a private group, or a group's privacy changes, and that
+    the feed query no longer needs DISTINCT.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # Arrange
+    user_a = feed_scenario['user_a']
+    group = feed_scenario['post_b_private'].group
+    client = api_client_factory(user=user_a)
+
+    def feed_contents():
+        return [post['content'] for post in client.get('/api/feed/').json()['results']]
+
+    # Act & Assert: Not a member yet; this also caches the visible set.
+    with CaptureQueriesContext(connection) as queries:
+        assert feed_scenario['post_b_private'].content not in feed_contents()
+    assert not any('DISTINCT' in q['sql'] for q in queries.captured_queries)
+
+    group.members.add(user_a)
+    assert feed_scenario['post_b_private'].content in feed_contents()
+
+    group.members.remove(user_a)
+    assert feed_scenario['post_b_private'].content not in feed_contents()
+
+    group.privacy_level = 'public'
+    group.save()
+    assert feed_scenario['post_b_private'].content in feed_contents()
+
+
+@pytest.mark.parametrize('typed_reads', [False, True])
+def test_top_feed_ranks_by_engagement_and_affinity(
+    user_factory, api_client_factory, settings, typed_reads
+):
+    """
+    Verifies ?mode=top puts engaging posts and posts from close connections
+    above plain recency, and keeps the chronological feed's filters, with
+    affinity read from either reaction table.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from community.models import Comment, Like
+
+    # Arrange
+    settings.ENGAGEMENT_TYPED_READS = typed_reads
+    viewer, close, distant = user_factory(), user_factory(), user_factory()
+    Follow.objects.create(follower=viewer, following=close)
+    Follow.objects.create(follower=close, following=viewer)
+    Follow.objects.create(follower=viewer, following=distant)
+    private_group = Group.objects.create(creator=distant, name='Hidden', privacy_level='private')
+    now = timezone.now()
+
+    def post(author, content, hours_ago, **fields):
+        created = StatusPost.objects.create(author=author, content=content)
+        StatusPost.objects.filter(pk=created.pk).update(
+            created_at=now - timedelta(hours=hours_ago), **fields
+        )
+        return created
+
+    # The viewer has engaged with the close connection before.
+    earlier = post(close, 'Earlier', hours_ago=24 * 10)
+    Like.objects.create(user=viewer, content_object=earlier)
+    Comment.objects.create(author=viewer, content='Nice', content_object=earlier)
+    post(close, 'Close', hours_ago=3)
+    post(distant, 'Distant', hours_ago=1)
+    post(distant, 'Viral', hours_ago=2, like_count=50)
+    post(distant, 'Private', hours_ago=1, group=private_group)
+    client = api_client_factory(user=viewer)
+
+    # Act
+    top = client.get('/api/feed/?mode=top').json()
+    latest = client.get('/api/feed/').json()
+
+    # Assert
+    # 'Earlier' is older than the ranking window.
+    assert [p['content'] for p in top['results']] == ['Viral', 'Close', 'Distant']
+    assert top['next'] is None
+    assert [p['content'] for p in latest['results']] == [
+        'Distant', 'Viral', 'Close', 'Earlier'
+    ]
+
+
+def test_top_feed_pages_are_stable(user_factory, api_client_factory):
+    """
+    Verifies paging through the ranked feed neither repeats nor skips posts
+    when scores change between pages, and that a fresh load re-ranks.
+    """
+    # Arrange
+    viewer = user_factory()
+    posts = [StatusPost.objects.create(author=viewer, content=f'Post {i}') for i in range(5)]
+    client = api_client_factory(user=viewer)
+
+    # Act
+    page = client.get('/api/feed/?mode=top&page_size=2').json()
+    seen = [p['id'] for p in page['results']]
+    # The oldest post suddenly takes off, and a new one arrives.
+    StatusPost.objects.filter(pk=posts[0].pk).update(like_count=1000)
+    newcomer = StatusPost.objects.create(author=viewer, content='New')
+    pages = 1
+    while page['next']:
+        page = client.get(page['next']).json()
+        seen += [p['id'] for p in page['results']]
+        pages += 1
+    fresh = client.get('/api/feed/?mode=top&page_size=2').json()
+
+    # Assert
+    assert pages == 3
+    assert sorted(seen) == sorted(p.id for p in posts)
+    assert [p['id'] for p in fresh['results']] == [posts[0].id, newcomer.id]
+    assert client.get('/api/feed/?mode=top&cursor=bogus').status_code == status.HTTP_404_NOT_FOUND
@@ -50,15 +50,71 @@ def test_non_member_sees_limited_private_group_details(user_factory, api_client_
     client = api_client_factory(user=non_member)
     response = client.get(f'/api/groups/{group.slug}/')
     assert response.status_code == status.HTTP_200_OK
-    assert response.json()['members'] == []
+    assert response.json()['member_count'] == 2
+    assert 'members' not in response.json()
+    response = client.get(f'/api/groups/{group.slug}/members/')
+    assert response.status_code == status.HTTP_403_FORBIDDEN
 
 def test_member_can_see_full_private_group_details(user_factory, api_client_factory):
     creator, member = user_factory(), user_factory()
     group = Group.objects.create(creator=creator, name="Secret", privacy_level='private')
     group.members.add(creator, member)
     client = api_client_factory(user=member)
-    response = client.get(f'/api/groups/{group.slug}/')
-    assert len(response.json()['members']) == 2
+    response = client.get(f'/api/groups/{group.slug}/members/')
+    assert [u['id'] for u in response.json()['results']] == sorted([creator.id, member.id])
+
+def test_member_counter_follows_membership_changes(user_factory):
+    """Verifies member_count tracks adds, removes, both sides of the relation and user deletion."""
+    creator, a, b = user_factory(), user_factory(), user_factory()
+    group = Group.objects.create(creator=creator, name="Counted")
+    group.members.add(creator, a)
+    group.members.add(a)  # Already a member: not counted twice.
+    b.joined_groups.add(group)
+    group.refresh_from_db()
+    assert group.member_count == 3
+    group.members.remove(a)
+    b.delete()
+    group.refresh_from_db()
+    assert group.member_count == 1
+    group.name = "Renamed"
+    group.save()  # A stale save must not overwrite the counter.
+    group.refresh_from_db()
+    assert (group.name, group.member_count) == ("Renamed", 1)
+
+def test_group_members_endpoint_pages_by_cursor(user_factory, api_client_factory):
+    """Verifies a public group's members can be walked page by page."""
+    creator = user_factory()
+    group = Group.objects.create(creator=creator, name="Big Group")
+    members = [user_factory() for _ in range(4)]
+    group.members.add(creator, *members)
+    client = api_client_factory(user=user_factory())
+    first = client.get(f'/api/groups/{group.slug}/members/?page_size=3').json()
+    second = client.get(first['next']).json()
+    seen = [u['id'] for u in first['results'] + second['results']]
+    assert seen == sorted(u.id for u in [creator, *members])
+    assert second['next'] is None
+
+def test_group_list_resolves_membership_in_batch(user_factory, api_client_factory, django_assert_max_num_queries):
+    """Verifies the group list reports every status without per-group queries."""
+    viewer, owner = user_factory(), user_factory()
+    joined = Group.objects.create(creator=owner, name="Joined")
+    joined.members.add(viewer)
+    pending = Group.objects.create(creator=owner, name="Pending", privacy_level='private')
+    GroupJoinRequest.objects.create(user=viewer, group=pending)
+    blocked = Group.objects.create(creator=owner, name="Blocked")
+    GroupBlock.objects.create(user=viewer, group=blocked, blocked_by=owner)
+    own = Group.objects.create(creator=viewer, name="Own")
+    for i in range(6):
+        Group.objects.create(creator=owner, name=f"Other {i}")
+    client = api_client_factory(user=viewer)
+    with django_assert_max_num_queries(8):
+        response = client.get('/api/groups/')
+    statuses = {g['name']: g['membership_status'] for g in response.json()['results']}
+    assert statuses['Joined'] == 'member'
+    assert statuses['Pending'] == 'pending'
+    assert statuses['Blocked'] == 'blocked'
+    assert statuses['Own'] == 'creator'
+    assert statuses['Other 0'] == 'none'
 
 def test_creator_can_update_group(user_factory, api_client_factory):
     creator = user_factory()
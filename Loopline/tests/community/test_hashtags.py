@@ -0,0 +1,155 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_hashtags.py
+import time
+
+import pytest
+from django.core.management import call_command
+from community import hashtags
+from community.models import Group, PostHashtag, StatusPost
+from community.redis_client import get_redis
+
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def trending_redis(settings):
+    """Trending counters in a scratch Redis database, emptied around each test."""
+    settings.TRENDING_REDIS_URL = "redis://127.0.0.1:6379/15"
+    redis = get_redis(settings.TRENDING_REDIS_URL)
+    redis.flushdb()
+    yield redis
+    redis.flushdb()
+
+
+def test_extract_hashtags():
+    """Verifies which words count as tags, and that they are normalized."""
+    text = "Loving #Django and #django, #web3! Not C# or &#39; or #1; #naïve."
+
+    assert hashtags.extract_hashtags(text) == ["django", "web3", "naïve"]
+    assert hashtags.extract_hashtags(None) == []
+
+
+def test_tag_timeline_follows_post_content(user_factory, api_client_factory):
+    """
+    Verifies tags are indexed as posts are written and edited, and that a
+    tag's timeline pages newest first and hides private group posts.
+    """
+    # Arrange
+    author, viewer = user_factory(), user_factory()
+    private = Group.objects.create(
+        creator=author, name="Inner", privacy_level="private"
+    )
+    posts = [
+        StatusPost.objects.create(author=author, content=f"Day {i} of #Python")
+        for i in range(3)
+    ]
+    StatusPost.objects.create(author=author, content="#python secrets", group=private)
+    edited = StatusPost.objects.create(author=author, content="#python #rust")
+    client = api_client_factory(user=viewer)
+
+    # Act
+    edited.content = "Just #rust now"
+    edited.save()
+    first = client.get("/api/hashtags/python/posts/?page_size=2").json()
+    second = client.get(first["next"]).json()
+    search = client.get("/api/search/content/?q=%23Python").json()
+
+    # Assert
+    timeline = [p["id"] for p in first["results"] + second["results"]]
+    assert timeline == [posts[2].id, posts[1].id, posts[0].id]
+    assert second["next"] is None
+    assert sorted(p["id"] for p in search["results"]) == sorted(p.id for p in posts) + [
+        p.id for p in StatusPost.objects.filter(group=private)
+    ]
+    assert list(edited.post_hashtags.values_list("hashtag__name", flat=True)) == [
+        "rust"
+    ]
+    assert client.get("/api/hashtags/unknown/posts/").status_code == 404
+
+
+def test_backfill_indexes_old_posts(user_factory):
+    """Verifies the backfill command tags posts written before the index."""
+    # Arrange
+    post = StatusPost.objects.create(author=user_factory(), content="#old #news")
+    PostHashtag.objects.all().delete()
+
+    # Act
+    call_command("backfill_hashtags", batch_size=1)
+    call_command("backfill_hashtags")
+
+    # Assert
+    assert sorted(post.post_hashtags.values_list("hashtag__name", flat=True)) == [
+        "news",
+        "old",
+    ]
+
+
+def test_trending_counts_committed_uses(
+    user_factory, api_client_factory, trending_redis, django_capture_on_commit_callbacks
+):
+    """
+    Verifies committed posts feed the trending counters, which rank tags per
+    window and forget uses older than the window.
+    """
+    # Arrange
+    author = user_factory()
+    client = api_client_factory(user=author)
+    with django_capture_on_commit_callbacks(execute=True):
+        for content in ["#go #rust", "#rust", "#rust #zig", "#go"]:
+            StatusPost.objects.create(author=author, content=content)
+    # Two hours ago: inside the day, outside the hour.
+    hashtags.count_hashtag_uses(["zig"] * 5, now=time.time() - 2 * 60 * 60)
+
+    # Act
+    hour = client.get("/api/hashtags/trending/?window=1h").json()
+    day = client.get("/api/hashtags/trending/?window=24h&limit=2").json()
+    bad = client.get("/api/hashtags/trending/?window=year")
+
+    # Assert
+    assert hour["results"] == [
+        {"name": "rust", "uses": 3},
+        {"name": "go", "uses": 2},
+        {"name": "zig", "uses": 1},
+    ]
+    assert day["results"] == [{"name": "zig", "uses": 6}, {"name": "rust", "uses": 3}]
+    assert bad.status_code == 400
+    # Memory is bounded by the sketch, not the number of tags.
+    bucket = int(time.time() // 300)
+    assert trending_redis.hlen(f"trending:300:{bucket}:cms") <= (
+        hashtags.SKETCH_DEPTH * hashtags.SKETCH_WIDTH
+    )
+
+
+def test_trending_ignores_private_groups_and_survives_redis_outages(
+    user_factory,
+    api_client_factory,
+    trending_redis,
+    settings,
+    django_capture_on_commit_callbacks,
+):
+    """
+    Verifies only tags on posts everyone may see count towards trending, and
+    that trending is empty rather than an error while Redis is down.
+    """
+    # Arrange
+    author = user_factory()
+    client = api_client_factory(user=author)
+    public = Group.objects.create(creator=author, name="Open", privacy_level="public")
+    private = Group.objects.create(
+        creator=author, name="Secret", privacy_level="private"
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        StatusPost.objects.create(author=author, content="#launch")
+        StatusPost.objects.create(author=author, content="#launch", group=public)
+        StatusPost.objects.create(author=author, content="#codename", group=private)
+
+    # Act
+    trending = client.get("/api/hashtags/trending/?window=1h").json()
+    settings.TRENDING_REDIS_URL = "redis://127.0.0.1:1/0"
+    outage = client.get("/api/hashtags/trending/?window=1h")
+
+    # Assert
+    assert trending["results"] == [{"name": "launch", "uses": 2}]
+    assert outage.status_code == 200
+    assert outage.json()["results"] == []
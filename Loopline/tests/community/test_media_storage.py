@@ -0,0 +1,215 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_media_storage.py
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from community.models import MediaBlob, PostMedia, StatusPost
+from community.storage import select_media_storage
+from community.views import media_blob_view
+
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+IMAGE_BYTES = b"\x89PNG fake image bytes"
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def add_image(post, name="photo.png", content=IMAGE_BYTES):
+    return PostMedia.objects.create(
+        post=post, media_type="image", file=SimpleUploadedFile(name, content)
+    )
+
+
+def test_identical_uploads_are_stored_once(user_factory, media_root):
+    """
+    Verifies that the same image uploaded under different names is written
+    to disk once and shared by both posts through a single blob.
+    """
+    # Arrange
+    author = user_factory()
+    post_1 = StatusPost.objects.create(author=author, content="First")
+    post_2 = StatusPost.objects.create(author=author, content="Second")
+
+    # Act
+    media_1 = add_image(post_1, "seed_image.png")
+    media_2 = add_image(post_2, "seed_image_copy.png")
+
+    # Assert
+    assert media_1.file.name == media_2.file.name
+    assert media_1.file.name.startswith("blobs/")
+    assert media_1.blob_id == media_2.blob_id
+    assert MediaBlob.objects.get(digest=media_1.blob_id).ref_count == 2
+    assert len(list(media_root.rglob("*.png"))) == 1
+
+
+def test_bulk_created_media_take_blob_references(
+    user_factory, api_client_factory, media_root
+):
+    """
+    Verifies that media attached through the post API (which uses
+    bulk_create) are linked to their blobs and reference-counted.
+    """
+    # Arrange
+    author = user_factory()
+    client = api_client_factory(user=author)
+
+    # Act
+    response = client.post(
+        "/api/posts/",
+        {
+            "content": "Two of the same",
+            "images": [
+                SimpleUploadedFile("a.png", IMAGE_BYTES),
+                SimpleUploadedFile("b.png", IMAGE_BYTES),
+            ],
+        },
+        format="multipart",
+    )
+
+    # Assert
+    assert response.status_code == 201
+    blob = MediaBlob.objects.get()
+    assert blob.ref_count == 2
+    assert PostMedia.objects.filter(blob=blob).count() == 2
+
+
+def test_unreferenced_blobs_are_pruned(user_factory, media_root):
+    """
+    Verifies that deleting the last post using a blob leaves it unreferenced,
+    and that the prune command then removes the file.
+    """
+    # Arrange
+    author = user_factory()
+    post_1 = StatusPost.objects.create(author=author, content="First")
+    post_2 = StatusPost.objects.create(author=author, content="Second")
+    blob_name = add_image(post_1).file.name
+    add_image(post_2)
+
+    # Act 1: Deleting one post keeps the blob alive for the other.
+    post_1.delete()
+    call_command("prune_media_blobs", grace_minutes=0)
+    assert select_media_storage().exists(blob_name)
+
+    # Act 2: Deleting the second post makes it prunable.
+    post_2.delete()
+    call_command("prune_media_blobs", grace_minutes=0)
+
+    # Assert
+    assert not MediaBlob.objects.exists()
+    assert not select_media_storage().exists(blob_name)
+
+
+def test_storing_a_blob_again_keeps_it_from_the_pruner(user_factory, media_root):
+    """
+    Verifies that content stored again while its blob waits to be pruned is
+    left alone until the new reference is taken, and that a file missing
+    from disk is written again instead of being reused.
+    """
+    # Arrange
+    author = user_factory()
+    post = StatusPost.objects.create(author=author, content="First")
+    blob_name = add_image(post).file.name
+    post.delete()
+    MediaBlob.objects.update(updated_at=timezone.now() - timedelta(hours=2))
+    storage = select_media_storage()
+
+    # Act 1: An upload of the same content is stored, not yet referenced.
+    stored_name = storage.save(
+        "again.png", SimpleUploadedFile("again.png", IMAGE_BYTES)
+    )
+    call_command("prune_media_blobs", grace_minutes=60)
+
+    # Assert 1
+    assert stored_name == blob_name
+    assert storage.exists(blob_name)
+    assert MediaBlob.objects.get().ref_count == 0
+
+    # Act 2: The file vanished from disk behind the blob's back.
+    storage.delete(blob_name)
+    media = add_image(StatusPost.objects.create(author=author, content="Second"))
+
+    # Assert 2
+    assert media.file.name == blob_name
+    assert storage.open(blob_name).read() == IMAGE_BYTES
+    assert MediaBlob.objects.get().ref_count == 1
+
+
+def test_concurrent_uploads_of_the_same_content_share_the_blob(
+    user_factory, media_root, monkeypatch
+):
+    """
+    Verifies that an upload which lost the race to write its content uses
+    the file the winner wrote instead of storing a renamed, untracked copy.
+    """
+    # Arrange
+    author = user_factory()
+    blob_name = add_image(
+        StatusPost.objects.create(author=author, content="First")
+    ).file.name
+    storage_class = type(select_media_storage())
+    real_exists = storage_class.exists
+    checks = []
+
+    def exists_after_first_check(self, name):
+        # The loser's check ran before the winner's file appeared.
+        if name == blob_name and not checks:
+            checks.append(name)
+            return False
+        return real_exists(self, name)
+
+    monkeypatch.setattr(storage_class, "exists", exists_after_first_check)
+
+    # Act
+    media = add_image(StatusPost.objects.create(author=author, content="Second"))
+
+    # Assert
+    assert media.file.name == blob_name
+    assert len(list(media_root.rglob("*.png"))) == 1
+    assert MediaBlob.objects.get().ref_count == 2
+
+
+def test_changing_profile_picture_moves_blob_reference(user_factory, media_root):
+    """
+    Verifies that replacing a profile picture releases the old blob and
+    references the new one.
+    """
+    # Arrange
+    profile = user_factory().profile
+    profile.picture = SimpleUploadedFile("me.png", b"old picture")
+    profile.save()
+    old_digest = profile.picture_blob_id
+
+    # Act
+    profile.picture = SimpleUploadedFile("me.png", b"new picture")
+    profile.save()
+
+    # Assert
+    assert profile.picture_blob_id != old_digest
+    assert MediaBlob.objects.get(digest=old_digest).ref_count == 0
+    assert MediaBlob.objects.get(digest=profile.picture_blob_id).ref_count == 1
+
+
+def test_blobs_are_served_with_immutable_cache_headers(user_factory, media_root, rf):
+    """
+    Verifies that blob URLs are marked as cacheable forever.
+    """
+    # Arrange
+    post = StatusPost.objects.create(author=user_factory(), content="Cached")
+    media = add_image(post)
+    blob_path = media.file.name.split("blobs/", 1)[1]
+
+    # Act
+    response = media_blob_view(rf.get(media.file.url), blob_path)
+
+    # Assert
+    assert response.status_code == 200
+    assert "immutable" in response["Cache-Control"]
+    assert "max-age=31536000" in response["Cache-Control"]
@@ -0,0 +1,114 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_mentions.py
+import pytest
+from django.core.management import call_command
+from community.models import Follow, Like, StatusPost
+from community.redis_client import get_redis
+
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def mention_redis(settings):
+    """The mention index in a scratch Redis database, emptied around each test."""
+    settings.MENTION_REDIS_URL = "redis://127.0.0.1:6379/15"
+    redis = get_redis(settings.MENTION_REDIS_URL)
+    redis.flushdb()
+    yield redis
+    redis.flushdb()
+
+
+def suggest(client, q, **params):
+    response = client.get("/api/search/mentions/", {"q": q, **params})
+    assert response.status_code == 200
+    return [user["username"] for user in response.json()["results"]]
+
+
+def test_index_follows_user_and_profile_saves(
+    user_factory, api_client_factory, mention_redis, django_capture_on_commit_callbacks
+):
+    """
+    Verifies users are found by username, name and display name, and that
+    renames, display name changes and deactivation update the index.
+    """
+    # Arrange
+    with django_capture_on_commit_callbacks(execute=True):
+        viewer = user_factory(username="viewer")
+        ada = user_factory(username="ada", first_name="Augusta", last_name="King")
+        gone = user_factory(username="adam")
+    client = api_client_factory(user=viewer)
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        ada.username = "countess"
+        ada.save()
+        ada.profile.display_name = "Lady Lovelace"
+        ada.profile.save()
+        gone.is_active = False
+        gone.save()
+
+    # Assert
+    assert suggest(client, "@Ad") == []
+    assert suggest(client, "count") == ["countess"]
+    assert suggest(client, "kin") == ["countess"]
+    assert suggest(client, "LOVE") == ["countess"]
+    assert suggest(client, "augusta k") == ["countess"]
+    assert suggest(client, "") == []
+
+    # A rebuild restores a lost index.
+    mention_redis.flushdb()
+    assert suggest(client, "count") == []
+    call_command("rebuild_mention_index", batch_size=2)
+    assert suggest(client, "count") == ["countess"]
+
+
+@pytest.mark.parametrize("typed_reads", [False, True])
+def test_suggestions_rank_the_viewers_people_first(
+    user_factory,
+    api_client_factory,
+    mention_redis,
+    django_capture_on_commit_callbacks,
+    settings,
+    typed_reads,
+):
+    """
+    Verifies people the viewer follows, then people who follow them or whose
+    posts they reacted to, come before everyone else, who stay in name order,
+    with reactions read from either table.
+    """
+    # Arrange
+    settings.ENGAGEMENT_TYPED_READS = typed_reads
+    with django_capture_on_commit_callbacks(execute=True):
+        viewer = user_factory(username="sam")
+        names = ["sa_anna", "sa_ben", "sa_cleo", "sa_dev", "sa_eve", "sa_finn"]
+        users = {name: user_factory(username=name) for name in names}
+    Follow.objects.create(follower=viewer, following=users["sa_eve"])
+    Follow.objects.create(follower=users["sa_dev"], following=viewer)
+    post = StatusPost.objects.create(author=users["sa_finn"], content="Hi")
+    Like.objects.create(user=viewer, content_object=post)
+    client = api_client_factory(user=viewer)
+
+    # Act
+    results = suggest(client, "sa", limit=5)
+
+    # Assert
+    assert results == ["sa_eve", "sa_dev", "sa_finn", "sa_anna", "sa_ben"]
+    assert "sam" not in suggest(client, "sam")
+
+
+def test_suggestions_fall_back_to_the_database(
+    user_factory, api_client_factory, settings
+):
+    """Verifies the typeahead still answers, from the database, without Redis."""
+    # Arrange
+    settings.MENTION_REDIS_URL = "redis://127.0.0.1:1/0"
+    viewer = user_factory(username="viewer")
+    user_factory(username="grace", last_name="Hopper")
+    client = api_client_factory(user=viewer)
+
+    # Act
+    results = suggest(client, "hop")
+
+    # Assert
+    assert results == ["grace"]
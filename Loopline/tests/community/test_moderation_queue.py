@@ -0,0 +1,150 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_moderation_queue.py
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from community.models import Comment, Report, StatusPost
+from community.moderation import moderation_queue
+from tests.conftest import user_factory
+
+pytestmark = pytest.mark.django_db
+
+
+def report(user_factory, target, count, reason):
+    for _ in range(count):
+        Report.objects.create(
+            reporter=user_factory(username_prefix="reporter"),
+            content_object=target,
+            reason=reason,
+        )
+
+
+def key(target):
+    return f"{ContentType.objects.get_for_model(target).id}:{target.pk}"
+
+
+@pytest.fixture
+def reported(user_factory):
+    """A heavily reported spam post, a comment on it and a violent post, each reported once."""
+    author = user_factory(username="spammer")
+    spam = StatusPost.objects.create(author=author, content="Buy now")
+    comment = Comment.objects.create(
+        author=author, content_object=spam, content="Click here"
+    )
+    violent = StatusPost.objects.create(author=author, content="Threat")
+    report(user_factory, spam, 6, "SPAM")
+    report(user_factory, comment, 1, "OTHER")
+    report(user_factory, violent, 1, "VIOLENCE")
+    return spam, comment, violent
+
+
+@pytest.fixture
+def moderator_client(user_factory):
+    moderator = user_factory(username="moderator", is_staff=True, is_superuser=True)
+    client = Client()
+    client.force_login(moderator)
+    return client, moderator
+
+
+def test_queue_groups_reports_by_target_in_priority_order(reported, moderator_client):
+    """
+    Verifies the queue has one row per reported target with its report
+    count, weighted so that many spam reports outrank a single violent one.
+    """
+    # Arrange
+    spam, comment, violent = reported
+    client, _ = moderator_client
+
+    # Act
+    rows = list(moderation_queue())
+    response = client.get(reverse("admin:community_report_queue"))
+
+    # Assert
+    assert [(row["object_id"], row["reports"], row["priority"]) for row in rows] == [
+        (spam.pk, 6, 12),
+        (violent.pk, 1, 5),
+        (comment.pk, 1, 1),
+    ]
+    assert response.status_code == 200
+    assert [entry["key"] for entry in response.context["entries"]] == [
+        key(spam),
+        key(violent),
+        key(comment),
+    ]
+    assert response.context["entries"][0]["reasons"] == [("Spam or Misleading", 6)]
+
+
+def test_deleting_from_the_queue_resolves_every_report_at_once(
+    reported, moderator_client, user_factory, django_capture_on_commit_callbacks
+):
+    """
+    Verifies deleting selected targets removes the content, comments
+    included, and marks all of their reports, which are kept, as action
+    taken, in queries that don't grow with the number of reports.
+    """
+    # Arrange
+    spam, comment, violent = reported
+    client, moderator = moderator_client
+    url = reverse("admin:community_report_queue")
+    once = StatusPost.objects.create(author=spam.author, content="Spam")
+    often = StatusPost.objects.create(author=spam.author, content="Spam")
+    report(user_factory, once, 1, "SPAM")
+    report(user_factory, often, 8, "SPAM")
+    with CaptureQueriesContext(connection) as few:
+        client.post(url, {"decision": "delete", "target": [key(once)]})
+    with CaptureQueriesContext(connection) as many:
+        client.post(url, {"decision": "delete", "target": [key(often)]})
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            url,
+            {
+                "decision": "delete",
+                "target": [key(spam), key(violent)],
+                "notes": "Spam wave",
+            },
+        )
+
+    # Assert
+    assert response.status_code == 302
+    assert len(many) == len(few)
+    assert not StatusPost.objects.filter(pk__in=[spam.pk, violent.pk]).exists()
+    assert not Comment.objects.filter(pk=comment.pk).exists()
+    spam_reports = Report.objects.filter(
+        object_id=spam.pk, content_type__model="statuspost"
+    )
+    assert spam_reports.count() == 6
+    assert set(spam_reports.values_list("status", "moderator", "moderator_notes")) == {
+        ("ACTION_TAKEN", moderator.id, "Spam wave")
+    }
+    assert list(moderation_queue()) == []
+
+
+def test_dismissing_selected_reports_dismisses_the_whole_target(
+    reported, moderator_client
+):
+    """Verifies the changelist action closes every open report on the content."""
+    # Arrange
+    spam, _, _ = reported
+    client, _ = moderator_client
+    one = Report.objects.filter(
+        object_id=spam.pk, content_type__model="statuspost"
+    ).first()
+
+    # Act
+    client.post(
+        reverse("admin:community_report_changelist"),
+        {"action": "dismiss_reports", "_selected_action": [one.pk]},
+    )
+
+    # Assert
+    statuses = Report.objects.filter(
+        object_id=spam.pk, content_type__model="statuspost"
+    )
+    assert set(statuses.values_list("status", flat=True)) == {"DISMISSED"}
+    assert StatusPost.objects.filter(pk=spam.pk).exists()
+    assert len(list(moderation_queue())) == 2
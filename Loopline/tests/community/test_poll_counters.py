@@ -0,0 +1,165 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_poll_counters.py
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from community import views
+from community.models import StatusPost, Poll, PollOption, PollVote
+
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def poll_scenario(user_factory):
+    """Sets up a post with a two-option poll."""
+    post = StatusPost.objects.create(author=user_factory(), content="Best framework?")
+    poll = Poll.objects.create(post=post, question="Best framework?")
+    option1 = PollOption.objects.create(poll=poll, text="Vue")
+    option2 = PollOption.objects.create(poll=poll, text="React")
+    return {"post": post, "poll": poll, "options": [option1, option2]}
+
+
+def vote_url(poll, option):
+    return f"/api/polls/{poll.id}/options/{option.id}/vote/"
+
+
+def test_vote_returns_only_updated_tallies(
+    api_client_factory, user_factory, poll_scenario
+):
+    """
+    Verifies that casting, changing and withdrawing a vote keeps the option
+    counters in step, and that the response carries only the tallies.
+    """
+    # Arrange
+    poll = poll_scenario["poll"]
+    option1, option2 = poll_scenario["options"]
+    client = api_client_factory(user=user_factory())
+    PollVote.objects.create(user=user_factory(), poll=poll, option=option1)
+
+    # Act 1: Cast a vote.
+    response = client.post(vote_url(poll, option1))
+
+    # Assert 1
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "poll_id": poll.id,
+        "post_id": poll_scenario["post"].id,
+        "options": [
+            {"id": option1.id, "vote_count": 2},
+            {"id": option2.id, "vote_count": 0},
+        ],
+        "total_votes": 2,
+        "user_vote": option1.id,
+        "is_closed": False,
+    }
+
+    # Act 2: Change it, then withdraw it.
+    changed = client.post(vote_url(poll, option2)).json()
+    withdrawn = client.post(vote_url(poll, option2)).json()
+
+    # Assert 2
+    assert changed["user_vote"] == option2.id
+    assert [o["vote_count"] for o in changed["options"]] == [1, 1]
+    assert withdrawn["user_vote"] is None
+    assert withdrawn["total_votes"] == 1
+    option1.refresh_from_db()
+    option2.refresh_from_db()
+    assert (option1.vote_count, option2.vote_count) == (1, 0)
+
+
+def test_feed_serializes_polls_from_counters(
+    api_client_factory, user_factory, poll_scenario
+):
+    """
+    Verifies that post lists report counts and the viewer's own vote without
+    loading every vote row of the poll.
+    """
+    # Arrange
+    poll = poll_scenario["poll"]
+    option1, option2 = poll_scenario["options"]
+    viewer = user_factory()
+    for _ in range(3):
+        PollVote.objects.create(user=user_factory(), poll=poll, option=option1)
+    PollVote.objects.create(user=viewer, poll=poll, option=option2)
+    client = api_client_factory(user=viewer)
+
+    # Act
+    response = client.get(f"/api/users/{poll_scenario['post'].author.username}/posts/")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    poll_data = response.json()["results"][0]["poll"]
+    assert [o["vote_count"] for o in poll_data["options"]] == [3, 1]
+    assert poll_data["total_votes"] == 4
+    assert poll_data["user_vote"] == option2.id
+
+
+def test_closed_poll_rejects_votes_and_freezes_results(
+    api_client_factory, user_factory, poll_scenario
+):
+    """
+    Verifies that an expired poll refuses new votes, and that its results
+    are frozen into a snapshot which later vote changes cannot affect.
+    """
+    # Arrange
+    poll = poll_scenario["poll"]
+    option1 = poll_scenario["options"][0]
+    voter = user_factory()
+    vote = PollVote.objects.create(user=voter, poll=poll, option=option1)
+    poll.closes_at = timezone.now() - timedelta(minutes=1)
+    poll.save()
+    client = api_client_factory(user=user_factory())
+
+    # Act
+    response = client.post(vote_url(poll, option1))
+    call_command("close_expired_polls")
+    vote.delete()  # e.g. the voter deleted their account afterwards
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    poll.refresh_from_db()
+    assert poll.closed_at is not None
+    assert poll.results_snapshot == {
+        str(option1.id): 1,
+        str(poll_scenario["options"][1].id): 0,
+    }
+    assert poll.get_vote_counts()[option1.id] == 1
+
+
+def test_vote_racing_the_close_is_rejected(
+    api_client_factory, user_factory, poll_scenario, monkeypatch
+):
+    """
+    Verifies that a vote which loaded the poll while it was open, but got to
+    write after another request closed it, is refused instead of landing
+    behind the frozen results.
+    """
+    # Arrange
+    poll = poll_scenario["poll"]
+    option1 = poll_scenario["options"][0]
+    client = api_client_factory(user=user_factory())
+    real_get_object_or_404 = views.get_object_or_404
+
+    def load_then_close(model, **kwargs):
+        found = real_get_object_or_404(model, **kwargs)
+        if model is Poll:
+            Poll.objects.get(pk=found.pk).close()
+        return found
+
+    monkeypatch.setattr(views, "get_object_or_404", load_then_close)
+
+    # Act
+    response = client.post(vote_url(poll, option1))
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not PollVote.objects.filter(poll=poll).exists()
+    poll.refresh_from_db()
+    assert poll.results_snapshot == {
+        str(option1.id): 0,
+        str(poll_scenario["options"][1].id): 0,
+    }
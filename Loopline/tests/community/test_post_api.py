@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from community.models import StatusPost
 from tests.conftest import user_factory, api_client_factory, api_client
@@ -57,4 +59,80 @@ def test_user_cannot_delete_another_users_post(user_factory, api_client_factory)
     post = StatusPost.objects.create(author=owner, content="Safe.")
     client = api_client_factory(user=attacker)
     response = client.delete(f'/api/posts/{post.id}/')
-    assert response.status_code in [403, 404]
\ No newline at end of file
+    assert response.status_code in [403, 404]
+
+def test_repost_count_follows_reposts(user_factory):
+    """
+    Verifies a post's stored repost count rises with each repost and falls
+    when a repost is deleted.
+    """
+    # Arrange
+    author, fan = user_factory(), user_factory()
+    original = StatusPost.objects.create(author=author, content="Original.")
+    reposts = [StatusPost.objects.create(author=fan, parent_post=original) for _ in range(3)]
+
+    # Act
+    reposts[0].delete()
+
+    # Assert
+    original.refresh_from_db()
+    assert original.repost_count == 2
+
+def test_reposts_on_a_page_load_their_originals_together(user_factory, api_client):
+    """
+    Verifies a page of reposts loads their originals in a fixed number of
+    queries, however many reposts and originals it has, and serializes a
+    shared original the same way for every repost of it.
+    """
+    # Arrange
+    author, fan = user_factory(), user_factory(username='fan')
+    viral = StatusPost.objects.create(author=author, content="Viral.")
+
+    def page_queries():
+        with CaptureQueriesContext(connection) as queries:
+            results = api_client.get('/api/users/fan/posts/').json()['results']
+        return results, len(queries.captured_queries)
+
+    # Act
+    StatusPost.objects.create(author=fan, parent_post=viral)
+    _, one_repost = page_queries()
+    for _ in range(4):
+        StatusPost.objects.create(author=fan, parent_post=viral)
+    same_original, five_reposts = page_queries()
+    for i in range(5):
+        other = StatusPost.objects.create(author=author, content=f"Other {i}.")
+        StatusPost.objects.create(author=fan, parent_post=other)
+    _, ten_reposts = page_queries()
+
+    # Assert
+    assert one_repost == five_reposts == ten_reposts
+    assert len(same_original) == 5
+    assert all(post['parent_post'] == same_original[0]['parent_post'] for post in same_original)
+    assert same_original[0]['parent_post']['repost_count'] == 5
+
+
+def test_reposts_of_reposts_nest_one_level(user_factory, api_client):
+    """
+    Verifies an older repost chain is serialized one level deep, with the
+    original's own parent left out, so chains cost no extra queries.
+    """
+    # Arrange
+    author, fan = user_factory(), user_factory(username='fan')
+    root = StatusPost.objects.create(author=author, content="Root.")
+    middle = StatusPost.objects.create(author=author, parent_post=root)
+
+    def page_queries():
+        with CaptureQueriesContext(connection) as queries:
+            results = api_client.get('/api/users/fan/posts/').json()['results']
+        return results, len(queries.captured_queries)
+
+    # Act
+    StatusPost.objects.create(author=fan, parent_post=root)
+    _, flat = page_queries()
+    StatusPost.objects.filter(author=fan).update(parent_post=middle)
+    chained, nested = page_queries()
+
+    # Assert
+    assert flat == nested
+    assert chained[0]['parent_post']['id'] == middle.id
+    assert chained[0]['parent_post']['parent_post'] is None
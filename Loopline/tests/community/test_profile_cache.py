@@ -0,0 +1,160 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_profile_cache.py
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from community.models import (
+    Education,
+    Follow,
+    Skill,
+    SkillCategory,
+    SocialLink,
+    StatusPost,
+)
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+
+def profile_url(user):
+    return reverse("community:userprofile-detail", kwargs={"username": user.username})
+
+
+def fetch(client, user):
+    """Fetches the profile; returns its data and the number of queries run."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(profile_url(user))
+    assert response.status_code == 200
+    return response.json(), len(queries)
+
+
+def test_repeat_views_come_from_the_cached_document(user_factory, api_client_factory):
+    """
+    Verifies a profile with every section filled in is served from the cache
+    on later views, with only the viewer's own lookups left to run.
+    """
+    # Arrange
+    owner = user_factory(username="owner")
+    viewer = user_factory(username="viewer")
+    Education.objects.create(user_profile=owner.profile, institution="IIT Bombay")
+    category = SkillCategory.objects.create(user_profile=owner.profile, name="Backend")
+    Skill.objects.create(category=category, name="Django")
+    Skill.objects.create(category=category, name="Postgres")
+    SocialLink.objects.create(
+        profile=owner.profile, link_type="github", url="https://github.com/owner"
+    )
+    client = api_client_factory(user=viewer)
+    fetch(client, owner)
+
+    # Act
+    data, queries = fetch(client, owner)
+
+    # Assert: the profile lookup, plus the Follow and ConnectionRequest checks.
+    assert queries == 3
+    assert data["education"][0]["institution"] == "IIT Bombay"
+    assert [s["name"] for s in data["skill_categories"][0]["skills"]] == [
+        "Django",
+        "Postgres",
+    ]
+    assert data["social_links"][0]["url"] == "https://github.com/owner"
+
+
+def test_changes_show_up_on_the_next_view(user_factory, api_client_factory):
+    """
+    Verifies profile, section, follow and post changes retire the cached
+    document, whichever code path makes them.
+    """
+    # Arrange
+    owner = user_factory(username="owner")
+    viewer = user_factory(username="viewer")
+    client = api_client_factory(user=viewer)
+    fetch(client, owner)
+
+    # Act & Assert: the owner edits their profile through the API.
+    api_client_factory(user=owner).patch(
+        profile_url(owner), {"bio": "New bio"}, format="json"
+    )
+    assert fetch(client, owner)[0]["bio"] == "New bio"
+
+    # Sections added, edited and removed outside the views.
+    education = Education.objects.create(user_profile=owner.profile, institution="MIT")
+    category = SkillCategory.objects.create(user_profile=owner.profile, name="Data")
+    skill = Skill.objects.create(category=category, name="SQL")
+    SocialLink.objects.create(
+        profile=owner.profile, link_type="website", url="https://a.example"
+    )
+    data = fetch(client, owner)[0]
+    assert data["education"][0]["institution"] == "MIT"
+    assert data["skill_categories"][0]["skills"][0]["name"] == "SQL"
+    assert len(data["social_links"]) == 1
+
+    skill.name = "PostgreSQL"
+    skill.save()
+    assert (
+        fetch(client, owner)[0]["skill_categories"][0]["skills"][0]["name"]
+        == "PostgreSQL"
+    )
+    education.delete()
+    assert fetch(client, owner)[0]["education"] == []
+
+    # Renames, follows and posts.
+    owner.first_name = "Olive"
+    owner.save()
+    Follow.objects.create(follower=viewer, following=owner)
+    StatusPost.objects.create(author=owner, content="Hello")
+    data = fetch(client, owner)[0]
+    assert data["user"]["first_name"] == "Olive"
+    assert data["followers_count"] == 1
+    assert data["posts_count"] == 1
+    assert data["relationship_status"]["is_followed_by_request_user"] is True
+
+
+def test_contact_details_follow_each_viewers_access(user_factory, api_client_factory):
+    """
+    Verifies the shared document never leaks contact details: each viewer
+    sees them only as their relationship with the owner allows.
+    """
+    # Arrange
+    owner = user_factory(username="owner", email="owner@example.com")
+    owner.profile.email_visibility = "followers"
+    owner.profile.phone_number = "555-0100"
+    owner.profile.phone_visibility = "connections"
+    owner.profile.save()
+    follower = user_factory(username="follower")
+    friend = user_factory(username="friend")
+    stranger = user_factory(username="stranger")
+    Follow.objects.create(follower=follower, following=owner)
+    Follow.objects.create(follower=friend, following=owner)
+    Follow.objects.create(follower=owner, following=friend)
+
+    # Act
+    views = {
+        name: fetch(api_client_factory(user=user), owner)[0]
+        for name, user in [
+            ("owner", owner),
+            ("follower", follower),
+            ("friend", friend),
+            ("stranger", stranger),
+        ]
+    }
+    anonymous = fetch(APIClient(), owner)[0]
+
+    # Assert
+    assert views["owner"]["phone_number"] == "555-0100"
+    assert views["owner"]["relationship_status"]["connection_status"] == "self"
+    assert (views["follower"]["email"], views["follower"]["phone_number"]) == (
+        "owner@example.com",
+        None,
+    )
+    assert views["friend"]["phone_number"] == "555-0100"
+    assert views["friend"]["relationship_status"]["connection_status"] == "connected"
+    assert (views["stranger"]["email"], views["stranger"]["phone_number"]) == (
+        None,
+        None,
+    )
+    assert (
+        views["stranger"]["relationship_status"]["connection_status"] == "not_connected"
+    )
+    assert (anonymous["email"], anonymous["relationship_status"]) == (None, None)
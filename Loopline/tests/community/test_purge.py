@@ -0,0 +1,168 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_purge.py
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+
+from community import purge
+from community.models import (
+    Comment,
+    Follow,
+    Group,
+    Like,
+    Notification,
+    Poll,
+    PollOption,
+    PollVote,
+    PostReaction,
+    PurgeJob,
+    StatusPost,
+)
+from tests.conftest import user_factory
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def populate(doomed, survivor):
+    """Gives `doomed` some of everything, much of it on `survivor`'s things."""
+    post = StatusPost.objects.create(author=survivor, content="Survivor post")
+    comment = Comment.objects.create(
+        author=survivor, content_object=post, content="Mine"
+    )
+    group = Group.objects.create(creator=survivor, name="Survivors")
+    group.members.add(doomed)
+    poll = Poll.objects.create(post=post, question="Best framework?")
+    option = PollOption.objects.create(poll=poll, text="Django")
+    PollVote.objects.create(user=doomed, poll=poll, option=option)
+    Like.objects.create(user=doomed, content_object=post, reaction_type="love")
+    Like.objects.create(user=doomed, content_object=comment)
+    Comment.objects.create(
+        author=doomed, content_object=post, content="Hi", parent=comment
+    )
+    Comment.objects.create(author=doomed, content_object=post, content="Hey")
+    StatusPost.objects.create(author=doomed, content="", parent_post=post)
+    Follow.objects.create(follower=doomed, following=survivor)
+    for i in range(3):
+        own = StatusPost.objects.create(author=doomed, content=f"Doomed post {i}")
+        Like.objects.create(user=survivor, content_object=own)
+        Comment.objects.create(author=survivor, content_object=own, content="Bye")
+
+
+def test_purging_users_removes_everything_and_fixes_survivors(user_factory):
+    """
+    Verifies a batched purge deletes the users with everything that depends
+    on them, generic likes, comments and notifications included, and moves
+    the counters on what survives as the delete signals would have.
+    """
+    # Arrange
+    survivor = user_factory(username="survivor")
+    doomed = [user_factory(username=f"doomed_{i}") for i in range(3)]
+    for user in doomed:
+        populate(user, survivor)
+    Follow.objects.create(follower=survivor, following=doomed[0])
+    doomed_ids = [user.id for user in doomed]
+
+    # Act
+    job = purge.schedule_purge(User.objects.filter(id__in=doomed_ids), label="test")
+    purge.run_purge_job(job, batch_size=2)
+
+    # Assert
+    job.refresh_from_db()
+    assert job.status == PurgeJob.DONE and job.finished_at
+    assert job.deleted["auth.User"] == 3
+    assert not User.objects.filter(id__in=doomed_ids).exists()
+    assert not StatusPost.objects.filter(author_id__in=doomed_ids).exists()
+    post_type = ContentType.objects.get_for_model(StatusPost)
+    survivor_posts = StatusPost.objects.filter(author=survivor).values_list(
+        "id", flat=True
+    )
+    # The survivor's likes and comments on the doomed posts went with them.
+    assert set(Like.objects.values_list("object_id", flat=True)) <= set(survivor_posts)
+    assert (
+        not Comment.objects.filter(content_type=post_type)
+        .exclude(object_id__in=survivor_posts)
+        .exists()
+    )
+    assert not Notification.objects.filter(actor_id__in=doomed_ids).exists()
+    assert (
+        not Notification.objects.filter(
+            action_object_content_type=ContentType.objects.get_for_model(Comment)
+        )
+        .exclude(action_object_object_id__in=Comment.objects.values("id"))
+        .exists()
+    )
+    for post in StatusPost.objects.filter(author=survivor):
+        assert (post.like_count, post.comment_count, post.repost_count) == (0, 1, 0)
+        assert sum(post.reaction_counts.values()) == 0
+        assert not PostReaction.objects.filter(post=post).exists()
+    for comment in Comment.objects.filter(author=survivor):
+        assert (comment.like_count, comment.reply_count) == (0, 0)
+    for group in Group.objects.filter(creator=survivor):
+        assert group.member_count == group.members.count()
+    assert not PollOption.objects.filter(vote_count__gt=0).exists()
+
+
+def test_a_failed_purge_resumes_where_it_stopped(user_factory, monkeypatch):
+    """
+    Verifies a purge that fails part way keeps the batches it committed,
+    and that running the job again finishes it.
+    """
+    # Arrange
+    survivor = user_factory(username="survivor")
+    doomed = [user_factory(username=f"doomed_{i}") for i in range(4)]
+    for user in doomed:
+        populate(user, survivor)
+    job = purge.schedule_purge(User.objects.filter(id__in=[u.id for u in doomed]))
+    real_delete = purge.Purger._delete
+
+    def delete_then_fail(self, model, ids):
+        if model is User and self.deleted["auth.User"] >= 2:
+            raise RuntimeError("Connection lost")
+        real_delete(self, model, ids)
+
+    monkeypatch.setattr(purge.Purger, "_delete", delete_then_fail)
+
+    # Act
+    with pytest.raises(RuntimeError):
+        purge.run_purge_job(job, batch_size=2)
+    failed = PurgeJob.objects.get(pk=job.pk)
+    users_left = User.objects.count()
+    monkeypatch.setattr(purge.Purger, "_delete", real_delete)
+    purge.run_purge_job(PurgeJob.objects.get(pk=job.pk), batch_size=2)
+
+    # Assert
+    assert (failed.status, failed.deleted["auth.User"], users_left) == (
+        PurgeJob.FAILED,
+        2,
+        3,
+    )
+    assert "Connection lost" in failed.error
+    finished = PurgeJob.objects.get(pk=job.pk)
+    assert (finished.status, finished.error) == (PurgeJob.DONE, "")
+    assert finished.deleted["auth.User"] == 4
+    assert list(User.objects.values_list("username", flat=True)) == ["survivor"]
+
+
+@pytest.mark.parametrize("verbosity", [1, 2])
+def test_the_command_runs_scheduled_jobs(user_factory, verbosity):
+    """Verifies run_purge_jobs finishes a scheduled purge and reports it."""
+    # Arrange
+    survivor = user_factory(username="survivor")
+    doomed = [user_factory(username=f"doomed_{i}") for i in range(3)]
+    for user in doomed:
+        populate(user, survivor)
+    job = purge.schedule_purge(User.objects.filter(id__in=[u.id for u in doomed]))
+    out = StringIO()
+
+    # Act
+    call_command("run_purge_jobs", batch_size=2, verbosity=verbosity, stdout=out)
+
+    # Assert
+    assert PurgeJob.objects.get(pk=job.pk).status == PurgeJob.DONE
+    assert list(User.objects.values_list("username", flat=True)) == ["survivor"]
+    assert "Finished 1 purge job(s)." in out.getvalue()
+    assert "failed" not in out.getvalue()
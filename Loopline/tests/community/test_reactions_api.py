@@ -0,0 +1,183 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_reactions_api.py
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from rest_framework import status
+from community.models import Like, Notification, StatusPost
+from community.redis_client import get_redis
+
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def post(user_factory):
+    return StatusPost.objects.create(author=user_factory(), content="React to me")
+
+
+@pytest.fixture
+def like_buffer(settings):
+    """Turns on write-behind with a low threshold, in a scratch Redis DB."""
+    settings.LIKE_WRITE_BEHIND_ENABLED = True
+    settings.LIKE_BUFFER_REDIS_URL = "redis://127.0.0.1:6379/15"
+    settings.LIKE_HOT_THRESHOLD = 2
+    redis = get_redis(settings.LIKE_BUFFER_REDIS_URL)
+    redis.flushdb()
+    yield redis
+    redis.flushdb()
+
+
+def react(client, post, reaction_type="like"):
+    content_type = ContentType.objects.get_for_model(StatusPost)
+    return client.post(
+        f"/api/content/{content_type.id}/{post.id}/like/",
+        {"reaction_type": reaction_type},
+        format="json",
+    )
+
+
+def test_toggle_adds_changes_and_removes_reaction(
+    user_factory, api_client_factory, post
+):
+    """
+    Verifies the toggle keeps the post's stored counters in step as a user
+    reacts, switches reaction, and then withdraws it.
+    """
+    # Arrange
+    Like.objects.create(user=user_factory(), content_object=post, reaction_type="like")
+    reactor = user_factory()
+    client = api_client_factory(user=reactor)
+
+    # Act
+    added = react(client, post, "love").json()
+    changed = react(client, post, "like").json()
+    removed = react(client, post, "like").json()
+
+    # Assert
+    assert added == {
+        "liked": True,
+        "reaction_type": "love",
+        "like_count": 2,
+        "reaction_counts": {"like": 1, "love": 1},
+    }
+    assert changed["like_count"] == 2
+    assert changed["reaction_counts"] == {"like": 2}
+    assert removed["liked"] is False
+    assert removed["like_count"] == 1
+    assert removed["reaction_counts"] == {"like": 1}
+    post.refresh_from_db()
+    assert (post.like_count, post.reaction_counts) == (1, {"like": 1})
+    assert not Like.objects.filter(user=reactor).exists()
+
+
+def test_toggle_notifies_author_and_feed_shows_counts(
+    user_factory, api_client_factory, post
+):
+    """
+    Verifies the SQL toggle still notifies the post's author, and that post
+    lists report the stored counts and the viewer's own reaction.
+    """
+    # Arrange
+    reactor = user_factory()
+    client = api_client_factory(user=reactor)
+
+    # Act
+    react(client, post, "celebrate")
+    response = client.get(f"/api/users/{post.author.username}/posts/")
+
+    # Assert
+    assert Notification.objects.filter(
+        recipient=post.author, actor=reactor, notification_type=Notification.LIKE
+    ).exists()
+    post_data = response.json()["results"][0]
+    assert post_data["like_count"] == 1
+    assert post_data["reaction_counts"] == {"celebrate": 1}
+    assert post_data["user_reaction"] == "celebrate"
+    assert post_data["is_liked_by_user"] is True
+
+
+def test_reacting_to_missing_post_or_with_unknown_reaction_fails(
+    user_factory, api_client_factory, post
+):
+    """
+    Verifies unknown targets return 404 and unknown reactions return 400.
+    """
+    # Arrange
+    client = api_client_factory(user=user_factory())
+    missing = StatusPost(id=post.id + 1000)
+
+    # Act & Assert
+    assert react(client, missing).status_code == status.HTTP_404_NOT_FOUND
+    assert react(client, post, "angry").status_code == status.HTTP_400_BAD_REQUEST
+    assert not Like.objects.exists()
+
+
+def test_hot_post_reactions_are_buffered_then_flushed(
+    user_factory, api_client_factory, post, like_buffer
+):
+    """
+    Verifies that once a post is hot, reactions are held in Redis with
+    read-your-writes counts, and the flush command writes them to Like.
+    """
+    # Arrange
+    clients = [api_client_factory(user=user_factory()) for _ in range(3)]
+
+    # Act 1: The first reaction goes straight to the database...
+    react(clients[0], post)
+    # ...the second crosses the threshold and is buffered, as is the third.
+    second = react(clients[1], post, "love").json()
+    third = react(clients[2], post).json()
+    undone = react(clients[2], post).json()
+
+    # Assert 1: Responses include the buffered reactions; the DB does not yet.
+    assert second["like_count"] == 2
+    assert third == {
+        "liked": True,
+        "reaction_type": "like",
+        "like_count": 3,
+        "reaction_counts": {"like": 2, "love": 1},
+    }
+    assert undone["liked"] is False
+    assert undone["like_count"] == 2
+    assert Like.objects.count() == 1
+
+    # Act 2
+    call_command("flush_like_buffer")
+
+    # Assert 2
+    post.refresh_from_db()
+    assert post.like_count == 2
+    assert post.reaction_counts == {"like": 1, "love": 1}
+    assert Like.objects.filter(reaction_type="love").count() == 1
+    assert not like_buffer.exists(
+        f"likes:pending:{ContentType.objects.get_for_model(post).id}:{post.id}"
+    )
+
+
+def test_buffered_reactions_show_on_reads_after_the_flush(
+    user_factory, api_client_factory, post, like_buffer
+):
+    """
+    Verifies that reads other than the toggle response come from the
+    database, so they show a buffered reaction, the reactor's own included,
+    once the flush has run.
+    """
+    # Arrange
+    clients = [api_client_factory(user=user_factory()) for _ in range(2)]
+    react(clients[0], post)
+    react(clients[1], post, "love")  # Buffered: the post is now hot.
+    url = f"/api/posts/{post.id}/"
+
+    # Act
+    before = clients[1].get(url).json()
+    call_command("flush_like_buffer")
+    after = clients[1].get(url).json()
+    undone = react(clients[1], post, "love").json()
+
+    # Assert
+    assert (before["like_count"], before["user_reaction"]) == (1, None)
+    assert (after["like_count"], after["user_reaction"]) == (2, "love")
+    # The next toggle reads the flushed reaction back from the database.
+    assert undone["liked"] is False
+    assert undone["like_count"] == 1
@@ -0,0 +1,119 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_renderers.py
+import datetime
+import decimal
+import json
+import uuid
+from io import StringIO
+
+import msgpack
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from community.models import Follow, StatusPost
+from community.renderers import ORJSONRenderer
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_orjson_writes_what_drf_would():
+    """
+    Verifies the orjson renderer encodes the types DRF's encoder knows the
+    same way, UTC datetimes with a trailing Z included.
+    """
+    # Arrange
+    data = {
+        "when": datetime.datetime(
+            2024, 5, 1, 12, 30, 15, 250, tzinfo=datetime.timezone.utc
+        ),
+        "day": datetime.date(2024, 5, 1),
+        "price": decimal.Decimal("1.50"),
+        "label": gettext_lazy("Hello"),
+        "took": datetime.timedelta(seconds=3),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "nested": [{"a": 1, "b": None, "c": "naïve ✓"}],
+    }
+
+    # Act
+    fast = ORJSONRenderer().render(data)
+    stdlib = JSONRenderer().render(data)
+
+    # Assert
+    assert json.loads(fast) == json.loads(stdlib)
+    assert json.loads(fast)["when"] == "2024-05-01T12:30:15.000250Z"
+
+
+def test_clients_get_msgpack_when_they_ask_for_it(user_factory, api_client_factory):
+    """
+    Verifies the feed is JSON by default and MessagePack with the same
+    content for `Accept: application/msgpack`.
+    """
+    # Arrange
+    viewer = user_factory(username="viewer")
+    author = user_factory(username="author")
+    Follow.objects.create(follower=viewer, following=author)
+    StatusPost.objects.create(author=author, content="Hello, world ✓")
+    client = api_client_factory(user=viewer)
+    url = reverse("community:user-feed")
+
+    # Act
+    as_json = client.get(url)
+    as_msgpack = client.get(url, HTTP_ACCEPT="application/msgpack")
+
+    # Assert
+    assert as_json["Content-Type"] == "application/json"
+    assert as_msgpack["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+    assert as_json.json()["results"][0]["content"] == "Hello, world ✓"
+
+
+def test_malformed_json_is_a_bad_request(user_factory, api_client_factory):
+    """Verifies the orjson parser rejects a broken body with a 400."""
+    # Arrange
+    client = api_client_factory(user=user_factory())
+
+    # Act
+    response = client.generic(
+        "POST",
+        reverse("community:statuspost-list-create"),
+        '{"content": ',
+        "application/json",
+    )
+
+    # Assert
+    assert response.status_code == 400
+    assert "JSON parse error" in response.json()["detail"]
+
+
+def test_benchmark_reports_every_encoder(user_factory):
+    """Verifies the benchmark encodes real feed pages with all three encoders."""
+    # Arrange
+    viewer = user_factory(username="viewer")
+    author = user_factory(username="author")
+    Follow.objects.create(follower=viewer, following=author)
+    for i in range(3):
+        StatusPost.objects.create(author=author, content=f"Post {i}")
+    out = StringIO()
+
+    # Act
+    call_command(
+        "benchmark_renderers",
+        users=1,
+        pages=1,
+        repeat=2,
+        json=True,
+        endpoints=["community:user-feed"],
+        stdout=out,
+    )
+
+    # Assert
+    report = json.loads(out.getvalue())["community:user-feed"]
+    assert report["pages"] == 1 and report["mismatches"] == 0
+    assert set(report["encoders"]) == {"json", "orjson", "msgpack"}
+    assert (
+        report["encoders"]["msgpack"]["mean_bytes"]
+        < report["encoders"]["json"]["mean_bytes"]
+    )
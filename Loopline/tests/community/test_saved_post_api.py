@@ -67,4 +67,55 @@ def test_user_can_list_own_saved_posts(user_factory, api_client_factory):
     
     # That one post must be post_2, which is the one User A saved.
     saved_post = results[0]
-    assert saved_post['id'] == post_2.id
\ No newline at end of file
+    assert saved_post['id'] == post_2.id
+def test_save_and_unsave_are_idempotent(user_factory, api_client_factory):
+    """
+    Verifies PUT saves and DELETE unsaves a post however often they are
+    repeated, so a retried request can't flip the result.
+    """
+    # Arrange
+    saver = user_factory()
+    post = StatusPost.objects.create(author=user_factory(), content="Keep me.")
+    client = api_client_factory(user=saver)
+    save_url = f'/api/posts/{post.id}/save/'
+
+    # Act & Assert
+    for _ in range(2):
+        response = client.put(save_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['is_saved'] is True
+        assert saver.profile.saved_posts.count() == 1
+
+    for _ in range(2):
+        response = client.delete(save_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['is_saved'] is False
+        assert saver.profile.saved_posts.count() == 0
+
+    assert client.put('/api/posts/999999/save/').status_code == status.HTTP_404_NOT_FOUND
+
+def test_saved_posts_page_by_save_time(user_factory, api_client_factory, django_assert_max_num_queries):
+    """
+    Verifies saved posts list most recently saved first (not by post date),
+    page by cursor, and resolve `is_saved` for a whole page at once.
+    """
+    # Arrange
+    saver = user_factory()
+    author = user_factory()
+    posts = [StatusPost.objects.create(author=author, content=f"Post {i}.") for i in range(5)]
+    client = api_client_factory(user=saver)
+    # Save the oldest post last.
+    for post in reversed(posts):
+        client.put(f'/api/posts/{post.id}/save/')
+
+    # Act
+    with django_assert_max_num_queries(7):
+        first = client.get('/api/posts/saved/?page_size=3').json()
+    second = client.get(first['next']).json()
+
+    # Assert
+    ids = [p['id'] for p in first['results'] + second['results']]
+    assert ids == [post.id for post in posts]
+    assert 'count' not in first
+    assert second['next'] is None
+    assert all(p['is_saved'] for p in first['results'] + second['results'])
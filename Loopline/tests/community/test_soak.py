@@ -0,0 +1,57 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_soak.py
+from community.soak import Soak
+
+
+def make_soak():
+    users = [{"id": i, "username": f"soak{i}", "token": "t"} for i in (1, 2, 3)]
+    soak = Soak(
+        users,
+        [[2, 1], [3, 1]],
+        7,
+        base_url="http://x",
+        ws_url="ws://x",
+        rates={},
+        duration=0,
+    )
+    soak.sockets = {1: None, 2: None, 3: None}
+    return soak
+
+
+def push(soak, user_id, message, at):
+    soak.received(soak.event_key(message, user_id), user_id, at)
+
+
+def test_pushes_are_matched_to_the_actions_that_caused_them():
+    """
+    Verifies pushes count as delivered, dropped or duplicated against what
+    each action should have caused, including pushes that beat the API
+    response.
+    """
+    # Arrange
+    soak = make_soak()
+    new_post = {"type": "new_post", "payload": {"id": 10}}
+    follow = {
+        "type": "new_notification",
+        "payload": {"notification_type": "follow", "actor": {"id": 2}},
+    }
+
+    # Act: user 2's push arrives before the post's API response.
+    push(soak, 2, new_post, at=1.05)
+    soak.expect(("post", 10), 1.0, soak.followers[1])
+    push(soak, 2, new_post, at=1.2)
+    soak.expect(("follow", 2, 3), 2.0, [3])
+    push(soak, 3, follow, at=2.01)
+    push(soak, 1, follow, at=2.02)
+    report = soak.report(3, None, None, 1)
+
+    # Assert
+    posts = report["pushes"]["post"]
+    assert (
+        posts["expected"],
+        posts["delivered"],
+        posts["dropped"],
+        posts["duplicated"],
+    ) == (2, 1, 1, 1)
+    assert posts["p50_ms"] == 50.0
+    assert report["pushes"]["follow"]["delivered"] == 1
+    assert report["unexpected_pushes"] == 1
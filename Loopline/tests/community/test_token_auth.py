@@ -0,0 +1,97 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_token_auth.py
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from community import authentication
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def token_queries(client, url="/api/auth/user/"):
+    """Makes a request; returns its status and how many token lookups it ran."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    lookups = [q for q in queries.captured_queries if "authtoken_token" in q["sql"]]
+    return response, len(lookups)
+
+
+def test_token_lookups_are_cached(user_factory, api_client_factory):
+    """
+    Verifies only the first request with a token reads it from the database,
+    and that the shared cache still answers once a process's copy is gone.
+    """
+    # Arrange
+    client = api_client_factory(user=user_factory())
+
+    # Act
+    first, first_lookups = token_queries(client)
+    second, second_lookups = token_queries(client)
+    authentication._local.clear()
+    third, third_lookups = token_queries(client)
+
+    # Assert
+    assert first.status_code == second.status_code == third.status_code == 200
+    assert (first_lookups, second_lookups, third_lookups) == (1, 0, 0)
+    assert second.json()["username"] == first.json()["username"]
+
+
+def test_account_changes_invalidate_cached_tokens(user_factory, api_client_factory):
+    """
+    Verifies profile edits, password changes, deactivation and logout all
+    take effect on the next request, and that saving the cached user never
+    overwrites fields it did not load.
+    """
+    # Arrange
+    user = user_factory(username="cached")
+    client = api_client_factory(user=user)
+    token_queries(client)
+    joined = User.objects.get(pk=user.pk).date_joined
+
+    # Act & Assert: an edit through the API shows up at once.
+    client.patch("/api/auth/user/", {"first_name": "Renamed"})
+    assert client.get("/api/auth/user/").json()["first_name"] == "Renamed"
+    assert User.objects.get(pk=user.pk).date_joined == joined
+
+    # A password change saves the new hash, and only that.
+    response = client.post(
+        "/api/auth/password/change/",
+        {"new_password1": "N3w-passw0rd!", "new_password2": "N3w-passw0rd!"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    stored = User.objects.get(pk=user.pk)
+    assert stored.check_password("N3w-passw0rd!")
+    assert stored.first_name == "Renamed"
+
+    # Deactivating the user locks the token out.
+    stored.is_active = False
+    stored.save()
+    assert client.get("/api/auth/user/").status_code == status.HTTP_401_UNAUTHORIZED
+    stored.is_active = True
+    stored.save(update_fields=["is_active"])
+    assert client.get("/api/auth/user/").status_code == status.HTTP_200_OK
+
+    # Logging out kills the token for good.
+    assert client.post("/api/auth/logout/").status_code == status.HTTP_200_OK
+    assert not Token.objects.filter(user=user).exists()
+    assert client.get("/api/auth/user/").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_deleted_token_is_forgotten(user_factory, api_client_factory):
+    """Verifies deleting a token anywhere (e.g. the admin) revokes it at once."""
+    # Arrange
+    user = user_factory()
+    client = api_client_factory(user=user)
+    token_queries(client)
+
+    # Act
+    Token.objects.filter(user=user).delete()
+
+    # Assert
+    assert client.get("/api/auth/user/").status_code == status.HTTP_401_UNAUTHORIZED
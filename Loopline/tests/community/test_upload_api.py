@@ -0,0 +1,241 @@
+# C:\Users\Vinay\Project\Loopline\tests\community\test_upload_api.py
+import os
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.files import locks
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from community.models import MediaUpload, PostMedia, StatusPost
+
+from tests.conftest import user_factory, api_client_factory
+
+pytestmark = pytest.mark.django_db
+
+VIDEO_BYTES = b"0123456789" * 100  # A 1000-byte stand-in for a video file.
+
+
+@pytest.fixture
+def upload_dirs(settings, tmp_path):
+    """Keeps uploaded files and partial chunks inside the test's temp dir."""
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.MEDIA_UPLOAD_TEMP_DIR = tmp_path / "chunks"
+    return tmp_path
+
+
+def start_upload(client, total_size=len(VIDEO_BYTES)):
+    return client.post(
+        "/api/uploads/",
+        {"media_type": "video", "filename": "clip.mp4", "total_size": total_size},
+        format="json",
+    )
+
+
+def send_chunk(client, upload_id, offset, data):
+    return client.patch(
+        f"/api/uploads/{upload_id}/",
+        data=data,
+        content_type="application/offset+octet-stream",
+        HTTP_UPLOAD_OFFSET=str(offset),
+    )
+
+
+def test_chunked_upload_can_be_resumed_and_attached_to_post(
+    user_factory, api_client_factory, upload_dirs
+):
+    """
+    Verifies a video can be uploaded in chunks, resumed from the offset the
+    server reports, finalized, and then attached to a new post by its ID.
+    """
+    # Arrange
+    author = user_factory()
+    client = api_client_factory(user=author)
+
+    # Act 1: Start the upload and send the first chunk.
+    response = start_upload(client)
+    assert response.status_code == status.HTTP_201_CREATED
+    upload_id = response.json()["id"]
+    assert response["Upload-Offset"] == "0"
+
+    response = send_chunk(client, upload_id, 0, VIDEO_BYTES[:400])
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Upload-Offset"] == "400"
+
+    # Act 2: "Reconnect" and ask the server where to resume from.
+    response = client.head(f"/api/uploads/{upload_id}/")
+    resume_from = int(response["Upload-Offset"])
+    assert resume_from == 400
+
+    response = send_chunk(client, upload_id, resume_from, VIDEO_BYTES[resume_from:])
+    assert response["Upload-Offset"] == str(len(VIDEO_BYTES))
+
+    # Act 3: Finalize and attach it to a post.
+    response = client.post(f"/api/uploads/{upload_id}/finalize/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == MediaUpload.STATUS_COMPLETE
+
+    response = client.post(
+        "/api/posts/",
+        {"content": "My new video", "upload_ids": [upload_id]},
+        format="json",
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_201_CREATED
+    post = StatusPost.objects.get(id=response.json()["id"])
+    media = PostMedia.objects.get(post=post)
+    assert media.media_type == "video"
+    with media.file.open("rb") as stored:
+        assert stored.read() == VIDEO_BYTES
+    assert MediaUpload.objects.get(id=upload_id).status == MediaUpload.STATUS_ATTACHED
+    # The assembled chunk file is gone once the upload is finalized.
+    assert not any((upload_dirs / "chunks").iterdir())
+
+
+def test_chunk_with_wrong_offset_is_rejected(
+    user_factory, api_client_factory, upload_dirs
+):
+    """
+    Verifies the server refuses a chunk that does not start at its current
+    offset and tells the client where to resume instead.
+    """
+    # Arrange
+    client = api_client_factory(user=user_factory())
+    upload_id = start_upload(client).json()["id"]
+    send_chunk(client, upload_id, 0, VIDEO_BYTES[:100])
+
+    # Act
+    response = send_chunk(client, upload_id, 500, VIDEO_BYTES[500:600])
+
+    # Assert
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response["Upload-Offset"] == "100"
+    assert MediaUpload.objects.get(id=upload_id).offset == 100
+
+
+def test_chunk_without_a_length_is_refused(
+    user_factory, api_client_factory, upload_dirs
+):
+    """
+    Verifies a chunk sent without a Content-Length (e.g. with chunked
+    transfer encoding) is refused instead of being read as empty.
+    """
+    # Arrange
+    client = api_client_factory(user=user_factory())
+    upload_id = start_upload(client).json()["id"]
+
+    # Act
+    response = client.patch(
+        f"/api/uploads/{upload_id}/",
+        data=VIDEO_BYTES[:100],
+        content_type="application/offset+octet-stream",
+        HTTP_UPLOAD_OFFSET="0",
+        CONTENT_LENGTH="",
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_411_LENGTH_REQUIRED
+    assert MediaUpload.objects.get(id=upload_id).offset == 0
+
+
+def test_chunk_is_refused_while_another_is_being_written(
+    user_factory, api_client_factory, upload_dirs
+):
+    """
+    Verifies a second chunk for an upload is turned away while another
+    request holds the .part file, without touching the offset.
+    """
+    # Arrange
+    client = api_client_factory(user=user_factory())
+    upload_id = start_upload(client).json()["id"]
+
+    # Act
+    with open(upload_dirs / "chunks" / f"{upload_id}.part", "r+b") as part_file:
+        locks.lock(part_file, locks.LOCK_EX)
+        busy = send_chunk(client, upload_id, 0, VIDEO_BYTES[:100])
+        locks.unlock(part_file)
+    retried = send_chunk(client, upload_id, 0, VIDEO_BYTES[:100])
+
+    # Assert
+    assert busy.status_code == status.HTTP_409_CONFLICT
+    assert retried.status_code == status.HTTP_200_OK
+    assert MediaUpload.objects.get(id=upload_id).offset == 100
+
+
+def test_stale_uploads_and_orphaned_chunks_are_pruned(
+    user_factory, api_client_factory, upload_dirs
+):
+    """
+    Verifies the prune command deletes uploads that stalled or were never
+    attached, with their .part files, and .part files with no upload, but
+    keeps recent ones.
+    """
+    # Arrange
+    client = api_client_factory(user=user_factory())
+    stalled, active = (start_upload(client).json()["id"] for _ in range(2))
+    send_chunk(client, stalled, 0, VIDEO_BYTES[:100])
+    MediaUpload.objects.filter(id=stalled).update(
+        updated_at=timezone.now() - timedelta(days=2)
+    )
+    chunks = upload_dirs / "chunks"
+    orphan = chunks / "00000000-0000-0000-0000-000000000000.part"
+    orphan.write_bytes(b"left over")
+    two_days_ago = time.time() - 2 * 24 * 3600
+    os.utime(orphan, (two_days_ago, two_days_ago))
+
+    # Act
+    call_command("prune_stale_uploads", max_age_hours=24)
+
+    # Assert
+    assert [str(pk) for pk in MediaUpload.objects.values_list("id", flat=True)] == [
+        active
+    ]
+    assert sorted(path.name for path in chunks.iterdir()) == [f"{active}.part"]
+
+
+def test_cannot_finalize_incomplete_upload(
+    user_factory, api_client_factory, upload_dirs
+):
+    """
+    Verifies an upload cannot be finalized before every byte has arrived.
+    """
+    # Arrange
+    client = api_client_factory(user=user_factory())
+    upload_id = start_upload(client).json()["id"]
+    send_chunk(client, upload_id, 0, VIDEO_BYTES[:100])
+
+    # Act
+    response = client.post(f"/api/uploads/{upload_id}/finalize/")
+
+    # Assert
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert MediaUpload.objects.get(id=upload_id).status == MediaUpload.STATUS_UPLOADING
+
+
+def test_user_cannot_attach_another_users_upload(
+    user_factory, api_client_factory, upload_dirs
+):
+    """
+    Verifies that upload IDs are scoped to their owner.
+    """
+    # Arrange
+    owner_client = api_client_factory(user=user_factory())
+    upload_id = start_upload(owner_client).json()["id"]
+    send_chunk(owner_client, upload_id, 0, VIDEO_BYTES)
+    owner_client.post(f"/api/uploads/{upload_id}/finalize/")
+
+    other_client = api_client_factory(user=user_factory())
+
+    # Act
+    response = other_client.post(
+        "/api/posts/",
+        {"content": "Not my video", "upload_ids": [upload_id]},
+        format="json",
+    )
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "upload_ids" in response.json()
+    assert PostMedia.objects.count() == 0
@@ -2,6 +2,7 @@
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework.authtoken.models import Token
 from community.models import Group, GroupJoinRequest
@@ -92,4 +93,17 @@ def join_request_scenario(user_factory):
 
 @pytest.fixture
 def channel_layer():
-    return get_channel_layer()
\ No newline at end of file
+    return get_channel_layer()
+
+@pytest.fixture(autouse=True)
+def isolated_cache(settings):
+    """
+    Gives every test its own empty in-memory cache instead of the shared
+    Redis cache, so cached state never leaks between tests (or runs).
+    """
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    }
+    cache.clear()
+    yield
+    cache.clear()
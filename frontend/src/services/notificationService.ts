@@ -13,6 +13,9 @@ class NotificationService {
   private maxReconnectAttempts = 10
   private reconnectInterval = 1000 // Start with 1 second
 
+  // Polls on screen, with how many components show each one. Re-sent after a reconnect.
+  private pollSubscriptions = new Map<number, number>()
+
   public connect(): void {
     const authStore = useAuthStore()
     console.log('Service: connect() called.')
@@ -56,6 +59,9 @@ class NotificationService {
       this.isConnecting = false
       // --- NEW: Reset reconnect attempts on a successful connection ---
       this.resetReconnectState()
+      for (const pollId of this.pollSubscriptions.keys()) {
+        this.send({ type: 'subscribe_poll', poll_id: pollId })
+      }
     }
 
     this.socket.onmessage = this.handleMessage.bind(this) // Use bound method for consistency
@@ -87,6 +93,29 @@ class NotificationService {
     }
   }
 
+  // --- Live poll tallies: subscribe while a poll is on screen ---
+  public subscribeToPoll(pollId: number): void {
+    const count = this.pollSubscriptions.get(pollId) ?? 0
+    this.pollSubscriptions.set(pollId, count + 1)
+    if (count === 0) this.send({ type: 'subscribe_poll', poll_id: pollId })
+  }
+
+  public unsubscribeFromPoll(pollId: number): void {
+    const count = this.pollSubscriptions.get(pollId) ?? 0
+    if (count > 1) {
+      this.pollSubscriptions.set(pollId, count - 1)
+      return
+    }
+    this.pollSubscriptions.delete(pollId)
+    if (count === 1) this.send({ type: 'unsubscribe_poll', poll_id: pollId })
+  }
+
+  private send(message: object): void {
+    if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+      this.socket.send(JSON.stringify(message))
+    }
+  }
+
   // --- Private method for handling messages (your existing logic) ---
   private async handleMessage(event: MessageEvent): Promise<void> {
     try {
@@ -128,6 +157,11 @@ class NotificationService {
           useGroupStore().handlePostDeletedSignal(postId)
           break
         }
+        case 'poll_tallies': {
+          const { usePostsStore } = await import('@/stores/posts')
+          usePostsStore().applyPollTallies(payload)
+          break
+        }
         default:
           console.warn(`Service: Unhandled event type: '${eventType}'`)
       }
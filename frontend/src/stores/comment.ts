@@ -27,6 +27,19 @@ export interface Comment {
   like_count: number;
   is_liked_by_user: boolean;
   comment_content_type_id: number;
+  reply_count: number;
+}
+
+// A top-level comment as returned by the threads endpoint
+interface CommentThread extends Comment {
+  replies: Comment[];
+  more_replies: string | null;
+}
+
+interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
 }
 
 // Define the store
@@ -35,6 +48,9 @@ export const useCommentStore = defineStore('comment', () => {
 
   // --- State ---
   const commentsByPost = ref<Record<string, Comment[]>>({});
+  // Cursor URLs for what the server has not sent yet
+  const nextCommentsPageByPost = ref<Record<string, string | null>>({});
+  const moreRepliesByComment = ref<Record<number, string | null>>({});
   const isLoading = ref(false);
   // --- THE FIX: Initialize with `null`, not a number ---
   const error = ref<string | null>(null);
@@ -48,14 +64,16 @@ export const useCommentStore = defineStore('comment', () => {
     error.value = null;
 
     try {
-      const apiUrl = `/comments/${postType}/${objectId}/`;
-      const response = await axiosInstance.get<Comment[]>(apiUrl);
+      const apiUrl = `/comments/${postType}/${objectId}/threads/`;
+      const response = await axiosInstance.get<CursorPage<CommentThread>>(apiUrl);
 
-      if (Array.isArray(response.data)) {
-          commentsByPost.value[postKey] = response.data;
+      if (Array.isArray(response.data?.results)) {
+          commentsByPost.value[postKey] = [];
+          addThreads(postKey, response.data);
       } else {
           console.error(`CommentStore: Received non-array data for comments ${postKey}:`, response.data);
           commentsByPost.value[postKey] = [];
+          nextCommentsPageByPost.value[postKey] = null;
       }
     } catch (err: any) {
       console.error(`CommentStore: Error fetching comments for ${postKey}:`, err);
@@ -66,6 +84,50 @@ export const useCommentStore = defineStore('comment', () => {
     }
   }
 
+  // Threads arrive with a preview of their replies; the store keeps one flat
+  // list per post, so unpack them.
+  function addThreads(postKey: string, page: CursorPage<CommentThread>) {
+    const list = commentsByPost.value[postKey] || [];
+    for (const { replies, more_replies, ...comment } of page.results) {
+      list.push(comment, ...replies);
+      moreRepliesByComment.value[comment.id] = more_replies;
+    }
+    commentsByPost.value[postKey] = list;
+    nextCommentsPageByPost.value[postKey] = page.next;
+  }
+
+  async function fetchMoreComments(postType: string, objectId: number) {
+    const postKey = `${postType}_${objectId}`;
+    const nextUrl = nextCommentsPageByPost.value[postKey];
+    if (!nextUrl) return;
+
+    try {
+      const response = await axiosInstance.get<CursorPage<CommentThread>>(nextUrl);
+      addThreads(postKey, response.data);
+    } catch (err: any) {
+      console.error(`CommentStore: Error fetching more comments for ${postKey}:`, err);
+      error.value = err.response?.data?.detail || err.message || 'Failed to fetch comments.';
+    }
+  }
+
+  async function fetchMoreReplies(commentId: number, postType: string, objectId: number) {
+    const postKey = `${postType}_${objectId}`;
+    const nextUrl = moreRepliesByComment.value[commentId];
+    if (!nextUrl) return;
+
+    try {
+      const response = await axiosInstance.get<CursorPage<Comment>>(nextUrl);
+      const list = commentsByPost.value[postKey] || [];
+      const known = new Set(list.map(c => c.id));
+      list.push(...response.data.results.filter(c => !known.has(c.id)));
+      commentsByPost.value[postKey] = list;
+      moreRepliesByComment.value[commentId] = response.data.next;
+    } catch (err: any) {
+      console.error(`CommentStore: Error fetching replies to comment ID ${commentId}:`, err);
+      throw err;
+    }
+  }
+
   async function createComment(
       postType: string, 
       objectId: number,
@@ -91,6 +153,10 @@ export const useCommentStore = defineStore('comment', () => {
         commentsByPost.value[postKey] = [];
       }
       commentsByPost.value[postKey].unshift(newComment);
+      if (parentCommentId) {
+        const parent = commentsByPost.value[postKey].find(c => c.id === parentCommentId);
+        if (parent) parent.reply_count = (parent.reply_count || 0) + 1;
+      }
 
       postsStore.incrementCommentCount(parentPostActualId); 
 
@@ -112,6 +178,11 @@ export const useCommentStore = defineStore('comment', () => {
       await axiosInstance.delete(`/comments/${commentId}/`);
 
       if (commentsByPost.value[postKey]) {
+        const deleted = commentsByPost.value[postKey].find(c => c.id === commentId);
+        const parent = deleted?.parent
+          ? commentsByPost.value[postKey].find(c => c.id === deleted.parent)
+          : undefined;
+        if (parent) parent.reply_count = Math.max((parent.reply_count || 0) - 1, 0);
         commentsByPost.value[postKey] = commentsByPost.value[postKey].filter(c => c.id !== commentId);
       }
       
@@ -179,9 +250,13 @@ export const useCommentStore = defineStore('comment', () => {
 
   return {
     commentsByPost,
+    nextCommentsPageByPost,
+    moreRepliesByComment,
     isLoading,
     error,
     fetchComments,
+    fetchMoreComments,
+    fetchMoreReplies,
     createComment,
     isCreatingComment,
     createCommentError,
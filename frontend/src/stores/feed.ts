@@ -4,7 +4,7 @@ import { defineStore } from 'pinia'
 import axiosInstance from '@/services/axiosInstance'
 import { useAuthStore } from './auth'
 import { usePostsStore } from './posts'
-import type { Post } from '@/types'
+import type { Post, PollTallies } from '@/types'
 import { useProfileStore } from './profile'
 import { useGroupStore } from './group'
 
@@ -13,12 +13,6 @@ interface CursorPaginatedResponse {
   previous: string | null
   results: Post[]
 }
-interface OffsetPaginatedResponse {
-  count: number
-  next: string | null
-  previous: string | null
-  results: Post[]
-}
 
 export const useFeedStore = defineStore('feed', () => {
   const postsStore = usePostsStore()
@@ -28,6 +22,8 @@ export const useFeedStore = defineStore('feed', () => {
 
   // --- State (is unchanged) ---
   const mainFeedPostIds = ref<number[]>([])
+  // 'top' asks the server for the ranked feed; 'latest' is newest first.
+  const feedMode = ref<'latest' | 'top'>('latest')
   const newPostIdsFromRefresh = ref<number[]>([])
   const mainFeedNextCursor = ref<string | null>(null)
   const isLoadingMainFeed = ref(false)
@@ -46,6 +42,7 @@ export const useFeedStore = defineStore('feed', () => {
 
   function $reset() {
     mainFeedPostIds.value = []
+    feedMode.value = 'latest'
     newPostIdsFromRefresh.value = []
     mainFeedNextCursor.value = null
     isLoadingMainFeed.value = false
@@ -73,13 +70,26 @@ export const useFeedStore = defineStore('feed', () => {
     searchResultPostIds.value = searchResultPostIds.value.filter((id) => id !== postId)
   }
 
+  function feedUrl() {
+    return feedMode.value === 'top' ? '/feed/?mode=top' : '/feed/'
+  }
+
+  function setFeedMode(mode: 'latest' | 'top') {
+    if (feedMode.value === mode) return
+    feedMode.value = mode
+    mainFeedPostIds.value = []
+    newPostIdsFromRefresh.value = []
+    mainFeedNextCursor.value = null
+    fetchFeed()
+  }
+
   async function fetchFeed(url: string | null = null) {
     if (isLoadingMainFeed.value) return
     isLoadingMainFeed.value = true
     mainFeedError.value = null
     try {
       if (!authStore.isAuthenticated) throw new Error('Authentication required')
-      const apiUrl = url || '/feed/'
+      const apiUrl = url || feedUrl()
       const response = await axiosInstance.get<CursorPaginatedResponse>(apiUrl)
       postsStore.addOrUpdatePosts(response.data.results)
       const newIds = response.data.results.map((post) => post.id)
@@ -96,12 +106,14 @@ export const useFeedStore = defineStore('feed', () => {
   async function refreshMainFeed() {
     if (isRefreshingMainFeed.value) return
     const isInitialLoad = mainFeedPostIds.value.length === 0
+    // The ranked feed has no "new posts" to merge in; it re-ranks on reload.
+    if (feedMode.value === 'top' && !isInitialLoad) return
     if (isInitialLoad) isLoadingMainFeed.value = true
     isRefreshingMainFeed.value = true
     mainFeedError.value = null
     try {
       if (!authStore.isAuthenticated) return
-      const response = await axiosInstance.get<CursorPaginatedResponse>('/feed/')
+      const response = await axiosInstance.get<CursorPaginatedResponse>(feedUrl())
       const freshPosts = response.data.results
       postsStore.addOrUpdatePosts(freshPosts)
       if (isInitialLoad) {
@@ -133,7 +145,7 @@ export const useFeedStore = defineStore('feed', () => {
     try {
       if (!authStore.isAuthenticated) throw new Error('Authentication required')
       const apiUrl = url || '/posts/saved/'
-      const response = await axiosInstance.get<OffsetPaginatedResponse>(apiUrl)
+      const response = await axiosInstance.get<CursorPaginatedResponse>(apiUrl)
       postsStore.addOrUpdatePosts(response.data.results)
       const newIds = response.data.results.map((post) => post.id)
       if (!url) savedPostIds.value = newIds
@@ -275,7 +287,11 @@ export const useFeedStore = defineStore('feed', () => {
     const originalIsSaved = post.is_saved
     postsStore.addOrUpdatePosts([{ id: postId, is_saved: !originalIsSaved } as Partial<Post>])
     try {
-      const response = await axiosInstance.post<Post>(`/posts/${postId}/save/`)
+      // PUT saves and DELETE unsaves; both are safe to retry.
+      const response = await axiosInstance.request<Post>({
+        method: originalIsSaved ? 'delete' : 'put',
+        url: `/posts/${postId}/save/`,
+      })
       postsStore.addOrUpdatePosts([
         { id: postId, is_saved: response.data.is_saved } as Partial<Post>,
       ])
@@ -297,9 +313,9 @@ export const useFeedStore = defineStore('feed', () => {
       // This URL is now correct. It does NOT start with /api/.
       const url = `polls/${pollId}/options/${optionId}/vote/`
 
-      const response = await axiosInstance.post<Post>(url, {})
+      const response = await axiosInstance.post<PollTallies>(url, {})
 
-      postsStore.addOrUpdatePosts([response.data])
+      postsStore.applyPollTallies(response.data)
     } catch (error) {
       console.error('Failed to cast vote:', error)
     }
@@ -321,6 +337,7 @@ export const useFeedStore = defineStore('feed', () => {
   // --- UPDATED RETURN STATEMENT ---
   return {
     mainFeedPostIds,
+    feedMode,
     mainFeedNextCursor,
     isLoadingMainFeed,
     mainFeedError,
@@ -336,6 +353,7 @@ export const useFeedStore = defineStore('feed', () => {
     createPostError,
     isCreatingPost,
     fetchFeed,
+    setFeedMode,
     refreshMainFeed,
     fetchNextPageOfMainFeed: () => fetchFeed(mainFeedNextCursor.value),
     showNewPosts: () => {
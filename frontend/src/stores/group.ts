@@ -7,9 +7,10 @@ import type { User } from './auth';
 import { useAuthStore } from './auth';
 import { usePostsStore, type Post } from './posts';
 
-export interface Group { id: number; slug: string; name: string; description: string | null; creator: User; members: User[]; member_count: number; membership_status: 'creator' | 'member' | 'pending' | 'none' | 'blocked'; created_at: string; privacy_level: 'public' | 'private'; }
+export interface Group { id: number; slug: string; name: string; description: string | null; creator: User; member_count: number; membership_status: 'creator' | 'member' | 'pending' | 'none' | 'blocked'; created_at: string; privacy_level: 'public' | 'private'; }
 interface PaginatedGroupResponse { count: number; next: string | null; previous: string | null; results: Group[]; }
 interface CursorPaginatedGroupPostResponse { next: string | null; previous: string | null; results: Post[]; }
+interface CursorPaginatedMemberResponse { next: string | null; previous: string | null; results: User[]; }
 export interface GroupJoinRequest { id: number; user: User; group: number; status: 'pending' | 'approved' | 'denied'; created_at: string; }
 export interface GroupBlock { id: number; user: User; group: number; blocked_by: User; created_at: string; }
 
@@ -22,6 +23,10 @@ export const useGroupStore = defineStore('group', () => {
   const nextCursorByGroupSlug = ref<{ [slug: string]: string | null }>({});
   const groupsBySlug = ref<{ [slug: string]: Group }>({});
   const hasFetchedPostsByGroupSlug = ref<{ [slug: string]: boolean }>({});
+  // Members are paged separately from the group itself.
+  const membersByGroupSlug = ref<{ [slug: string]: User[] }>({});
+  const membersNextCursorByGroupSlug = ref<{ [slug: string]: string | null }>({});
+  const isLoadingMembers = ref(false);
   const isLoadingGroup = ref(false);
   const isLoadingGroupPosts = ref(false);
   const groupError = ref<string | null>(null);
@@ -70,6 +75,8 @@ export const useGroupStore = defineStore('group', () => {
     nextCursorByGroupSlug.value = {};
     groupsBySlug.value = {};
     hasFetchedPostsByGroupSlug.value = {};
+    membersByGroupSlug.value = {};
+    membersNextCursorByGroupSlug.value = {};
     isLoadingGroup.value = false;
     isLoadingGroupPosts.value = false;
     groupError.value = null;
@@ -122,6 +129,25 @@ export const useGroupStore = defineStore('group', () => {
     }
   }
 
+  // Pass the `next` URL of the previous page to append the following one.
+  async function fetchGroupMembers(groupSlug: string, url: string | null = null) {
+    isLoadingMembers.value = true;
+    try {
+      const response = await axiosInstance.get<CursorPaginatedMemberResponse>(
+        url || `/groups/${groupSlug}/members/`
+      );
+      const existing = url ? membersByGroupSlug.value[groupSlug] || [] : [];
+      membersByGroupSlug.value[groupSlug] = [...existing, ...response.data.results];
+      membersNextCursorByGroupSlug.value[groupSlug] = response.data.next;
+    } catch (err: any) {
+      console.error(`GroupStore: Error fetching members of ${groupSlug}:`, err);
+      if (!url) membersByGroupSlug.value[groupSlug] = [];
+      membersNextCursorByGroupSlug.value[groupSlug] = null;
+    } finally {
+      isLoadingMembers.value = false;
+    }
+  }
+
   async function fetchGroupPosts(groupSlug: string, url: string | null = null) {
     if (!url && hasFetchedPostsByGroupSlug.value[groupSlug]) { return; }
     if (isLoadingGroupPosts.value) return;
@@ -493,7 +519,11 @@ export const useGroupStore = defineStore('group', () => {
     unblockUserError,
     hasFetchedPostsByGroupSlug,
     groupPostsError,
+    membersByGroupSlug,
+    membersNextCursorByGroupSlug,
+    isLoadingMembers,
     fetchGroupDetails,
+    fetchGroupMembers,
     fetchGroupPosts,
     refreshGroupPosts,
     fetchNextPageOfGroupPosts,
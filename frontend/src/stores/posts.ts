@@ -2,7 +2,7 @@
 import { ref, computed } from 'vue'
 import { defineStore } from 'pinia'
 import axiosInstance from '@/services/axiosInstance'
-import type { Post } from '@/types'
+import type { Post, PollTallies } from '@/types'
 
 export const usePostsStore = defineStore('posts', () => {
   const posts = ref<{ [id: number]: Post }>({})
@@ -36,6 +36,20 @@ export const usePostsStore = defineStore('posts', () => {
     }
   }
 
+  function applyPollTallies(tallies: PollTallies) {
+    const poll = posts.value[tallies.post_id]?.poll
+    if (!poll) return
+    const counts = new Map(tallies.options.map((option) => [option.id, option.vote_count]))
+    poll.options = poll.options.map((option) => ({
+      ...option,
+      vote_count: counts.get(option.id) ?? option.vote_count,
+    }))
+    poll.total_votes = tallies.total_votes
+    // Live pushes go to every subscriber, so they carry no per-user vote.
+    if (tallies.user_vote !== undefined) poll.user_vote = tallies.user_vote
+    poll.is_closed = tallies.is_closed
+  }
+
   function removePost(postId: number) {
     console.log(`PostsStore: Deleting post data for ID ${postId} from central cache.`)
     delete posts.value[postId]
@@ -91,6 +105,7 @@ export const usePostsStore = defineStore('posts', () => {
     decrementCommentCount,
     fetchPostById,
     processVoteUpdate,
+    applyPollTallies,
     updateAuthorDetailsInPosts, // <-- Expose the new action
   }
 })
@@ -167,6 +167,18 @@ export interface Poll {
   options: PollOption[]
   total_votes: number
   user_vote: number | null
+  closes_at: string | null
+  is_closed: boolean
+}
+
+// Response of a vote (and live WebSocket push): only the numbers that changed.
+export interface PollTallies {
+  poll_id: number
+  post_id: number
+  options: Pick<PollOption, 'id' | 'vote_count'>[]
+  total_votes: number
+  user_vote?: number | null // Only present in the voter's own response
+  is_closed: boolean
 }
 
 export interface Post {
@@ -183,6 +195,7 @@ export interface Post {
   poll: Poll | null
   like_count: number
   comment_count?: number
+  repost_count?: number
   is_liked_by_user: boolean
   user_reaction: string | null
   reaction_counts: Record<string, number>